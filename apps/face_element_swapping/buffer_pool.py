@@ -0,0 +1,65 @@
+"""
+    This file contains the pool of scratch arrays.
+    Every thread has its own buffers, so the arrays can be reused
+    by many requests handled by the same thread without allocating them again.
+"""
+
+from threading import local
+
+import numpy as np
+
+
+class BufferPool:
+    def __init__(self):
+        self._buffers_of_threads = local()
+
+    def _get_buffers(self):
+        """
+        :return: dictionary of buffers belonging to the current thread
+        :rtype: dictionary - {}
+        """
+        if not hasattr(self._buffers_of_threads, "buffers"):
+            self._buffers_of_threads.buffers = {}
+        return self._buffers_of_threads.buffers
+
+    def get_buffer(self, name, shape, dtype):
+        """
+        This function returns an array with the passed shape ('shape') and type ('dtype').
+        The array is a view of the buffer named 'name' belonging to the current thread.
+        The buffer is enlarged only if it is too small, so its content is not initialized.
+        The returned array is valid only until the next call with the same name
+        and it must not be returned outside the function which requested it.
+        :param name: name of the buffer
+        :type name: string - str
+        :param shape: shape of the returned array
+        :type shape: tuple - ()
+        :param dtype: numpy type (https://www.numpy.org/devdocs/user/basics.types.html)
+        :return: an array with the passed shape
+        :rtype: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        """
+        dtype = np.dtype(dtype)
+        number_of_bytes = int(np.prod(shape)) * dtype.itemsize
+
+        buffers = self._get_buffers()
+        buffer = buffers.get(name)
+        if buffer is None or buffer.nbytes < number_of_bytes:
+            buffer = np.empty(number_of_bytes, dtype=np.uint8)
+            buffers[name] = buffer
+
+        return buffer[:number_of_bytes].view(dtype).reshape(shape)
+
+    def get_number_of_bytes(self):
+        """
+        :return: number of bytes occupied by the buffers of the current thread
+        :rtype: integer - int
+        """
+        return sum(buffer.nbytes for buffer in self._get_buffers().values())
+
+    def clear(self):
+        """
+        This function releases the buffers of the current thread.
+        """
+        self._get_buffers().clear()
+
+
+SCRATCH_BUFFERS = BufferPool()
@@ -1,14 +1,59 @@
-from math import ceil
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from threading import Lock
+from time import perf_counter
 
 import cv2
 import numpy as np
 
-from .helpers import fill_pixel_if_belongs_to_polygon, get_rectangle_in_an_image
+from .buffer_pool import SCRATCH_BUFFERS
+from .color_adjustment import ColorIndex, ColorLookupTable
+from .color_index_cache import ColorIndexCache
+from .helpers import (
+    get_padded_rectangle,
+    get_palette,
+    get_polygon_mask,
+    get_rectangle_in_an_image,
+    get_the_most_frequent_colors,
+)
+from .piecewise_affine_warp import WarpMapCache, get_warp_maps
 from .settings import (
+    COLOR_ADJUSTMENT_MODE_OF_THE_LOOKUP_TABLE,
+    COLOR_ADJUSTMENT_MODES,
     DEFAULT_CLASSIFIER,
-    PERCENT_OF_NEAREST_NEIGHBOURS,
+    DEFAULT_COLOR_ADJUSTMENT_MODE,
+    DEFAULT_WARP_MODE,
+    MAXIMUM_NUMBER_OF_COLORS_OF_THE_TRAINING_PALETTE,
+    NUMBER_OF_CELLS_PER_CHANNEL_OF_THE_COLOR_LOOKUP_TABLE,
+    NUMBER_OF_THREADS_OF_THE_MULTI_FACE_SWAPPING,
+    NUMBERS_OF_CELLS_PER_CHANNEL_IN_THE_ERROR_REPORT,
+    PADDING_OF_THE_REGION_OF_INTEREST_OF_SEAMLESS_CLONING,
     RGB_MASK_FILLING_COLOR,
+    SEAMLESS_CLONING_IN_THE_REGION_OF_INTEREST,
+    WARP_MODE_OF_THE_PIECEWISE_AFFINE_TRANSFORM,
+    WARP_MODES,
 )
+from .timing import timing_span
+
+_thread_pool_of_the_multi_face_swapping = None
+_lock_of_the_thread_pool_of_the_multi_face_swapping = Lock()
+
+
+def _get_thread_pool_of_the_multi_face_swapping():
+    """
+    :return: the thread pool shared by all calls of the function 'change_face_elements'
+    (class 'ChangeFaceElement' contained in this file). It is created by the first call,
+    so its threads (and their scratch buffers) are reused by the next calls.
+    :rtype: concurrent.futures.ThreadPoolExecutor
+    """
+    global _thread_pool_of_the_multi_face_swapping
+    with _lock_of_the_thread_pool_of_the_multi_face_swapping:
+        if _thread_pool_of_the_multi_face_swapping is None:
+            _thread_pool_of_the_multi_face_swapping = ThreadPoolExecutor(
+                max_workers=NUMBER_OF_THREADS_OF_THE_MULTI_FACE_SWAPPING,
+                thread_name_prefix="multi_face_swapping",
+            )
+        return _thread_pool_of_the_multi_face_swapping
 
 
 class ChangeFaceElement:
@@ -21,18 +66,27 @@ class ChangeFaceElement:
         dst_cut_field=None,
         cropped_src_rgb_array=None,
         cropped_dst_rgb_array=None,
+        src_control_points=None,
+        dst_control_points=None,
+        warp_mode=DEFAULT_WARP_MODE,
+        warp_map_cache=None,
     ):
         self.src_rgb_array = src_rgb_array
         self.dst_rgb_array = dst_rgb_array
         self.src_polygon = src_polygon
         self.dst_polygon = dst_polygon
         self.dst_cut_field = dst_cut_field
-        self.mask = dst_rgb_array
-        self.tmp_dst_rgb_array = dst_rgb_array
+        self.region_of_interest = None
+        self.mask = None
+        self.tmp_dst_rgb_array = None
         self.cropped_src_rgb_array = cropped_src_rgb_array
         self.cropped_dst_rgb_array = cropped_dst_rgb_array
         self.bounding_rectangle_of_src_polygon = src_polygon
         self.bounding_rectangle_of_dst_polygon = dst_polygon
+        self.src_control_points = src_control_points
+        self.dst_control_points = dst_control_points
+        self.warp_mode = warp_mode
+        self.warp_map_cache = warp_map_cache
 
     @property
     def src_rgb_array(self):
@@ -74,27 +128,29 @@ class ChangeFaceElement:
     def dst_cut_field(self, dst_cut_field):
         self._dst_cut_field = dst_cut_field
 
+    @property
+    def region_of_interest(self):
+        return self._region_of_interest
+
+    @region_of_interest.setter
+    def region_of_interest(self, region_of_interest):
+        self._region_of_interest = region_of_interest
+
     @property
     def mask(self):
         return self._mask
 
     @mask.setter
-    def mask(self, dst_rgb_array):
-        if dst_rgb_array is not None:
-            self._mask = np.zeros_like(dst_rgb_array)
-        else:
-            self._mask = None
+    def mask(self, mask):
+        self._mask = mask
 
     @property
     def tmp_dst_rgb_array(self):
         return self._tmp_dst_rgb_array
 
     @tmp_dst_rgb_array.setter
-    def tmp_dst_rgb_array(self, dst_rgb_array):
-        if dst_rgb_array is not None:
-            self._tmp_dst_rgb_array = dst_rgb_array.copy()
-        else:
-            self._tmp_dst_rgb_array = None
+    def tmp_dst_rgb_array(self, tmp_dst_rgb_array):
+        self._tmp_dst_rgb_array = tmp_dst_rgb_array
 
     @property
     def cropped_src_rgb_array(self):
@@ -138,6 +194,46 @@ class ChangeFaceElement:
         else:
             self._bounding_rectangle_of_dst_polygon = None
 
+    @property
+    def src_control_points(self):
+        return self._src_control_points
+
+    @src_control_points.setter
+    def src_control_points(self, src_control_points):
+        self._src_control_points = src_control_points
+
+    @property
+    def dst_control_points(self):
+        return self._dst_control_points
+
+    @dst_control_points.setter
+    def dst_control_points(self, dst_control_points):
+        self._dst_control_points = dst_control_points
+
+    @property
+    def warp_mode(self):
+        return self._warp_mode
+
+    @warp_mode.setter
+    def warp_mode(self, warp_mode):
+        if warp_mode not in WARP_MODES:
+            supported_modes = ", ".join(map(lambda mode: "'" + mode + "'", WARP_MODES))
+            raise ValueError(
+                "The passed mode: '{mode}' is not supported by this class. "
+                "The supported modes are: {supported_modes}.".format(
+                    mode=warp_mode, supported_modes=supported_modes
+                )
+            )
+        self._warp_mode = warp_mode
+
+    @property
+    def warp_map_cache(self):
+        return self._warp_map_cache
+
+    @warp_map_cache.setter
+    def warp_map_cache(self, warp_map_cache):
+        self._warp_map_cache = warp_map_cache
+
     @staticmethod
     def get_bounding_rectangle_of_polygon(polygon):
         """
@@ -205,7 +301,76 @@ class ChangeFaceElement:
         return warp_mats
 
     @staticmethod
-    def get_vector_of_pixels(rgb_array, bounding_rectangle_of_polygon, unique=True):
+    def get_piecewise_affine_warp_maps(
+        src_polygon,
+        dst_polygon,
+        src_control_points=None,
+        dst_control_points=None,
+        warp_map_cache=None,
+    ):
+        """
+        :param src_polygon: list or tuple of coordinates in 2D Space ([(x, y),(x, y),(x, y)...] or ((x, y),(x, y),(x, y)...)).
+                            All elements in list (or tuple) should represent a source polygon.
+        :type src_polygon: list - [] or tuple - ()
+        :param dst_polygon: list or tuple of coordinates in 2D Space ([(x, y),(x, y),(x, y)...] or ((x, y),(x, y),(x, y)...)).
+                            All elements in list (or tuple) should represent a destination polygon.
+        :type dst_polygon: list - [] or tuple - ()
+        :param src_control_points: None or points of the source image (e.g. the landmarks of the part of the face)
+        in the same coordinates as 'src_polygon' ([(x, y),(x, y),(x, y)...])
+        :type src_control_points: None or list - [] or tuple - ()
+        :param dst_control_points: None or points of the destination image corresponding to 'src_control_points'
+        :type dst_control_points: None or list - [] or tuple - ()
+        :param warp_map_cache: None or the cache in which the maps are looked for and stored
+        :type warp_map_cache: None or WarpMapCache (from the file '.piecewise_affine_warp')
+        :return: maps warping the bounding rectangle of 'src_polygon' to the bounding rectangle of 'dst_polygon'
+        (see the function 'get_warp_maps' from the file '.piecewise_affine_warp').
+        The triangles are formed by the points of the polygons and the control points.
+        The control points are used only if both of them are passed.
+        :rtype: tuple - (numpy.ndarray, numpy.ndarray)
+        """
+        if not src_control_points or not dst_control_points:
+            src_control_points = dst_control_points = None
+        bounding_rectangle_of_src_polygon = (
+            ChangeFaceElement.get_bounding_rectangle_of_polygon(polygon=src_polygon)
+        )
+        bounding_rectangle_of_dst_polygon = (
+            ChangeFaceElement.get_bounding_rectangle_of_polygon(polygon=dst_polygon)
+        )
+        src_points = np.array(
+            list(src_polygon) + list(src_control_points or []), dtype=np.float64
+        ) - bounding_rectangle_of_src_polygon[:2]
+        dst_points = np.array(
+            list(dst_polygon) + list(dst_control_points or []), dtype=np.float64
+        ) - bounding_rectangle_of_dst_polygon[:2]
+        size_of_the_output = tuple(bounding_rectangle_of_dst_polygon[2:])
+
+        key = None
+        if warp_map_cache is not None:
+            key = WarpMapCache.get_key(
+                src_points=src_points,
+                dst_points=dst_points,
+                size_of_the_output=size_of_the_output,
+            )
+            warp_maps = warp_map_cache.get(key=key)
+            if warp_maps is not None:
+                return warp_maps
+
+        warp_maps = get_warp_maps(
+            src_points=src_points,
+            dst_points=dst_points,
+            size_of_the_output=size_of_the_output,
+            perspective_transform=ChangeFaceElement.get_warp_mats(
+                src_polygon=src_polygon, dst_polygon=dst_polygon
+            ),
+        )
+        if warp_map_cache is not None:
+            warp_map_cache.add(key=key, warp_maps=warp_maps)
+        return warp_maps
+
+    @staticmethod
+    def get_vector_of_pixels(
+        rgb_array, bounding_rectangle_of_polygon, unique=True, return_counts=False
+    ):
         """
         :param rgb_array: an RGB image converted into a numpy array (the array has following shape(y, x, 3))
         :type rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
@@ -214,8 +379,13 @@ class ChangeFaceElement:
         :type bounding_rectangle_of_polygon: tuple - () or list - (). The tuple or list should have four elements.
         :param unique: params indicates if returned vector will contain only unique pixel values
         :type unique: bool (True or False)
+        :param return_counts: params indicates if the number of occurrences of each unique pixel value
+        will be also returned (it is used only if 'unique' is True)
+        :type return_counts: bool (True or False)
         :return: vector of all pixels or vector of unique pixels (it depends on the parameter 'unique')
+        and optionally the vector of their counts (it depends on the parameter 'return_counts')
         :rtype numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        or tuple - (), (numpy.ndarray, numpy.ndarray)
         """
         data = get_rectangle_in_an_image(
             np_array=rgb_array,
@@ -224,12 +394,123 @@ class ChangeFaceElement:
         shape = data.shape
         data = np.reshape(data, (shape[0] * shape[1], shape[2]))
         if unique:
-            data = np.unique(data, axis=0)
+            data, counts = get_palette(rgb_values=data)
+            if return_counts:
+                return data, counts
         return data
 
+    @staticmethod
+    def get_color_index(
+        classifier, training_image, polygon_of_images, color_index_cache=None
+    ):
+        """
+        :param classifier: object representing a classifier.
+        The classifier is based on the kNN algorithm (https://en.wikipedia.org/wiki/K-nearest_neighbors_algorithm).
+        The first parameter of this classifier must be the number of neighbors(integer - int).
+        :param training_image: an RGB image converted into a numpy array (the array has following shape(y, x, 3))
+        Pixels of this image will be used to fitting the classifier.
+        :type training_image: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :param polygon_of_images: list of tuple of points in 2D Space ([(x, y),(x, y),(x, y)...] or ((x, y),(x, y),(x, y)...))
+        Unique pixels of 'training_image' from the bounding rectangle of this polygon form the training palette.
+        If the palette has more colors than 'MAXIMUM_NUMBER_OF_COLORS_OF_THE_TRAINING_PALETTE' (from the file '.settings'),
+        only the most frequent of them are kept.
+        :type polygon_of_images: list - [] or tuple - ()
+        :param color_index_cache: None or the cache in which the fitted classifier is looked for and stored
+        :type color_index_cache: None or ColorIndexCache (from the file '.color_index_cache')
+        :return: the classifier fitted to the training palette
+        :rtype: ColorIndex (from the file '.color_adjustment')
+        """
+        bounding_rectangle_of_polygon = (
+            ChangeFaceElement.get_bounding_rectangle_of_polygon(
+                polygon=polygon_of_images
+            )
+        )
+        if color_index_cache is not None:
+            key = ColorIndexCache.get_key(
+                classifier=classifier,
+                training_image=training_image,
+                bounding_rectangle_of_polygon=bounding_rectangle_of_polygon,
+            )
+            color_index = color_index_cache.get(key=key)
+            if color_index is not None:
+                return color_index
+
+        training_data, training_data_counts = ChangeFaceElement.get_vector_of_pixels(
+            rgb_array=training_image,
+            bounding_rectangle_of_polygon=bounding_rectangle_of_polygon,
+            return_counts=True,
+        )
+        if MAXIMUM_NUMBER_OF_COLORS_OF_THE_TRAINING_PALETTE is not None:
+            training_data, _ = get_the_most_frequent_colors(
+                colors=training_data,
+                counts=training_data_counts,
+                maximum_number_of_colors=MAXIMUM_NUMBER_OF_COLORS_OF_THE_TRAINING_PALETTE,
+            )
+        color_index = ColorIndex(classifier=classifier, training_data=training_data)
+
+        if color_index_cache is not None:
+            color_index_cache.add(key=key, color_index=color_index)
+        return color_index
+
+    @staticmethod
+    def get_pixels_inside_polygon(rgb_array, polygon):
+        """
+        :param rgb_array: an RGB image converted into a numpy array (the array has following shape(y, x, 3))
+        :type rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :param polygon: list or tuple of coordinates in 2D Space ([(x, y),(x, y),(x, y)...] or ((x, y),(x, y),(x, y)...)).
+        :type polygon: list - [] or tuple - ()
+        :return: the view of the bounding rectangle of 'polygon' in 'rgb_array'
+        and the boolean mask of the pixels of this rectangle that are inside 'polygon'
+        :rtype: tuple - (), (numpy.ndarray, numpy.ndarray)
+        """
+        bounding_rectangle_of_polygon = (
+            ChangeFaceElement.get_bounding_rectangle_of_polygon(polygon=polygon)
+        )
+        polygon_mask = get_polygon_mask(
+            polygon=polygon,
+            bounding_rectangle_of_polygon=bounding_rectangle_of_polygon,
+        )
+        rectangle_of_rgb_array = get_rectangle_in_an_image(
+            np_array=rgb_array,
+            bounding_rectangle_of_polygon=bounding_rectangle_of_polygon,
+        )
+        return rectangle_of_rgb_array, polygon_mask
+
+    @staticmethod
+    def replace_colors_inside_polygon(color_adjuster, image_to_adjust, polygon_of_images):
+        """
+        This function replaces pixels of 'image_to_adjust' that are included in 'polygon_of_images'
+        with the colors returned by 'color_adjuster'.
+        :param color_adjuster: an object with the method 'get_adjusted_colors'
+        (e.g. 'ColorIndex' or 'ColorLookupTable' from the file '.color_adjustment')
+        :param image_to_adjust: an RGB image converted into a numpy array (the array has following shape(y, x, 3))
+        :type image_to_adjust: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :param polygon_of_images: list of tuple of points in 2D Space ([(x, y),(x, y),(x, y)...] or ((x, y),(x, y),(x, y)...))
+        :type polygon_of_images: list - [] or tuple - ()
+        :return: 'image_to_adjust' in which pixels inside 'polygon_of_images' have been replaced.
+        :rtype: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        """
+        # Only pixels inside the polygon are replaced,
+        # so only these pixels are passed to 'color_adjuster'.
+        (
+            rectangle_to_adjust,
+            polygon_mask,
+        ) = ChangeFaceElement.get_pixels_inside_polygon(
+            rgb_array=image_to_adjust, polygon=polygon_of_images
+        )
+        if polygon_mask.any():
+            rectangle_to_adjust[polygon_mask] = color_adjuster.get_adjusted_colors(
+                rgb_values=rectangle_to_adjust[polygon_mask]
+            )
+        return image_to_adjust
+
     @staticmethod
     def adjust_image_colors_via_classifier(
-        classifier, training_image, image_to_adjust, polygon_of_images
+        classifier,
+        training_image,
+        image_to_adjust,
+        polygon_of_images,
+        color_index_cache=None,
     ):
         """
         This function replaces pixels of 'image_to_adjust' that are included in 'polygon_of_images'.
@@ -251,133 +532,297 @@ class ChangeFaceElement:
         All points in this list or tuple form a polygon.
         Pixels of 'image_to_adjust' that are inside the polygon will be replaced.
         :type polygon_of_images: list - [] or tuple - ()
+        :param color_index_cache: None or the cache in which the fitted classifier is looked for and stored
+        :type color_index_cache: None or ColorIndexCache (from the file '.color_index_cache')
         :return: 'image_to_adjust' in which pixels inside 'polygon_of_images' have been replaced.
         :rtype: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
         """
-        bounding_rectangle_of_polygon = (
-            ChangeFaceElement.get_bounding_rectangle_of_polygon(
-                polygon=polygon_of_images
-            )
+        color_index = ChangeFaceElement.get_color_index(
+            classifier=classifier,
+            training_image=training_image,
+            polygon_of_images=polygon_of_images,
+            color_index_cache=color_index_cache,
         )
-        training_data = ChangeFaceElement.get_vector_of_pixels(
-            rgb_array=training_image,
-            bounding_rectangle_of_polygon=bounding_rectangle_of_polygon,
+        return ChangeFaceElement.replace_colors_inside_polygon(
+            color_adjuster=color_index,
+            image_to_adjust=image_to_adjust,
+            polygon_of_images=polygon_of_images,
         )
-        training_data_avg = np.average(training_data, axis=0)
-        training_data_std = np.std(training_data, axis=0)
 
-        normalized_training_data = (
-            training_data - training_data_avg
-        ) / training_data_std
-        training_labels = range(training_data.shape[0])
+    @staticmethod
+    def adjust_image_colors(
+        classifier,
+        training_image,
+        image_to_adjust,
+        polygon_of_images,
+        color_adjustment_mode=DEFAULT_COLOR_ADJUSTMENT_MODE,
+        color_index_cache=None,
+    ):
+        """
+        This function replaces pixels of 'image_to_adjust' that are included in 'polygon_of_images'
+        with the colors returned by the object which adjusts colors in the passed mode ('color_adjustment_mode')
+        (see the functions 'get_color_adjuster' and 'replace_colors_inside_polygon' included in this class).
+        :param classifier: object representing a classifier.
+        The classifier is based on the kNN algorithm (https://en.wikipedia.org/wiki/K-nearest_neighbors_algorithm).
+        The first parameter of this classifier must be the number of neighbors(integer - int).
+        Examples of the classifiers:
+            https://scikit-learn.org/stable/modules/generated/sklearn.neighbors.KNeighborsClassifier.html
+            https://scikit-learn.org/stable/modules/generated/sklearn.neighbors.NearestNeighbors.html
+        :param training_image: an RGB image converted into a numpy array (the array has following shape(y, x, 3))
+        Pixels of this image will be used to fitting the classifier.
+        :type training_image: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :param image_to_adjust: an RGB image converted into a numpy array (the array has following shape(y, x, 3))
+        Some of the pixels in this image will be replaced by
+        the pixels of the second image that are the most similar to them in terms of color.
+        :type image_to_adjust: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :param polygon_of_images: list of tuple of points in 2D Space ([(x, y),(x, y),(x, y)...] or ((x, y),(x, y),(x, y)...))
+        All points in this list or tuple form a polygon.
+        Pixels of 'image_to_adjust' that are inside the polygon will be replaced.
+        :type polygon_of_images: list - [] or tuple - ()
+        :param color_adjustment_mode: one of the values of the COLOR_ADJUSTMENT_MODES list (from the file '.settings')
+        :type color_adjustment_mode: string - str
+        :param color_index_cache: None or the cache in which the fitted classifier is looked for and stored
+        :type color_index_cache: None or ColorIndexCache (from the file '.color_index_cache')
+        :return: 'image_to_adjust' in which pixels inside 'polygon_of_images' have been replaced.
+        :rtype: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :raises ValueError: if the passed mode ('color_adjustment_mode') is not one of the values of the COLOR_ADJUSTMENT_MODES list.
+        """
+        color_adjuster = ChangeFaceElement.get_color_adjuster(
+            classifier=classifier,
+            training_image=training_image,
+            polygon_of_images=polygon_of_images,
+            color_adjustment_mode=color_adjustment_mode,
+            color_index_cache=color_index_cache,
+        )
+        return ChangeFaceElement.replace_colors_inside_polygon(
+            color_adjuster=color_adjuster,
+            image_to_adjust=image_to_adjust,
+            polygon_of_images=polygon_of_images,
+        )
 
-        data_to_adjust = ChangeFaceElement.get_vector_of_pixels(
-            rgb_array=image_to_adjust,
-            bounding_rectangle_of_polygon=bounding_rectangle_of_polygon,
-            unique=False,
-        )
-        data_to_adjust = (data_to_adjust - training_data_avg) / training_data_std
-
-        classifier = classifier(
-            n_neighbors=ceil(PERCENT_OF_NEAREST_NEIGHBOURS * training_data.shape[0])
-        )
-        classifier.fit(normalized_training_data, training_labels)
-        labels = classifier.kneighbors(data_to_adjust, return_distance=False)
-
-        label_idx = 0
-        for row_idx in range(
-            bounding_rectangle_of_polygon[1],
-            bounding_rectangle_of_polygon[1] + bounding_rectangle_of_polygon[3],
-        ):
-            for column_idx in range(
-                bounding_rectangle_of_polygon[0],
-                bounding_rectangle_of_polygon[0] + bounding_rectangle_of_polygon[2],
-            ):
-                pixel_value = np.round(
-                    np.average(training_data[labels[label_idx]], axis=0)
-                ).astype(np.uint8)
-                fill_pixel_if_belongs_to_polygon(
-                    rgb_array=image_to_adjust,
-                    polygon=polygon_of_images,
-                    row_idx=row_idx,
-                    column_idx=column_idx,
-                    pixel_value=pixel_value,
+    @staticmethod
+    def get_color_adjuster(
+        classifier,
+        training_image,
+        polygon_of_images,
+        color_adjustment_mode=DEFAULT_COLOR_ADJUSTMENT_MODE,
+        color_index_cache=None,
+        number_of_cells_per_channel=NUMBER_OF_CELLS_PER_CHANNEL_OF_THE_COLOR_LOOKUP_TABLE,
+    ):
+        """
+        :param classifier: object representing a classifier.
+        The classifier is based on the kNN algorithm (https://en.wikipedia.org/wiki/K-nearest_neighbors_algorithm).
+        :param training_image: an RGB image converted into a numpy array (the array has following shape(y, x, 3))
+        Pixels of this image will be used to fitting the classifier.
+        :type training_image: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :param polygon_of_images: list of tuple of points in 2D Space ([(x, y),(x, y),(x, y)...] or ((x, y),(x, y),(x, y)...))
+        :type polygon_of_images: list - [] or tuple - ()
+        :param color_adjustment_mode: one of the values of the COLOR_ADJUSTMENT_MODES list (from the file '.settings')
+        :type color_adjustment_mode: string - str
+        :param color_index_cache: None or the cache in which the fitted classifier is looked for and stored
+        :type color_index_cache: None or ColorIndexCache (from the file '.color_index_cache')
+        :param number_of_cells_per_channel: number of cells along each axis of the RGB cube of the lookup table
+        (it is used only by the mode COLOR_ADJUSTMENT_MODE_OF_THE_LOOKUP_TABLE)
+        :type number_of_cells_per_channel: integer - int
+        :return: the object which adjusts colors in the passed mode (see the function 'replace_colors_inside_polygon')
+        :rtype: ColorIndex or ColorLookupTable (from the file '.color_adjustment')
+        :raises ValueError: if the passed mode ('color_adjustment_mode') is not one of the values of the COLOR_ADJUSTMENT_MODES list.
+        """
+        if color_adjustment_mode not in COLOR_ADJUSTMENT_MODES:
+            supported_modes = ", ".join(
+                map(lambda mode: "'" + mode + "'", COLOR_ADJUSTMENT_MODES)
+            )
+            raise ValueError(
+                "The passed mode: '{mode}' is not supported by this function. "
+                "The supported modes are: {supported_modes}.".format(
+                    mode=color_adjustment_mode, supported_modes=supported_modes
                 )
-                label_idx += 1
+            )
 
-        return image_to_adjust
+        color_index = ChangeFaceElement.get_color_index(
+            classifier=classifier,
+            training_image=training_image,
+            polygon_of_images=polygon_of_images,
+            color_index_cache=color_index_cache,
+        )
+        if color_adjustment_mode == COLOR_ADJUSTMENT_MODE_OF_THE_LOOKUP_TABLE:
+            return ColorLookupTable(
+                color_index=color_index,
+                number_of_cells_per_channel=number_of_cells_per_channel,
+            )
+        return color_index
 
-    def _fill_pixels(
-        self,
-        row_idx,
-        column_idx,
-        cropped_dst_rgb_array_row_idx,
-        cropped_dst_rgb_array_column_idx,
+    @staticmethod
+    def get_error_report_of_the_lookup_table(
+        classifier,
+        training_image,
+        image_to_adjust,
+        polygon_of_images,
+        numbers_of_cells_per_channel=NUMBERS_OF_CELLS_PER_CHANNEL_IN_THE_ERROR_REPORT,
     ):
         """
-        This function fills chosen pixels of 'self.tmp_dst_rgb_array' and 'self.mask'.
-        :param row_idx: current row index of 'self.tmp_dst_rgb_array' and 'self.mask'
-        :type row_idx: integer - int
-        :param column_idx: current column index of 'self.tmp_dst_rgb_array' and 'self.mask'
-        :type column_idx: integer - int
-        :param cropped_dst_rgb_array_row_idx: current row index of 'self._cropped_dst_rgb_array'
-        :type cropped_dst_rgb_array_row_idx: integer - int
-        :param cropped_dst_rgb_array_column_idx: current column index of 'self._cropped_dst_rgb_array'
-        :type cropped_dst_rgb_array_column_idx: integer - int
-        """
-        fill_pixel_if_belongs_to_polygon(
-            rgb_array=self.tmp_dst_rgb_array,
-            polygon=self.dst_polygon,
-            row_idx=row_idx,
-            column_idx=column_idx,
-            pixel_value=self._cropped_dst_rgb_array[cropped_dst_rgb_array_row_idx][
-                cropped_dst_rgb_array_column_idx
-            ],
+        This function compares colors calculated via lookup tables of different sizes
+        with the colors calculated via the classifier, for pixels of 'image_to_adjust' that are included in 'polygon_of_images'.
+        Neither of the passed images is modified.
+        :param classifier: object representing a classifier.
+        The classifier is based on the kNN algorithm (https://en.wikipedia.org/wiki/K-nearest_neighbors_algorithm).
+        The first parameter of this classifier must be the number of neighbors(integer - int).
+        Examples of the classifiers:
+            https://scikit-learn.org/stable/modules/generated/sklearn.neighbors.KNeighborsClassifier.html
+            https://scikit-learn.org/stable/modules/generated/sklearn.neighbors.NearestNeighbors.html
+        :param training_image: an RGB image converted into a numpy array (the array has following shape(y, x, 3))
+        Pixels of this image will be used to fitting the classifier.
+        :type training_image: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :param image_to_adjust: an RGB image converted into a numpy array (the array has following shape(y, x, 3))
+        Some of the pixels in this image will be replaced by
+        the pixels of the second image that are the most similar to them in terms of color.
+        :type image_to_adjust: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :param polygon_of_images: list of tuple of points in 2D Space ([(x, y),(x, y),(x, y)...] or ((x, y),(x, y),(x, y)...))
+        All points in this list or tuple form a polygon.
+        Pixels of 'image_to_adjust' that are inside the polygon will be replaced.
+        :type polygon_of_images: list - [] or tuple - ()
+        :param numbers_of_cells_per_channel: numbers of cells along each axis of the compared RGB cubes
+        :type numbers_of_cells_per_channel: list - [] or tuple - () of integers
+        :return: dictionary with the keys: 'number_of_pixels', 'seconds_of_fitting', 'seconds_of_the_classifier' and 'lookup_tables'.
+        The key 'lookup_tables' contains a list of dictionaries (one per size of the cube) with the following keys:
+        'number_of_cells_per_channel', 'number_of_calculated_nodes', 'seconds',
+        'maximum_absolute_error', 'mean_absolute_error' and 'fraction_of_different_pixels'
+        (the fraction of the pixels whose color differs from the color calculated via the classifier, from 0 to 1).
+        :rtype: dictionary - {}
+        """
+        start = perf_counter()
+        color_index = ChangeFaceElement.get_color_index(
+            classifier=classifier,
+            training_image=training_image,
+            polygon_of_images=polygon_of_images,
         )
+        seconds_of_fitting = perf_counter() - start
 
-        fill_pixel_if_belongs_to_polygon(
-            rgb_array=self.mask,
-            polygon=self.dst_polygon,
-            row_idx=row_idx,
-            column_idx=column_idx,
-            pixel_value=RGB_MASK_FILLING_COLOR,
+        rectangle_to_adjust, polygon_mask = ChangeFaceElement.get_pixels_inside_polygon(
+            rgb_array=image_to_adjust, polygon=polygon_of_images
+        )
+        pixels_to_adjust = rectangle_to_adjust[polygon_mask]
+
+        start = perf_counter()
+        exact_colors = color_index.get_adjusted_colors(rgb_values=pixels_to_adjust)
+        seconds_of_the_classifier = perf_counter() - start
+
+        lookup_tables = []
+        for number_of_cells_per_channel in numbers_of_cells_per_channel:
+            start = perf_counter()
+            lookup_table = ColorLookupTable(
+                color_index=color_index,
+                number_of_cells_per_channel=number_of_cells_per_channel,
+            )
+            looked_up_colors = lookup_table.get_adjusted_colors(
+                rgb_values=pixels_to_adjust
+            )
+            seconds = perf_counter() - start
+
+            absolute_errors = np.abs(
+                looked_up_colors.astype(np.int16) - exact_colors.astype(np.int16)
+            )
+            lookup_tables.append(
+                {
+                    "number_of_cells_per_channel": number_of_cells_per_channel,
+                    "number_of_calculated_nodes": lookup_table.number_of_calculated_nodes,
+                    "seconds": seconds,
+                    "maximum_absolute_error": int(absolute_errors.max(initial=0)),
+                    "mean_absolute_error": float(absolute_errors.mean())
+                    if absolute_errors.size
+                    else 0.0,
+                    "fraction_of_different_pixels": float(
+                        np.any(absolute_errors, axis=1).mean()
+                    )
+                    if absolute_errors.size
+                    else 0.0,
+                }
+            )
+
+        return {
+            "number_of_pixels": int(pixels_to_adjust.shape[0]),
+            "seconds_of_fitting": seconds_of_fitting,
+            "seconds_of_the_classifier": seconds_of_the_classifier,
+            "lookup_tables": lookup_tables,
+        }
+
+    def _prepare_scratch_arrays(self, region_of_interest):
+        """
+        This function sets 'self.region_of_interest' and prepares 'self.mask' and 'self.tmp_dst_rgb_array'.
+        Both arrays cover only the region of interest and are taken from the buffers of the current thread
+        (SCRATCH_BUFFERS from the file '.buffer_pool'), so 'self.dst_rgb_array' is never modified.
+        'self.tmp_dst_rgb_array' is a copy of the region of interest of 'self.dst_rgb_array'
+        and 'self.mask' is filled with zeros.
+        :param region_of_interest: tuple or list with coordinates of the start point of the rectangle
+        and the width and height of this rectangle - (x, y, width, height) or [x, y, width, height]
+        :type region_of_interest: tuple - () or list - (). The tuple or list should have four elements.
+        """
+        self.region_of_interest = region_of_interest
+        rectangle_of_dst_rgb_array = get_rectangle_in_an_image(
+            np_array=self.dst_rgb_array,
+            bounding_rectangle_of_polygon=region_of_interest,
         )
 
+        self.tmp_dst_rgb_array = SCRATCH_BUFFERS.get_buffer(
+            name="tmp_dst_rgb_array",
+            shape=rectangle_of_dst_rgb_array.shape,
+            dtype=rectangle_of_dst_rgb_array.dtype,
+        )
+        self.tmp_dst_rgb_array[:] = rectangle_of_dst_rgb_array
+
+        self.mask = SCRATCH_BUFFERS.get_buffer(
+            name="mask",
+            shape=rectangle_of_dst_rgb_array.shape,
+            dtype=rectangle_of_dst_rgb_array.dtype,
+        )
+        self.mask.fill(0)
+
     def _fill_polygon_in_an_image(self):
         """
-        This function fills pixels of 'self.mask' and 'self.tmp_dst_rgb_array'.
-        Every newer pixel value is taken from the set of pixels of 'training_image' that are included in 'polygon_of_images'.
+        This function fills pixels of 'self.mask' and 'self.tmp_dst_rgb_array' that are included in 'self.dst_polygon'.
+        Every newer pixel value of 'self.tmp_dst_rgb_array' is taken from 'self.cropped_dst_rgb_array'.
+        Every newer pixel value of 'self.mask' is equal to 'RGB_MASK_FILLING_COLOR'.
+        Both arrays cover only 'self.region_of_interest'.
         """
-        cropped_dst_rgb_array_row_idx = 0
-        for row_idx in range(
-            self.bounding_rectangle_of_dst_polygon[1],
-            self.bounding_rectangle_of_dst_polygon[1]
-            + self.bounding_rectangle_of_dst_polygon[3],
-        ):
-            cropped_dst_rgb_array_column_idx = 0
-            for column_idx in range(
-                self.bounding_rectangle_of_dst_polygon[0],
-                self.bounding_rectangle_of_dst_polygon[0]
-                + self.bounding_rectangle_of_dst_polygon[2],
-            ):
-                self._fill_pixels(
-                    row_idx=row_idx,
-                    column_idx=column_idx,
-                    cropped_dst_rgb_array_row_idx=cropped_dst_rgb_array_row_idx,
-                    cropped_dst_rgb_array_column_idx=cropped_dst_rgb_array_column_idx,
-                )
+        polygon_mask = get_polygon_mask(
+            polygon=self.dst_polygon,
+            bounding_rectangle_of_polygon=self.bounding_rectangle_of_dst_polygon,
+        )
+        height, width = polygon_mask.shape
+        bounding_rectangle_in_the_region_of_interest = (
+            self.bounding_rectangle_of_dst_polygon[0] - self.region_of_interest[0],
+            self.bounding_rectangle_of_dst_polygon[1] - self.region_of_interest[1],
+            width,
+            height,
+        )
 
-                cropped_dst_rgb_array_column_idx += 1
-            cropped_dst_rgb_array_row_idx += 1
+        rectangle_of_tmp_dst_rgb_array = get_rectangle_in_an_image(
+            np_array=self.tmp_dst_rgb_array,
+            bounding_rectangle_of_polygon=bounding_rectangle_in_the_region_of_interest,
+        )
+        rectangle_of_tmp_dst_rgb_array[polygon_mask] = self.cropped_dst_rgb_array[
+            :height, :width
+        ][polygon_mask]
+
+        rectangle_of_mask = get_rectangle_in_an_image(
+            np_array=self.mask,
+            bounding_rectangle_of_polygon=bounding_rectangle_in_the_region_of_interest,
+        )
+        rectangle_of_mask[polygon_mask] = RGB_MASK_FILLING_COLOR
 
     @classmethod
     def fill_polygon_in_a_rectangle(
-        cls, dst_rgb_array, dst_polygon, cropped_dst_rgb_array
+        cls,
+        dst_rgb_array,
+        dst_polygon,
+        cropped_dst_rgb_array,
+        region_of_interest_cloning=SEAMLESS_CLONING_IN_THE_REGION_OF_INTEREST,
     ):
         """
         This function fills pixels of 'dst_rgb_array' that are included in 'dst_polygon'.
         Newer pixels values are contained in 'cropped_dst_rgb_array'.
         The function makes also the output image looks uniformly.
+        'dst_rgb_array' is not modified (it may be read-only).
         :param dst_rgb_array: an RGB image converted into a numpy array (the array has following shape(y, x, 3))
         :type dst_rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
         :param dst_polygon: list of tuple of points in 2D Space ([(x, y),(x, y),(x, y)...] or ((x, y),(x, y),(x, y)...))
@@ -385,6 +830,14 @@ class ChangeFaceElement:
         :type dst_polygon: list - [] or tuple - ()
         :param cropped_dst_rgb_array: an RGB image converted into a numpy array (the array has following shape(y, x, 3))
         :type cropped_dst_rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :param region_of_interest_cloning: param indicates if the seamless cloning will be calculated
+        only in the neighbourhood of 'dst_polygon' or in the whole image.
+        In the first case the region of interest is the bounding rectangle of 'dst_polygon' enlarged by
+        'PADDING_OF_THE_REGION_OF_INTEREST_OF_SEAMLESS_CLONING' (from the file '.settings').
+        The cloned pixels are the same in both cases.
+        :type region_of_interest_cloning: bool (True or False)
+        :return: a copy of 'dst_rgb_array' which contains the new pixels
+        :rtype: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
         """
 
         fill_polygon = cls(
@@ -393,37 +846,78 @@ class ChangeFaceElement:
             cropped_dst_rgb_array=cropped_dst_rgb_array,
         )
 
-        fill_polygon._fill_polygon_in_an_image()
+        if region_of_interest_cloning:
+            region_of_interest = get_padded_rectangle(
+                bounding_rectangle_of_polygon=fill_polygon.bounding_rectangle_of_dst_polygon,
+                padding=PADDING_OF_THE_REGION_OF_INTEREST_OF_SEAMLESS_CLONING,
+                shape_of_an_image=dst_rgb_array.shape,
+            )
+        else:
+            region_of_interest = (0, 0, dst_rgb_array.shape[1], dst_rgb_array.shape[0])
+
+        with timing_span(name="fill_polygon"):
+            fill_polygon._prepare_scratch_arrays(region_of_interest=region_of_interest)
+            fill_polygon._fill_polygon_in_an_image()
         center = (
             (
                 2 * fill_polygon.bounding_rectangle_of_dst_polygon[0]
                 + fill_polygon.bounding_rectangle_of_dst_polygon[2]
             )
-            // 2,
+            // 2
+            - region_of_interest[0],
             (
                 2 * fill_polygon.bounding_rectangle_of_dst_polygon[1]
                 + fill_polygon.bounding_rectangle_of_dst_polygon[3]
             )
-            // 2,
+            // 2
+            - region_of_interest[1],
         )
 
-        return cv2.seamlessClone(
-            fill_polygon.tmp_dst_rgb_array,
-            fill_polygon.dst_rgb_array,
-            fill_polygon.mask,
-            center,
-            cv2.NORMAL_CLONE,
-        )
+        # 'cv2.seamlessClone' changes only the pixels around the polygon,
+        # so the region of interest of the output image is the only part which differs from 'dst_rgb_array'.
+        with timing_span(name="seamless_clone"):
+            output_rgb_array = dst_rgb_array.copy()
+            get_rectangle_in_an_image(
+                np_array=output_rgb_array, bounding_rectangle_of_polygon=region_of_interest
+            )[:] = cv2.seamlessClone(
+                fill_polygon.tmp_dst_rgb_array,
+                get_rectangle_in_an_image(
+                    np_array=dst_rgb_array, bounding_rectangle_of_polygon=region_of_interest
+                ),
+                fill_polygon.mask,
+                center,
+                cv2.NORMAL_CLONE,
+            )
+        return output_rgb_array
 
     def _get_cropped_rgb_arrays(self):
         """
         This function looks for the appropriate values of
-        'self.cropped_src_rgb_array' and 'self.cropped_dst_rgb_array'.
+        'self.cropped_src_rgb_array' (unless it has been passed) and 'self.cropped_dst_rgb_array'.
+        The source is warped according to 'self.warp_mode'.
         """
-        self.cropped_src_rgb_array = get_rectangle_in_an_image(
-            np_array=self.src_rgb_array,
-            bounding_rectangle_of_polygon=self.bounding_rectangle_of_src_polygon,
-        )
+        if self.cropped_src_rgb_array is None:
+            self.cropped_src_rgb_array = get_rectangle_in_an_image(
+                np_array=self.src_rgb_array,
+                bounding_rectangle_of_polygon=self.bounding_rectangle_of_src_polygon,
+            )
+
+        if self.warp_mode == WARP_MODE_OF_THE_PIECEWISE_AFFINE_TRANSFORM:
+            first_map, second_map = ChangeFaceElement.get_piecewise_affine_warp_maps(
+                src_polygon=self.src_polygon,
+                dst_polygon=self.dst_polygon,
+                src_control_points=self.src_control_points,
+                dst_control_points=self.dst_control_points,
+                warp_map_cache=self.warp_map_cache,
+            )
+            self.cropped_dst_rgb_array = cv2.remap(
+                self.cropped_src_rgb_array,
+                first_map,
+                second_map,
+                interpolation=cv2.INTER_LINEAR,
+                borderMode=cv2.BORDER_REPLICATE,
+            )
+            return
 
         warp_mats = ChangeFaceElement.get_warp_mats(
             src_polygon=self.src_polygon, dst_polygon=self.dst_polygon
@@ -441,9 +935,465 @@ class ChangeFaceElement:
             borderMode=cv2.BORDER_REPLICATE,
         )
 
+    @staticmethod
+    def get_groups_of_overlapping_rectangles(rectangles):
+        """
+        :param rectangles: list of tuples with coordinates of the start point of a rectangle
+        and the width and height of this rectangle - [(x, y, width, height), ...]
+        :type rectangles: list - []
+        :return: list of tuples: (the bounding rectangle of a group, sorted indices of the rectangles of the group).
+        Rectangles of different groups don't overlap, so the groups can be processed independently.
+        :rtype: list - []
+        """
+        groups = [(tuple(rectangle), [idx]) for idx, rectangle in enumerate(rectangles)]
+        merged = True
+        while merged:
+            merged = False
+            for first_idx in range(len(groups)):
+                for second_idx in range(first_idx + 1, len(groups)):
+                    (x1, y1, width1, height1), first_indices = groups[first_idx]
+                    (x2, y2, width2, height2), second_indices = groups[second_idx]
+                    if (
+                        x1 < x2 + width2
+                        and x2 < x1 + width1
+                        and y1 < y2 + height2
+                        and y2 < y1 + height1
+                    ):
+                        start_x, start_y = min(x1, x2), min(y1, y2)
+                        groups[first_idx] = (
+                            (
+                                start_x,
+                                start_y,
+                                max(x1 + width1, x2 + width2) - start_x,
+                                max(y1 + height1, y2 + height2) - start_y,
+                            ),
+                            sorted(first_indices + second_indices),
+                        )
+                        del groups[second_idx]
+                        merged = True
+                        break
+                if merged:
+                    break
+        return groups
+
+    @staticmethod
+    def get_moved_polygon(polygon, x, y):
+        """
+        :param polygon: list or tuple of coordinates in 2D Space ([(x, y),(x, y),(x, y)...] or ((x, y),(x, y),(x, y)...)).
+        :type polygon: list - [] or tuple - ()
+        :param x: the 'x' value subtracted from each point of the polygon
+        :type x: integer - int
+        :param y: the 'y' value subtracted from each point of the polygon
+        :type y: integer - int
+        :return list of tuples
+        :rtype list - []
+        """
+        return [(point[0] - x, point[1] - y) for point in polygon]
+
+    @classmethod
+    def _change_face_elements_in_a_region(
+        cls,
+        dst_rgb_array,
+        swaps,
+        region,
+        color_adjustment_mode,
+        color_index_cache,
+        fused_color_adjustment,
+        warp_mode,
+        warp_map_cache,
+    ):
+        """
+        This function swaps the parts of faces one by one in the region of 'dst_rgb_array'.
+        :param dst_rgb_array: an RGB destination image converted into a numpy array (the array has following shape(y, x, 3))
+        :type dst_rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :param swaps: list of dictionaries with the keys: 'cropped_src_rgb_array', 'src_polygon',
+        'dst_polygon', 'dst_cut_field', 'src_control_points' and 'dst_control_points'
+        (see the function 'change_face_element' contained in this class)
+        :type swaps: list - []
+        :param region: the region of 'dst_rgb_array' which contains the regions of interest of all swaps - (x, y, width, height)
+        :type region: tuple - ()
+        :param color_adjustment_mode: one of the values of the COLOR_ADJUSTMENT_MODES list (from the file '.settings')
+        :type color_adjustment_mode: string - str
+        :param color_index_cache: None or the cache of the fitted classifiers
+        :type color_index_cache: None or ColorIndexCache (from the file '.color_index_cache')
+        :param fused_color_adjustment: param indicates if the colors of all swapped parts are adjusted
+        after all parts have been cloned (with the colors of the original image)
+        or after every swap (like in the function 'change_face_element')
+        :type fused_color_adjustment: bool (True or False)
+        :param warp_mode: one of the values of the WARP_MODES list (from the file '.settings')
+        :type warp_mode: string - str
+        :param warp_map_cache: None or the cache of the maps of the piecewise affine warp
+        :type warp_map_cache: None or WarpMapCache (from the file '.piecewise_affine_warp')
+        :return: the region of the output image (the array has following shape(region height, region width, 3))
+        :rtype: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        """
+        output_rgb_array = get_rectangle_in_an_image(
+            np_array=dst_rgb_array, bounding_rectangle_of_polygon=region
+        )
+        for swap in swaps:
+            dst_polygon = cls.get_moved_polygon(
+                polygon=swap["dst_polygon"], x=region[0], y=region[1]
+            )
+            dst_cut_field = (
+                cls.get_moved_polygon(
+                    polygon=swap["dst_cut_field"], x=region[0], y=region[1]
+                )
+                if swap["dst_cut_field"]
+                else swap["dst_cut_field"]
+            )
+            dst_control_points = (
+                cls.get_moved_polygon(
+                    polygon=swap["dst_control_points"], x=region[0], y=region[1]
+                )
+                if swap["dst_control_points"]
+                else swap["dst_control_points"]
+            )
+            if not fused_color_adjustment:
+                output_rgb_array = cls.change_face_element(
+                    src_rgb_array=None,
+                    dst_rgb_array=output_rgb_array,
+                    src_polygon=swap["src_polygon"],
+                    dst_polygon=dst_polygon,
+                    dst_cut_field=dst_cut_field,
+                    color_adjustment_mode=color_adjustment_mode,
+                    color_index_cache=color_index_cache,
+                    cropped_src_rgb_array=swap["cropped_src_rgb_array"],
+                    src_control_points=swap["src_control_points"],
+                    dst_control_points=dst_control_points,
+                    warp_mode=warp_mode,
+                    warp_map_cache=warp_map_cache,
+                )
+                continue
+
+            change_face_element = cls(
+                src_polygon=swap["src_polygon"],
+                dst_polygon=dst_polygon,
+                cropped_src_rgb_array=swap["cropped_src_rgb_array"],
+                src_control_points=swap["src_control_points"],
+                dst_control_points=dst_control_points,
+                warp_mode=warp_mode,
+                warp_map_cache=warp_map_cache,
+            )
+            with timing_span(name="warp"):
+                change_face_element._get_cropped_rgb_arrays()
+            output_rgb_array = ChangeFaceElement.fill_polygon_in_a_rectangle(
+                dst_rgb_array=output_rgb_array,
+                dst_polygon=dst_cut_field if dst_cut_field else dst_polygon,
+                cropped_dst_rgb_array=change_face_element.cropped_dst_rgb_array,
+            )
+
+        if not fused_color_adjustment:
+            return output_rgb_array
+        # The colors of every part are taken from the original image (not from the image with the previous parts),
+        # in the coordinates of the whole image, so the color indexes are the same as when the part is swapped alone
+        # and they are shared with such swaps via 'color_index_cache'.
+        with timing_span(name="color_adjustment"):
+            for swap in swaps:
+                filled_polygon = (
+                    swap["dst_cut_field"] if swap["dst_cut_field"] else swap["dst_polygon"]
+                )
+                color_adjuster = ChangeFaceElement.get_color_adjuster(
+                    classifier=DEFAULT_CLASSIFIER,
+                    training_image=dst_rgb_array,
+                    polygon_of_images=filled_polygon,
+                    color_adjustment_mode=color_adjustment_mode,
+                    color_index_cache=color_index_cache,
+                )
+                output_rgb_array = ChangeFaceElement.replace_colors_inside_polygon(
+                    color_adjuster=color_adjuster,
+                    image_to_adjust=output_rgb_array,
+                    polygon_of_images=cls.get_moved_polygon(
+                        polygon=filled_polygon, x=region[0], y=region[1]
+                    ),
+                )
+        return output_rgb_array
+
+    @classmethod
+    def _swap_in_regions_of_interest(
+        cls,
+        dst_rgb_array,
+        swaps,
+        color_adjustment_mode,
+        color_index_cache,
+        in_parallel,
+        fused_color_adjustment,
+        warp_mode,
+        warp_map_cache,
+    ):
+        """
+        Every swap changes only its region of interest (see the function 'fill_polygon_in_a_rectangle' contained in this class),
+        so the swaps are grouped by overlapping regions. Every group is swapped in its own region
+        and the groups are swapped at the same time by the threads of a shared pool (if 'in_parallel' is True).
+        :param dst_rgb_array: an RGB destination image converted into a numpy array (the array has following shape(y, x, 3))
+        :type dst_rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :param swaps: see the function '_change_face_elements_in_a_region' (contained in this class)
+        :type swaps: list - []
+        :return: a copy of 'dst_rgb_array' with all swapped parts of faces
+        :rtype: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        """
+        if SEAMLESS_CLONING_IN_THE_REGION_OF_INTEREST:
+            regions_of_interest = [
+                get_padded_rectangle(
+                    bounding_rectangle_of_polygon=ChangeFaceElement.get_bounding_rectangle_of_polygon(
+                        polygon=swap["dst_cut_field"]
+                        if swap["dst_cut_field"]
+                        else swap["dst_polygon"]
+                    ),
+                    padding=PADDING_OF_THE_REGION_OF_INTEREST_OF_SEAMLESS_CLONING,
+                    shape_of_an_image=dst_rgb_array.shape,
+                )
+                for swap in swaps
+            ]
+        else:
+            regions_of_interest = [
+                (0, 0, dst_rgb_array.shape[1], dst_rgb_array.shape[0])
+            ] * len(swaps)
+        groups = ChangeFaceElement.get_groups_of_overlapping_rectangles(
+            rectangles=regions_of_interest
+        )
+
+        arguments_of_groups = [
+            dict(
+                dst_rgb_array=dst_rgb_array,
+                swaps=[swaps[idx] for idx in indices],
+                region=region,
+                color_adjustment_mode=color_adjustment_mode,
+                color_index_cache=color_index_cache,
+                fused_color_adjustment=fused_color_adjustment,
+                warp_mode=warp_mode,
+                warp_map_cache=warp_map_cache,
+            )
+            for region, indices in groups
+        ]
+        if in_parallel and len(groups) > 1:
+            # Every task runs in a copy of the current context, so the stages of all faces are measured.
+            thread_pool = _get_thread_pool_of_the_multi_face_swapping()
+            futures = [
+                thread_pool.submit(
+                    copy_context().run, cls._change_face_elements_in_a_region, **arguments
+                )
+                for arguments in arguments_of_groups
+            ]
+            outputs_of_groups = [future.result() for future in futures]
+        else:
+            outputs_of_groups = [
+                cls._change_face_elements_in_a_region(**arguments)
+                for arguments in arguments_of_groups
+            ]
+
+        output_rgb_array = dst_rgb_array.copy()
+        for (region, _), output_of_a_group in zip(groups, outputs_of_groups):
+            get_rectangle_in_an_image(
+                np_array=output_rgb_array, bounding_rectangle_of_polygon=region
+            )[:] = output_of_a_group
+        return output_rgb_array
+
+    @staticmethod
+    def get_swaps_of_a_source(
+        src_rgb_array,
+        src_polygon,
+        dst_polygons,
+        dst_cut_fields=None,
+        src_control_points=None,
+        dst_control_points_of_faces=None,
+    ):
+        """
+        :param src_rgb_array: an RGB source image converted into a numpy array (the array has following shape(y, x, 3))
+        :type src_rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :param src_polygon: list or tuple of coordinates in 2D Space ([(x, y),(x, y),(x, y)...] or ((x, y),(x, y),(x, y)...)).
+        :type src_polygon: list - [] or tuple - ()
+        :param dst_polygons: list of destination polygons (one polygon for every face)
+        :type dst_polygons: list - []
+        :param dst_cut_fields: None or list of cut fields (None or a polygon for every face)
+        :type dst_cut_fields: None or list - []
+        :param src_control_points: None or points of 'src_rgb_array' used by the piecewise affine warp
+        :type src_control_points: None or list - []
+        :param dst_control_points_of_faces: None or list of points corresponding to 'src_control_points'
+        (None or a list of points for every face)
+        :type dst_control_points_of_faces: None or list - []
+        :return: list of dictionaries with the keys: 'cropped_src_rgb_array', 'src_polygon',
+        'dst_polygon', 'dst_cut_field', 'src_control_points' and 'dst_control_points' (one dictionary for every face).
+        The source image is cropped only once.
+        :rtype: list - []
+        """
+        if dst_cut_fields is None:
+            dst_cut_fields = [None] * len(dst_polygons)
+        if dst_control_points_of_faces is None:
+            dst_control_points_of_faces = [None] * len(dst_polygons)
+        cropped_src_rgb_array = get_rectangle_in_an_image(
+            np_array=src_rgb_array,
+            bounding_rectangle_of_polygon=ChangeFaceElement.get_bounding_rectangle_of_polygon(
+                polygon=src_polygon
+            ),
+        )
+        return [
+            {
+                "cropped_src_rgb_array": cropped_src_rgb_array,
+                "src_polygon": src_polygon,
+                "dst_polygon": dst_polygon,
+                "dst_cut_field": dst_cut_field,
+                "src_control_points": src_control_points,
+                "dst_control_points": dst_control_points,
+            }
+            for dst_polygon, dst_cut_field, dst_control_points in zip(
+                dst_polygons, dst_cut_fields, dst_control_points_of_faces
+            )
+        ]
+
+    @classmethod
+    def change_face_elements(
+        cls,
+        src_rgb_array,
+        dst_rgb_array,
+        src_polygon,
+        dst_polygons,
+        dst_cut_fields=None,
+        color_adjustment_mode=DEFAULT_COLOR_ADJUSTMENT_MODE,
+        color_index_cache=None,
+        in_parallel=True,
+        src_control_points=None,
+        dst_control_points_of_faces=None,
+        warp_mode=DEFAULT_WARP_MODE,
+        warp_map_cache=None,
+    ):
+        """
+        This function moves the source polygon(src_polygon) to many destination polygons (e.g. to all faces of a group photo).
+        Faces whose regions of interest don't overlap are swapped independently
+        (see the function '_swap_in_regions_of_interest' contained in this class) and the source image is cropped only once.
+        The output is the same as the output of calling the function 'change_face_element'
+        (also included in this class) for every face one by one.
+        :param src_rgb_array: an RGB source image converted into a numpy array (the array has following shape(y, x, 3))
+        :type src_rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :param dst_rgb_array: an RGB destination image converted into a numpy array (the array has following shape(y, x, 3))
+        :type dst_rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :param src_polygon: list or tuple of coordinates in 2D Space ([(x, y),(x, y),(x, y)...] or ((x, y),(x, y),(x, y)...)).
+        :type src_polygon: list - [] or tuple - ()
+        :param dst_polygons: list of destination polygons (one polygon for every face)
+        :type dst_polygons: list - []
+        :param dst_cut_fields: None or list of cut fields (None or a polygon for every face).
+        See the parameter 'dst_cut_field' of the function 'change_face_element'.
+        :type dst_cut_fields: None or list - []
+        :param color_adjustment_mode: one of the values of the COLOR_ADJUSTMENT_MODES list (from the file '.settings')
+        :type color_adjustment_mode: string - str
+        :param color_index_cache: None or the cache of the fitted classifiers
+        :type color_index_cache: None or ColorIndexCache (from the file '.color_index_cache')
+        :param in_parallel: param indicates if the groups of faces will be swapped at the same time
+        :type in_parallel: bool (True or False)
+        :param src_control_points: see the function 'change_face_element' (contained in this class)
+        :type src_control_points: None or list - []
+        :param dst_control_points_of_faces: None or list of the destination control points of every face
+        (see the parameter 'dst_control_points' of the function 'change_face_element')
+        :type dst_control_points_of_faces: None or list - []
+        :param warp_mode: one of the values of the WARP_MODES list (from the file '.settings')
+        :type warp_mode: string - str
+        :param warp_map_cache: None or the cache of the maps of the piecewise affine warp
+        :type warp_map_cache: None or WarpMapCache (from the file '.piecewise_affine_warp')
+        :return: an RGB image converted into a numpy array.
+        The image has exactly the same shape as 'dst_rgb_array' and contains 'src_polygon' in all destination polygons.
+        :rtype: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        """
+        return cls._swap_in_regions_of_interest(
+            dst_rgb_array=dst_rgb_array,
+            swaps=ChangeFaceElement.get_swaps_of_a_source(
+                src_rgb_array=src_rgb_array,
+                src_polygon=src_polygon,
+                dst_polygons=dst_polygons,
+                dst_cut_fields=dst_cut_fields,
+                src_control_points=src_control_points,
+                dst_control_points_of_faces=dst_control_points_of_faces,
+            ),
+            color_adjustment_mode=color_adjustment_mode,
+            color_index_cache=color_index_cache,
+            in_parallel=in_parallel,
+            fused_color_adjustment=False,
+            warp_mode=warp_mode,
+            warp_map_cache=warp_map_cache,
+        )
+
+    @classmethod
+    def change_face_elements_from_many_sources(
+        cls,
+        dst_rgb_array,
+        sources,
+        color_adjustment_mode=DEFAULT_COLOR_ADJUSTMENT_MODE,
+        color_index_cache=None,
+        in_parallel=True,
+        fused_color_adjustment=True,
+        warp_mode=DEFAULT_WARP_MODE,
+        warp_map_cache=None,
+    ):
+        """
+        This function moves many parts of faces (e.g. lips and a nose from different source images)
+        to the destination image in one pass. Every source image is cropped only once,
+        parts whose regions of interest don't overlap are swapped independently
+        (see the function '_swap_in_regions_of_interest' contained in this class)
+        and, if 'fused_color_adjustment' is True, the colors of the parts whose regions overlap are adjusted
+        in a single pass after all of them have been cloned.
+        :param dst_rgb_array: an RGB destination image converted into a numpy array (the array has following shape(y, x, 3))
+        :type dst_rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :param sources: list of dictionaries with the keys: 'src_rgb_array', 'src_polygon', 'dst_polygons'
+        and optionally 'dst_cut_fields', 'src_control_points' and 'dst_control_points_of_faces'
+        (see the function 'change_face_elements' contained in this class).
+        The parts are swapped in the order of this list.
+        :type sources: list - []
+        :param color_adjustment_mode: one of the values of the COLOR_ADJUSTMENT_MODES list (from the file '.settings')
+        :type color_adjustment_mode: string - str
+        :param color_index_cache: None or the cache of the fitted classifiers
+        :type color_index_cache: None or ColorIndexCache (from the file '.color_index_cache')
+        :param in_parallel: param indicates if the groups of parts will be swapped at the same time
+        :type in_parallel: bool (True or False)
+        :param fused_color_adjustment: param indicates if the colors of the parts whose regions overlap
+        are adjusted in a single pass after all of them have been cloned. The colors of every part
+        are taken from 'dst_rgb_array', so the color indexes are the same as the indexes of the part swapped alone
+        and they are shared with such swaps via 'color_index_cache'. If it is False, the output is the same
+        as the output of calling the function 'change_face_element' for every part and face one by one.
+        :type fused_color_adjustment: bool (True or False)
+        :param warp_mode: one of the values of the WARP_MODES list (from the file '.settings')
+        :type warp_mode: string - str
+        :param warp_map_cache: None or the cache of the maps of the piecewise affine warp
+        :type warp_map_cache: None or WarpMapCache (from the file '.piecewise_affine_warp')
+        :return: an RGB image converted into a numpy array.
+        The image has exactly the same shape as 'dst_rgb_array' and contains all swapped parts.
+        :rtype: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        """
+        swaps = []
+        for source in sources:
+            swaps.extend(
+                ChangeFaceElement.get_swaps_of_a_source(
+                    src_rgb_array=source["src_rgb_array"],
+                    src_polygon=source["src_polygon"],
+                    dst_polygons=source["dst_polygons"],
+                    dst_cut_fields=source.get("dst_cut_fields"),
+                    src_control_points=source.get("src_control_points"),
+                    dst_control_points_of_faces=source.get("dst_control_points_of_faces"),
+                )
+            )
+        return cls._swap_in_regions_of_interest(
+            dst_rgb_array=dst_rgb_array,
+            swaps=swaps,
+            color_adjustment_mode=color_adjustment_mode,
+            color_index_cache=color_index_cache,
+            in_parallel=in_parallel,
+            fused_color_adjustment=fused_color_adjustment,
+            warp_mode=warp_mode,
+            warp_map_cache=warp_map_cache,
+        )
+
     @classmethod
     def change_face_element(
-        cls, src_rgb_array, dst_rgb_array, src_polygon, dst_polygon, dst_cut_field=None
+        cls,
+        src_rgb_array,
+        dst_rgb_array,
+        src_polygon,
+        dst_polygon,
+        dst_cut_field=None,
+        color_adjustment_mode=DEFAULT_COLOR_ADJUSTMENT_MODE,
+        color_index_cache=None,
+        cropped_src_rgb_array=None,
+        src_control_points=None,
+        dst_control_points=None,
+        warp_mode=DEFAULT_WARP_MODE,
+        warp_map_cache=None,
     ):
         """
         This function moves the source polygon(src_polygon) contained in source image(src_rgb_array)
@@ -461,6 +1411,26 @@ class ChangeFaceElement:
         :type dst_polygon: list - [] or tuple - ()
         :param dst_cut_field: None, list or tuple of coordinates in 2D Space ([(x, y),(x, y),(x, y)...] or ((x, y),(x, y),(x, y)...)).
         :type dst_cut_field: None, list - [] or tuple - ()
+        :param color_adjustment_mode: one of the values of the COLOR_ADJUSTMENT_MODES list (from the file '.settings')
+        :type color_adjustment_mode: string - str
+        :param color_index_cache: None or the cache of the fitted classifiers.
+        Passing the same cache to many calls with the same 'dst_rgb_array' lets them fit the classifier only once.
+        :type color_index_cache: None or ColorIndexCache (from the file '.color_index_cache')
+        :param cropped_src_rgb_array: None or the bounding rectangle of 'src_polygon' cut out of 'src_rgb_array'.
+        If it is passed, 'src_rgb_array' isn't used (it may be None), so the source image can be cropped once
+        for many destination images (e.g. for all frames of a video).
+        :type cropped_src_rgb_array: None or numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :param src_control_points: None or points of 'src_rgb_array' (e.g. the landmarks of the part of the face)
+        which are moved exactly to 'dst_control_points' by the piecewise affine warp.
+        They are ignored by the perspective warp.
+        :type src_control_points: None or list - [] or tuple - ()
+        :param dst_control_points: None or points of 'dst_rgb_array' corresponding to 'src_control_points'
+        :type dst_control_points: None or list - [] or tuple - ()
+        :param warp_mode: one of the values of the WARP_MODES list (from the file '.settings')
+        :type warp_mode: string - str
+        :param warp_map_cache: None or the cache of the maps of the piecewise affine warp.
+        Passing the same cache to many calls with the same example and destination face lets them build the maps only once.
+        :type warp_map_cache: None or WarpMapCache (from the file '.piecewise_affine_warp')
         :return: an RGB image converted into a numpy array.
         The image has exactly the same shape as 'dst_rgb_array'
         and contains 'src_polygon' from 'src_rgb_array'.
@@ -472,9 +1442,15 @@ class ChangeFaceElement:
             src_polygon=src_polygon,
             dst_polygon=dst_polygon,
             dst_cut_field=dst_cut_field,
+            cropped_src_rgb_array=cropped_src_rgb_array,
+            src_control_points=src_control_points,
+            dst_control_points=dst_control_points,
+            warp_mode=warp_mode,
+            warp_map_cache=warp_map_cache,
         )
 
-        change_face_element._get_cropped_rgb_arrays()
+        with timing_span(name="warp"):
+            change_face_element._get_cropped_rgb_arrays()
         if dst_cut_field:
             dst_polygon = dst_cut_field
 
@@ -484,9 +1460,12 @@ class ChangeFaceElement:
             cropped_dst_rgb_array=change_face_element.cropped_dst_rgb_array,
         )
 
-        return ChangeFaceElement.adjust_image_colors_via_classifier(
-            classifier=DEFAULT_CLASSIFIER,
-            training_image=dst_rgb_array,
-            image_to_adjust=mixed_image,
-            polygon_of_images=dst_polygon,
-        )
+        with timing_span(name="color_adjustment"):
+            return ChangeFaceElement.adjust_image_colors(
+                classifier=DEFAULT_CLASSIFIER,
+                training_image=dst_rgb_array,
+                image_to_adjust=mixed_image,
+                polygon_of_images=dst_polygon,
+                color_adjustment_mode=color_adjustment_mode,
+                color_index_cache=color_index_cache,
+            )
@@ -0,0 +1,189 @@
+"""
+    This file contains objects which replace colors of pixels
+    with colors taken from a training palette.
+"""
+
+from itertools import product
+from math import ceil
+
+import numpy as np
+
+from .helpers import get_read_only_view
+from .settings import (
+    MAXIMUM_VALUE_OF_A_CHANNEL,
+    NUMBER_OF_CELLS_PER_CHANNEL_OF_THE_COLOR_LOOKUP_TABLE,
+    PERCENT_OF_NEAREST_NEIGHBOURS,
+)
+
+
+class ColorIndex:
+    def __init__(self, classifier, training_data):
+        """
+        :param classifier: object representing a classifier.
+        The classifier is based on the kNN algorithm (https://en.wikipedia.org/wiki/K-nearest_neighbors_algorithm).
+        The first parameter of this classifier must be the number of neighbors(integer - int).
+        :param training_data: vector of RGB values (the array has following shape(number of colors, 3))
+        which will be used to fitting the classifier.
+        :type training_data: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        """
+        # Color indexes may be cached and shared between requests, so their arrays are read-only.
+        self._training_data = get_read_only_view(np_array=training_data)
+        self._training_data_avg = np.average(training_data, axis=0)
+        # A channel with a single value (e.g. a black frame of a video) isn't scaled.
+        training_data_std = np.std(training_data, axis=0)
+        self._training_data_std = np.where(training_data_std > 0, training_data_std, 1.0)
+
+        normalized_training_data = self.normalize(rgb_values=training_data)
+        self._classifier = classifier(
+            n_neighbors=ceil(PERCENT_OF_NEAREST_NEIGHBOURS * training_data.shape[0])
+        )
+        self._classifier.fit(normalized_training_data, range(training_data.shape[0]))
+
+        # The fitted classifier keeps the normalized training data
+        # together with a tree of the same size built from it.
+        self._nbytes = training_data.nbytes + 2 * normalized_training_data.nbytes
+
+    @property
+    def training_data(self):
+        return self._training_data
+
+    @property
+    def training_data_avg(self):
+        return self._training_data_avg
+
+    @property
+    def training_data_std(self):
+        return self._training_data_std
+
+    @property
+    def classifier(self):
+        return self._classifier
+
+    @property
+    def nbytes(self):
+        """
+        :return: approximate number of bytes occupied by the index
+        :rtype: integer - int
+        """
+        return self._nbytes
+
+    def normalize(self, rgb_values):
+        """
+        :param rgb_values: vector of RGB values (the array has following shape(number of colors, 3))
+        :type rgb_values: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :return: 'rgb_values' standardized with the mean and the standard deviation of the training data
+        :rtype: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        """
+        return (rgb_values - self._training_data_avg) / self._training_data_std
+
+    def get_average_colors_of_the_nearest_neighbours(self, rgb_values):
+        """
+        :param rgb_values: vector of RGB values (the array has following shape(number of colors, 3))
+        :type rgb_values: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :return: for every passed color the average of its nearest neighbours in the training data.
+        The array has the same shape as 'rgb_values' and contains floats.
+        :rtype: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        """
+        labels = self._classifier.kneighbors(
+            self.normalize(rgb_values=rgb_values), return_distance=False
+        )
+        # 'self._training_data[labels]' has the shape (number of colors, number of neighbors, 3),
+        # so the new value of every color is the average of its neighbors.
+        return np.average(self._training_data[labels], axis=1)
+
+    def get_adjusted_colors(self, rgb_values):
+        """
+        :param rgb_values: vector of RGB values (the array has following shape(number of colors, 3))
+        :type rgb_values: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :return: the rounded averages of the nearest neighbours of the passed colors
+        :rtype: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        """
+        return np.round(
+            self.get_average_colors_of_the_nearest_neighbours(rgb_values=rgb_values)
+        ).astype(np.uint8)
+
+
+class ColorLookupTable:
+    def __init__(
+        self,
+        color_index,
+        number_of_cells_per_channel=NUMBER_OF_CELLS_PER_CHANNEL_OF_THE_COLOR_LOOKUP_TABLE,
+    ):
+        """
+        The table is a quantized RGB cube. Its nodes store the average colors of the nearest neighbours
+        (calculated by 'color_index') and other colors are interpolated trilinearly between the nodes.
+        Nodes are calculated only when a color from one of the neighbouring cells is looked up for the first time,
+        so the table can be reused for many images without calculating all nodes of the cube.
+        :param color_index: the fitted index of the training palette
+        :type color_index: ColorIndex
+        :param number_of_cells_per_channel: number of cells along each axis of the RGB cube
+        :type number_of_cells_per_channel: integer - int
+        """
+        self._color_index = color_index
+        self._number_of_cells_per_channel = number_of_cells_per_channel
+        self._shape_of_the_cube = (number_of_cells_per_channel + 1,) * 3
+        number_of_nodes = int(np.prod(self._shape_of_the_cube))
+        self._table = np.zeros((number_of_nodes, 3), dtype=np.float64)
+        self._calculated_nodes = np.zeros(number_of_nodes, dtype=bool)
+
+    @property
+    def number_of_cells_per_channel(self):
+        return self._number_of_cells_per_channel
+
+    @property
+    def number_of_calculated_nodes(self):
+        return int(np.count_nonzero(self._calculated_nodes))
+
+    def _calculate_nodes(self, nodes):
+        """
+        This function fills the nodes of 'self._table' which haven't been calculated yet.
+        :param nodes: flat indices of the nodes of the cube
+        :type nodes: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        """
+        nodes = np.unique(nodes)
+        nodes = nodes[~self._calculated_nodes[nodes]]
+        if not nodes.size:
+            return
+
+        node_colors = (
+            np.column_stack(np.unravel_index(nodes, self._shape_of_the_cube))
+            * MAXIMUM_VALUE_OF_A_CHANNEL
+            / self._number_of_cells_per_channel
+        )
+        self._table[
+            nodes
+        ] = self._color_index.get_average_colors_of_the_nearest_neighbours(
+            rgb_values=node_colors
+        )
+        self._calculated_nodes[nodes] = True
+
+    def get_adjusted_colors(self, rgb_values):
+        """
+        :param rgb_values: vector of RGB values (the array has following shape(number of colors, 3))
+        :type rgb_values: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :return: the passed colors looked up in the table
+        :rtype: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        """
+        positions = (
+            rgb_values.astype(np.float64)
+            * self._number_of_cells_per_channel
+            / MAXIMUM_VALUE_OF_A_CHANNEL
+        )
+        lower_nodes = np.minimum(
+            np.floor(positions).astype(np.intp), self._number_of_cells_per_channel - 1
+        )
+        offsets = positions - lower_nodes
+
+        corners = [np.array(corner) for corner in product((0, 1), repeat=3)]
+        nodes_of_the_corners = [
+            np.ravel_multi_index((lower_nodes + corner).T, self._shape_of_the_cube)
+            for corner in corners
+        ]
+        self._calculate_nodes(nodes=np.concatenate(nodes_of_the_corners))
+
+        adjusted_colors = np.zeros(rgb_values.shape, dtype=np.float64)
+        for corner, nodes in zip(corners, nodes_of_the_corners):
+            weights = np.prod(np.where(corner, offsets, 1 - offsets), axis=1)
+            adjusted_colors += weights[:, np.newaxis] * self._table[nodes]
+
+        return np.round(adjusted_colors).astype(np.uint8)
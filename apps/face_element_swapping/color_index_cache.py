@@ -0,0 +1,143 @@
+"""
+    This file contains the cache of the fitted color indexes.
+    Swapping different parts of the face into the same photo
+    needs exactly the same color index, so it can be fitted only once.
+"""
+
+from collections import OrderedDict
+from hashlib import blake2b
+from threading import Lock
+
+import numpy as np
+
+from .helpers import get_rectangle_in_an_image
+from .settings import MAXIMUM_NUMBER_OF_BYTES_OF_THE_COLOR_INDEX_CACHE
+
+
+class ColorIndexCache:
+    def __init__(
+        self, maximum_number_of_bytes=MAXIMUM_NUMBER_OF_BYTES_OF_THE_COLOR_INDEX_CACHE
+    ):
+        """
+        The least recently used color indexes are evicted
+        when the total size of the cached indexes exceeds 'maximum_number_of_bytes'.
+        :param maximum_number_of_bytes: maximum total size of the cached color indexes
+        :type maximum_number_of_bytes: integer - int
+        """
+        self._maximum_number_of_bytes = maximum_number_of_bytes
+        self._color_indexes = OrderedDict()
+        self._number_of_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = Lock()
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def misses(self):
+        return self._misses
+
+    @property
+    def number_of_bytes(self):
+        return self._number_of_bytes
+
+    def __len__(self):
+        return len(self._color_indexes)
+
+    @staticmethod
+    def get_key(classifier, training_image, bounding_rectangle_of_polygon):
+        """
+        :param classifier: object representing a classifier
+        :param training_image: an RGB image converted into a numpy array (the array has following shape(y, x, 3))
+        :type training_image: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :param bounding_rectangle_of_polygon: tuple or list with coordinates of the start point of the rectangle
+        and the width and height of this rectangle - (x, y, width, height) or [x, y, width, height]
+        :type bounding_rectangle_of_polygon: tuple - () or list - (). The tuple or list should have four elements.
+        :return: key identifying the color index fitted to the rectangle of 'training_image'.
+        Only the pixels of the rectangle are hashed because only they form the training palette.
+        :rtype: tuple - ()
+        """
+        rectangle = get_rectangle_in_an_image(
+            np_array=training_image,
+            bounding_rectangle_of_polygon=bounding_rectangle_of_polygon,
+        )
+        fingerprint = blake2b(np.ascontiguousarray(rectangle).data).hexdigest()
+        return (
+            classifier.__module__,
+            classifier.__qualname__,
+            tuple(bounding_rectangle_of_polygon),
+            rectangle.shape,
+            str(rectangle.dtype),
+            fingerprint,
+        )
+
+    def get(self, key):
+        """
+        :param key: result of calling the function 'get_key' (contained in this class)
+        :type key: tuple - ()
+        :return: the cached color index or None if the cache doesn't contain it
+        :rtype: ColorIndex (from the file '.color_adjustment') or None
+        """
+        with self._lock:
+            color_index = self._color_indexes.get(key)
+            if color_index is None:
+                self._misses += 1
+                return None
+
+            self._color_indexes.move_to_end(key)
+            self._hits += 1
+            return color_index
+
+    def add(self, key, color_index):
+        """
+        This function adds 'color_index' to the cache
+        and evicts the least recently used color indexes if the cache is too big.
+        An index bigger than the whole cache isn't stored at all.
+        :param key: result of calling the function 'get_key' (contained in this class)
+        :type key: tuple - ()
+        :param color_index: the fitted color index
+        :type color_index: ColorIndex (from the file '.color_adjustment')
+        """
+        if color_index.nbytes > self._maximum_number_of_bytes:
+            return
+
+        with self._lock:
+            if key in self._color_indexes:
+                self._number_of_bytes -= self._color_indexes.pop(key).nbytes
+            self._color_indexes[key] = color_index
+            self._number_of_bytes += color_index.nbytes
+
+            while self._number_of_bytes > self._maximum_number_of_bytes:
+                _, evicted_color_index = self._color_indexes.popitem(last=False)
+                self._number_of_bytes -= evicted_color_index.nbytes
+
+    def get_statistics(self):
+        """
+        :return: dictionary with the following keys: 'hits', 'misses', 'hit_rate',
+        'number_of_color_indexes', 'number_of_bytes', 'maximum_number_of_bytes'
+        :rtype: dictionary - {}
+        """
+        with self._lock:
+            number_of_requests = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / number_of_requests
+                if number_of_requests
+                else 0.0,
+                "number_of_color_indexes": len(self._color_indexes),
+                "number_of_bytes": self._number_of_bytes,
+                "maximum_number_of_bytes": self._maximum_number_of_bytes,
+            }
+
+    def clear(self):
+        """
+        This function removes all color indexes from the cache and resets its counters.
+        """
+        with self._lock:
+            self._color_indexes.clear()
+            self._number_of_bytes = 0
+            self._hits = 0
+            self._misses = 0
@@ -0,0 +1,303 @@
+"""
+    This file should be executed at the level of the main directory of this repository, e.g.:
+        python apps/face_element_swapping/dev/benchmark.py --output benchmark.json
+        python apps/face_element_swapping/dev/benchmark.py --baseline benchmark.json
+    It measures the kernels of face part swapping on synthetic images
+    (see the file 'synthetic_faces.py') and writes the results as JSON.
+    If a baseline (the JSON written by the previous run) is passed, every result is compared with it
+    and the script exits with the status 1 when any kernel is slower than allowed.
+"""
+import argparse
+import json
+import platform
+import sys
+from statistics import median
+from time import perf_counter
+
+import cv2
+import numpy as np
+
+sys.path.append("./")
+
+from apps.face_element_swapping.change_faces import ChangeFaceElement
+from apps.face_element_swapping.dev.synthetic_faces import (
+    SIZES_OF_FACE_PARTS,
+    get_synthetic_face,
+    get_synthetic_polygons,
+)
+from apps.face_element_swapping.settings import (
+    COLOR_ADJUSTMENT_MODE_OF_THE_LOOKUP_TABLE,
+    DEFAULT_CLASSIFIER,
+)
+from apps.face_element_swapping.timing import collect_stage_timings
+
+SIDES_OF_IMAGES = [256, 710, 2048]
+NUMBER_OF_REPEATS = 5
+MAXIMUM_SLOWDOWN = 1.2
+
+# The source face part is shifted and smaller than the destination one,
+# so the warp really transforms the pixels.
+SHIFT_OF_THE_SOURCE_FACE_PART = (0.02, -0.01)
+
+
+class BenchmarkOfKernels:
+    def __init__(self, side_of_an_image, size_of_a_face_part, number_of_repeats):
+        self._side_of_an_image = side_of_an_image
+        self._size_of_a_face_part = size_of_a_face_part
+        self._number_of_repeats = number_of_repeats
+        self._src_rgb_array = get_synthetic_face(side_of_an_image=side_of_an_image, seed=1)
+        self._dst_rgb_array = get_synthetic_face(side_of_an_image=side_of_an_image, seed=2)
+        self._src_polygon, _ = get_synthetic_polygons(
+            side_of_an_image=side_of_an_image,
+            size_of_a_face_part=size_of_a_face_part,
+            shift=SHIFT_OF_THE_SOURCE_FACE_PART,
+        )
+        self._dst_polygon, dst_cut_field = get_synthetic_polygons(
+            side_of_an_image=side_of_an_image, size_of_a_face_part=size_of_a_face_part
+        )
+        # Lips have no cut field, so the polygon itself is filled (like in the class 'ChangeFaceElement').
+        self._dst_cut_field = dst_cut_field if dst_cut_field else self._dst_polygon
+        self._results = []
+
+    def _add_result(self, kernel, seconds):
+        """
+        :param kernel: name of the measured kernel
+        :type kernel: string - str
+        :param seconds: durations of all repeats of the kernel
+        :type seconds: list - [] of floats
+        """
+        self._results.append(
+            {
+                "kernel": kernel,
+                "side_of_an_image": self._side_of_an_image,
+                "size_of_a_face_part": self._size_of_a_face_part,
+                "median_seconds": median(seconds),
+                "minimum_seconds": min(seconds),
+            }
+        )
+
+    def _measure(self, kernel, function, prepare_arguments=dict):
+        """
+        This function calls 'function' 'self._number_of_repeats' times (after one call which warms up caches)
+        and saves the durations of these calls.
+        :param kernel: name of the measured kernel
+        :type kernel: string - str
+        :param function: the measured function
+        :param prepare_arguments: function returning keyword arguments of 'function'.
+        It is called before every call of 'function' and its duration isn't measured.
+        """
+        function(**prepare_arguments())
+        seconds = []
+        for _ in range(self._number_of_repeats):
+            arguments = prepare_arguments()
+            start = perf_counter()
+            function(**arguments)
+            seconds.append(perf_counter() - start)
+        self._add_result(kernel=kernel, seconds=seconds)
+
+    def _warp(self):
+        warp_mats = ChangeFaceElement.get_warp_mats(
+            src_polygon=self._src_polygon, dst_polygon=self._dst_polygon
+        )
+        bounding_rectangle_of_src_polygon = (
+            ChangeFaceElement.get_bounding_rectangle_of_polygon(polygon=self._src_polygon)
+        )
+        bounding_rectangle_of_dst_polygon = (
+            ChangeFaceElement.get_bounding_rectangle_of_polygon(polygon=self._dst_polygon)
+        )
+        x, y, width, height = bounding_rectangle_of_src_polygon
+        return cv2.warpPerspective(
+            self._src_rgb_array[y : y + height, x : x + width],
+            warp_mats,
+            (bounding_rectangle_of_dst_polygon[2], bounding_rectangle_of_dst_polygon[3]),
+            None,
+            flags=cv2.INTER_LINEAR,
+            borderMode=cv2.BORDER_REPLICATE,
+        )
+
+    def _measure_filling_and_cloning(self, cropped_dst_rgb_array):
+        """
+        The polygon filling and the seamless cloning are measured together by the function
+        'fill_polygon_in_a_rectangle' of the class 'ChangeFaceElement',
+        so their durations are taken from its timing spans.
+        :param cropped_dst_rgb_array: the warped face part
+        :type cropped_dst_rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        """
+        seconds_of_stages = {}
+        for repeat in range(self._number_of_repeats + 1):
+            with collect_stage_timings() as stage_timings:
+                ChangeFaceElement.fill_polygon_in_a_rectangle(
+                    dst_rgb_array=self._dst_rgb_array,
+                    dst_polygon=self._dst_cut_field,
+                    cropped_dst_rgb_array=cropped_dst_rgb_array,
+                )
+            # The first call only warms up caches.
+            if repeat:
+                for name, seconds in stage_timings.spans:
+                    seconds_of_stages.setdefault(name, []).append(seconds)
+
+        for name, seconds in seconds_of_stages.items():
+            self._add_result(kernel=name, seconds=seconds)
+
+    def _run(self):
+        """
+        :return: list of results of all kernels (see the function '_add_result' included in this class)
+        :rtype: list - []
+        """
+        self._measure(kernel="warp", function=self._warp)
+        self._measure_filling_and_cloning(cropped_dst_rgb_array=self._warp())
+        bounding_rectangle_of_dst_cut_field = (
+            ChangeFaceElement.get_bounding_rectangle_of_polygon(polygon=self._dst_cut_field)
+        )
+        self._measure(
+            kernel="get_vector_of_pixels",
+            function=ChangeFaceElement.get_vector_of_pixels,
+            prepare_arguments=lambda: {
+                "rgb_array": self._dst_rgb_array,
+                "bounding_rectangle_of_polygon": bounding_rectangle_of_dst_cut_field,
+            },
+        )
+        self._measure(
+            kernel="adjust_image_colors_via_classifier",
+            function=ChangeFaceElement.adjust_image_colors_via_classifier,
+            prepare_arguments=lambda: {
+                "classifier": DEFAULT_CLASSIFIER,
+                "training_image": self._dst_rgb_array,
+                "image_to_adjust": self._src_rgb_array.copy(),
+                "polygon_of_images": self._dst_cut_field,
+            },
+        )
+        self._measure(
+            kernel="adjust_image_colors_via_lookup_table",
+            function=ChangeFaceElement.adjust_image_colors,
+            prepare_arguments=lambda: {
+                "classifier": DEFAULT_CLASSIFIER,
+                "training_image": self._dst_rgb_array,
+                "image_to_adjust": self._src_rgb_array.copy(),
+                "polygon_of_images": self._dst_cut_field,
+                "color_adjustment_mode": COLOR_ADJUSTMENT_MODE_OF_THE_LOOKUP_TABLE,
+            },
+        )
+        return self._results
+
+    @classmethod
+    def run(cls, sides_of_images, sizes_of_face_parts, number_of_repeats):
+        """
+        :param sides_of_images: widths (and heights) of the synthetic images in pixels
+        :type sides_of_images: list - [] of integers
+        :param sizes_of_face_parts: keys of the SIZES_OF_FACE_PARTS dictionary (from the file 'synthetic_faces.py')
+        :type sizes_of_face_parts: list - [] of strings
+        :param number_of_repeats: number of measured calls of every kernel
+        :type number_of_repeats: integer - int
+        :return: dictionary with the keys: 'environment', 'number_of_repeats' and 'results'
+        :rtype: dictionary - {}
+        """
+        results = []
+        for side_of_an_image in sides_of_images:
+            for size_of_a_face_part in sizes_of_face_parts:
+                benchmark = cls(
+                    side_of_an_image=side_of_an_image,
+                    size_of_a_face_part=size_of_a_face_part,
+                    number_of_repeats=number_of_repeats,
+                )
+                results.extend(benchmark._run())
+
+        return {
+            "environment": {
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "opencv": cv2.__version__,
+                "machine": platform.machine(),
+            },
+            "number_of_repeats": number_of_repeats,
+            "results": results,
+        }
+
+
+def get_key_of_a_result(result):
+    return result["kernel"], result["side_of_an_image"], result["size_of_a_face_part"]
+
+
+def compare_with_baseline(report, baseline, maximum_slowdown):
+    """
+    :param report: the result of the function 'run' of the class 'BenchmarkOfKernels' (included in this file)
+    :type report: dictionary - {}
+    :param baseline: the report saved by one of the previous runs
+    :type baseline: dictionary - {}
+    :param maximum_slowdown: the maximum allowed ratio of the current median to the median of the baseline
+    :type maximum_slowdown: float
+    :return: list of dictionaries with the keys: 'kernel', 'side_of_an_image', 'size_of_a_face_part',
+    'baseline_median_seconds', 'median_seconds', 'ratio' and 'regression'.
+    Results which are missing in the baseline are skipped.
+    :rtype: list - []
+    """
+    baseline_results = {
+        get_key_of_a_result(result): result for result in baseline["results"]
+    }
+    comparison = []
+    for result in report["results"]:
+        baseline_result = baseline_results.get(get_key_of_a_result(result))
+        if baseline_result is None:
+            continue
+
+        ratio = result["median_seconds"] / baseline_result["median_seconds"]
+        comparison.append(
+            {
+                "kernel": result["kernel"],
+                "side_of_an_image": result["side_of_an_image"],
+                "size_of_a_face_part": result["size_of_a_face_part"],
+                "baseline_median_seconds": baseline_result["median_seconds"],
+                "median_seconds": result["median_seconds"],
+                "ratio": ratio,
+                "regression": ratio > maximum_slowdown,
+            }
+        )
+    return comparison
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="Measures the kernels of face part swapping on synthetic images."
+    )
+    parser.add_argument(
+        "--sides-of-images", type=int, nargs="+", default=SIDES_OF_IMAGES
+    )
+    parser.add_argument(
+        "--sizes-of-face-parts",
+        nargs="+",
+        choices=list(SIZES_OF_FACE_PARTS),
+        default=list(SIZES_OF_FACE_PARTS),
+    )
+    parser.add_argument("--number-of-repeats", type=int, default=NUMBER_OF_REPEATS)
+    parser.add_argument("--output", help="path of the JSON file with the results")
+    parser.add_argument(
+        "--baseline", help="path of the JSON file with the results of a previous run"
+    )
+    parser.add_argument("--maximum-slowdown", type=float, default=MAXIMUM_SLOWDOWN)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments = parse_arguments()
+    report = BenchmarkOfKernels.run(
+        sides_of_images=arguments.sides_of_images,
+        sizes_of_face_parts=arguments.sizes_of_face_parts,
+        number_of_repeats=arguments.number_of_repeats,
+    )
+
+    if arguments.baseline:
+        with open(arguments.baseline) as baseline_file:
+            report["comparison"] = compare_with_baseline(
+                report=report,
+                baseline=json.load(baseline_file),
+                maximum_slowdown=arguments.maximum_slowdown,
+            )
+
+    if arguments.output:
+        with open(arguments.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if any(result["regression"] for result in report.get("comparison", [])):
+        sys.exit(1)
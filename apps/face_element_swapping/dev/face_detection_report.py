@@ -0,0 +1,249 @@
+"""
+    This file should be executed at the level of the main directory of this repository, e.g.:
+        python apps/face_element_swapping/dev/face_detection_report.py
+        python apps/face_element_swapping/dev/face_detection_report.py --maximum-side-lengths 240 320 --output report.json
+    It detects faces in the photos from the directories 'blog/dev/lips' and 'blog/dev/noses'
+    (resized like the photos of users) on downscaled copies of the photos and compares the results
+    with the detection on the photos themselves: the numbers of found faces, the displacements of the landmarks
+    and of the endpoints of lips and noses (in pixels of the photos) and the durations of the detection.
+"""
+import argparse
+import json
+import os
+import sys
+from statistics import median
+from time import perf_counter
+
+import numpy as np
+from PIL import Image
+
+sys.path.append("./")
+
+from apps.face_element_swapping.endpoints import GetEndpointsOfANose, GetEndpointsOfLips
+from apps.face_element_swapping.endpoints.helpers import get_faces_landmarks
+from apps.face_element_swapping.endpoints.landmark_operator import (
+    get_array_of_landmarks,
+)
+from blog.helpers import correct_size, resize_img
+
+DIRECTORIES_WITH_FACES = ["./blog/dev/lips", "./blog/dev/noses"]
+ACCEPTABLE_FILE_EXTENSIONS = (".jpg", ".jpeg")
+MAXIMUM_SIDE_LENGTHS = [160, 240, 320, 480]
+NUMBERS_OF_TIMES_TO_UPSAMPLE = [0, 1]
+NUMBER_OF_REPEATS = 3
+
+
+def get_photos():
+    """
+    :return: list of tuples: (name of a photo, the photo converted into a numpy array).
+    The photos are resized like the photos sent by users.
+    :rtype: list - []
+    """
+    photos = []
+    for directory in DIRECTORIES_WITH_FACES:
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith(ACCEPTABLE_FILE_EXTENSIONS):
+                continue
+            with Image.open(os.path.join(directory, name)) as pil:
+                pil = pil.convert("RGB")
+                if not correct_size(img=pil):
+                    pil = resize_img(img=pil)
+                photos.append((name, np.array(pil, dtype=np.uint8)))
+    return photos
+
+
+def get_endpoints(face_landmarks):
+    """
+    :param face_landmarks: landmarks of a single face generated
+    by the function 'face_landmarks' from module named 'face_recognition'
+    :type face_landmarks: dictionary - {}
+    :return: the endpoints of lips and the six endpoints of a nose (the array has following shape(number of endpoints, 2))
+    :rtype: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    """
+    return np.array(
+        list(GetEndpointsOfLips.get_endpoints_of_lips(face_landmarks))
+        + list(
+            GetEndpointsOfANose.get_endpoints_of_a_nose(face_landmarks)[
+                "six_endpoints"
+            ]
+        )
+    )
+
+
+def detect(rgb_array, maximum_side_length, number_of_times_to_upsample, number_of_repeats):
+    """
+    :param rgb_array: an RGB image converted into a numpy array (the array has following shape(y, x, 3))
+    :type rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    :param maximum_side_length: see the function 'get_faces_locations' (from the file '../endpoints/helpers.py')
+    :type maximum_side_length: integer - int or None
+    :param number_of_times_to_upsample: see the function 'get_faces_locations'
+    :type number_of_times_to_upsample: integer - int
+    :param number_of_repeats: number of measured detections
+    :type number_of_repeats: integer - int
+    :return: the landmarks of the found faces and the median duration of the detection in seconds
+    :rtype: tuple - (list - [], float)
+    """
+    seconds = []
+    for _ in range(number_of_repeats):
+        start = perf_counter()
+        faces_landmarks = get_faces_landmarks(
+            rgb_array=rgb_array,
+            maximum_side_length_for_face_detection=maximum_side_length,
+            number_of_times_to_upsample=number_of_times_to_upsample,
+        )
+        seconds.append(perf_counter() - start)
+    return faces_landmarks, median(seconds)
+
+
+def get_displacements(reference_faces_landmarks, faces_landmarks):
+    """
+    Only the first face of both lists is compared (the photos of the directories contain a single face).
+    :param reference_faces_landmarks: the landmarks found via the detection on a photo itself
+    :type reference_faces_landmarks: list - [] of dictionaries
+    :param faces_landmarks: the landmarks found via the detection on a downscaled copy of the photo
+    :type faces_landmarks: list - [] of dictionaries
+    :return: dictionary with the maximum and the mean displacements (Euclidean distances)
+    of the landmarks and of the endpoints or None if any list is empty
+    :rtype: dictionary - {} or None
+    """
+    if not reference_faces_landmarks or not faces_landmarks:
+        return None
+
+    displacements = {}
+    for name, function in (
+        ("landmarks", get_array_of_landmarks),
+        ("endpoints", get_endpoints),
+    ):
+        distances = np.linalg.norm(
+            function(face_landmarks=faces_landmarks[0])
+            - function(face_landmarks=reference_faces_landmarks[0]),
+            axis=1,
+        )
+        displacements["maximum_displacement_of_{name}".format(name=name)] = float(
+            distances.max()
+        )
+        displacements["mean_displacement_of_{name}".format(name=name)] = float(
+            distances.mean()
+        )
+    return displacements
+
+
+def get_report(maximum_side_lengths, numbers_of_times_to_upsample, number_of_repeats):
+    """
+    :param maximum_side_lengths: the side lengths of the downscaled copies of the photos
+    :type maximum_side_lengths: list - [] of integers
+    :param numbers_of_times_to_upsample: the numbers of times to upsample the copies
+    :type numbers_of_times_to_upsample: list - [] of integers
+    :param number_of_repeats: number of measured detections of every configuration
+    :type number_of_repeats: integer - int
+    :return: dictionary with the keys: 'photos' (one result for every photo and configuration)
+    and 'summary' (one result for every configuration)
+    :rtype: dictionary - {}
+    """
+    results = []
+    for name, rgb_array in get_photos():
+        reference_faces_landmarks, reference_seconds = detect(
+            rgb_array=rgb_array,
+            maximum_side_length=None,
+            number_of_times_to_upsample=1,
+            number_of_repeats=number_of_repeats,
+        )
+        for maximum_side_length in maximum_side_lengths:
+            for number_of_times_to_upsample in numbers_of_times_to_upsample:
+                faces_landmarks, seconds = detect(
+                    rgb_array=rgb_array,
+                    maximum_side_length=maximum_side_length,
+                    number_of_times_to_upsample=number_of_times_to_upsample,
+                    number_of_repeats=number_of_repeats,
+                )
+                results.append(
+                    {
+                        "photo": name,
+                        "maximum_side_length": maximum_side_length,
+                        "number_of_times_to_upsample": number_of_times_to_upsample,
+                        "reference_number_of_faces": len(reference_faces_landmarks),
+                        "number_of_faces": len(faces_landmarks),
+                        "reference_median_seconds": reference_seconds,
+                        "median_seconds": seconds,
+                        "displacements": get_displacements(
+                            reference_faces_landmarks=reference_faces_landmarks,
+                            faces_landmarks=faces_landmarks,
+                        ),
+                    }
+                )
+
+    summary = []
+    for maximum_side_length in maximum_side_lengths:
+        for number_of_times_to_upsample in numbers_of_times_to_upsample:
+            results_of_a_configuration = [
+                result
+                for result in results
+                if result["maximum_side_length"] == maximum_side_length
+                and result["number_of_times_to_upsample"] == number_of_times_to_upsample
+            ]
+            displacements = [
+                result["displacements"]
+                for result in results_of_a_configuration
+                if result["displacements"] is not None
+            ]
+            summary.append(
+                {
+                    "maximum_side_length": maximum_side_length,
+                    "number_of_times_to_upsample": number_of_times_to_upsample,
+                    "number_of_photos_with_a_different_number_of_faces": sum(
+                        result["number_of_faces"] != result["reference_number_of_faces"]
+                        for result in results_of_a_configuration
+                    ),
+                    "speedup": sum(
+                        result["reference_median_seconds"]
+                        for result in results_of_a_configuration
+                    )
+                    / sum(result["median_seconds"] for result in results_of_a_configuration),
+                    "maximum_displacement_of_landmarks": max(
+                        (d["maximum_displacement_of_landmarks"] for d in displacements),
+                        default=None,
+                    ),
+                    "maximum_displacement_of_endpoints": max(
+                        (d["maximum_displacement_of_endpoints"] for d in displacements),
+                        default=None,
+                    ),
+                    "mean_displacement_of_endpoints": float(
+                        np.mean([d["mean_displacement_of_endpoints"] for d in displacements])
+                    )
+                    if displacements
+                    else None,
+                }
+            )
+    return {"photos": results, "summary": summary}
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="Compares the face detection on downscaled photos with the detection on the photos themselves."
+    )
+    parser.add_argument(
+        "--maximum-side-lengths", type=int, nargs="+", default=MAXIMUM_SIDE_LENGTHS
+    )
+    parser.add_argument(
+        "--numbers-of-times-to-upsample",
+        type=int,
+        nargs="+",
+        default=NUMBERS_OF_TIMES_TO_UPSAMPLE,
+    )
+    parser.add_argument("--number-of-repeats", type=int, default=NUMBER_OF_REPEATS)
+    parser.add_argument("--output", help="path of the JSON file with the results")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments = parse_arguments()
+    report = get_report(
+        maximum_side_lengths=arguments.maximum_side_lengths,
+        numbers_of_times_to_upsample=arguments.numbers_of_times_to_upsample,
+        number_of_repeats=arguments.number_of_repeats,
+    )
+    if arguments.output:
+        with open(arguments.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+    else:
+        print(json.dumps(report["summary"], indent=2))
@@ -0,0 +1,339 @@
+"""
+    This file should be executed at the level of the main directory of this repository, e.g.:
+        python apps/face_element_swapping/dev/golden_images.py --candidates classifier
+        python apps/face_element_swapping/dev/golden_images.py --candidates lookup_table --maximum-absolute-error 8
+    It swaps face parts via the reference implementation (see the file 'reference_pipeline.py')
+    and via the candidate implementations on the same deterministic inputs:
+    the photos from the directories 'blog/dev/lips' and 'blog/dev/noses' and synthetic faces
+    (see the file 'synthetic_faces.py'). For every pair of images it reports the differences
+    between the output images, the number of pixels of the polygon masks which differ and the durations of both implementations.
+    The script exits with the status 1 when any difference exceeds the passed tolerances.
+"""
+import argparse
+import json
+import os
+import sys
+from functools import partial
+from time import perf_counter
+
+import numpy as np
+from PIL import Image
+
+sys.path.append("./")
+
+from apps.face_element_swapping.change_faces import ChangeFaceElement
+from apps.face_element_swapping.dev.reference_pipeline import ReferenceChangeFaceElement
+from apps.face_element_swapping.dev.synthetic_faces import (
+    PARTS_OF_SYNTHETIC_FACES,
+    SIZES_OF_FACE_PARTS,
+    get_synthetic_face,
+    get_synthetic_polygons,
+)
+from apps.face_element_swapping.endpoints import GetEndpointsOfANose, GetEndpointsOfLips
+from apps.face_element_swapping.endpoints.helpers import get_faces_landmarks
+from apps.face_element_swapping.helpers import get_polygon_mask, get_read_only_view
+from apps.face_element_swapping.settings import (
+    COLOR_ADJUSTMENT_MODE_OF_THE_CLASSIFIER,
+    COLOR_ADJUSTMENT_MODE_OF_THE_LOOKUP_TABLE,
+    MAXIMUM_VALUE_OF_A_CHANNEL,
+)
+from blog.settings import DIRECTORIES_WITH_FACES
+
+ACCEPTABLE_FILE_EXTENSIONS = (".jpg", ".jpeg")
+SIDES_OF_SYNTHETIC_IMAGES = [256, 710]
+
+CANDIDATES = {
+    COLOR_ADJUSTMENT_MODE_OF_THE_CLASSIFIER: partial(
+        ChangeFaceElement.change_face_element,
+        color_adjustment_mode=COLOR_ADJUSTMENT_MODE_OF_THE_CLASSIFIER,
+    ),
+    COLOR_ADJUSTMENT_MODE_OF_THE_LOOKUP_TABLE: partial(
+        ChangeFaceElement.change_face_element,
+        color_adjustment_mode=COLOR_ADJUSTMENT_MODE_OF_THE_LOOKUP_TABLE,
+    ),
+}
+
+
+def get_polygons_of_a_photo(part_of_face, rgb_array):
+    """
+    :param part_of_face: 'lips' or 'nose'
+    :type part_of_face: string - str
+    :param rgb_array: an RGB image converted into a numpy array (the array has following shape(y, x, 3))
+    :type rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    :return: the polygon and the cut field (None for lips) of the first face detected in the photo
+    or None if no face has been detected
+    :rtype: tuple - () or None
+    """
+    faces_landmarks = get_faces_landmarks(rgb_array=rgb_array)
+    if not faces_landmarks:
+        return None
+
+    if part_of_face == "nose":
+        endpoints = GetEndpointsOfANose.get_endpoints_of_a_nose(faces_landmarks[0])
+        return endpoints["four_endpoints"], endpoints["six_endpoints"]
+    return GetEndpointsOfLips.get_endpoints_of_lips(faces_landmarks[0]), None
+
+
+def get_cases_of_photos():
+    """
+    :return: list of dictionaries with the keys: 'name', 'src_rgb_array', 'dst_rgb_array',
+    'src_polygon', 'dst_polygon' and 'dst_cut_field'.
+    Every photo of a directory (DIRECTORIES_WITH_FACES) is swapped with the next photo of the same directory.
+    :rtype: list - []
+    """
+    cases = []
+    for part_of_face, directory in DIRECTORIES_WITH_FACES.items():
+        photos = []
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith(ACCEPTABLE_FILE_EXTENSIONS):
+                continue
+            with Image.open(os.path.join(directory, name)) as pil:
+                rgb_array = np.array(pil.convert("RGB"), dtype=np.uint8)
+            polygons = get_polygons_of_a_photo(
+                part_of_face=part_of_face, rgb_array=rgb_array
+            )
+            if polygons is not None:
+                photos.append((name, rgb_array, polygons))
+
+        if len(photos) < 2:
+            continue
+
+        for idx, (src_name, src_rgb_array, src_polygons) in enumerate(photos):
+            dst_name, dst_rgb_array, dst_polygons = photos[(idx + 1) % len(photos)]
+            cases.append(
+                {
+                    "name": "{part_of_face}: {src_name} -> {dst_name}".format(
+                        part_of_face=part_of_face, src_name=src_name, dst_name=dst_name
+                    ),
+                    "src_rgb_array": src_rgb_array,
+                    "dst_rgb_array": dst_rgb_array,
+                    "src_polygon": src_polygons[0],
+                    "dst_polygon": dst_polygons[0],
+                    "dst_cut_field": dst_polygons[1],
+                }
+            )
+    return cases
+
+
+def get_synthetic_cases(sides_of_images):
+    """
+    :param sides_of_images: widths (and heights) of the synthetic images in pixels
+    :type sides_of_images: list - [] of integers
+    :return: list of dictionaries with the same keys as the dictionaries returned by
+    the function 'get_cases_of_photos' (included in this file)
+    :rtype: list - []
+    """
+    cases = []
+    for side_of_an_image in sides_of_images:
+        for size_of_a_face_part in SIZES_OF_FACE_PARTS:
+            for part_of_face in PARTS_OF_SYNTHETIC_FACES:
+                src_polygon, _ = get_synthetic_polygons(
+                    side_of_an_image=side_of_an_image,
+                    size_of_a_face_part=size_of_a_face_part,
+                    shift=(0.02, -0.01),
+                    part_of_face=part_of_face,
+                )
+                dst_polygon, dst_cut_field = get_synthetic_polygons(
+                    side_of_an_image=side_of_an_image,
+                    size_of_a_face_part=size_of_a_face_part,
+                    part_of_face=part_of_face,
+                )
+                cases.append(
+                    {
+                        "name": "synthetic: {side}px {size} {part_of_face}".format(
+                            side=side_of_an_image,
+                            size=size_of_a_face_part,
+                            part_of_face=part_of_face,
+                        ),
+                        "src_rgb_array": get_synthetic_face(
+                            side_of_an_image=side_of_an_image, seed=1
+                        ),
+                        "dst_rgb_array": get_synthetic_face(
+                            side_of_an_image=side_of_an_image, seed=2
+                        ),
+                        "src_polygon": src_polygon,
+                        "dst_polygon": dst_polygon,
+                        "dst_cut_field": dst_cut_field,
+                    }
+                )
+    return cases
+
+
+def get_differences_of_images(reference_rgb_array, candidate_rgb_array):
+    """
+    :param reference_rgb_array: an RGB image converted into a numpy array (the array has following shape(y, x, 3))
+    :type reference_rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    :param candidate_rgb_array: an RGB image with the same shape as 'reference_rgb_array'
+    :type candidate_rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    :return: dictionary with the keys: 'maximum_absolute_error', 'mean_absolute_error',
+    'number_of_different_pixels' and 'psnr' (None if the images are identical)
+    :rtype: dictionary - {}
+    """
+    absolute_errors = np.abs(
+        reference_rgb_array.astype(np.int16) - candidate_rgb_array.astype(np.int16)
+    )
+    mean_squared_error = float(np.mean(absolute_errors.astype(np.float64) ** 2))
+    return {
+        "maximum_absolute_error": int(absolute_errors.max()),
+        "mean_absolute_error": float(absolute_errors.mean()),
+        "number_of_different_pixels": int(np.count_nonzero(absolute_errors.any(axis=2))),
+        "psnr": 10 * np.log10(MAXIMUM_VALUE_OF_A_CHANNEL**2 / mean_squared_error)
+        if mean_squared_error
+        else None,
+    }
+
+
+def get_mask_disagreement(polygon):
+    """
+    :param polygon: list or tuple of coordinates in 2D Space ([(x, y),(x, y),(x, y)...] or ((x, y),(x, y),(x, y)...)).
+    :type polygon: list - [] or tuple - ()
+    :return: number of pixels of the bounding rectangle of 'polygon' for which the mask rasterized by the function
+    'get_polygon_mask' (from the file '..helpers') differs from the mask calculated via the module 'shapely'
+    :rtype: integer - int
+    """
+    bounding_rectangle_of_polygon = ChangeFaceElement.get_bounding_rectangle_of_polygon(
+        polygon=polygon
+    )
+    reference_mask = ReferenceChangeFaceElement.get_polygon_mask(
+        polygon=polygon, bounding_rectangle_of_polygon=bounding_rectangle_of_polygon
+    )
+    candidate_mask = get_polygon_mask(
+        polygon=polygon, bounding_rectangle_of_polygon=bounding_rectangle_of_polygon
+    )
+    return int(np.count_nonzero(reference_mask != candidate_mask))
+
+
+def compare_case(case, candidates):
+    """
+    :param case: one of the dictionaries returned by the function 'get_cases_of_photos' or 'get_synthetic_cases'
+    :type case: dictionary - {}
+    :param candidates: names of the candidates (keys of the CANDIDATES dictionary included in this file)
+    :type candidates: list - [] of strings
+    :return: list of dictionaries (one per candidate) with the keys: 'case', 'candidate', 'reference_seconds',
+    'candidate_seconds', 'mask_disagreement' and the keys returned by the function 'get_differences_of_images'
+    :rtype: list - []
+    """
+    arguments = {
+        "src_rgb_array": get_read_only_view(np_array=case["src_rgb_array"]),
+        "dst_rgb_array": get_read_only_view(np_array=case["dst_rgb_array"]),
+        "src_polygon": case["src_polygon"],
+        "dst_polygon": case["dst_polygon"],
+        "dst_cut_field": case["dst_cut_field"],
+    }
+    start = perf_counter()
+    reference_rgb_array = ReferenceChangeFaceElement.change_face_element(**arguments)
+    reference_seconds = perf_counter() - start
+
+    mask_disagreement = get_mask_disagreement(
+        polygon=case["dst_cut_field"] or case["dst_polygon"]
+    )
+
+    results = []
+    for candidate in candidates:
+        start = perf_counter()
+        candidate_rgb_array = CANDIDATES[candidate](**arguments)
+        candidate_seconds = perf_counter() - start
+
+        result = {
+            "case": case["name"],
+            "candidate": candidate,
+            "reference_seconds": reference_seconds,
+            "candidate_seconds": candidate_seconds,
+            "mask_disagreement": mask_disagreement,
+        }
+        result.update(
+            get_differences_of_images(
+                reference_rgb_array=reference_rgb_array,
+                candidate_rgb_array=candidate_rgb_array,
+            )
+        )
+        results.append(result)
+    return results
+
+
+def get_failures(result, tolerances):
+    """
+    :param result: one of the dictionaries returned by the function 'compare_case' (included in this file)
+    :type result: dictionary - {}
+    :param tolerances: dictionary with the keys: 'maximum_absolute_error', 'maximum_mean_absolute_error',
+    'minimum_psnr' (None means any value) and 'maximum_mask_disagreement'
+    :type tolerances: dictionary - {}
+    :return: list of messages describing the exceeded tolerances
+    :rtype: list - []
+    """
+    failures = []
+    if result["maximum_absolute_error"] > tolerances["maximum_absolute_error"]:
+        failures.append("maximum absolute error")
+    if result["mean_absolute_error"] > tolerances["maximum_mean_absolute_error"]:
+        failures.append("mean absolute error")
+    if (
+        tolerances["minimum_psnr"] is not None
+        and result["psnr"] is not None
+        and result["psnr"] < tolerances["minimum_psnr"]
+    ):
+        failures.append("psnr")
+    if result["mask_disagreement"] > tolerances["maximum_mask_disagreement"]:
+        failures.append("mask disagreement")
+    return failures
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="Compares fast implementations of face part swapping with the reference one."
+    )
+    parser.add_argument(
+        "--candidates",
+        nargs="+",
+        choices=list(CANDIDATES),
+        default=[COLOR_ADJUSTMENT_MODE_OF_THE_CLASSIFIER],
+    )
+    parser.add_argument(
+        "--sides-of-synthetic-images",
+        type=int,
+        nargs="*",
+        default=SIDES_OF_SYNTHETIC_IMAGES,
+    )
+    parser.add_argument("--skip-photos", action="store_true")
+    parser.add_argument("--maximum-absolute-error", type=int, default=0)
+    parser.add_argument("--maximum-mean-absolute-error", type=float, default=0.0)
+    parser.add_argument("--minimum-psnr", type=float, default=None)
+    parser.add_argument("--maximum-mask-disagreement", type=int, default=0)
+    parser.add_argument("--output", help="path of the JSON file with the results")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments = parse_arguments()
+    tolerances = {
+        "maximum_absolute_error": arguments.maximum_absolute_error,
+        "maximum_mean_absolute_error": arguments.maximum_mean_absolute_error,
+        "minimum_psnr": arguments.minimum_psnr,
+        "maximum_mask_disagreement": arguments.maximum_mask_disagreement,
+    }
+
+    cases = get_synthetic_cases(sides_of_images=arguments.sides_of_synthetic_images)
+    if not arguments.skip_photos:
+        cases = get_cases_of_photos() + cases
+
+    results = []
+    for case in cases:
+        for result in compare_case(case=case, candidates=arguments.candidates):
+            result["failures"] = get_failures(result=result, tolerances=tolerances)
+            results.append(result)
+            print(
+                "{status} {case} [{candidate}]: max error {maximum_absolute_error}, "
+                "mean error {mean_absolute_error:.4f}, mask disagreement {mask_disagreement}, "
+                "reference {reference_seconds:.3f}s, candidate {candidate_seconds:.3f}s".format(
+                    status="FAIL" if result["failures"] else "OK",
+                    **result
+                ),
+                file=sys.stderr,
+            )
+
+    report = {"tolerances": tolerances, "results": results}
+    if arguments.output:
+        with open(arguments.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+
+    if any(result["failures"] for result in results):
+        sys.exit(1)
@@ -0,0 +1,187 @@
+"""
+    This file should be executed at the level of the main directory of this repository, e.g.:
+        python apps/face_element_swapping/dev/lookup_table_report.py
+        python apps/face_element_swapping/dev/lookup_table_report.py --numbers-of-cells-per-channel 16 32 --output report.json
+    Every photo from the directories 'blog/dev/lips' and 'blog/dev/noses' (resized like the photos of users)
+    gets the part of the face from the next photo of the same directory, and the colors of the swapped part
+    are adjusted via lookup tables of different sizes and via the classifier
+    (see the function 'get_error_report_of_the_lookup_table' of the class 'ChangeFaceElement').
+    The script prints the errors and the durations of the lookup tables.
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+from PIL import Image
+
+sys.path.append("./")
+
+from apps.face_element_swapping.change_faces import ChangeFaceElement
+from apps.face_element_swapping.endpoints import GetEndpointsOfANose, GetEndpointsOfLips
+from apps.face_element_swapping.endpoints.helpers import get_faces_landmarks
+from apps.face_element_swapping.settings import (
+    DEFAULT_CLASSIFIER,
+    NUMBERS_OF_CELLS_PER_CHANNEL_IN_THE_ERROR_REPORT,
+)
+from blog.helpers import correct_size, resize_img
+
+DIRECTORIES_WITH_FACES = {"lips": "./blog/dev/lips", "nose": "./blog/dev/noses"}
+ACCEPTABLE_FILE_EXTENSIONS = (".jpg", ".jpeg")
+
+
+def get_photos(directory):
+    """
+    :param directory: path of a directory with photos
+    :type directory: string - str
+    :return: list of tuples: (name of a photo, the photo converted into a numpy array, landmarks of its first face).
+    The photos are resized like the photos sent by users and the photos without faces are skipped.
+    :rtype: list - []
+    """
+    photos = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(ACCEPTABLE_FILE_EXTENSIONS):
+            continue
+        with Image.open(os.path.join(directory, name)) as pil:
+            pil = pil.convert("RGB")
+            if not correct_size(img=pil):
+                pil = resize_img(img=pil)
+            rgb_array = np.array(pil, dtype=np.uint8)
+        faces_landmarks = get_faces_landmarks(rgb_array=rgb_array)
+        if faces_landmarks:
+            photos.append((name, rgb_array, faces_landmarks[0]))
+    return photos
+
+
+def get_polygons(part_of_face, face_landmarks):
+    """
+    :param part_of_face: one of the keys of the DIRECTORIES_WITH_FACES dictionary (included in this file)
+    :type part_of_face: string - str
+    :param face_landmarks: landmarks of a single face generated
+    by the function 'face_landmarks' from module named 'face_recognition'
+    :type face_landmarks: dictionary - {}
+    :return: the polygon and the cut field (None for lips) of the part of the face
+    :rtype: tuple - ()
+    """
+    if part_of_face == "lips":
+        return GetEndpointsOfLips.get_endpoints_of_lips(face_landmarks), None
+    endpoints = GetEndpointsOfANose.get_endpoints_of_a_nose(face_landmarks)
+    return endpoints["four_endpoints"], endpoints["six_endpoints"]
+
+
+def get_mixed_image(src_rgb_array, dst_rgb_array, src_polygon, dst_polygon, dst_cut_field):
+    """
+    :return: 'dst_rgb_array' with the part of the face from 'src_rgb_array' before the adjustment of its colors
+    (see the function 'change_face_element' of the class 'ChangeFaceElement') and the filled polygon
+    :rtype: tuple - (numpy.ndarray, list - [])
+    """
+    change_face_element = ChangeFaceElement(
+        src_rgb_array=src_rgb_array,
+        dst_rgb_array=dst_rgb_array,
+        src_polygon=src_polygon,
+        dst_polygon=dst_polygon,
+        dst_cut_field=dst_cut_field,
+    )
+    change_face_element._get_cropped_rgb_arrays()
+    filled_polygon = dst_cut_field if dst_cut_field else dst_polygon
+    mixed_image = ChangeFaceElement.fill_polygon_in_a_rectangle(
+        dst_rgb_array=dst_rgb_array,
+        dst_polygon=filled_polygon,
+        cropped_dst_rgb_array=change_face_element.cropped_dst_rgb_array,
+    )
+    return mixed_image, filled_polygon
+
+
+def get_report(numbers_of_cells_per_channel):
+    """
+    :param numbers_of_cells_per_channel: numbers of cells along each axis of the compared RGB cubes
+    :type numbers_of_cells_per_channel: list - [] of integers
+    :return: dictionary with the keys: 'swaps' (one report for every swap)
+    and 'summary' (one result for every size of the cube)
+    :rtype: dictionary - {}
+    """
+    swaps = []
+    for part_of_face, directory in DIRECTORIES_WITH_FACES.items():
+        photos = get_photos(directory=directory)
+        for idx, (name, dst_rgb_array, dst_face_landmarks) in enumerate(photos):
+            src_name, src_rgb_array, src_face_landmarks = photos[(idx + 1) % len(photos)]
+            src_polygon, _ = get_polygons(
+                part_of_face=part_of_face, face_landmarks=src_face_landmarks
+            )
+            dst_polygon, dst_cut_field = get_polygons(
+                part_of_face=part_of_face, face_landmarks=dst_face_landmarks
+            )
+            mixed_image, filled_polygon = get_mixed_image(
+                src_rgb_array=src_rgb_array,
+                dst_rgb_array=dst_rgb_array,
+                src_polygon=src_polygon,
+                dst_polygon=dst_polygon,
+                dst_cut_field=dst_cut_field,
+            )
+            swaps.append(
+                {
+                    "part_of_face": part_of_face,
+                    "photo": name,
+                    "source_photo": src_name,
+                    **ChangeFaceElement.get_error_report_of_the_lookup_table(
+                        classifier=DEFAULT_CLASSIFIER,
+                        training_image=dst_rgb_array,
+                        image_to_adjust=mixed_image,
+                        polygon_of_images=filled_polygon,
+                        numbers_of_cells_per_channel=numbers_of_cells_per_channel,
+                    ),
+                }
+            )
+
+    summary = []
+    for idx, number_of_cells_per_channel in enumerate(numbers_of_cells_per_channel):
+        lookup_tables = [swap["lookup_tables"][idx] for swap in swaps]
+        number_of_pixels = sum(swap["number_of_pixels"] for swap in swaps)
+        summary.append(
+            {
+                "number_of_cells_per_channel": number_of_cells_per_channel,
+                "maximum_absolute_error": max(
+                    lookup_table["maximum_absolute_error"] for lookup_table in lookup_tables
+                ),
+                "mean_absolute_error": sum(
+                    lookup_table["mean_absolute_error"] * swap["number_of_pixels"]
+                    for lookup_table, swap in zip(lookup_tables, swaps)
+                )
+                / number_of_pixels,
+                "fraction_of_different_pixels": sum(
+                    lookup_table["fraction_of_different_pixels"] * swap["number_of_pixels"]
+                    for lookup_table, swap in zip(lookup_tables, swaps)
+                )
+                / number_of_pixels,
+                "speedup": sum(swap["seconds_of_the_classifier"] for swap in swaps)
+                / sum(lookup_table["seconds"] for lookup_table in lookup_tables),
+            }
+        )
+    return {"swaps": swaps, "summary": summary}
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="Compares the colors adjusted via lookup tables with the colors adjusted via the classifier."
+    )
+    parser.add_argument(
+        "--numbers-of-cells-per-channel",
+        type=int,
+        nargs="+",
+        default=NUMBERS_OF_CELLS_PER_CHANNEL_IN_THE_ERROR_REPORT,
+    )
+    parser.add_argument("--output", help="path of the JSON file with the results")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments = parse_arguments()
+    report = get_report(
+        numbers_of_cells_per_channel=arguments.numbers_of_cells_per_channel
+    )
+    if arguments.output:
+        with open(arguments.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+    else:
+        print(json.dumps(report["summary"], indent=2))
@@ -0,0 +1,230 @@
+"""
+    This file contains the reference implementation of face part swapping.
+    It checks every pixel with the module 'shapely' and adjusts colors of all pixels of the bounding rectangle
+    via the classifier, exactly as the first version of the class 'ChangeFaceElement' did.
+    It is very slow and it should be used only to check that faster implementations produce the same images.
+"""
+
+from math import ceil
+
+import cv2
+import numpy as np
+from shapely.geometry import Point
+from shapely.geometry.polygon import Polygon
+
+from apps.face_element_swapping.change_faces import ChangeFaceElement
+from apps.face_element_swapping.helpers import (
+    fill_pixel_if_belongs_to_polygon,
+    get_rectangle_in_an_image,
+)
+from apps.face_element_swapping.settings import (
+    DEFAULT_CLASSIFIER,
+    PERCENT_OF_NEAREST_NEIGHBOURS,
+    RGB_MASK_FILLING_COLOR,
+)
+
+
+class ReferenceChangeFaceElement:
+    @staticmethod
+    def get_vector_of_pixels(rgb_array, bounding_rectangle_of_polygon, unique=True):
+        """
+        :param rgb_array: an RGB image converted into a numpy array (the array has following shape(y, x, 3))
+        :type rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :param bounding_rectangle_of_polygon: tuple or list with coordinates of the start point of the rectangle
+               and the width and height of this rectangle - (x, y, width, height) or [x, y, width, height]
+        :type bounding_rectangle_of_polygon: tuple - () or list - (). The tuple or list should have four elements.
+        :param unique: params indicates if returned vector will contain only unique pixel values
+        :type unique: bool (True or False)
+        :return: vector of all pixels or vector of unique pixels (it depends on the parameter 'unique')
+        found via the function 'unique' from the module 'numpy'
+        :rtype numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        """
+        data = get_rectangle_in_an_image(
+            np_array=rgb_array,
+            bounding_rectangle_of_polygon=bounding_rectangle_of_polygon,
+        )
+        shape = data.shape
+        data = np.reshape(data, (shape[0] * shape[1], shape[2]))
+        if unique:
+            data = np.unique(data, axis=0)
+        return data
+
+    @staticmethod
+    def get_polygon_mask(polygon, bounding_rectangle_of_polygon):
+        """
+        :param polygon: list or tuple of coordinates in 2D Space ([(x, y),(x, y),(x, y)...] or ((x, y),(x, y),(x, y)...)).
+        :type polygon: list - [] or tuple - ()
+        :param bounding_rectangle_of_polygon: tuple or list with coordinates of the start point of the rectangle
+        and the width and height of this rectangle - (x, y, width, height) or [x, y, width, height]
+        :type bounding_rectangle_of_polygon: tuple - () or list - (). The tuple or list should have four elements.
+        :return: a boolean mask with the shape (height, width) calculated point by point via the module 'shapely'.
+        It should be equal to the mask returned by the function 'get_polygon_mask' (from the file '..helpers').
+        :rtype numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        """
+        x, y, width, height = bounding_rectangle_of_polygon
+        shapely_polygon = Polygon(polygon)
+        polygon_mask = np.zeros((height, width), dtype=bool)
+        for row_idx in range(height):
+            for column_idx in range(width):
+                polygon_mask[row_idx][column_idx] = shapely_polygon.contains(
+                    Point(x + column_idx, y + row_idx)
+                )
+        return polygon_mask
+
+    @staticmethod
+    def adjust_image_colors_via_classifier(
+        classifier, training_image, image_to_adjust, polygon_of_images
+    ):
+        """
+        This function replaces pixels of 'image_to_adjust' that are included in 'polygon_of_images'
+        (see the function 'adjust_image_colors_via_classifier' of the class 'ChangeFaceElement').
+        The classifier is queried for every pixel of the bounding rectangle of 'polygon_of_images'.
+        :param classifier: object representing a classifier.
+        :param training_image: an RGB image converted into a numpy array (the array has following shape(y, x, 3))
+        :type training_image: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :param image_to_adjust: an RGB image converted into a numpy array (the array has following shape(y, x, 3))
+        :type image_to_adjust: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :param polygon_of_images: list of tuple of points in 2D Space ([(x, y),(x, y),(x, y)...] or ((x, y),(x, y),(x, y)...))
+        :type polygon_of_images: list - [] or tuple - ()
+        :return: 'image_to_adjust' in which pixels inside 'polygon_of_images' have been replaced.
+        :rtype: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        """
+        bounding_rectangle_of_polygon = (
+            ChangeFaceElement.get_bounding_rectangle_of_polygon(
+                polygon=polygon_of_images
+            )
+        )
+        training_data = ReferenceChangeFaceElement.get_vector_of_pixels(
+            rgb_array=training_image,
+            bounding_rectangle_of_polygon=bounding_rectangle_of_polygon,
+        )
+        training_data_avg = np.average(training_data, axis=0)
+        training_data_std = np.std(training_data, axis=0)
+
+        normalized_training_data = (
+            training_data - training_data_avg
+        ) / training_data_std
+
+        data_to_adjust = ReferenceChangeFaceElement.get_vector_of_pixels(
+            rgb_array=image_to_adjust,
+            bounding_rectangle_of_polygon=bounding_rectangle_of_polygon,
+            unique=False,
+        )
+        data_to_adjust = (data_to_adjust - training_data_avg) / training_data_std
+
+        classifier = classifier(
+            n_neighbors=ceil(PERCENT_OF_NEAREST_NEIGHBOURS * training_data.shape[0])
+        )
+        classifier.fit(normalized_training_data, range(training_data.shape[0]))
+        labels = classifier.kneighbors(data_to_adjust, return_distance=False)
+
+        label_idx = 0
+        for row_idx in range(
+            bounding_rectangle_of_polygon[1],
+            bounding_rectangle_of_polygon[1] + bounding_rectangle_of_polygon[3],
+        ):
+            for column_idx in range(
+                bounding_rectangle_of_polygon[0],
+                bounding_rectangle_of_polygon[0] + bounding_rectangle_of_polygon[2],
+            ):
+                pixel_value = np.round(
+                    np.average(training_data[labels[label_idx]], axis=0)
+                ).astype(np.uint8)
+                fill_pixel_if_belongs_to_polygon(
+                    rgb_array=image_to_adjust,
+                    polygon=polygon_of_images,
+                    row_idx=row_idx,
+                    column_idx=column_idx,
+                    pixel_value=pixel_value,
+                )
+                label_idx += 1
+
+        return image_to_adjust
+
+    @staticmethod
+    def fill_polygon_in_a_rectangle(dst_rgb_array, dst_polygon, cropped_dst_rgb_array):
+        """
+        This function fills pixels of 'dst_rgb_array' that are included in 'dst_polygon' point by point
+        and clones them seamlessly into the whole image.
+        :param dst_rgb_array: an RGB image converted into a numpy array (the array has following shape(y, x, 3))
+        :type dst_rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :param dst_polygon: list of tuple of points in 2D Space ([(x, y),(x, y),(x, y)...] or ((x, y),(x, y),(x, y)...))
+        :type dst_polygon: list - [] or tuple - ()
+        :param cropped_dst_rgb_array: an RGB image converted into a numpy array (the array has following shape(y, x, 3))
+        :type cropped_dst_rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :return: a new image which contains the new pixels
+        :rtype: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        """
+        bounding_rectangle_of_dst_polygon = (
+            ChangeFaceElement.get_bounding_rectangle_of_polygon(polygon=dst_polygon)
+        )
+        x, y, width, height = bounding_rectangle_of_dst_polygon
+        tmp_dst_rgb_array = np.array(dst_rgb_array)
+        mask = np.zeros(dst_rgb_array.shape, dst_rgb_array.dtype)
+
+        for row_idx in range(y, y + height):
+            for column_idx in range(x, x + width):
+                fill_pixel_if_belongs_to_polygon(
+                    rgb_array=tmp_dst_rgb_array,
+                    polygon=dst_polygon,
+                    row_idx=row_idx,
+                    column_idx=column_idx,
+                    pixel_value=cropped_dst_rgb_array[row_idx - y][column_idx - x],
+                )
+                fill_pixel_if_belongs_to_polygon(
+                    rgb_array=mask,
+                    polygon=dst_polygon,
+                    row_idx=row_idx,
+                    column_idx=column_idx,
+                    pixel_value=RGB_MASK_FILLING_COLOR,
+                )
+
+        center = ((2 * x + width) // 2, (2 * y + height) // 2)
+        return cv2.seamlessClone(
+            tmp_dst_rgb_array, np.array(dst_rgb_array), mask, center, cv2.NORMAL_CLONE
+        )
+
+    @staticmethod
+    def change_face_element(
+        src_rgb_array, dst_rgb_array, src_polygon, dst_polygon, dst_cut_field=None
+    ):
+        """
+        This function has the same parameters and the same result as the function 'change_face_element'
+        of the class 'ChangeFaceElement' called with the default mode of the color adjustment.
+        Neither of the passed images is modified.
+        :return: an RGB image converted into a numpy array.
+        :rtype: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        """
+        bounding_rectangle_of_src_polygon = (
+            ChangeFaceElement.get_bounding_rectangle_of_polygon(polygon=src_polygon)
+        )
+        bounding_rectangle_of_dst_polygon = (
+            ChangeFaceElement.get_bounding_rectangle_of_polygon(polygon=dst_polygon)
+        )
+        cropped_dst_rgb_array = cv2.warpPerspective(
+            get_rectangle_in_an_image(
+                np_array=src_rgb_array,
+                bounding_rectangle_of_polygon=bounding_rectangle_of_src_polygon,
+            ),
+            ChangeFaceElement.get_warp_mats(
+                src_polygon=src_polygon, dst_polygon=dst_polygon
+            ),
+            (bounding_rectangle_of_dst_polygon[2], bounding_rectangle_of_dst_polygon[3]),
+            None,
+            flags=cv2.INTER_LINEAR,
+            borderMode=cv2.BORDER_REPLICATE,
+        )
+        if dst_cut_field:
+            dst_polygon = dst_cut_field
+
+        mixed_image = ReferenceChangeFaceElement.fill_polygon_in_a_rectangle(
+            dst_rgb_array=dst_rgb_array,
+            dst_polygon=dst_polygon,
+            cropped_dst_rgb_array=cropped_dst_rgb_array,
+        )
+        return ReferenceChangeFaceElement.adjust_image_colors_via_classifier(
+            classifier=DEFAULT_CLASSIFIER,
+            training_image=dst_rgb_array,
+            image_to_adjust=mixed_image,
+            polygon_of_images=dst_polygon,
+        )
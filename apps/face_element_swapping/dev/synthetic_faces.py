@@ -0,0 +1,221 @@
+"""
+    This file contains functions generating deterministic synthetic images of faces.
+    The images don't need any network access or database, so they can be used to measure
+    and compare the kernels of face part swapping on any machine.
+"""
+
+import numpy as np
+
+from apps.face_element_swapping.endpoints import GetEndpointsOfANose, GetEndpointsOfLips
+from apps.face_element_swapping.endpoints.settings import (
+    INDICES_OF_THE_LANDMARKS_OF_PARTS_OF_A_FACE,
+    NUMBER_OF_LANDMARKS_OF_A_FACE,
+)
+
+# Sizes of face parts are expressed as fractions of the side of an image.
+# The size is the width of the lips of the synthetic landmarks.
+SIZES_OF_FACE_PARTS = {"small": 0.08, "medium": 0.15, "large": 0.25}
+PARTS_OF_SYNTHETIC_FACES = ["lips", "nose"]
+
+# The synthetic landmarks are placed in the same order as the 68 landmarks returned by
+# the function 'face_landmarks' from the module named 'face_recognition'.
+# Their coordinates are expressed as fractions of the width of the face,
+# relative to the center of the outer outline of the lips.
+HALF_OF_THE_WIDTH_OF_THE_LIPS = 0.18
+HALF_OF_THE_HEIGHT_OF_THE_LIPS = 0.08
+HALF_OF_THE_WIDTH_OF_THE_INNER_OUTLINE_OF_THE_LIPS = 0.12
+HALF_OF_THE_HEIGHT_OF_THE_INNER_OUTLINE_OF_THE_LIPS = 0.02
+CENTER_OF_THE_CHIN = (0.0, -0.3)
+HALF_OF_THE_WIDTH_OF_THE_CHIN = 0.5
+HALF_OF_THE_HEIGHT_OF_THE_CHIN = 0.55
+TOP_OF_THE_NOSE_BRIDGE = -0.47
+BOTTOM_OF_THE_NOSE_BRIDGE = -0.25
+HALF_OF_THE_WIDTH_OF_THE_NOSE_TIP = 0.08
+TOP_OF_THE_NOSE_TIP = -0.19
+BOTTOM_OF_THE_NOSE_TIP = -0.16
+CENTERS_OF_THE_EYES = ((-0.2, -0.43), (0.2, -0.43))
+HALF_OF_THE_WIDTH_OF_AN_EYE = 0.07
+HALF_OF_THE_HEIGHT_OF_AN_EYE = 0.025
+HEIGHT_OF_THE_EYEBROWS = -0.57
+HEIGHT_OF_THE_ARCHES_OF_THE_EYEBROWS = 0.03
+INNER_AND_OUTER_ENDS_OF_THE_EYEBROWS = (0.08, 0.38)
+AMPLITUDE_OF_THE_NOISE = 4
+
+SKIN_COLOR = (224, 172, 142)
+LIPS_COLOR = (176, 74, 84)
+BACKGROUND_COLORS = ((40, 60, 90), (120, 150, 190))
+
+
+def get_synthetic_face(side_of_an_image, seed=0):
+    """
+    :param side_of_an_image: width and height of the image in pixels
+    :type side_of_an_image: integer - int
+    :param seed: seed of the random generator. The same seed always gives the same image.
+    :type seed: integer - int
+    :return: an RGB image converted into a numpy array (the array has following shape(y, x, 3)).
+    The image contains a gradient background, an oval face and a darker ellipse (lips)
+    in the center of the image, where the lips of the function 'get_synthetic_landmarks'
+    (also included in this file) are placed.
+    :rtype: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    """
+    random_generator = np.random.default_rng(seed)
+    rows, columns = np.mgrid[0:side_of_an_image, 0:side_of_an_image] / side_of_an_image
+
+    start_color, end_color = (np.array(color, dtype=np.float64) for color in BACKGROUND_COLORS)
+    rgb_array = start_color + (end_color - start_color) * rows[..., np.newaxis]
+
+    face = ((columns - 0.5) / 0.3) ** 2 + ((rows - 0.5) / 0.4) ** 2 <= 1
+    shading = 1 - 0.25 * np.hypot(columns - 0.45, rows - 0.4)
+    rgb_array[face] = np.array(SKIN_COLOR) * shading[face][:, np.newaxis]
+
+    lips = ((columns - 0.5) / 0.1) ** 2 + ((rows - 0.5) / 0.05) ** 2 <= 1
+    rgb_array[lips] = np.array(LIPS_COLOR) * (1.2 - rows[lips][:, np.newaxis] * 0.4)
+
+    rgb_array += random_generator.integers(
+        -AMPLITUDE_OF_THE_NOISE, AMPLITUDE_OF_THE_NOISE + 1, size=rgb_array.shape
+    )
+    return np.clip(np.round(rgb_array), 0, 255).astype(np.uint8)
+
+
+def get_points_of_an_ellipse(center, half_of_the_width, half_of_the_height, angles):
+    """
+    :param center: center of the ellipse - (x, y)
+    :type center: tuple - ()
+    :param half_of_the_width: half of the width of the ellipse
+    :type half_of_the_width: float
+    :param half_of_the_height: half of the height of the ellipse
+    :type half_of_the_height: float
+    :param angles: angles of the points (0 is the rightmost point, pi / 2 is the lowest point)
+    :type angles: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    :return: the points of the ellipse (the array has following shape(number of angles, 2))
+    :rtype: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    """
+    return np.stack(
+        (
+            center[0] + half_of_the_width * np.cos(angles),
+            center[1] + half_of_the_height * np.sin(angles),
+        ),
+        axis=1,
+    )
+
+
+def get_template_of_landmarks():
+    """
+    :return: the 68 landmarks of a frontal face (the array has following shape(68, 2)).
+    The coordinates are fractions of the width of the face, relative to the center of the lips.
+    :rtype: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    """
+    landmarks = np.zeros((NUMBER_OF_LANDMARKS_OF_A_FACE, 2), dtype=np.float64)
+    # The chin goes from the left temple through the lowest point to the right temple.
+    landmarks[0:17] = get_points_of_an_ellipse(
+        center=CENTER_OF_THE_CHIN,
+        half_of_the_width=HALF_OF_THE_WIDTH_OF_THE_CHIN,
+        half_of_the_height=HALF_OF_THE_HEIGHT_OF_THE_CHIN,
+        angles=np.linspace(np.pi, 0, 17),
+    )
+    inner_end, outer_end = INNER_AND_OUTER_ENDS_OF_THE_EYEBROWS
+    columns_of_an_eyebrow = np.linspace(-outer_end, -inner_end, 5)
+    heights_of_an_eyebrow = HEIGHT_OF_THE_EYEBROWS - (
+        HEIGHT_OF_THE_ARCHES_OF_THE_EYEBROWS * np.sin(np.linspace(0, np.pi, 5))
+    )
+    landmarks[17:22] = np.stack((columns_of_an_eyebrow, heights_of_an_eyebrow), axis=1)
+    landmarks[22:27] = np.stack(
+        (-columns_of_an_eyebrow[::-1], heights_of_an_eyebrow[::-1]), axis=1
+    )
+    landmarks[27:31] = np.stack(
+        (np.zeros(4), np.linspace(TOP_OF_THE_NOSE_BRIDGE, BOTTOM_OF_THE_NOSE_BRIDGE, 4)),
+        axis=1,
+    )
+    # The middle landmark of the nose tip is the lowest one.
+    landmarks[31:36] = np.stack(
+        (
+            np.linspace(
+                -HALF_OF_THE_WIDTH_OF_THE_NOSE_TIP, HALF_OF_THE_WIDTH_OF_THE_NOSE_TIP, 5
+            ),
+            TOP_OF_THE_NOSE_TIP
+            + (BOTTOM_OF_THE_NOSE_TIP - TOP_OF_THE_NOSE_TIP) * np.sin(np.linspace(0, np.pi, 5)),
+        ),
+        axis=1,
+    )
+    # Every eye starts with its leftmost point and goes clockwise (over the top of the eye).
+    angles_of_an_eye = np.linspace(np.pi, 3 * np.pi, 6, endpoint=False)
+    for start, center_of_an_eye in zip((36, 42), CENTERS_OF_THE_EYES):
+        landmarks[start : start + 6] = get_points_of_an_ellipse(
+            center=center_of_an_eye,
+            half_of_the_width=HALF_OF_THE_WIDTH_OF_AN_EYE,
+            half_of_the_height=HALF_OF_THE_HEIGHT_OF_AN_EYE,
+            angles=angles_of_an_eye,
+        )
+    # Both outlines of the lips start with their leftmost points and go clockwise.
+    landmarks[48:60] = get_points_of_an_ellipse(
+        center=(0.0, 0.0),
+        half_of_the_width=HALF_OF_THE_WIDTH_OF_THE_LIPS,
+        half_of_the_height=HALF_OF_THE_HEIGHT_OF_THE_LIPS,
+        angles=np.linspace(np.pi, 3 * np.pi, 12, endpoint=False),
+    )
+    landmarks[60:68] = get_points_of_an_ellipse(
+        center=(0.0, 0.0),
+        half_of_the_width=HALF_OF_THE_WIDTH_OF_THE_INNER_OUTLINE_OF_THE_LIPS,
+        half_of_the_height=HALF_OF_THE_HEIGHT_OF_THE_INNER_OUTLINE_OF_THE_LIPS,
+        angles=np.linspace(np.pi, 3 * np.pi, 8, endpoint=False),
+    )
+    return landmarks
+
+
+def get_synthetic_landmarks(side_of_an_image, size_of_a_face_part, shift=(0.0, 0.0)):
+    """
+    :param side_of_an_image: width and height of the image in pixels
+    :type side_of_an_image: integer - int
+    :param size_of_a_face_part: one of the keys of the SIZES_OF_FACE_PARTS dictionary (included in this file)
+    :type size_of_a_face_part: string - str
+    :param shift: shift of the center of the lips from the center of the image
+    as a fraction of the side of the image - (x, y)
+    :type shift: tuple - ()
+    :return: landmarks of a single face in the same format as the landmarks generated
+    by the function 'face_landmarks' from module named 'face_recognition'
+    :rtype: dictionary - {}
+    """
+    width_of_the_face = (
+        SIZES_OF_FACE_PARTS[size_of_a_face_part]
+        * side_of_an_image
+        / (2 * HALF_OF_THE_WIDTH_OF_THE_LIPS)
+    )
+    center_of_the_lips = (np.array([0.5, 0.5]) + shift) * side_of_an_image
+    landmarks = np.round(
+        center_of_the_lips + get_template_of_landmarks() * width_of_the_face
+    ).astype(np.int64)
+    return {
+        name_of_a_part: list(map(tuple, landmarks[indices].tolist()))
+        for name_of_a_part, indices in INDICES_OF_THE_LANDMARKS_OF_PARTS_OF_A_FACE.items()
+    }
+
+
+def get_synthetic_polygons(
+    side_of_an_image, size_of_a_face_part, shift=(0.0, 0.0), part_of_face="lips"
+):
+    """
+    The polygons are calculated from the synthetic landmarks (see the function 'get_synthetic_landmarks'
+    included in this file) by the same functions as the polygons of real photos.
+    :param side_of_an_image: width and height of the image in pixels
+    :type side_of_an_image: integer - int
+    :param size_of_a_face_part: one of the keys of the SIZES_OF_FACE_PARTS dictionary (included in this file)
+    :type size_of_a_face_part: string - str
+    :param shift: shift of the center of the lips from the center of the image
+    as a fraction of the side of the image - (x, y)
+    :type shift: tuple - ()
+    :param part_of_face: one of the values of the PARTS_OF_SYNTHETIC_FACES list (included in this file)
+    :type part_of_face: string - str
+    :return: the polygon and the cut field (None for lips) of the part of the face.
+    They have the same format as the polygons passed to the function
+    'change_face_element' of the class 'ChangeFaceElement' as 'src_polygon' and 'dst_cut_field'.
+    :rtype: tuple - ()
+    """
+    face_landmarks = get_synthetic_landmarks(
+        side_of_an_image=side_of_an_image,
+        size_of_a_face_part=size_of_a_face_part,
+        shift=shift,
+    )
+    if part_of_face == "nose":
+        endpoints = GetEndpointsOfANose.get_endpoints_of_a_nose(face_landmarks)
+        return endpoints["four_endpoints"], endpoints["six_endpoints"]
+    return GetEndpointsOfLips.get_endpoints_of_lips(face_landmarks), None
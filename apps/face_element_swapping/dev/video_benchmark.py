@@ -0,0 +1,219 @@
+"""
+    This file should be executed at the level of the main directory of this repository, e.g.:
+        python apps/face_element_swapping/dev/video_benchmark.py
+        python apps/face_element_swapping/dev/video_benchmark.py --number-of-workers 4 --output-video clip.mp4
+    It measures the number of frames per second of the frame pipeline (see the file '../frames.py')
+    on a synthetic clip: a photo from the directory 'blog/dev/lips' which slowly moves and zooms.
+    The pipeline is measured with the detection on every frame, with the landmark tracking
+    and with the landmark tracking and the pool of workers.
+"""
+import argparse
+import json
+import sys
+from math import pi, sin
+from time import perf_counter
+
+import cv2
+import numpy as np
+from PIL import Image
+
+sys.path.append("./")
+
+from apps.face_element_swapping.endpoints import LandmarkTracker
+from apps.face_element_swapping.endpoints.helpers import get_faces_landmarks
+from apps.face_element_swapping.endpoints.settings import (
+    DETECTION_INTERVAL_OF_THE_LANDMARK_TRACKING,
+)
+from apps.face_element_swapping.frames import (
+    NAME_OF_LIPS,
+    PARTS_OF_A_FACE,
+    swap_part_of_face_in_frames,
+    write_frames,
+)
+from apps.face_element_swapping.settings import (
+    COLOR_ADJUSTMENT_MODES,
+    DEFAULT_COLOR_ADJUSTMENT_MODE,
+)
+
+PATH_OF_THE_PHOTO_OF_THE_CLIP = "./blog/dev/lips/Ariana_space_Grande.jpg"
+PATH_OF_THE_SOURCE_PHOTO = "./blog/dev/lips/Angelina_space_Jolie.jpg"
+MAXIMUM_SIDE_LENGTH_OF_THE_CLIP = 710
+NUMBER_OF_FRAMES = 60
+FRAME_RATE = 25.0
+NUMBER_OF_WORKERS = 2
+# The clip moves by this fraction of its width and zooms by this fraction of its size.
+AMPLITUDE_OF_THE_MOVEMENT = 0.03
+AMPLITUDE_OF_THE_ZOOM = 0.05
+
+
+def read_photo(path):
+    """
+    :param path: path of a photo
+    :type path: string - str
+    :return: the photo resized like the photos sent by users and converted into a numpy array
+    :rtype: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    """
+    with Image.open(path) as pil:
+        pil = pil.convert("RGB")
+        pil.thumbnail((MAXIMUM_SIDE_LENGTH_OF_THE_CLIP, MAXIMUM_SIDE_LENGTH_OF_THE_CLIP))
+        return np.array(pil, dtype=np.uint8)
+
+
+def get_synthetic_clip(rgb_array, number_of_frames):
+    """
+    :param rgb_array: an RGB image converted into a numpy array (the array has following shape(y, x, 3))
+    :type rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    :param number_of_frames: number of frames of the clip
+    :type number_of_frames: integer - int
+    :return: generator of frames of the clip. The image moves and zooms slowly, like a face in a selfie video.
+    :rtype: generator
+    """
+    height, width = rgb_array.shape[:2]
+    for idx in range(number_of_frames):
+        phase = 2 * pi * idx / number_of_frames
+        transformation = cv2.getRotationMatrix2D(
+            (width / 2, height / 2), 0, 1 + AMPLITUDE_OF_THE_ZOOM * sin(phase)
+        )
+        transformation[0, 2] += AMPLITUDE_OF_THE_MOVEMENT * width * sin(phase)
+        transformation[1, 2] += AMPLITUDE_OF_THE_MOVEMENT * height * sin(2 * phase)
+        yield cv2.warpAffine(
+            rgb_array, transformation, (width, height), borderMode=cv2.BORDER_REPLICATE
+        )
+
+
+def measure(
+    clip_rgb_array,
+    src_rgb_array,
+    src_face_landmarks,
+    part_of_face,
+    number_of_frames,
+    number_of_workers,
+    detection_interval,
+    color_adjustment_mode,
+    output_video=None,
+):
+    """
+    :param clip_rgb_array: the photo of the synthetic clip
+    :type clip_rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    :param src_rgb_array: the photo whose part of the face is moved to the frames
+    :type src_rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    :param src_face_landmarks: landmarks of the face in 'src_rgb_array'
+    :type src_face_landmarks: dictionary - {}
+    :param part_of_face: one of the values of the PARTS_OF_A_FACE list (from the file '../frames.py')
+    :type part_of_face: string - str
+    :param number_of_frames: number of frames of the clip
+    :type number_of_frames: integer - int
+    :param number_of_workers: see the function 'swap_part_of_face_in_frames' (from the file '../frames.py')
+    :type number_of_workers: integer - int
+    :param detection_interval: see the class 'LandmarkTracker' (from the module '..endpoints')
+    :type detection_interval: integer - int
+    :param color_adjustment_mode: one of the values of the COLOR_ADJUSTMENT_MODES list (from the file '../settings.py')
+    :type color_adjustment_mode: string - str
+    :param output_video: None or path of the written video
+    :type output_video: string - str or None
+    :return: dictionary with the keys: 'number_of_workers', 'detection_interval', 'number_of_frames',
+    'number_of_detections', 'seconds' and 'frames_per_second'. The time includes starting the workers.
+    :rtype: dictionary - {}
+    """
+    landmark_tracker = LandmarkTracker(detection_interval=detection_interval)
+    start = perf_counter()
+    frames = swap_part_of_face_in_frames(
+        frames=get_synthetic_clip(
+            rgb_array=clip_rgb_array, number_of_frames=number_of_frames
+        ),
+        src_rgb_array=src_rgb_array,
+        src_face_landmarks=src_face_landmarks,
+        part_of_face=part_of_face,
+        number_of_workers=number_of_workers,
+        landmark_tracker=landmark_tracker,
+        color_adjustment_mode=color_adjustment_mode,
+    )
+    if output_video:
+        number_of_written_frames = write_frames(
+            frames=frames, path=output_video, frame_rate=FRAME_RATE
+        )
+    else:
+        number_of_written_frames = sum(1 for _ in frames)
+    seconds = perf_counter() - start
+
+    return {
+        "number_of_workers": number_of_workers,
+        "detection_interval": detection_interval,
+        "number_of_frames": number_of_written_frames,
+        "number_of_detections": landmark_tracker.number_of_detections,
+        "seconds": seconds,
+        "frames_per_second": number_of_written_frames / seconds,
+    }
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="Measures the number of frames per second of the frame pipeline on a synthetic clip."
+    )
+    parser.add_argument("--part-of-face", choices=PARTS_OF_A_FACE, default=NAME_OF_LIPS)
+    parser.add_argument("--number-of-frames", type=int, default=NUMBER_OF_FRAMES)
+    parser.add_argument("--number-of-workers", type=int, default=NUMBER_OF_WORKERS)
+    parser.add_argument(
+        "--color-adjustment-mode",
+        choices=COLOR_ADJUSTMENT_MODES,
+        default=DEFAULT_COLOR_ADJUSTMENT_MODE,
+    )
+    parser.add_argument(
+        "--output-video",
+        help="path of the video written by the last measurement (the tracking and the pool of workers)",
+    )
+    parser.add_argument("--output", help="path of the JSON file with the results")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments = parse_arguments()
+    clip_rgb_array = read_photo(path=PATH_OF_THE_PHOTO_OF_THE_CLIP)
+    src_rgb_array = read_photo(path=PATH_OF_THE_SOURCE_PHOTO)
+    src_face_landmarks = get_faces_landmarks(rgb_array=src_rgb_array)[0]
+
+    configurations = [
+        {
+            "name": "detection_on_every_frame",
+            "number_of_workers": 0,
+            "detection_interval": 1,
+        },
+        {
+            "name": "tracking",
+            "number_of_workers": 0,
+            "detection_interval": DETECTION_INTERVAL_OF_THE_LANDMARK_TRACKING,
+        },
+        {
+            "name": "tracking_and_pool",
+            "number_of_workers": arguments.number_of_workers,
+            "detection_interval": DETECTION_INTERVAL_OF_THE_LANDMARK_TRACKING,
+        },
+    ]
+    results = []
+    for idx, configuration in enumerate(configurations):
+        result = measure(
+            clip_rgb_array=clip_rgb_array,
+            src_rgb_array=src_rgb_array,
+            src_face_landmarks=src_face_landmarks,
+            part_of_face=arguments.part_of_face,
+            number_of_frames=arguments.number_of_frames,
+            number_of_workers=configuration["number_of_workers"],
+            detection_interval=configuration["detection_interval"],
+            color_adjustment_mode=arguments.color_adjustment_mode,
+            output_video=arguments.output_video
+            if idx == len(configurations) - 1
+            else None,
+        )
+        results.append(dict(name=configuration["name"], **result))
+
+    report = {
+        "part_of_face": arguments.part_of_face,
+        "color_adjustment_mode": arguments.color_adjustment_mode,
+        "side_of_the_clip": list(clip_rgb_array.shape[:2]),
+        "results": results,
+    }
+    if arguments.output:
+        with open(arguments.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
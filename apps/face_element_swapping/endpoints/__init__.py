@@ -1,2 +1,5 @@
+from .face_landmarks import FaceLandmarks
 from .lips import GetEndpointsOfLips
 from .nose import GetEndpointsOfANose
+from .detection_service import LandmarkDetectionService
+from .landmark_tracker import LandmarkTracker
@@ -0,0 +1,238 @@
+"""
+    This file contains the service which detects landmarks of faces in a pool of worker processes.
+    The models of the module 'face_recognition' are loaded once by every worker when the pool starts,
+    and images are passed to the workers through shared memory instead of being pickled,
+    so the calling thread only waits for the result and doesn't hold the GIL during the detection.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from threading import BrokenBarrierError, Lock
+
+import numpy as np
+
+from .helpers import get_faces_landmarks
+from .settings import (
+    DEFAULT_TIMEOUT_OF_THE_LANDMARK_DETECTION_IN_SECONDS,
+    MAXIMUM_SIDE_LENGTH_OF_AN_IMAGE_FOR_FACE_DETECTION,
+    NUMBER_OF_TIMES_TO_UPSAMPLE_AN_IMAGE_FOR_FACE_DETECTION,
+    NUMBER_OF_WORKERS_OF_THE_LANDMARK_DETECTION,
+    START_METHOD_OF_THE_WORKERS_OF_THE_LANDMARK_DETECTION,
+    TIMEOUT_OF_THE_START_OF_THE_LANDMARK_DETECTION_IN_SECONDS,
+)
+
+# Side length of the image detected by every worker when it starts, so the first request doesn't warm up the detector.
+SIDE_LENGTH_OF_THE_WARM_UP_IMAGE = 64
+
+
+def _initialize_worker(barrier_of_the_start):
+    """
+    :param barrier_of_the_start: barrier which is passed when all workers and the starting process are ready
+    :type barrier_of_the_start: multiprocessing.synchronize.Barrier
+    """
+    # The models have been loaded by importing this file, so only the detector is warmed up.
+    get_faces_landmarks(
+        rgb_array=np.zeros(
+            (SIDE_LENGTH_OF_THE_WARM_UP_IMAGE, SIDE_LENGTH_OF_THE_WARM_UP_IMAGE, 3),
+            dtype=np.uint8,
+        )
+    )
+    barrier_of_the_start.wait()
+
+
+def _do_nothing():
+    pass
+
+
+def _detect_faces_landmarks_in_shared_memory(
+    name_of_the_shared_memory,
+    shape,
+    dtype,
+    maximum_side_length_for_face_detection,
+    number_of_times_to_upsample,
+    faces_locations,
+):
+    """
+    This function is called by the workers of the pool.
+    :param name_of_the_shared_memory: name of the block of shared memory which contains the image
+    :type name_of_the_shared_memory: string - str
+    :param shape: shape of the image
+    :type shape: tuple - ()
+    :param dtype: numpy type of the image (https://www.numpy.org/devdocs/user/basics.types.html)
+    :type dtype: string - str
+    :param maximum_side_length_for_face_detection: see the function 'get_faces_landmarks' (from the file '.helpers')
+    :type maximum_side_length_for_face_detection: integer - int or None
+    :param number_of_times_to_upsample: see the function 'get_faces_landmarks'
+    :type number_of_times_to_upsample: integer - int
+    :param faces_locations: see the function 'get_faces_landmarks'
+    :type faces_locations: list - [] of tuples - () or None
+    :return: a list of dictionaries of face feature locations (eyes, nose, etc)
+    :rtype list - []
+    """
+    shared_memory = SharedMemory(name=name_of_the_shared_memory)
+    try:
+        rgb_array = np.ndarray(shape, dtype=dtype, buffer=shared_memory.buf)
+        faces_landmarks = get_faces_landmarks(
+            rgb_array=rgb_array,
+            maximum_side_length_for_face_detection=maximum_side_length_for_face_detection,
+            number_of_times_to_upsample=number_of_times_to_upsample,
+            faces_locations=faces_locations,
+        )
+        # The memory can't be closed while any array uses it.
+        del rgb_array
+    finally:
+        shared_memory.close()
+    return faces_landmarks
+
+
+def _release_shared_memory(shared_memory):
+    shared_memory.close()
+    shared_memory.unlink()
+
+
+class LandmarkDetectionService:
+    def __init__(
+        self,
+        number_of_workers=NUMBER_OF_WORKERS_OF_THE_LANDMARK_DETECTION,
+        start_method=START_METHOD_OF_THE_WORKERS_OF_THE_LANDMARK_DETECTION,
+        maximum_side_length_for_face_detection=MAXIMUM_SIDE_LENGTH_OF_AN_IMAGE_FOR_FACE_DETECTION,
+        number_of_times_to_upsample=NUMBER_OF_TIMES_TO_UPSAMPLE_AN_IMAGE_FOR_FACE_DETECTION,
+    ):
+        """
+        The workers are started by the function 'start' or by the first detection.
+        :param number_of_workers: number of worker processes
+        :type number_of_workers: integer - int
+        :param start_method: method of starting the workers ('spawn', 'forkserver' or 'fork')
+        :type start_method: string - str
+        :param maximum_side_length_for_face_detection: see the function 'get_faces_landmarks' (from the file '.helpers')
+        :type maximum_side_length_for_face_detection: integer - int or None
+        :param number_of_times_to_upsample: see the function 'get_faces_landmarks'
+        :type number_of_times_to_upsample: integer - int
+        """
+        self._number_of_workers = number_of_workers
+        self._start_method = start_method
+        self._maximum_side_length_for_face_detection = (
+            maximum_side_length_for_face_detection
+        )
+        self._number_of_times_to_upsample = number_of_times_to_upsample
+        self._executor = None
+        self._lock = Lock()
+
+    @property
+    def number_of_workers(self):
+        return self._number_of_workers
+
+    def start(self):
+        """
+        This function starts all workers and waits until they have loaded the models.
+        Calling it again does nothing while the workers are running.
+        :raises RuntimeError: if the workers haven't loaded the models
+        in TIMEOUT_OF_THE_START_OF_THE_LANDMARK_DETECTION_IN_SECONDS seconds (from the file '.settings')
+        """
+        with self._lock:
+            if self._executor is not None:
+                return
+
+            context = get_context(self._start_method)
+            barrier_of_the_start = context.Barrier(self._number_of_workers + 1)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._number_of_workers,
+                mp_context=context,
+                initializer=_initialize_worker,
+                initargs=(barrier_of_the_start,),
+            )
+            # Every task submitted to a new pool starts a new worker until the pool is full.
+            for _ in range(self._number_of_workers):
+                self._executor.submit(_do_nothing)
+            try:
+                barrier_of_the_start.wait(
+                    timeout=TIMEOUT_OF_THE_START_OF_THE_LANDMARK_DETECTION_IN_SECONDS
+                )
+            except BrokenBarrierError:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+                raise RuntimeError(
+                    "The workers of the landmark detection haven't started "
+                    "in {timeout} seconds.".format(
+                        timeout=TIMEOUT_OF_THE_START_OF_THE_LANDMARK_DETECTION_IN_SECONDS
+                    )
+                )
+
+    def shutdown(self, wait=True):
+        """
+        :param wait: if it is True, this function waits until the running detections finish
+        :type wait: bool
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    def submit(self, rgb_array, faces_locations=None):
+        """
+        The image is copied once into a new block of shared memory, which is released when the detection finishes.
+        :param rgb_array: an RGB image converted into a numpy array (the array has following shape(y, x, 3))
+        :type rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :param faces_locations: known boxes of faces, see the function 'get_faces_landmarks' (from the file '.helpers')
+        :type faces_locations: list - [] of tuples - () or None
+        :return: a future whose result is a list of dictionaries of face feature locations (eyes, nose, etc)
+        :rtype: concurrent.futures.Future
+        """
+        if self._executor is None:
+            self.start()
+
+        shared_memory = SharedMemory(create=True, size=rgb_array.nbytes)
+        try:
+            np.ndarray(rgb_array.shape, dtype=rgb_array.dtype, buffer=shared_memory.buf)[
+                ...
+            ] = rgb_array
+            future = self._executor.submit(
+                _detect_faces_landmarks_in_shared_memory,
+                name_of_the_shared_memory=shared_memory.name,
+                shape=rgb_array.shape,
+                dtype=rgb_array.dtype.str,
+                maximum_side_length_for_face_detection=self._maximum_side_length_for_face_detection,
+                number_of_times_to_upsample=self._number_of_times_to_upsample,
+                faces_locations=faces_locations,
+            )
+        except BaseException:
+            _release_shared_memory(shared_memory=shared_memory)
+            raise
+
+        future.add_done_callback(lambda _: _release_shared_memory(shared_memory))
+        return future
+
+    def get_faces_landmarks(
+        self,
+        rgb_array,
+        timeout=DEFAULT_TIMEOUT_OF_THE_LANDMARK_DETECTION_IN_SECONDS,
+        faces_locations=None,
+    ):
+        """
+        This function has the same result as the function 'get_faces_landmarks' (from the file '.helpers').
+        If a worker has died, the pool is started again by the next detection.
+        :param rgb_array: an RGB image converted into a numpy array (the array has following shape(y, x, 3))
+        :type rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :param timeout: the maximum number of seconds to wait for the result (None means no limit)
+        :type timeout: float or None
+        :param faces_locations: known boxes of faces, see the function 'get_faces_landmarks' (from the file '.helpers')
+        :type faces_locations: list - [] of tuples - () or None
+        :return: a list of dictionaries of face feature locations (eyes, nose, etc)
+        :rtype list - []
+        :raises concurrent.futures.TimeoutError: if the result isn't ready after 'timeout' seconds
+        (an alias of the built-in 'TimeoutError' only since Python 3.11)
+        :raises concurrent.futures.process.BrokenProcessPool: if a worker has died
+        :raises ValueError: if any of the passed boxes ('faces_locations') is invalid
+        """
+        future = self.submit(rgb_array=rgb_array, faces_locations=faces_locations)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise
+        except BrokenProcessPool:
+            self.shutdown(wait=False)
+            raise
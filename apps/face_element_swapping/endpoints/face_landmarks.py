@@ -0,0 +1,199 @@
+"""
+    This file contains the compact representation of the 68 landmarks of a face.
+    The landmarks are stored in a single (68, 2) array of 16-bit integers,
+    so they can be serialized into a few hundred bytes and read back without parsing.
+"""
+
+from collections.abc import Mapping
+
+import numpy as np
+
+from .landmark_operator import get_array_of_landmarks
+from .settings import (
+    INDICES_OF_THE_LANDMARKS_OF_PARTS_OF_A_FACE,
+    NUMBER_OF_LANDMARKS_OF_A_FACE,
+    TYPE_OF_THE_SERIALIZED_LANDMARKS,
+    VERSION_OF_THE_SERIALIZED_LANDMARKS,
+)
+
+
+def _get_selection_of_a_part(indices):
+    """
+    :param indices: indices of the landmarks of a part of a face
+    :type indices: list - [] of integers
+    :return: a slice if the indices are consecutive (so the part can be a view of the array), otherwise the indices
+    :rtype: slice or list - []
+    """
+    if indices == list(range(indices[0], indices[-1] + 1)):
+        return slice(indices[0], indices[-1] + 1)
+    return indices
+
+
+NUMBER_OF_BYTES_OF_THE_SERIALIZED_LANDMARKS = 1 + NUMBER_OF_LANDMARKS_OF_A_FACE * 2 * np.dtype(
+    TYPE_OF_THE_SERIALIZED_LANDMARKS
+).itemsize
+
+SELECTIONS_OF_PARTS_OF_A_FACE = {
+    name_of_a_part: _get_selection_of_a_part(indices=indices)
+    for name_of_a_part, indices in INDICES_OF_THE_LANDMARKS_OF_PARTS_OF_A_FACE.items()
+}
+
+
+class FaceLandmarks(Mapping):
+    def __init__(self, landmarks):
+        """
+        The object can be passed to the functions which expect the landmarks generated
+        by the function 'face_landmarks' from module named 'face_recognition'
+        (e.g. the functions of the classes 'GetEndpointsOfLips' and 'GetEndpointsOfANose'),
+        because it maps the names of parts of a face to lists of points.
+        :param landmarks: all landmarks of a face (the array has following shape(68, 2))
+        :type landmarks: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :raises ValueError: if 'landmarks' doesn't have the shape (68, 2)
+        """
+        if np.shape(landmarks) != (NUMBER_OF_LANDMARKS_OF_A_FACE, 2):
+            raise ValueError(
+                "The landmarks must have the shape ({number_of_landmarks}, 2). "
+                "The passed landmarks have the shape {shape}.".format(
+                    number_of_landmarks=NUMBER_OF_LANDMARKS_OF_A_FACE,
+                    shape=np.shape(landmarks),
+                )
+            )
+        landmarks = np.asarray(landmarks)
+        # The array may be shared (e.g. it may be a view of the serialized landmarks), so it is read-only.
+        if landmarks.dtype != TYPE_OF_THE_SERIALIZED_LANDMARKS or landmarks.flags.writeable:
+            landmarks = landmarks.astype(TYPE_OF_THE_SERIALIZED_LANDMARKS)
+            landmarks.flags.writeable = False
+        self._array = landmarks
+
+    @property
+    def array(self):
+        return self._array
+
+    @classmethod
+    def from_face_recognition(cls, face_landmarks):
+        """
+        :param face_landmarks: landmarks of a single face generated
+        by the function 'face_landmarks' from module named 'face_recognition'
+        (link to the module named 'face_recognition' - https://pypi.org/project/face_recognition/)
+        :type face_landmarks: dictionary - {}
+        :return: the same landmarks in the compact representation
+        :rtype: FaceLandmarks
+        """
+        return cls(landmarks=get_array_of_landmarks(face_landmarks=face_landmarks))
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        The returned landmarks are a view of 'data', so nothing is copied.
+        :param data: the result of calling the function 'to_bytes' (included in this class)
+        :type data: bytes or memoryview
+        :return: the deserialized landmarks
+        :rtype: FaceLandmarks
+        :raises ValueError: if 'data' isn't a serialized object of this class
+        """
+        data = memoryview(data)
+        if (
+            data.nbytes != NUMBER_OF_BYTES_OF_THE_SERIALIZED_LANDMARKS
+            or data[0] != VERSION_OF_THE_SERIALIZED_LANDMARKS
+        ):
+            raise ValueError(
+                "The passed data are not landmarks serialized in the version {version}.".format(
+                    version=VERSION_OF_THE_SERIALIZED_LANDMARKS
+                )
+            )
+        landmarks = np.frombuffer(
+            data, dtype=TYPE_OF_THE_SERIALIZED_LANDMARKS, offset=1
+        ).reshape(NUMBER_OF_LANDMARKS_OF_A_FACE, 2)
+        landmarks.flags.writeable = False
+        return cls(landmarks=landmarks)
+
+    def to_bytes(self):
+        """
+        :return: the landmarks serialized into the version number (one byte)
+        followed by the coordinates saved as little-endian 16-bit integers
+        :rtype: bytes
+        """
+        return bytes((VERSION_OF_THE_SERIALIZED_LANDMARKS,)) + self._array.tobytes()
+
+    @classmethod
+    def from_bytes_of_many_faces(cls, data):
+        """
+        :param data: the result of calling the function 'to_bytes_of_many_faces' (included in this class)
+        :type data: bytes or memoryview
+        :return: the deserialized landmarks of all faces (views of 'data')
+        :rtype: list - [] of FaceLandmarks
+        :raises ValueError: if 'data' aren't serialized objects of this class
+        """
+        data = memoryview(data)
+        if data.nbytes % NUMBER_OF_BYTES_OF_THE_SERIALIZED_LANDMARKS:
+            raise ValueError(
+                "The passed data are not landmarks serialized in the version {version}.".format(
+                    version=VERSION_OF_THE_SERIALIZED_LANDMARKS
+                )
+            )
+        return [
+            cls.from_bytes(
+                data=data[start : start + NUMBER_OF_BYTES_OF_THE_SERIALIZED_LANDMARKS]
+            )
+            for start in range(0, data.nbytes, NUMBER_OF_BYTES_OF_THE_SERIALIZED_LANDMARKS)
+        ]
+
+    @staticmethod
+    def to_bytes_of_many_faces(faces_landmarks):
+        """
+        :param faces_landmarks: the landmarks of many faces (e.g. of all faces of a group photo)
+        :type faces_landmarks: list - [] of FaceLandmarks
+        :return: the landmarks of the faces serialized one after another
+        by the function 'to_bytes' (included in this class).
+        The landmarks of a single face are serialized exactly like by the function 'to_bytes'.
+        :rtype: bytes
+        """
+        return b"".join(face_landmarks.to_bytes() for face_landmarks in faces_landmarks)
+
+    def get_part(self, name_of_a_part):
+        """
+        :param name_of_a_part: one of the keys of the INDICES_OF_THE_LANDMARKS_OF_PARTS_OF_A_FACE dictionary
+        (from the file '.settings'), e.g. 'nose_tip'
+        :type name_of_a_part: string - str
+        :return: read-only array of the landmarks of the part (the array has following shape(number of landmarks, 2)).
+        The array is a view of 'self.array' for all parts except lips, whose landmarks are not consecutive.
+        :rtype: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        """
+        part = self._array[SELECTIONS_OF_PARTS_OF_A_FACE[name_of_a_part]]
+        part.flags.writeable = False
+        return part
+
+    def get_landmarks_of_parts(self, names_of_parts):
+        """
+        :param names_of_parts: keys of the INDICES_OF_THE_LANDMARKS_OF_PARTS_OF_A_FACE dictionary
+        (from the file '.settings'), e.g. ['top_lip', 'bottom_lip']
+        :type names_of_parts: list - [] of strings
+        :return: the landmarks of all the parts ordered by their indices. Landmarks shared by the parts
+        (e.g. the corners of the lips) are returned only once, so the landmarks of two faces correspond one to one.
+        :rtype: list - [] of tuples - (x, y)
+        """
+        indices = sorted(
+            {
+                idx
+                for name_of_a_part in names_of_parts
+                for idx in INDICES_OF_THE_LANDMARKS_OF_PARTS_OF_A_FACE[name_of_a_part]
+            }
+        )
+        return list(map(tuple, self._array[indices].tolist()))
+
+    def __getitem__(self, name_of_a_part):
+        """
+        :param name_of_a_part: one of the keys of the INDICES_OF_THE_LANDMARKS_OF_PARTS_OF_A_FACE dictionary
+        (from the file '.settings'), e.g. 'nose_tip'
+        :type name_of_a_part: string - str
+        :return: the landmarks of the part in the same format as in the landmarks generated
+        by the function 'face_landmarks' from module named 'face_recognition'
+        :rtype: list - [] of tuples - (x, y)
+        """
+        return list(map(tuple, self.get_part(name_of_a_part=name_of_a_part).tolist()))
+
+    def __iter__(self):
+        return iter(INDICES_OF_THE_LANDMARKS_OF_PARTS_OF_A_FACE)
+
+    def __len__(self):
+        return len(INDICES_OF_THE_LANDMARKS_OF_PARTS_OF_A_FACE)
@@ -1,6 +1,13 @@
-from face_recognition import face_landmarks
+import cv2
+from face_recognition import face_landmarks, face_locations
 
-from .settings import TYPES_OF_ENDPOINTS
+from ..timing import timing_span
+from .settings import (
+    MAXIMUM_SIDE_LENGTH_OF_AN_IMAGE_FOR_FACE_DETECTION,
+    MINIMUM_SIDE_LENGTH_OF_A_FACE_LOCATION,
+    NUMBER_OF_TIMES_TO_UPSAMPLE_AN_IMAGE_FOR_FACE_DETECTION,
+    TYPES_OF_ENDPOINTS,
+)
 
 
 def point_dividing_a_line_segment(A, B, offset_from_A):
@@ -101,12 +108,134 @@ def point_along_a_line_distanced_from_another_point(A, B, offset_from_A):
     return point_outside_a_line
 
 
-def get_faces_landmarks(rgb_array):
+def get_faces_locations(
+    rgb_array,
+    maximum_side_length=MAXIMUM_SIDE_LENGTH_OF_AN_IMAGE_FOR_FACE_DETECTION,
+    number_of_times_to_upsample=NUMBER_OF_TIMES_TO_UPSAMPLE_AN_IMAGE_FOR_FACE_DETECTION,
+):
     """
+    The cost of the face detection grows with the number of pixels,
+    so faces can be detected on a downscaled copy of the image and the found boxes are scaled back.
+    If no face is found on the copy, faces are detected on the image itself
+    (small faces may be missed on the copy).
     :param rgb_array: an RGB image converted into a numpy array (the array has following shape(y, x, 3))
     :type rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    :param maximum_side_length: the maximum side length of the copy on which faces are detected.
+    If it is None, faces are detected on 'rgb_array'.
+    :type maximum_side_length: integer - int or None
+    :param number_of_times_to_upsample: how many times the image is upsampled while faces are looked for
+    :type number_of_times_to_upsample: integer - int
+    :return: a list of boxes of the found faces in the coordinates of 'rgb_array'
+    in css (top, right, bottom, left) order
+    :rtype list - [] of tuples - ()
+    """
+    height, width = rgb_array.shape[:2]
+    if maximum_side_length is None or max(height, width) <= maximum_side_length:
+        return face_locations(
+            rgb_array, number_of_times_to_upsample=number_of_times_to_upsample
+        )
+
+    scale = maximum_side_length / max(height, width)
+    downscaled_rgb_array = cv2.resize(
+        rgb_array, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA
+    )
+    boxes_of_faces = face_locations(
+        downscaled_rgb_array, number_of_times_to_upsample=number_of_times_to_upsample
+    )
+    if not boxes_of_faces:
+        return face_locations(
+            rgb_array, number_of_times_to_upsample=number_of_times_to_upsample
+        )
+
+    return [
+        (
+            max(int(round(top / scale)), 0),
+            min(int(round(right / scale)), width),
+            min(int(round(bottom / scale)), height),
+            max(int(round(left / scale)), 0),
+        )
+        for top, right, bottom, left in boxes_of_faces
+    ]
+
+
+def get_valid_face_location(face_location, shape_of_an_image):
+    """
+    This function checks a face box which hasn't been found by the detection on the image,
+    e.g. a box from a cache or a box sent by a client.
+    :param face_location: a box of a face in css (top, right, bottom, left) order
+    :type face_location: tuple - () or list - [] of numbers
+    :param shape_of_an_image: shape of the image which contains the face
+    :type shape_of_an_image: tuple - ()
+    :return: the box clipped to the image, its coordinates are integers
+    :rtype: tuple - ()
+    :raises ValueError: if 'face_location' isn't a box of four numbers or if the box clipped to the image
+    is smaller than MINIMUM_SIDE_LENGTH_OF_A_FACE_LOCATION (from the file '.settings')
+    """
+    try:
+        top, right, bottom, left = map(int, face_location)
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError(
+            "The face location must contain four numbers: top, right, bottom, left. "
+            "The passed face location: {face_location}.".format(
+                face_location=face_location
+            )
+        )
+
+    height, width = shape_of_an_image[:2]
+    top, right = max(top, 0), min(right, width)
+    bottom, left = min(bottom, height), max(left, 0)
+    if (
+        bottom - top < MINIMUM_SIDE_LENGTH_OF_A_FACE_LOCATION
+        or right - left < MINIMUM_SIDE_LENGTH_OF_A_FACE_LOCATION
+    ):
+        raise ValueError(
+            "The face location: {face_location} doesn't contain a box of at least "
+            "{side_length}x{side_length} pixels inside the image.".format(
+                face_location=face_location,
+                side_length=MINIMUM_SIDE_LENGTH_OF_A_FACE_LOCATION,
+            )
+        )
+    return top, right, bottom, left
+
+
+def get_faces_landmarks(
+    rgb_array,
+    maximum_side_length_for_face_detection=MAXIMUM_SIDE_LENGTH_OF_AN_IMAGE_FOR_FACE_DETECTION,
+    number_of_times_to_upsample=NUMBER_OF_TIMES_TO_UPSAMPLE_AN_IMAGE_FOR_FACE_DETECTION,
+    faces_locations=None,
+):
+    """
+    Faces are detected via the function 'get_faces_locations' (included in this file),
+    but the landmarks are always predicted on 'rgb_array' itself.
+    If the boxes of faces are already known ('faces_locations'), the detection is skipped.
+    :param rgb_array: an RGB image converted into a numpy array (the array has following shape(y, x, 3))
+    :type rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    :param maximum_side_length_for_face_detection: see the parameter 'maximum_side_length'
+    of the function 'get_faces_locations'
+    :type maximum_side_length_for_face_detection: integer - int or None
+    :param number_of_times_to_upsample: see the function 'get_faces_locations'
+    :type number_of_times_to_upsample: integer - int
+    :param faces_locations: known boxes of faces in css (top, right, bottom, left) order.
+    Every box is checked by the function 'get_valid_face_location' (included in this file).
+    :type faces_locations: list - [] of tuples - () or None
     :return: a list of dictionaries of face feature locations (eyes, nose, etc)
     :rtype list - []
+    :raises ValueError: if any of the passed boxes ('faces_locations') is invalid
     """
-    face_landmarks_list = face_landmarks(rgb_array)
+    if faces_locations is None:
+        with timing_span(name="detect_faces"):
+            boxes_of_faces = get_faces_locations(
+                rgb_array=rgb_array,
+                maximum_side_length=maximum_side_length_for_face_detection,
+                number_of_times_to_upsample=number_of_times_to_upsample,
+            )
+    else:
+        boxes_of_faces = [
+            get_valid_face_location(
+                face_location=face_location, shape_of_an_image=rgb_array.shape
+            )
+            for face_location in faces_locations
+        ]
+    with timing_span(name="predict_landmarks"):
+        face_landmarks_list = face_landmarks(rgb_array, face_locations=boxes_of_faces)
     return face_landmarks_list
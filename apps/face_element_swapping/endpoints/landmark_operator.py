@@ -0,0 +1,253 @@
+"""
+    This file contains the operator which calculates endpoints of parts of a face
+    for many faces at once. Every endpoint is a weighted sum of two points (rounded like in the function
+    'point_dividing_a_line_segment') or a point selected from a set of points (like in the function 'find_endpoint').
+    The operations are compiled once into stages of NumPy operations, so the endpoints of N faces
+    are calculated from an array of landmarks with the shape (N, 68, 2) without any Python loop over faces.
+"""
+
+import numpy as np
+
+from .settings import (
+    INDICES_OF_THE_LANDMARKS_OF_PARTS_OF_A_FACE,
+    NUMBER_OF_LANDMARKS_OF_A_FACE,
+    TYPES_OF_ENDPOINTS,
+)
+
+LINEAR_STAGE = "linear"
+SELECTION_STAGE = "selection"
+
+
+def get_array_of_landmarks(face_landmarks):
+    """
+    :param face_landmarks: landmarks of a single face generated
+    by the function 'face_landmarks' from module named 'face_recognition'
+    (link to the module named 'face_recognition' - https://pypi.org/project/face_recognition/)
+    :type face_landmarks: dictionary - {}
+    :return: all landmarks of the face (the array has following shape(68, 2))
+    :rtype: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    """
+    landmarks = np.zeros((NUMBER_OF_LANDMARKS_OF_A_FACE, 2), dtype=np.int64)
+    for name_of_a_part, indices in INDICES_OF_THE_LANDMARKS_OF_PARTS_OF_A_FACE.items():
+        landmarks[indices] = face_landmarks[name_of_a_part]
+    return landmarks
+
+
+class LandmarkOperator:
+    def __init__(self):
+        # Points are identified by their indices. The first 68 points are the landmarks of a face,
+        # the next ones are calculated by the operations added to the operator.
+        self._number_of_points = NUMBER_OF_LANDMARKS_OF_A_FACE
+        self._depths_of_points = [0] * NUMBER_OF_LANDMARKS_OF_A_FACE
+        self._operations = []
+        self._names_of_outputs = []
+        self._indices_of_outputs = []
+        self._stages = None
+
+    @property
+    def names_of_outputs(self):
+        return self._names_of_outputs
+
+    def _add_operation(self, kind, arguments, points_used):
+        """
+        :param kind: LINEAR_STAGE or SELECTION_STAGE (included in this file)
+        :type kind: string - str
+        :param arguments: arguments of the operation
+        :type arguments: tuple - ()
+        :param points_used: indices of the points used by the operation
+        :type points_used: list - [] of integers
+        :return: the index of the point calculated by the operation
+        :rtype: integer - int
+        """
+        point = self._number_of_points
+        depth = 1 + max(self._depths_of_points[point_used] for point_used in points_used)
+        self._operations.append((depth, kind, point, arguments))
+        self._depths_of_points.append(depth)
+        self._number_of_points += 1
+        self._stages = None
+        return point
+
+    def landmark(self, name_of_a_part, index):
+        """
+        :param name_of_a_part: one of the keys of the INDICES_OF_THE_LANDMARKS_OF_PARTS_OF_A_FACE dictionary
+        (from the file '.settings'), e.g. 'top_lip'
+        :type name_of_a_part: string - str
+        :param index: index of the landmark in the list of the landmarks of the part
+        :type index: integer - int
+        :return: the index of the landmark
+        :rtype: integer - int
+        """
+        return INDICES_OF_THE_LANDMARKS_OF_PARTS_OF_A_FACE[name_of_a_part][index]
+
+    def landmarks(self, name_of_a_part):
+        """
+        :param name_of_a_part: one of the keys of the INDICES_OF_THE_LANDMARKS_OF_PARTS_OF_A_FACE dictionary
+        (from the file '.settings'), e.g. 'top_lip'
+        :type name_of_a_part: string - str
+        :return: the indices of all landmarks of the part
+        :rtype: list - [] of integers
+        """
+        return list(INDICES_OF_THE_LANDMARKS_OF_PARTS_OF_A_FACE[name_of_a_part])
+
+    def point_dividing_a_line_segment(self, A, B, offset_from_A):
+        """
+        This function has the same meaning as the function 'point_dividing_a_line_segment' (from the file '.helpers').
+        :param A: index of the start point of a line
+        :type A: integer - int
+        :param B: index of the end point of a line
+        :type B: integer - int
+        :param offset_from_A: percent of the Euclidean distance between A and B where 0 % is equal to 0 and 100% is equal to 1.
+        :type offset_from_A: float
+        :return: the index of the calculated point
+        :rtype: integer - int
+        """
+        return self._add_operation(
+            kind=LINEAR_STAGE,
+            arguments=(A, B, 1 - offset_from_A, offset_from_A),
+            points_used=[A, B],
+        )
+
+    def point_along_a_line_distanced_from_another_point(self, A, B, offset_from_A):
+        """
+        This function has the same meaning as the function
+        'point_along_a_line_distanced_from_another_point' (from the file '.helpers').
+        :param A: index of a point of the straight
+        :type A: integer - int
+        :param B: index of an another point of the straight
+        :type B: integer - int
+        :param offset_from_A: percent of the Euclidean distance between A and B where 0 % is equal to 0 and 100% is equal to 1.
+        :type offset_from_A: float
+        :return: the index of the calculated point
+        :rtype: integer - int
+        """
+        point_inside_a_line = self.point_dividing_a_line_segment(
+            A=A, B=B, offset_from_A=offset_from_A
+        )
+        # The point is symmetric to 'point_inside_a_line' with respect to A: 2 * A - point_inside_a_line
+        return self._add_operation(
+            kind=LINEAR_STAGE,
+            arguments=(A, point_inside_a_line, 2, -1),
+            points_used=[A, point_inside_a_line],
+        )
+
+    def find_endpoint(self, coordinates, mode):
+        """
+        This function has the same meaning as the function 'find_endpoint' (from the file '.helpers').
+        :param coordinates: indices of the points among which the endpoint is looked for
+        :type coordinates: list - [] of integers
+        :param mode: one of the keys of the TYPES_OF_ENDPOINTS dictionary (from the file '.settings')
+        :type mode: string
+        :return: the index of the selected point
+        :rtype: integer - int
+        :raises ValueError: if the passed mode ('mode') is not supported by this function.
+        """
+        if mode not in TYPES_OF_ENDPOINTS:
+            supported_modes = ", ".join(
+                map(lambda mode: "'" + mode + "'", TYPES_OF_ENDPOINTS)
+            )
+            raise ValueError(
+                "The passed mode: '{mode}' is not supported by this function. "
+                "The supported modes are: {supported_modes}.".format(
+                    mode=mode, supported_modes=supported_modes
+                )
+            )
+        return self._add_operation(
+            kind=SELECTION_STAGE,
+            arguments=(list(coordinates), mode),
+            points_used=coordinates,
+        )
+
+    def add_output(self, name, point):
+        """
+        :param name: name of the output, e.g. 'left_endpoint'
+        :type name: string - str
+        :param point: index of the point
+        :type point: integer - int
+        """
+        self._names_of_outputs.append(name)
+        self._indices_of_outputs.append(point)
+
+    def _compile(self):
+        """
+        This function groups the operations into stages. Operations of the same stage depend only
+        on the points calculated by the previous stages, so they are calculated together.
+        :return: list of stages. Every stage is a tuple: (kind, calculated points, arguments)
+        :rtype: list - []
+        """
+        stages = []
+        for depth in sorted({operation[0] for operation in self._operations}):
+            operations = [
+                operation for operation in self._operations if operation[0] == depth
+            ]
+            linear_operations = [
+                (point, arguments)
+                for _, kind, point, arguments in operations
+                if kind == LINEAR_STAGE
+            ]
+            if linear_operations:
+                points, arguments = zip(*linear_operations)
+                first_points, second_points, first_weights, second_weights = zip(
+                    *arguments
+                )
+                stages.append(
+                    (
+                        LINEAR_STAGE,
+                        np.array(points),
+                        (
+                            np.array(first_points),
+                            np.array(second_points),
+                            np.array(first_weights, dtype=np.float64)[:, np.newaxis],
+                            np.array(second_weights, dtype=np.float64)[:, np.newaxis],
+                        ),
+                    )
+                )
+
+            for _, kind, point, arguments in operations:
+                if kind == SELECTION_STAGE:
+                    coordinates, mode = arguments
+                    stages.append(
+                        (SELECTION_STAGE, point, (np.array(coordinates), mode))
+                    )
+        return stages
+
+    def apply(self, landmarks):
+        """
+        :param landmarks: landmarks of N faces (the array has following shape(N, 68, 2))
+        The array of a single face can be created via the function 'get_array_of_landmarks' (included in this file).
+        :type landmarks: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :return: the outputs of the operator for every face (the array has following shape(N, number of outputs, 2)).
+        The outputs are in the same order as 'self.names_of_outputs'.
+        :rtype: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        """
+        if self._stages is None:
+            self._stages = self._compile()
+
+        points = np.empty((landmarks.shape[0], self._number_of_points, 2), dtype=np.float64)
+        points[:, :NUMBER_OF_LANDMARKS_OF_A_FACE] = landmarks
+
+        for kind, calculated_points, arguments in self._stages:
+            if kind == LINEAR_STAGE:
+                first_points, second_points, first_weights, second_weights = arguments
+                # The weights multiply the points one by one (exactly like the functions from the file '.helpers'),
+                # so the rounded results are the same as the results of these functions.
+                points[:, calculated_points] = np.round(
+                    first_weights * points[:, first_points]
+                    + second_weights * points[:, second_points]
+                )
+            else:
+                coordinates, mode = arguments
+                index_of_a_coordinate = TYPES_OF_ENDPOINTS[mode]["INDEX_OF_A_COORDINATE"]
+                comparison_operator = TYPES_OF_ENDPOINTS[mode]["COMPARSION_OPERATOR"]
+
+                wanted_points = points[:, coordinates[0]]
+                for idx in coordinates[1:]:
+                    replace = comparison_operator(
+                        points[:, idx, index_of_a_coordinate],
+                        wanted_points[:, index_of_a_coordinate],
+                    )
+                    wanted_points = np.where(
+                        replace[:, np.newaxis], points[:, idx], wanted_points
+                    )
+                points[:, calculated_points] = wanted_points
+
+        return points[:, self._indices_of_outputs].astype(np.int64)
@@ -0,0 +1,179 @@
+"""
+    This file contains the tracker of the landmarks of a face in consecutive frames (e.g. of a video).
+    Faces are detected only from time to time. In the other frames the landmarks are predicted
+    inside the face box moved along with the landmarks of the previous frame,
+    so most frames skip the detection.
+"""
+
+import numpy as np
+
+from .helpers import get_faces_landmarks, get_faces_locations
+from .landmark_operator import get_array_of_landmarks
+from .settings import (
+    DETECTION_INTERVAL_OF_THE_LANDMARK_TRACKING,
+    MINIMUM_CONFIDENCE_OF_THE_LANDMARK_TRACKING,
+)
+
+
+def get_bounding_rectangle_of_landmarks(landmarks):
+    """
+    :param landmarks: landmarks of a face (the array has following shape(number of landmarks, 2))
+    :type landmarks: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    :return: the rectangle in css (top, right, bottom, left) order
+    :rtype: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    """
+    left, top = landmarks.min(axis=0)
+    right, bottom = landmarks.max(axis=0)
+    return np.array([top, right, bottom, left], dtype=np.float64)
+
+
+def get_intersection_over_union(first_rectangle, second_rectangle):
+    """
+    :param first_rectangle: a rectangle in css (top, right, bottom, left) order
+    :type first_rectangle: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    :param second_rectangle: a rectangle in css (top, right, bottom, left) order
+    :type second_rectangle: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    :return: the area of the intersection of the rectangles divided by the area of their union (from 0 to 1)
+    :rtype: float
+    """
+    top, left = np.maximum(first_rectangle[[0, 3]], second_rectangle[[0, 3]])
+    bottom, right = np.minimum(first_rectangle[[2, 1]], second_rectangle[[2, 1]])
+    intersection = max(bottom - top, 0) * max(right - left, 0)
+    union = (
+        (first_rectangle[2] - first_rectangle[0]) * (first_rectangle[1] - first_rectangle[3])
+        + (second_rectangle[2] - second_rectangle[0])
+        * (second_rectangle[1] - second_rectangle[3])
+        - intersection
+    )
+    if union <= 0:
+        return 0.0
+    return float(intersection / union)
+
+
+class LandmarkTracker:
+    def __init__(
+        self,
+        detection_interval=DETECTION_INTERVAL_OF_THE_LANDMARK_TRACKING,
+        minimum_confidence=MINIMUM_CONFIDENCE_OF_THE_LANDMARK_TRACKING,
+    ):
+        """
+        The tracker follows a single face. Frames which contain more or less than one face have no landmarks.
+        The faces are counted only when they are detected, the tracked frames get the landmarks
+        as long as they are close to the landmarks of the previous frame.
+        :param detection_interval: the maximum number of frames between two detections
+        :type detection_interval: integer - int
+        :param minimum_confidence: see MINIMUM_CONFIDENCE_OF_THE_LANDMARK_TRACKING (from the file '.settings')
+        :type minimum_confidence: float
+        """
+        self._detection_interval = detection_interval
+        self._minimum_confidence = minimum_confidence
+        self._number_of_detections = 0
+        self._number_of_frames_since_the_detection = None
+        self._rectangle_of_the_landmarks = None
+        # Position of the detected face box relative to the bounding rectangle of the landmarks
+        # (offsets of its sides divided by the width and the height of the rectangle).
+        self._face_box_relative_to_the_landmarks = None
+
+    @property
+    def number_of_detections(self):
+        return self._number_of_detections
+
+    def reset(self):
+        """
+        The next frame will be detected (e.g. after a cut of a video).
+        """
+        self._number_of_frames_since_the_detection = None
+        self._rectangle_of_the_landmarks = None
+        self._face_box_relative_to_the_landmarks = None
+
+    def _get_size_of_a_rectangle(self, rectangle):
+        return np.array(
+            [
+                rectangle[2] - rectangle[0],
+                rectangle[1] - rectangle[3],
+                rectangle[2] - rectangle[0],
+                rectangle[1] - rectangle[3],
+            ]
+        )
+
+    def _get_face_box(self):
+        """
+        :return: the face box of the next frame: the detected box moved along with the landmarks
+        :rtype: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        """
+        return self._rectangle_of_the_landmarks + (
+            self._face_box_relative_to_the_landmarks
+            * self._get_size_of_a_rectangle(rectangle=self._rectangle_of_the_landmarks)
+        )
+
+    def _track(self, rgb_array):
+        """
+        :param rgb_array: an RGB image converted into a numpy array (the array has following shape(y, x, 3))
+        :type rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :return: landmarks of the face predicted inside the moved face box
+        or None if the tracking isn't confident enough
+        :rtype: dictionary - {} or None
+        """
+        try:
+            face_landmarks = get_faces_landmarks(
+                rgb_array=rgb_array, faces_locations=[self._get_face_box()]
+            )[0]
+        except ValueError:
+            return None
+
+        rectangle_of_the_landmarks = get_bounding_rectangle_of_landmarks(
+            landmarks=get_array_of_landmarks(face_landmarks=face_landmarks)
+        )
+        confidence = get_intersection_over_union(
+            first_rectangle=self._rectangle_of_the_landmarks,
+            second_rectangle=rectangle_of_the_landmarks,
+        )
+        if confidence < self._minimum_confidence:
+            return None
+
+        self._rectangle_of_the_landmarks = rectangle_of_the_landmarks
+        self._number_of_frames_since_the_detection += 1
+        return face_landmarks
+
+    def _detect(self, rgb_array):
+        """
+        :param rgb_array: an RGB image converted into a numpy array (the array has following shape(y, x, 3))
+        :type rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :return: landmarks of the face or None if the image contains more or less than one face
+        :rtype: dictionary - {} or None
+        """
+        self._number_of_detections += 1
+        faces_locations = get_faces_locations(rgb_array=rgb_array)
+        if len(faces_locations) != 1:
+            self.reset()
+            return None
+
+        face_landmarks = get_faces_landmarks(
+            rgb_array=rgb_array, faces_locations=faces_locations
+        )[0]
+        self._rectangle_of_the_landmarks = get_bounding_rectangle_of_landmarks(
+            landmarks=get_array_of_landmarks(face_landmarks=face_landmarks)
+        )
+        self._face_box_relative_to_the_landmarks = (
+            np.array(faces_locations[0], dtype=np.float64) - self._rectangle_of_the_landmarks
+        ) / self._get_size_of_a_rectangle(rectangle=self._rectangle_of_the_landmarks)
+        self._number_of_frames_since_the_detection = 0
+        return face_landmarks
+
+    def track(self, rgb_array):
+        """
+        :param rgb_array: the next frame - an RGB image converted into a numpy array (the array has following shape(y, x, 3))
+        :type rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :return: landmarks of the face in the same format as the landmarks generated
+        by the function 'face_landmarks' from module named 'face_recognition'
+        or None if the frame contains more or less than one face
+        :rtype: dictionary - {} or None
+        """
+        if (
+            self._number_of_frames_since_the_detection is not None
+            and self._number_of_frames_since_the_detection + 1 < self._detection_interval
+        ):
+            face_landmarks = self._track(rgb_array=rgb_array)
+            if face_landmarks is not None:
+                return face_landmarks
+        return self._detect(rgb_array=rgb_array)
@@ -3,6 +3,7 @@ from .helpers import (
     point_along_a_line_distanced_from_another_point,
     point_dividing_a_line_segment,
 )
+from .landmark_operator import LandmarkOperator
 from .settings import (
     MODE_OF_THE_LEFTMOST_POINT,
     MODE_OF_THE_RIGHTMOST_POINT,
@@ -182,3 +183,99 @@ class GetEndpointsOfLips:
             right_endpoint=right_endpoint_of_lips,
             bottom_endpoint=bottom_endpoint_of_lips,
         )
+
+    @staticmethod
+    def get_landmark_operator():
+        """
+        This function compiles the calculations of the above functions into an operator
+        which calculates the endpoints of lips of many faces at once.
+        :return: the operator with the outputs in the same order as the fields of 'EndpointsOfLips'
+        :rtype: LandmarkOperator (from the file '.landmark_operator')
+        """
+        operator = LandmarkOperator()
+
+        top_endpoint_of_lips = operator.point_dividing_a_line_segment(
+            A=operator.landmark(
+                name_of_a_part="nose_tip",
+                index=SETTINGS_OF_THE_ENDPOINTS_OF_LIPS[
+                    "INDEX_OF_THE_LOWEST_LANDMARK_OF_THE_NOSE_TIP"
+                ],
+            ),
+            B=operator.landmark(
+                name_of_a_part="top_lip",
+                index=SETTINGS_OF_THE_ENDPOINTS_OF_LIPS[
+                    "INDEX_OF_THE_HIGHEST_LANDMARK_OF_THE_TOP_LIP"
+                ],
+            ),
+            offset_from_A=SETTINGS_OF_THE_ENDPOINTS_OF_LIPS[
+                "DISTANCE_BETWEEN_THE_NOSE_TIP_AND_THE_TOP_LIP"
+            ],
+        )
+        bottom_endpoint_of_lips = operator.point_dividing_a_line_segment(
+            A=operator.landmark(
+                name_of_a_part="bottom_lip",
+                index=SETTINGS_OF_THE_ENDPOINTS_OF_LIPS[
+                    "INDEX_OF_THE_LOWEST_LANDMARK_OF_THE_BOTTOM_LIP"
+                ],
+            ),
+            B=operator.landmark(
+                name_of_a_part="chin",
+                index=SETTINGS_OF_THE_ENDPOINTS_OF_LIPS[
+                    "INDEX_OF_THE_LOWEST_LANDMARK_OF_THE_CHIN"
+                ],
+            ),
+            offset_from_A=SETTINGS_OF_THE_ENDPOINTS_OF_LIPS[
+                "DISTANCE_BETWEEN_THE_CHIN_AND_THE_BOTTOM_LIP"
+            ],
+        )
+
+        both_lips = operator.landmarks(name_of_a_part="top_lip") + operator.landmarks(
+            name_of_a_part="bottom_lip"
+        )
+        the_leftmost_point_of_lips = operator.find_endpoint(
+            coordinates=both_lips, mode=MODE_OF_THE_LEFTMOST_POINT
+        )
+        the_rightmost_point_of_lips = operator.find_endpoint(
+            coordinates=both_lips, mode=MODE_OF_THE_RIGHTMOST_POINT
+        )
+        left_endpoint_of_lips = operator.point_along_a_line_distanced_from_another_point(
+            A=the_leftmost_point_of_lips,
+            B=the_rightmost_point_of_lips,
+            offset_from_A=SETTINGS_OF_THE_ENDPOINTS_OF_LIPS[
+                "OFFSET_FROM_THE_LEFTMOST_POINT_AND_THE_RIGHTMOST_POINT_OF_THE_LIPS"
+            ],
+        )
+        right_endpoint_of_lips = operator.point_along_a_line_distanced_from_another_point(
+            A=the_rightmost_point_of_lips,
+            B=the_leftmost_point_of_lips,
+            offset_from_A=SETTINGS_OF_THE_ENDPOINTS_OF_LIPS[
+                "OFFSET_FROM_THE_LEFTMOST_POINT_AND_THE_RIGHTMOST_POINT_OF_THE_LIPS"
+            ],
+        )
+
+        for name, point in zip(
+            EndpointsOfLips._fields,
+            (
+                left_endpoint_of_lips,
+                top_endpoint_of_lips,
+                right_endpoint_of_lips,
+                bottom_endpoint_of_lips,
+            ),
+        ):
+            operator.add_output(name=name, point=point)
+        return operator
+
+    @staticmethod
+    def get_endpoints_of_lips_of_many_faces(landmarks):
+        """
+        :param landmarks: landmarks of N faces (the array has following shape(N, 68, 2))
+        :type landmarks: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :return: endpoints of lips of every face (the array has following shape(N, 4, 2)).
+        The endpoints are in the same order as the fields of 'EndpointsOfLips'
+        and they are equal to the endpoints returned by the function 'get_endpoints_of_lips'.
+        :rtype: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        """
+        return LANDMARK_OPERATOR_OF_LIPS.apply(landmarks=landmarks)
+
+
+LANDMARK_OPERATOR_OF_LIPS = GetEndpointsOfLips.get_landmark_operator()
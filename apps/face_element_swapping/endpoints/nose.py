@@ -2,6 +2,7 @@ from .helpers import (
     point_along_a_line_distanced_from_another_point,
     point_dividing_a_line_segment,
 )
+from .landmark_operator import LandmarkOperator
 from .settings import SETTINGS_OF_THE_ENDPOINTS_OF_A_NOSE
 from .types_of_face_part_endpoints import FourEndpointsOfANose, SixEndpointsOfANose
 
@@ -239,3 +240,161 @@ class GetEndpointsOfANose:
             )
 
         return nose_endpoints
+
+    @staticmethod
+    def get_landmark_operator():
+        """
+        This function compiles the calculations of the above functions into an operator
+        which calculates the endpoints of noses of many faces at once.
+        :return: the operator with the outputs in the same order as the fields of 'FourEndpointsOfANose'
+        followed by the fields of 'SixEndpointsOfANose'
+        :rtype: LandmarkOperator (from the file '.landmark_operator')
+        """
+        operator = LandmarkOperator()
+
+        left_point_of_the_bottom_straight = operator.point_dividing_a_line_segment(
+            A=operator.landmark(
+                name_of_a_part="nose_tip",
+                index=SETTINGS_OF_THE_ENDPOINTS_OF_A_NOSE[
+                    "INDEX_OF_THE_LEFTMOST_LANDMARK_OF_THE_TOP_LIP"
+                ],
+            ),
+            B=operator.landmark(
+                name_of_a_part="top_lip",
+                index=SETTINGS_OF_THE_ENDPOINTS_OF_A_NOSE[
+                    "INDEX_OF_THE_LEFTMOST_LANDMARK_OF_THE_TOP_LIP"
+                ],
+            ),
+            offset_from_A=SETTINGS_OF_THE_ENDPOINTS_OF_A_NOSE[
+                "DISTANCE_BETWEEN_THE_NOSE_TIP_AND_THE_TOP_LIP"
+            ],
+        )
+        right_point_of_the_bottom_straight = operator.point_dividing_a_line_segment(
+            A=operator.landmark(
+                name_of_a_part="nose_tip",
+                index=SETTINGS_OF_THE_ENDPOINTS_OF_A_NOSE[
+                    "INDEX_OF_THE_RIGHTMOST_LANDMARK_OF_THE_NOSE_TIP"
+                ],
+            ),
+            B=operator.landmark(
+                name_of_a_part="top_lip",
+                index=SETTINGS_OF_THE_ENDPOINTS_OF_A_NOSE[
+                    "INDEX_OF_THE_RIGHTMOST_LANDMARK_OF_THE_TOP_LIP"
+                ],
+            ),
+            offset_from_A=SETTINGS_OF_THE_ENDPOINTS_OF_A_NOSE[
+                "DISTANCE_BETWEEN_THE_NOSE_TIP_AND_THE_TOP_LIP"
+            ],
+        )
+        bottom_left_endpoint = operator.point_along_a_line_distanced_from_another_point(
+            A=left_point_of_the_bottom_straight,
+            B=right_point_of_the_bottom_straight,
+            offset_from_A=SETTINGS_OF_THE_ENDPOINTS_OF_A_NOSE[
+                "OFFSET_FROM_THE_LINE_BETWEEN_THE_NOSE_AND_THE_LIPS"
+            ],
+        )
+        bottom_right_endpoint = operator.point_along_a_line_distanced_from_another_point(
+            A=right_point_of_the_bottom_straight,
+            B=left_point_of_the_bottom_straight,
+            offset_from_A=SETTINGS_OF_THE_ENDPOINTS_OF_A_NOSE[
+                "OFFSET_FROM_THE_LINE_BETWEEN_THE_NOSE_AND_THE_LIPS"
+            ],
+        )
+
+        the_rightmost_landmark_of_the_left_eyebrow = operator.landmark(
+            name_of_a_part="left_eyebrow",
+            index=SETTINGS_OF_THE_ENDPOINTS_OF_A_NOSE[
+                "INDEX_OF_THE_RIGHTMOST_LANDMARK_OF_THE_LEFT_EYEBROW"
+            ],
+        )
+        the_leftmost_landmark_of_the_right_eyebrow = operator.landmark(
+            name_of_a_part="right_eyebrow",
+            index=SETTINGS_OF_THE_ENDPOINTS_OF_A_NOSE[
+                "INDEX_OF_THE_LEFTMOST_LANDMARK_OF_THE_RIGHT_EYEBROW"
+            ],
+        )
+        top_left_endpoint = operator.point_along_a_line_distanced_from_another_point(
+            A=the_rightmost_landmark_of_the_left_eyebrow,
+            B=bottom_left_endpoint,
+            offset_from_A=SETTINGS_OF_THE_ENDPOINTS_OF_A_NOSE["OFFSET_FROM_THE_EYEBROWS"],
+        )
+        top_right_endpoint = operator.point_along_a_line_distanced_from_another_point(
+            A=the_leftmost_landmark_of_the_right_eyebrow,
+            B=bottom_right_endpoint,
+            offset_from_A=SETTINGS_OF_THE_ENDPOINTS_OF_A_NOSE["OFFSET_FROM_THE_EYEBROWS"],
+        )
+
+        the_rightmost_landmark_of_the_left_eye = operator.landmark(
+            name_of_a_part="left_eye",
+            index=SETTINGS_OF_THE_ENDPOINTS_OF_A_NOSE[
+                "INDEX_OF_THE_RIGHTMOST_LANDMARK_OF_THE_LEFT_EYE"
+            ],
+        )
+        the_leftmost_landmark_of_the_right_eye = operator.landmark(
+            name_of_a_part="right_eye",
+            index=SETTINGS_OF_THE_ENDPOINTS_OF_A_NOSE[
+                "INDEX_OF_THE_LEFTMOST_LANDMARK_OF_THE_RIGHT_EYE"
+            ],
+        )
+        middle_left_endpoint = operator.point_dividing_a_line_segment(
+            A=the_rightmost_landmark_of_the_left_eye,
+            B=the_leftmost_landmark_of_the_right_eye,
+            offset_from_A=SETTINGS_OF_THE_ENDPOINTS_OF_A_NOSE[
+                "OFFSET_FROM_THE_ENDPOINTS_OF_THE_EYES"
+            ],
+        )
+        middle_right_endpoint = operator.point_dividing_a_line_segment(
+            A=the_leftmost_landmark_of_the_right_eye,
+            B=the_rightmost_landmark_of_the_left_eye,
+            offset_from_A=SETTINGS_OF_THE_ENDPOINTS_OF_A_NOSE[
+                "OFFSET_FROM_THE_ENDPOINTS_OF_THE_EYES"
+            ],
+        )
+
+        for name, point in zip(
+            FourEndpointsOfANose._fields,
+            (
+                bottom_left_endpoint,
+                bottom_right_endpoint,
+                top_right_endpoint,
+                top_left_endpoint,
+            ),
+        ):
+            operator.add_output(name=name, point=point)
+        # The top endpoints of the six endpoints are the landmarks of the eyebrows.
+        for name, point in zip(
+            SixEndpointsOfANose._fields,
+            (
+                bottom_left_endpoint,
+                bottom_right_endpoint,
+                middle_right_endpoint,
+                the_leftmost_landmark_of_the_right_eyebrow,
+                the_rightmost_landmark_of_the_left_eyebrow,
+                middle_left_endpoint,
+            ),
+        ):
+            operator.add_output(name=name, point=point)
+        return operator
+
+    @staticmethod
+    def get_endpoints_of_noses_of_many_faces(landmarks, six_endpoints_mode=True):
+        """
+        :param landmarks: landmarks of N faces (the array has following shape(N, 68, 2))
+        :type landmarks: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :param six_endpoints_mode: params indicates if the six endpoints describing the nose should be also returned
+        :type six_endpoints_mode: bool (True or False)
+        :return: dictionary with the key "four_endpoints" (the array has following shape(N, 4, 2))
+        and optionally "six_endpoints" (the array has following shape(N, 6, 2)).
+        The endpoints are in the same order as the fields of 'FourEndpointsOfANose' and 'SixEndpointsOfANose'
+        and they are equal to the endpoints returned by the function 'get_endpoints_of_a_nose'.
+        :rtype: dictionary - {}
+        """
+        endpoints = LANDMARK_OPERATOR_OF_A_NOSE.apply(landmarks=landmarks)
+        number_of_four_endpoints = len(FourEndpointsOfANose._fields)
+        nose_endpoints = {"four_endpoints": endpoints[:, :number_of_four_endpoints]}
+        if six_endpoints_mode:
+            nose_endpoints["six_endpoints"] = endpoints[:, number_of_four_endpoints:]
+        return nose_endpoints
+
+
+LANDMARK_OPERATOR_OF_A_NOSE = GetEndpointsOfANose.get_landmark_operator()
@@ -40,3 +40,54 @@ TYPES_OF_ENDPOINTS = {
 
 MODE_OF_THE_LEFTMOST_POINT = "LEFT"
 MODE_OF_THE_RIGHTMOST_POINT = "RIGHT"
+
+NUMBER_OF_LANDMARKS_OF_A_FACE = 68
+
+# Indices of the landmarks of parts of a face in the array of all 68 landmarks.
+# The order of the indices is the same as the order of the landmarks returned by
+# the function 'face_landmarks' from module named 'face_recognition'.
+INDICES_OF_THE_LANDMARKS_OF_PARTS_OF_A_FACE = {
+    "chin": list(range(0, 17)),
+    "left_eyebrow": list(range(17, 22)),
+    "right_eyebrow": list(range(22, 27)),
+    "nose_bridge": list(range(27, 31)),
+    "nose_tip": list(range(31, 36)),
+    "left_eye": list(range(36, 42)),
+    "right_eye": list(range(42, 48)),
+    "top_lip": list(range(48, 55)) + [64, 63, 62, 61, 60],
+    "bottom_lip": list(range(54, 60)) + [48, 60, 67, 66, 65, 64],
+}
+
+# Landmarks serialized by the class 'FaceLandmarks' (from the file '.face_landmarks')
+# start with the version number which is followed by the coordinates of type TYPE_OF_THE_SERIALIZED_LANDMARKS.
+VERSION_OF_THE_SERIALIZED_LANDMARKS = 1
+TYPE_OF_THE_SERIALIZED_LANDMARKS = "<i2"
+
+# Faces may be detected on a copy of an image whose longer side is downscaled to this length
+# (None means that faces are detected on the image itself). The landmarks are always predicted
+# on the image itself, inside the detected face boxes scaled back to its size.
+# The boxes found on a copy differ slightly from the boxes found on the image itself,
+# so the downscaling is opt-in (320 finds the same faces in the photos from 'blog/dev',
+# see the script 'dev/face_detection_report.py').
+MAXIMUM_SIDE_LENGTH_OF_AN_IMAGE_FOR_FACE_DETECTION = None
+# Known face boxes (e.g. sent by a client) which are smaller than this length
+# after being clipped to an image are rejected instead of being passed to the landmark predictor.
+MINIMUM_SIDE_LENGTH_OF_A_FACE_LOCATION = 20
+# Every upsampling doubles the sides of the image on which faces are detected, so smaller faces are found.
+NUMBER_OF_TIMES_TO_UPSAMPLE_AN_IMAGE_FOR_FACE_DETECTION = 1
+
+# Settings of the pool of processes detecting landmarks (see the class 'LandmarkDetectionService'
+# from the file '.detection_service'). The processes are started via 'spawn',
+# so they don't inherit the threads and the locks of the web server process.
+NUMBER_OF_WORKERS_OF_THE_LANDMARK_DETECTION = 2
+START_METHOD_OF_THE_WORKERS_OF_THE_LANDMARK_DETECTION = "spawn"
+DEFAULT_TIMEOUT_OF_THE_LANDMARK_DETECTION_IN_SECONDS = 30
+# The maximum number of seconds the workers can spend on loading the models.
+TIMEOUT_OF_THE_START_OF_THE_LANDMARK_DETECTION_IN_SECONDS = 120
+
+# Settings of the class 'LandmarkTracker' (from the file '.landmark_tracker').
+# Faces are detected again after this number of frames, even if the tracking is confident.
+DETECTION_INTERVAL_OF_THE_LANDMARK_TRACKING = 10
+# The confidence of the tracking is the intersection over union of the bounding rectangles
+# of the landmarks of two consecutive frames. If it drops below this value, faces are detected again.
+MINIMUM_CONFIDENCE_OF_THE_LANDMARK_TRACKING = 0.7
@@ -0,0 +1,319 @@
+"""
+    This file contains the pipeline which swaps a part of a face in frames of videos and animated images (GIF, APNG).
+    Frames are read, processed and written one by one (all functions take and return generators),
+    so a video is never loaded into memory as a whole. The landmarks are tracked by the main process
+    (see the class 'LandmarkTracker'), and the face parts are swapped by a pool of worker processes
+    which crop the source image once, when they start.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import get_context
+
+import cv2
+import numpy as np
+from PIL import Image, ImageSequence
+
+from .change_faces import ChangeFaceElement
+from .endpoints import GetEndpointsOfANose, GetEndpointsOfLips, LandmarkTracker
+from .helpers import get_rectangle_in_an_image
+from .settings import (
+    DEFAULT_COLOR_ADJUSTMENT_MODE,
+    DEFAULT_FRAME_RATE,
+    FILE_EXTENSIONS_OF_ANIMATED_IMAGES,
+    FOURCC_OF_WRITTEN_VIDEOS,
+    NUMBER_OF_FRAMES_IN_FLIGHT_PER_WORKER,
+    NUMBER_OF_WORKERS_OF_THE_FRAME_PIPELINE,
+    START_METHOD_OF_THE_WORKERS_OF_THE_FRAME_PIPELINE,
+)
+
+NAME_OF_LIPS = "lips"
+NAME_OF_A_NOSE = "nose"
+PARTS_OF_A_FACE = [NAME_OF_LIPS, NAME_OF_A_NOSE]
+
+
+def is_an_animated_image(path):
+    """
+    :param path: path of a file
+    :type path: string - str
+    :return: True if the file is read and written as an animated image (FILE_EXTENSIONS_OF_ANIMATED_IMAGES)
+    :rtype: bool
+    """
+    return os.path.splitext(path)[1].lower() in FILE_EXTENSIONS_OF_ANIMATED_IMAGES
+
+
+def get_frame_rate(path):
+    """
+    :param path: path of a video or an animated image
+    :type path: string - str
+    :return: number of frames per second
+    :rtype: float
+    """
+    if is_an_animated_image(path=path):
+        with Image.open(path) as img:
+            duration_of_a_frame = img.info.get("duration")
+        if not duration_of_a_frame:
+            return DEFAULT_FRAME_RATE
+        return 1000 / duration_of_a_frame
+
+    video = cv2.VideoCapture(path)
+    try:
+        frame_rate = video.get(cv2.CAP_PROP_FPS)
+    finally:
+        video.release()
+    return frame_rate or DEFAULT_FRAME_RATE
+
+
+def read_frames(path):
+    """
+    :param path: path of a video or an animated image
+    :type path: string - str
+    :return: generator of the frames converted into RGB numpy arrays (the arrays have following shape(y, x, 3))
+    :rtype: generator
+    :raises ValueError: if the file can't be opened
+    """
+    if is_an_animated_image(path=path):
+        with Image.open(path) as img:
+            for frame in ImageSequence.Iterator(img):
+                yield np.array(frame.convert("RGB"), dtype=np.uint8)
+        return
+
+    video = cv2.VideoCapture(path)
+    if not video.isOpened():
+        raise ValueError("The video '{path}' can't be opened.".format(path=path))
+    try:
+        while True:
+            frame_read, bgr_array = video.read()
+            if not frame_read:
+                break
+            yield cv2.cvtColor(bgr_array, cv2.COLOR_BGR2RGB)
+    finally:
+        video.release()
+
+
+def write_frames(frames, path, frame_rate):
+    """
+    Frames of videos are written as soon as they are generated.
+    Animated images are written by the module 'PIL' after the last frame.
+    :param frames: RGB images converted into numpy arrays (the arrays have following shape(y, x, 3))
+    :type frames: iterable of numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    :param path: path of the written video or animated image
+    :type path: string - str
+    :param frame_rate: number of frames per second
+    :type frame_rate: float
+    :return: number of written frames
+    :rtype: integer - int
+    """
+    frames = iter(frames)
+    first_frame = next(frames, None)
+    if first_frame is None:
+        return 0
+
+    if is_an_animated_image(path=path):
+        # The module 'PIL' needs all frames of an animated image at once.
+        next_images = [Image.fromarray(frame) for frame in frames]
+        Image.fromarray(first_frame).save(
+            path,
+            save_all=True,
+            append_images=next_images,
+            duration=round(1000 / frame_rate),
+            loop=0,
+        )
+        return 1 + len(next_images)
+
+    number_of_frames = 1
+    height, width = first_frame.shape[:2]
+    video = cv2.VideoWriter(
+        path, cv2.VideoWriter_fourcc(*FOURCC_OF_WRITTEN_VIDEOS), frame_rate, (width, height)
+    )
+    try:
+        video.write(cv2.cvtColor(first_frame, cv2.COLOR_RGB2BGR))
+        for frame in frames:
+            video.write(cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
+            number_of_frames += 1
+    finally:
+        video.release()
+    return number_of_frames
+
+
+def get_polygons_of_a_part_of_a_face(part_of_face, face_landmarks):
+    """
+    :param part_of_face: one of the values of the PARTS_OF_A_FACE list (included in this file)
+    :type part_of_face: string - str
+    :param face_landmarks: landmarks of a single face generated
+    by the function 'face_landmarks' from module named 'face_recognition'
+    :type face_landmarks: dictionary - {}
+    :return: the polygon and the cut field (None for lips) of the part of the face
+    :rtype: tuple - ()
+    :raises ValueError: if the passed part of a face ('part_of_face') is not supported by this function.
+    """
+    if part_of_face == NAME_OF_LIPS:
+        return GetEndpointsOfLips.get_endpoints_of_lips(face_landmarks), None
+    if part_of_face == NAME_OF_A_NOSE:
+        endpoints = GetEndpointsOfANose.get_endpoints_of_a_nose(face_landmarks)
+        return endpoints["four_endpoints"], endpoints["six_endpoints"]
+
+    supported_parts = ", ".join(map(lambda part: "'" + part + "'", PARTS_OF_A_FACE))
+    raise ValueError(
+        "The passed part of a face: '{part_of_face}' is not supported by this function. "
+        "The supported parts are: {supported_parts}.".format(
+            part_of_face=part_of_face, supported_parts=supported_parts
+        )
+    )
+
+
+class SwapOfAPartOfAFace:
+    def __init__(self, src_rgb_array, src_polygon, color_adjustment_mode):
+        """
+        The source image is cropped once, so only the crop is kept (and sent to the workers of the pool).
+        :param src_rgb_array: an RGB source image converted into a numpy array (the array has following shape(y, x, 3))
+        :type src_rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :param src_polygon: the polygon of the part of the face in the source image
+        :type src_polygon: list - [] or tuple - ()
+        :param color_adjustment_mode: one of the values of the COLOR_ADJUSTMENT_MODES list (from the file '.settings')
+        :type color_adjustment_mode: string - str
+        """
+        self._cropped_src_rgb_array = np.ascontiguousarray(
+            get_rectangle_in_an_image(
+                np_array=src_rgb_array,
+                bounding_rectangle_of_polygon=ChangeFaceElement.get_bounding_rectangle_of_polygon(
+                    polygon=src_polygon
+                ),
+            )
+        )
+        self._src_polygon = src_polygon
+        self._color_adjustment_mode = color_adjustment_mode
+
+    def swap(self, dst_rgb_array, dst_polygon, dst_cut_field):
+        """
+        :param dst_rgb_array: a frame - an RGB image converted into a numpy array (the array has following shape(y, x, 3))
+        :type dst_rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :param dst_polygon: the polygon of the part of the face in the frame
+        :type dst_polygon: list - [] or tuple - ()
+        :param dst_cut_field: the cut field of the part of the face in the frame or None
+        :type dst_cut_field: None, list - [] or tuple - ()
+        :return: the frame with the part of the face from the source image
+        :rtype: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        """
+        return ChangeFaceElement.change_face_element(
+            src_rgb_array=None,
+            dst_rgb_array=dst_rgb_array,
+            src_polygon=self._src_polygon,
+            dst_polygon=dst_polygon,
+            dst_cut_field=dst_cut_field,
+            color_adjustment_mode=self._color_adjustment_mode,
+            cropped_src_rgb_array=self._cropped_src_rgb_array,
+        )
+
+
+# The swap of the worker process (see the function '_initialize_worker').
+_swap_of_the_worker = None
+
+
+def _initialize_worker(swap_of_a_part_of_a_face):
+    global _swap_of_the_worker
+    _swap_of_the_worker = swap_of_a_part_of_a_face
+
+
+def _swap_in_the_worker(dst_rgb_array, dst_polygon, dst_cut_field):
+    return _swap_of_the_worker.swap(
+        dst_rgb_array=dst_rgb_array, dst_polygon=dst_polygon, dst_cut_field=dst_cut_field
+    )
+
+
+def _get_done_future(result):
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+def swap_part_of_face_in_frames(
+    frames,
+    src_rgb_array,
+    src_face_landmarks,
+    part_of_face,
+    number_of_workers=NUMBER_OF_WORKERS_OF_THE_FRAME_PIPELINE,
+    landmark_tracker=None,
+    color_adjustment_mode=DEFAULT_COLOR_ADJUSTMENT_MODE,
+):
+    """
+    :param frames: RGB images converted into numpy arrays (the arrays have following shape(y, x, 3)),
+    e.g. the result of the function 'read_frames' (included in this file)
+    :type frames: iterable of numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    :param src_rgb_array: an RGB image with the face whose part is moved to the frames
+    :type src_rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    :param src_face_landmarks: landmarks of the face in 'src_rgb_array' generated
+    by the function 'face_landmarks' from module named 'face_recognition'
+    :type src_face_landmarks: dictionary - {}
+    :param part_of_face: one of the values of the PARTS_OF_A_FACE list (included in this file)
+    :type part_of_face: string - str
+    :param number_of_workers: number of worker processes swapping the part of the face.
+    If it is 0, the frames are processed by the calling process.
+    :type number_of_workers: integer - int
+    :param landmark_tracker: None or the tracker of the landmarks of the frames
+    (the tracker is created with the default settings if it is None)
+    :type landmark_tracker: None or LandmarkTracker (from the module '.endpoints')
+    :param color_adjustment_mode: one of the values of the COLOR_ADJUSTMENT_MODES list (from the file '.settings')
+    :type color_adjustment_mode: string - str
+    :return: generator of the processed frames in the order of 'frames'.
+    Frames which contain more or less than one face are not changed
+    (faces are counted only in the frames in which they are detected, see LandmarkTracker).
+    :rtype: generator
+    """
+    if landmark_tracker is None:
+        landmark_tracker = LandmarkTracker()
+    src_polygon, _ = get_polygons_of_a_part_of_a_face(
+        part_of_face=part_of_face, face_landmarks=src_face_landmarks
+    )
+    swap_of_a_part_of_a_face = SwapOfAPartOfAFace(
+        src_rgb_array=src_rgb_array,
+        src_polygon=src_polygon,
+        color_adjustment_mode=color_adjustment_mode,
+    )
+
+    if not number_of_workers:
+        for frame in frames:
+            face_landmarks = landmark_tracker.track(rgb_array=frame)
+            if face_landmarks is None:
+                yield frame
+                continue
+            dst_polygon, dst_cut_field = get_polygons_of_a_part_of_a_face(
+                part_of_face=part_of_face, face_landmarks=face_landmarks
+            )
+            yield swap_of_a_part_of_a_face.swap(
+                dst_rgb_array=frame, dst_polygon=dst_polygon, dst_cut_field=dst_cut_field
+            )
+        return
+
+    maximum_number_of_frames_in_flight = (
+        number_of_workers * NUMBER_OF_FRAMES_IN_FLIGHT_PER_WORKER
+    )
+    with ProcessPoolExecutor(
+        max_workers=number_of_workers,
+        mp_context=get_context(START_METHOD_OF_THE_WORKERS_OF_THE_FRAME_PIPELINE),
+        initializer=_initialize_worker,
+        initargs=(swap_of_a_part_of_a_face,),
+    ) as executor:
+        futures = deque()
+        for frame in frames:
+            face_landmarks = landmark_tracker.track(rgb_array=frame)
+            if face_landmarks is None:
+                futures.append(_get_done_future(result=frame))
+            else:
+                dst_polygon, dst_cut_field = get_polygons_of_a_part_of_a_face(
+                    part_of_face=part_of_face, face_landmarks=face_landmarks
+                )
+                futures.append(
+                    executor.submit(
+                        _swap_in_the_worker,
+                        dst_rgb_array=frame,
+                        dst_polygon=dst_polygon,
+                        dst_cut_field=dst_cut_field,
+                    )
+                )
+            while len(futures) >= maximum_number_of_frames_in_flight:
+                yield futures.popleft().result()
+
+        while futures:
+            yield futures.popleft().result()
@@ -1,7 +1,22 @@
+import numpy as np
 from shapely.geometry import Point
 from shapely.geometry.polygon import Polygon
 
 
+def get_read_only_view(np_array):
+    """
+    :param np_array: a numpy array
+    :type np_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    :return: a view of 'np_array' which can't be modified.
+    Any attempt to modify it raises ValueError, so arrays shared between requests (e.g. cached ones)
+    can't be changed by accident.
+    :rtype numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    """
+    read_only_view = np_array.view()
+    read_only_view.flags.writeable = False
+    return read_only_view
+
+
 def get_rectangle_in_an_image(np_array, bounding_rectangle_of_polygon):
     """
     :param np_array: a numpy array
@@ -20,6 +35,26 @@ def get_rectangle_in_an_image(np_array, bounding_rectangle_of_polygon):
     ]
 
 
+def get_padded_rectangle(bounding_rectangle_of_polygon, padding, shape_of_an_image):
+    """
+    :param bounding_rectangle_of_polygon: tuple or list with coordinates of the start point of the rectangle
+    and the width and height of this rectangle - (x, y, width, height) or [x, y, width, height]
+    :type bounding_rectangle_of_polygon: tuple - () or list - (). The tuple or list should have four elements.
+    :param padding: number of pixels added to each side of the rectangle
+    :type padding: integer - int
+    :param shape_of_an_image: shape of the image which contains the rectangle - (height, width, ...)
+    :type shape_of_an_image: tuple - ()
+    :return: the rectangle enlarged by 'padding' and clipped to the borders of the image - (x, y, width, height)
+    :rtype tuple - (). the tuple will have four elements
+    """
+    x, y, width, height = bounding_rectangle_of_polygon
+    start_x = max(x - padding, 0)
+    start_y = max(y - padding, 0)
+    end_x = min(x + width + padding, shape_of_an_image[1])
+    end_y = min(y + height + padding, shape_of_an_image[0])
+    return start_x, start_y, max(end_x - start_x, 0), max(end_y - start_y, 0)
+
+
 def fill_pixel_if_belongs_to_polygon(
     rgb_array, polygon, row_idx, column_idx, pixel_value
 ):
@@ -43,3 +78,89 @@ def fill_pixel_if_belongs_to_polygon(
     point = Point(column_idx, row_idx)
     if polygon.contains(point):
         rgb_array[row_idx][column_idx] = pixel_value
+
+
+def get_polygon_mask(polygon, bounding_rectangle_of_polygon):
+    """
+    This function rasterizes the passed polygon('polygon') into a boolean mask
+    covering the rectangle indicated by 'bounding_rectangle_of_polygon'.
+    The mask has the same semantics as the function 'fill_pixel_if_belongs_to_polygon'
+    (also included in this file): the element mask[i][j] is True only if the point
+    (x + j, y + i) lies strictly inside the polygon. Points lying on the boundary of the polygon are excluded.
+    :param polygon: list or tuple of coordinates in 2D Space ([(x, y),(x, y),(x, y)...] or ((x, y),(x, y),(x, y)...)).
+    All elements in list (or tuple) should represent a polygon.
+    :type polygon: list - [] or tuple - ()
+    :param bounding_rectangle_of_polygon: tuple or list with coordinates of the start point of the rectangle
+    and the width and height of this rectangle - (x, y, width, height) or [x, y, width, height]
+    :type bounding_rectangle_of_polygon: tuple - () or list - (). The tuple or list should have four elements.
+    :return: a boolean mask with the shape (height, width)
+    :rtype numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    """
+    x, y, width, height = bounding_rectangle_of_polygon
+    columns = np.arange(x, x + width, dtype=np.float64)[np.newaxis, :]
+    rows = np.arange(y, y + height, dtype=np.float64)[:, np.newaxis]
+
+    vertices = np.asarray(polygon, dtype=np.float64)
+    inside = np.zeros((height, width), dtype=bool)
+    on_boundary = np.zeros((height, width), dtype=bool)
+    for (x1, y1), (x2, y2) in zip(vertices, np.roll(vertices, -1, axis=0)):
+        # The sign of the cross product tells on which side of the edge the point lies.
+        cross_product = (x2 - x1) * (rows - y1) - (y2 - y1) * (columns - x1)
+
+        on_boundary |= (
+            (cross_product == 0)
+            & (min(x1, x2) <= columns)
+            & (columns <= max(x1, x2))
+            & (min(y1, y2) <= rows)
+            & (rows <= max(y1, y2))
+        )
+
+        # Even-odd rule: we count the edges crossed by a horizontal ray
+        # which starts at the point and goes to the right.
+        inside ^= ((y1 > rows) != (y2 > rows)) & ((cross_product > 0) == (y2 > y1))
+
+    return inside & ~on_boundary
+
+
+def get_palette(rgb_values):
+    """
+    This function looks for the unique colors of 'rgb_values' and counts them.
+    Every color is packed into a single 24-bit integer, so colors are sorted as integers instead of rows.
+    The unique colors are returned in the same (lexicographic) order
+    as by the function 'unique' from the module 'numpy' called with the parameter 'axis=0'.
+    :param rgb_values: vector of RGB values (the array has following shape(number of colors, 3) and dtype numpy.uint8)
+    :type rgb_values: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    :return: the unique colors (the array has following shape(number of unique colors, 3))
+    and the number of occurrences of each of them (the array has following shape(number of unique colors,))
+    :rtype: tuple - (), (numpy.ndarray, numpy.ndarray)
+    """
+    rgb_values = rgb_values.astype(np.uint32)
+    packed_colors = (rgb_values[:, 0] << 16) | (rgb_values[:, 1] << 8) | rgb_values[:, 2]
+    unique_packed_colors, counts = np.unique(packed_colors, return_counts=True)
+
+    colors = np.empty((unique_packed_colors.shape[0], 3), dtype=np.uint8)
+    colors[:, 0] = unique_packed_colors >> 16
+    colors[:, 1] = (unique_packed_colors >> 8) & 0xFF
+    colors[:, 2] = unique_packed_colors & 0xFF
+    return colors, counts
+
+
+def get_the_most_frequent_colors(colors, counts, maximum_number_of_colors):
+    """
+    :param colors: the unique colors (the array has following shape(number of unique colors, 3))
+    :type colors: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    :param counts: the number of occurrences of each color (the array has following shape(number of unique colors,))
+    :type counts: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    :param maximum_number_of_colors: the maximum number of returned colors
+    :type maximum_number_of_colors: integer - int
+    :return: at most 'maximum_number_of_colors' of the most frequent colors and their counts.
+    The colors keep their original order.
+    :rtype: tuple - (), (numpy.ndarray, numpy.ndarray)
+    """
+    if colors.shape[0] <= maximum_number_of_colors:
+        return colors, counts
+
+    indices = np.sort(
+        np.argsort(-counts, kind="stable")[:maximum_number_of_colors]
+    )
+    return colors[indices], counts[indices]
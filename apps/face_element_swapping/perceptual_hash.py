@@ -0,0 +1,171 @@
+"""
+    This file contains the perceptual hashes and the alignment of near duplicate images
+    (e.g. the same photo encoded again or slightly cropped).
+    The hashes find near duplicates, the thumbnails align them, so the landmarks of a face
+    found in one image can be moved to its near duplicate without detecting the face again.
+"""
+
+import cv2
+import numpy as np
+
+from .settings import (
+    MAXIMUM_CHANGE_OF_THE_SCALE_OF_NEAR_DUPLICATES,
+    MAXIMUM_REPROJECTION_ERROR_OF_THE_ALIGNMENT,
+    MINIMUM_NUMBER_OF_INLIERS_OF_THE_ALIGNMENT,
+    MINIMUM_RATIO_OF_INLIERS_OF_THE_ALIGNMENT,
+    NUMBER_OF_BANDS_OF_THE_PERCEPTUAL_HASH,
+    NUMBER_OF_FEATURES_OF_THE_ALIGNMENT,
+    SCALE_OF_THUMBNAILS,
+    SIDE_OF_THE_DIFFERENCE_HASH,
+)
+
+NUMBER_OF_BITS_OF_THE_PERCEPTUAL_HASH = SIDE_OF_THE_DIFFERENCE_HASH**2
+NUMBER_OF_BITS_OF_A_BAND = (
+    NUMBER_OF_BITS_OF_THE_PERCEPTUAL_HASH // NUMBER_OF_BANDS_OF_THE_PERCEPTUAL_HASH
+)
+
+
+def get_difference_hash(rgb_array):
+    """
+    :param rgb_array: an RGB image converted into a numpy array (the array has following shape(y, x, 3))
+    :type rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    :return: the difference hash (dHash) of the image. Every bit is set
+    if a pixel of the downscaled grayscale image is brighter than its left neighbour.
+    :rtype: integer - int (from 0 to 2 ** NUMBER_OF_BITS_OF_THE_PERCEPTUAL_HASH - 1)
+    """
+    downscaled_gray_array = cv2.resize(
+        cv2.cvtColor(rgb_array, cv2.COLOR_RGB2GRAY),
+        (SIDE_OF_THE_DIFFERENCE_HASH + 1, SIDE_OF_THE_DIFFERENCE_HASH),
+        interpolation=cv2.INTER_AREA,
+    )
+    bits = downscaled_gray_array[:, 1:] > downscaled_gray_array[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), byteorder="big")
+
+
+def get_bands_of_a_perceptual_hash(perceptual_hash):
+    """
+    :param perceptual_hash: the result of calling the function 'get_difference_hash' (included in this file)
+    :type perceptual_hash: integer - int
+    :return: NUMBER_OF_BANDS_OF_THE_PERCEPTUAL_HASH (from the file '.settings') parts of the hash,
+    starting with the most significant bits
+    :rtype: list - [] of integers
+    """
+    mask = (1 << NUMBER_OF_BITS_OF_A_BAND) - 1
+    return [
+        (perceptual_hash >> (NUMBER_OF_BITS_OF_A_BAND * idx)) & mask
+        for idx in reversed(range(NUMBER_OF_BANDS_OF_THE_PERCEPTUAL_HASH))
+    ]
+
+
+def get_hamming_distance(first_perceptual_hash, second_perceptual_hash):
+    """
+    :return: number of bits which differ
+    :rtype: integer - int
+    """
+    return (first_perceptual_hash ^ second_perceptual_hash).bit_count()
+
+
+def get_thumbnail(rgb_array):
+    """
+    :param rgb_array: an RGB image converted into a numpy array (the array has following shape(y, x, 3))
+    :type rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    :return: the grayscale image downscaled by SCALE_OF_THUMBNAILS (from the file '.settings') and encoded as PNG
+    :rtype: bytes
+    """
+    thumbnail = cv2.resize(
+        cv2.cvtColor(rgb_array, cv2.COLOR_RGB2GRAY),
+        None,
+        fx=SCALE_OF_THUMBNAILS,
+        fy=SCALE_OF_THUMBNAILS,
+        interpolation=cv2.INTER_AREA,
+    )
+    return cv2.imencode(".png", thumbnail)[1].tobytes()
+
+
+def _get_features_of_a_thumbnail(thumbnail):
+    """
+    :param thumbnail: the result of calling the function 'get_thumbnail' (included in this file)
+    :type thumbnail: bytes
+    :return: coordinates of the keypoints in the coordinates of the image (not of the thumbnail)
+    and their descriptors
+    :rtype: tuple - (numpy.ndarray, numpy.ndarray)
+    """
+    gray_array = cv2.imdecode(np.frombuffer(thumbnail, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+    keypoints, descriptors = cv2.ORB_create(
+        nfeatures=NUMBER_OF_FEATURES_OF_THE_ALIGNMENT
+    ).detectAndCompute(gray_array, None)
+    coordinates = np.float32([keypoint.pt for keypoint in keypoints])
+    # Centers of pixels of the thumbnail are moved to centers of pixels of the image.
+    return (coordinates + 0.5) / SCALE_OF_THUMBNAILS - 0.5, descriptors
+
+
+def get_alignment_of_near_duplicates(first_thumbnail, second_thumbnail):
+    """
+    :param first_thumbnail: the thumbnail of the first image (the result of calling the function 'get_thumbnail')
+    :type first_thumbnail: bytes
+    :param second_thumbnail: the thumbnail of the second image
+    :type second_thumbnail: bytes
+    :return: the 2 x 3 matrix of the similarity transform (scaling, rotation and translation)
+    from the coordinates of the first image to the coordinates of the second image
+    or None if the images can't be aligned reliably
+    :rtype: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html) or None
+    """
+    first_coordinates, first_descriptors = _get_features_of_a_thumbnail(
+        thumbnail=first_thumbnail
+    )
+    second_coordinates, second_descriptors = _get_features_of_a_thumbnail(
+        thumbnail=second_thumbnail
+    )
+    if first_descriptors is None or second_descriptors is None:
+        return None
+
+    matches = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=True).match(
+        first_descriptors, second_descriptors
+    )
+    if len(matches) < MINIMUM_NUMBER_OF_INLIERS_OF_THE_ALIGNMENT:
+        return None
+
+    transformation, inliers = cv2.estimateAffinePartial2D(
+        first_coordinates[[match.queryIdx for match in matches]],
+        second_coordinates[[match.trainIdx for match in matches]],
+        method=cv2.RANSAC,
+        ransacReprojThreshold=MAXIMUM_REPROJECTION_ERROR_OF_THE_ALIGNMENT
+        / SCALE_OF_THUMBNAILS,
+    )
+    if transformation is None:
+        return None
+
+    number_of_inliers = int(inliers.sum())
+    scale = np.hypot(transformation[0, 0], transformation[1, 0])
+    if (
+        number_of_inliers < MINIMUM_NUMBER_OF_INLIERS_OF_THE_ALIGNMENT
+        or number_of_inliers < MINIMUM_RATIO_OF_INLIERS_OF_THE_ALIGNMENT * len(matches)
+        or abs(scale - 1) > MAXIMUM_CHANGE_OF_THE_SCALE_OF_NEAR_DUPLICATES
+    ):
+        return None
+    return transformation
+
+
+def align_landmarks(landmarks, transformation, shape_of_an_image):
+    """
+    :param landmarks: landmarks of a face (the array has following shape(number of landmarks, 2))
+    :type landmarks: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    :param transformation: the result of calling the function 'get_alignment_of_near_duplicates'
+    :type transformation: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    :param shape_of_an_image: shape of the image to which the landmarks are moved
+    :type shape_of_an_image: tuple - ()
+    :return: the moved landmarks rounded to integers
+    or None if any of them is outside the image (e.g. the face has been cropped)
+    :rtype: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html) or None
+    """
+    aligned_landmarks = np.rint(
+        landmarks @ transformation[:, :2].T + transformation[:, 2]
+    ).astype(np.int64)
+    height, width = shape_of_an_image[:2]
+    if (
+        aligned_landmarks.min() < 0
+        or aligned_landmarks[:, 0].max() >= width
+        or aligned_landmarks[:, 1].max() >= height
+    ):
+        return None
+    return aligned_landmarks
@@ -0,0 +1,261 @@
+"""
+    This file contains the piecewise affine warp of a part of a face.
+    Corresponding points of the source and the destination (the corners of the polygons and the landmarks of the part)
+    are triangulated (Delaunay triangulation of the destination points) and every triangle is warped
+    by its own affine transform. The transforms of all triangles are combined into a single pair of maps,
+    so the whole bounding rectangle is warped by one call of 'cv2.remap'. Pixels outside the triangles
+    are warped by the perspective transform of the polygons (like in the class 'ChangeFaceElement').
+"""
+
+from collections import OrderedDict
+from hashlib import blake2b
+from threading import Lock
+
+import cv2
+import numpy as np
+
+from .settings import MAXIMUM_NUMBER_OF_BYTES_OF_THE_WARP_MAP_CACHE
+
+# Triangles whose doubled area (in square pixels) is smaller than this are skipped.
+MINIMUM_DOUBLED_AREA_OF_A_TRIANGLE = 1e-6
+# The triangles are rasterized with subpixel accuracy of 1 / 2 ** SHIFT_OF_THE_RASTERIZED_TRIANGLES of a pixel.
+SHIFT_OF_THE_RASTERIZED_TRIANGLES = 4
+
+
+def get_delaunay_triangles(points):
+    """
+    :param points: points in 2D Space (the array has following shape(number of points, 2))
+    :type points: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    :return: indices of the vertices of the triangles of the Delaunay triangulation of 'points'
+    (the array has following shape(number of triangles, 3)). Repeated points are used only once.
+    :rtype: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    """
+    points = np.asarray(points, dtype=np.float32)
+    x, y, width, height = cv2.boundingRect(points)
+    subdivision = cv2.Subdiv2D((x - 1, y - 1, width + 2, height + 2))
+    _, unique_indices = np.unique(points, axis=0, return_index=True)
+    for idx in sorted(unique_indices):
+        subdivision.insert((float(points[idx, 0]), float(points[idx, 1])))
+
+    # 'getTriangleList' returns an empty tuple (instead of an array) if there aren't any triangles.
+    vertices = np.asarray(subdivision.getTriangleList(), dtype=np.float32).reshape(-1, 3, 2)
+    if not len(vertices):
+        return np.empty((0, 3), dtype=np.int64)
+    # The triangulation contains also the triangles connected to the vertices of the enclosing rectangle,
+    # their vertices aren't any of 'points'.
+    distances = np.linalg.norm(
+        vertices[:, :, np.newaxis, :] - points[np.newaxis, np.newaxis, :, :], axis=3
+    )
+    triangles = distances.argmin(axis=2)
+    return triangles[(distances.min(axis=2) < 0.5).all(axis=1)]
+
+
+def get_warp_maps(src_points, dst_points, size_of_the_output, perspective_transform):
+    """
+    The maps can be passed to the function 'remap' from the module 'cv2' to warp the source image.
+    :param src_points: points of the source image (the array has following shape(number of points, 2))
+    :type src_points: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    :param dst_points: points of the output image corresponding to 'src_points'
+    (the array has following shape(number of points, 2))
+    :type dst_points: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    :param size_of_the_output: size of the output image - (width, height)
+    :type size_of_the_output: tuple - ()
+    :param perspective_transform: 3 x 3 matrix of the perspective transform from the source image to the output image.
+    It warps the pixels which don't belong to any triangle.
+    :type perspective_transform: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    :return: two maps in the fixed-point representation (see the function 'convertMaps' from the module 'cv2')
+    :rtype: tuple - (numpy.ndarray, numpy.ndarray)
+    """
+    src_points = np.asarray(src_points, dtype=np.float64)
+    dst_points = np.asarray(dst_points, dtype=np.float64)
+    width, height = size_of_the_output
+    triangles = get_delaunay_triangles(points=dst_points)
+
+    # Affine transforms from the output image to the source image, one for every triangle:
+    # [x_src, y_src] = [x_dst, y_dst, 1] @ transform
+    dst_vertices = np.concatenate(
+        [dst_points[triangles], np.ones(triangles.shape + (1,))], axis=2
+    )
+    doubled_areas = np.abs(np.linalg.det(dst_vertices))
+    triangles = triangles[doubled_areas > MINIMUM_DOUBLED_AREA_OF_A_TRIANGLE]
+    dst_vertices = dst_vertices[doubled_areas > MINIMUM_DOUBLED_AREA_OF_A_TRIANGLE]
+    transforms = np.linalg.solve(dst_vertices, src_points[triangles])
+
+    labels = np.full((height, width), -1, dtype=np.int32)
+    scale = 2**SHIFT_OF_THE_RASTERIZED_TRIANGLES
+    for label, triangle in enumerate(triangles):
+        vertices = np.round(dst_points[triangle] * scale).astype(np.int32)
+        cv2.fillConvexPoly(
+            labels,
+            vertices,
+            label,
+            lineType=cv2.LINE_8,
+            shift=SHIFT_OF_THE_RASTERIZED_TRIANGLES,
+        )
+        # The edges are drawn as well, so the pixels on the edges of the outer triangles are warped
+        # by the triangles (the transforms of neighbouring triangles are equal on their shared edges).
+        cv2.polylines(
+            labels,
+            [vertices],
+            True,
+            label,
+            lineType=cv2.LINE_8,
+            shift=SHIFT_OF_THE_RASTERIZED_TRIANGLES,
+        )
+
+    xs, ys = np.meshgrid(
+        np.arange(width, dtype=np.float64), np.arange(height, dtype=np.float64)
+    )
+    inverse_perspective_transform = np.linalg.inv(perspective_transform)
+    denominators = (
+        inverse_perspective_transform[2, 0] * xs
+        + inverse_perspective_transform[2, 1] * ys
+        + inverse_perspective_transform[2, 2]
+    )
+    map_x = (
+        inverse_perspective_transform[0, 0] * xs
+        + inverse_perspective_transform[0, 1] * ys
+        + inverse_perspective_transform[0, 2]
+    ) / denominators
+    map_y = (
+        inverse_perspective_transform[1, 0] * xs
+        + inverse_perspective_transform[1, 1] * ys
+        + inverse_perspective_transform[1, 2]
+    ) / denominators
+
+    inside = labels >= 0
+    transforms_of_pixels = transforms[labels[inside]]
+    map_x[inside] = (
+        transforms_of_pixels[:, 0, 0] * xs[inside]
+        + transforms_of_pixels[:, 1, 0] * ys[inside]
+        + transforms_of_pixels[:, 2, 0]
+    )
+    map_y[inside] = (
+        transforms_of_pixels[:, 0, 1] * xs[inside]
+        + transforms_of_pixels[:, 1, 1] * ys[inside]
+        + transforms_of_pixels[:, 2, 1]
+    )
+    return cv2.convertMaps(
+        map_x.astype(np.float32), map_y.astype(np.float32), cv2.CV_16SC2
+    )
+
+
+class WarpMapCache:
+    def __init__(
+        self, maximum_number_of_bytes=MAXIMUM_NUMBER_OF_BYTES_OF_THE_WARP_MAP_CACHE
+    ):
+        """
+        The maps depend only on the corresponding points (in the coordinates of the bounding rectangles)
+        and on the size of the output, so the same example swapped into the same face reuses its maps.
+        The least recently used maps are evicted
+        when the total size of the cached maps exceeds 'maximum_number_of_bytes'.
+        :param maximum_number_of_bytes: maximum total size of the cached maps
+        :type maximum_number_of_bytes: integer - int
+        """
+        self._maximum_number_of_bytes = maximum_number_of_bytes
+        self._warp_maps = OrderedDict()
+        self._number_of_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = Lock()
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def misses(self):
+        return self._misses
+
+    def __len__(self):
+        return len(self._warp_maps)
+
+    @staticmethod
+    def get_key(src_points, dst_points, size_of_the_output):
+        """
+        :param src_points: see the function 'get_warp_maps' (included in this file)
+        :param dst_points: see the function 'get_warp_maps'
+        :param size_of_the_output: see the function 'get_warp_maps'
+        :return: key identifying the maps
+        :rtype: tuple - ()
+        """
+        points = np.ascontiguousarray(
+            np.concatenate([src_points, dst_points]), dtype=np.float64
+        )
+        return tuple(size_of_the_output), blake2b(points.data).hexdigest()
+
+    def get(self, key):
+        """
+        :param key: result of calling the function 'get_key' (contained in this class)
+        :type key: tuple - ()
+        :return: the cached maps or None if the cache doesn't contain them
+        :rtype: tuple - (numpy.ndarray, numpy.ndarray) or None
+        """
+        with self._lock:
+            warp_maps = self._warp_maps.get(key)
+            if warp_maps is None:
+                self._misses += 1
+                return None
+
+            self._warp_maps.move_to_end(key)
+            self._hits += 1
+            return warp_maps
+
+    def add(self, key, warp_maps):
+        """
+        This function adds 'warp_maps' to the cache
+        and evicts the least recently used maps if the cache is too big.
+        The maps are made read-only, because they are shared by all users of the cache.
+        :param key: result of calling the function 'get_key' (contained in this class)
+        :type key: tuple - ()
+        :param warp_maps: result of calling the function 'get_warp_maps' (included in this file)
+        :type warp_maps: tuple - (numpy.ndarray, numpy.ndarray)
+        """
+        number_of_bytes = sum(warp_map.nbytes for warp_map in warp_maps)
+        if number_of_bytes > self._maximum_number_of_bytes:
+            return
+        for warp_map in warp_maps:
+            warp_map.flags.writeable = False
+
+        with self._lock:
+            if key in self._warp_maps:
+                self._number_of_bytes -= sum(
+                    warp_map.nbytes for warp_map in self._warp_maps.pop(key)
+                )
+            self._warp_maps[key] = warp_maps
+            self._number_of_bytes += number_of_bytes
+
+            while self._number_of_bytes > self._maximum_number_of_bytes:
+                _, evicted_warp_maps = self._warp_maps.popitem(last=False)
+                self._number_of_bytes -= sum(
+                    warp_map.nbytes for warp_map in evicted_warp_maps
+                )
+
+    def get_statistics(self):
+        """
+        :return: dictionary with the following keys: 'hits', 'misses', 'hit_rate',
+        'number_of_warp_maps', 'number_of_bytes', 'maximum_number_of_bytes'
+        :rtype: dictionary - {}
+        """
+        with self._lock:
+            number_of_requests = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / number_of_requests
+                if number_of_requests
+                else 0.0,
+                "number_of_warp_maps": len(self._warp_maps),
+                "number_of_bytes": self._number_of_bytes,
+                "maximum_number_of_bytes": self._maximum_number_of_bytes,
+            }
+
+    def clear(self):
+        """
+        This function removes all maps from the cache and resets its counters.
+        """
+        with self._lock:
+            self._warp_maps.clear()
+            self._number_of_bytes = 0
+            self._hits = 0
+            self._misses = 0
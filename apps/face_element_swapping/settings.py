@@ -2,7 +2,80 @@ import numpy as np
 from sklearn.neighbors import KNeighborsClassifier, NearestNeighbors
 
 PERCENT_OF_NEAREST_NEIGHBOURS = 0.01
+# None means that all unique colors of the training image are used to fitting the classifier.
+# Otherwise only this number of the most frequent colors is used.
+MAXIMUM_NUMBER_OF_COLORS_OF_THE_TRAINING_PALETTE = None
 CLASSIFIERS = {"kNN": KNeighborsClassifier, "NearestNeighbors": NearestNeighbors}
 DEFAULT_CLASSIFIER = CLASSIFIERS["NearestNeighbors"]
 
+# The classifier recolors every pixel separately,
+# the lookup table recolors pixels by interpolating between the precomputed colors of the RGB cube.
+COLOR_ADJUSTMENT_MODE_OF_THE_CLASSIFIER = "classifier"
+COLOR_ADJUSTMENT_MODE_OF_THE_LOOKUP_TABLE = "lookup_table"
+COLOR_ADJUSTMENT_MODES = [
+    COLOR_ADJUSTMENT_MODE_OF_THE_CLASSIFIER,
+    COLOR_ADJUSTMENT_MODE_OF_THE_LOOKUP_TABLE,
+]
+DEFAULT_COLOR_ADJUSTMENT_MODE = COLOR_ADJUSTMENT_MODE_OF_THE_CLASSIFIER
+NUMBER_OF_CELLS_PER_CHANNEL_OF_THE_COLOR_LOOKUP_TABLE = 32
+NUMBERS_OF_CELLS_PER_CHANNEL_IN_THE_ERROR_REPORT = [8, 16, 32, 64]
+MAXIMUM_VALUE_OF_A_CHANNEL = 255
+
+MAXIMUM_NUMBER_OF_BYTES_OF_THE_COLOR_INDEX_CACHE = 64 * 1024 * 1024
+
+# Seamless cloning in the region of interest processes only the bounding rectangle of the polygon
+# enlarged by the padding (in pixels) instead of the whole image. The padding must be big enough
+# to contain the area in which 'cv2.seamlessClone' places the cloned pixels.
+SEAMLESS_CLONING_IN_THE_REGION_OF_INTEREST = True
+PADDING_OF_THE_REGION_OF_INTEREST_OF_SEAMLESS_CLONING = 8
+
+# Faces whose regions of interest don't overlap are swapped at the same time by this number of threads
+# (see the function 'change_face_elements' of the class 'ChangeFaceElement' from the file '.change_faces').
+NUMBER_OF_THREADS_OF_THE_MULTI_FACE_SWAPPING = 4
+
 RGB_MASK_FILLING_COLOR = np.array([255, 255, 255], dtype=np.uint8)
+
+# The perspective warp moves the source polygon to the destination polygon by a single perspective transform
+# of the four corners of the polygons. The piecewise affine warp moves every triangle of the corresponding points
+# (the corners of the polygons and, optionally, the landmarks of the part of the face) by its own affine transform
+# (see the file '.piecewise_affine_warp').
+WARP_MODE_OF_THE_PERSPECTIVE_TRANSFORM = "perspective"
+WARP_MODE_OF_THE_PIECEWISE_AFFINE_TRANSFORM = "piecewise_affine"
+WARP_MODES = [
+    WARP_MODE_OF_THE_PERSPECTIVE_TRANSFORM,
+    WARP_MODE_OF_THE_PIECEWISE_AFFINE_TRANSFORM,
+]
+DEFAULT_WARP_MODE = WARP_MODE_OF_THE_PERSPECTIVE_TRANSFORM
+MAXIMUM_NUMBER_OF_BYTES_OF_THE_WARP_MAP_CACHE = 16 * 1024 * 1024
+
+# Settings of the pipeline swapping face parts in frames of videos and animated images (see the file '.frames').
+# Animated images are read and written via the module 'PIL', all other files via the module 'cv2'.
+FILE_EXTENSIONS_OF_ANIMATED_IMAGES = (".gif", ".png", ".apng")
+FOURCC_OF_WRITTEN_VIDEOS = "mp4v"
+# Frame rate of the animated images which don't specify the duration of their frames.
+DEFAULT_FRAME_RATE = 25.0
+NUMBER_OF_WORKERS_OF_THE_FRAME_PIPELINE = 2
+START_METHOD_OF_THE_WORKERS_OF_THE_FRAME_PIPELINE = "spawn"
+# Frames are read only this number of frames (per worker) ahead of the last written frame,
+# so the memory used by the pipeline doesn't depend on the length of a video.
+NUMBER_OF_FRAMES_IN_FLIGHT_PER_WORKER = 2
+
+# Settings of the perceptual hashes of images (see the file '.perceptual_hash').
+# The difference hash compares neighbouring pixels of a grayscale image downscaled to (SIDE + 1) x SIDE pixels,
+# so the hash has SIDE * SIDE bits.
+SIDE_OF_THE_DIFFERENCE_HASH = 8
+# The hash is split into bands. Hashes which differ by less bits than the number of bands
+# have at least one equal band, so near duplicates can be looked for via indexed bands.
+# Wide bands are rarely shared by different photos, so few candidates are read from the database.
+# Changing the number of bands requires saving the bands of the saved hashes again (see the migrations of 'blog').
+NUMBER_OF_BANDS_OF_THE_PERCEPTUAL_HASH = 4
+MAXIMUM_HAMMING_DISTANCE_OF_NEAR_DUPLICATES = NUMBER_OF_BANDS_OF_THE_PERCEPTUAL_HASH - 1
+# Thumbnails are grayscale images downscaled by this factor. They are used to align near duplicates.
+# Changing the factor makes the previously saved thumbnails useless.
+SCALE_OF_THUMBNAILS = 0.375
+NUMBER_OF_FEATURES_OF_THE_ALIGNMENT = 500
+MAXIMUM_REPROJECTION_ERROR_OF_THE_ALIGNMENT = 2.0
+MINIMUM_NUMBER_OF_INLIERS_OF_THE_ALIGNMENT = 40
+MINIMUM_RATIO_OF_INLIERS_OF_THE_ALIGNMENT = 0.5
+# Near duplicates may be slightly cropped or resized, but not rescaled more than this.
+MAXIMUM_CHANGE_OF_THE_SCALE_OF_NEAR_DUPLICATES = 0.25
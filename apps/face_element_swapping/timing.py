@@ -0,0 +1,101 @@
+"""
+    This file contains the instrumentation of the stages of face part swapping.
+    Stages are measured only inside the function 'collect_stage_timings',
+    otherwise the function 'timing_span' returns an empty context manager,
+    so the instrumentation costs almost nothing when it is disabled.
+"""
+
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from time import perf_counter
+
+_current_stage_timings = ContextVar("current_stage_timings", default=None)
+_disabled_span = nullcontext()
+
+
+class StageTimings:
+    def __init__(self):
+        self._spans = []
+
+    @property
+    def spans(self):
+        return self._spans
+
+    def add(self, name, seconds):
+        """
+        :param name: name of the stage
+        :type name: string - str
+        :param seconds: duration of the stage
+        :type seconds: float
+        """
+        self._spans.append((name, seconds))
+
+    def to_list(self):
+        """
+        :return: list of dictionaries with the keys: 'name' and 'milliseconds'.
+        The stages are ordered by their end time. Nested stages are included in the durations of their parents.
+        :rtype: list - []
+        """
+        return [
+            {"name": name, "milliseconds": round(seconds * 1000, 3)}
+            for name, seconds in self._spans
+        ]
+
+    def to_server_timing_header(self):
+        """
+        :return: the stages in the format of the 'Server-Timing' http header
+        (https://developer.mozilla.org/en-US/docs/Web/HTTP/Headers/Server-Timing)
+        e.g. 'decode_base64;dur=1.234, get_faces_landmarks;dur=98.765'
+        :rtype: string - str
+        """
+        return ", ".join(
+            "{name};dur={milliseconds:.3f}".format(
+                name=name, milliseconds=seconds * 1000
+            )
+            for name, seconds in self._spans
+        )
+
+
+@contextmanager
+def _measured_span(stage_timings, name):
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        stage_timings.add(name=name, seconds=perf_counter() - start)
+
+
+def timing_span(name):
+    """
+    :param name: name of the stage
+    :type name: string - str
+    :return: context manager which measures the duration of the stage
+    if the stages are currently collected (see the function 'collect_stage_timings'),
+    otherwise an empty context manager.
+    """
+    stage_timings = _current_stage_timings.get()
+    if stage_timings is None:
+        return _disabled_span
+    return _measured_span(stage_timings=stage_timings, name=name)
+
+
+@contextmanager
+def collect_stage_timings(enabled=True):
+    """
+    Stages measured by the function 'timing_span' inside this context manager
+    (also in the called functions) are collected into the yielded object.
+    :param enabled: param indicates if the stages will be collected.
+    If it is False, None is yielded and no stage is measured.
+    :type enabled: bool (True or False)
+    :return: context manager yielding StageTimings or None
+    """
+    if not enabled:
+        yield None
+        return
+
+    stage_timings = StageTimings()
+    token = _current_stage_timings.set(stage_timings)
+    try:
+        yield stage_timings
+    finally:
+        _current_stage_timings.reset(token)
@@ -1,7 +1,8 @@
 from django.contrib import admin
 
-from .models import ExampleLip, ExampleNose, Photo
+from .models import ExampleLip, ExampleNose, PerceptualHashBand, Photo
 
 admin.site.register(Photo)
 admin.site.register(ExampleLip)
 admin.site.register(ExampleNose)
+admin.site.register(PerceptualHashBand)
@@ -3,3 +3,8 @@ from django.apps import AppConfig
 
 class BlogConfig(AppConfig):
     name = 'blog'
+
+    def ready(self):
+        from .signals import connect_signals_of_the_example_faces
+
+        connect_signals_of_the_example_faces()
@@ -1,24 +1,53 @@
-from .models import DB_OBJECTS, Photo
+from functools import reduce
+from operator import or_
+from uuid import uuid4
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from apps.face_element_swapping.perceptual_hash import (
+    get_bands_of_a_perceptual_hash,
+    get_hamming_distance,
+)
+
+from .helpers import (
+    convert_perceptual_hash_to_a_signed_integer,
+    convert_signed_integer_to_a_perceptual_hash,
+)
+from .models import DB_OBJECTS, PerceptualHashBand, Photo, VersionOfTheExampleFaces
+from .settings import (
+    EXAMPLE_ASSET_STORE_ENABLED,
+    ID_OF_THE_VERSION_OF_THE_EXAMPLE_FACES,
+)
 
 
 class DBFunc:
     @staticmethod
     def save_user_photo(
         photo_in_base64,
+        photo_digest,
         number_of_detected_faces,
         rgb_array=None,
         face_landmarks=None,
         transparent_pixels=None,
+        landmarks=None,
+        perceptual_hash=None,
+        thumbnail=None,
     ):
         """
         This function saves user photos in the database table
         represented by 'Photo' object (from the file '.models').
+        Nothing is saved if the photo has been saved in the meantime (e.g. by a concurrent request).
         :param photo_in_base64: an RGB photo converted to base64
         :type photo_in_base64: string - str
+        :param photo_digest: the result of calling the function 'get_digest_of_a_photo'
+        (from the file '.helpers') for the photo
+        :type photo_digest: string - str
         :param number_of_detected_faces: number of detected faces in the photo
         :type number_of_detected_faces: integer - int
         :param rgb_array: the same photo converted into a numpy array (the array has following shape(y, x, 3))
-        :type rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        and serialized by the function 'convert_rgb_array_to_bytes' (from the file '.helpers')
+        :type rgb_array: bytes
         :param face_landmarks: characteristic points for the specific parts of a face.
         A dictionary representing these points should come from calling
         the function 'get_landmarks_of_parts_of_face'
@@ -34,40 +63,172 @@ class DBFunc:
         (class 'ProcessUserPhoto' from the file './process_user_data/swap_elements_of_face.py').
         After all this list must be converted to a string.
         :type transparent_pixels: string - str
+        :param landmarks: all landmarks of the face serialized by the function 'to_bytes'
+        of the class 'FaceLandmarks' (from 'apps.face_element_swapping.endpoints').
+        :type landmarks: bytes
+        :param perceptual_hash: the result of calling the function 'get_difference_hash'
+        (from 'apps.face_element_swapping.perceptual_hash'). The bands of the hash are saved
+        in the database table represented by 'PerceptualHashBand' object (from the file '.models').
+        :type perceptual_hash: integer - int
+        :param thumbnail: the result of calling the function 'get_thumbnail'
+        (from 'apps.face_element_swapping.perceptual_hash')
+        :type thumbnail: bytes
+        :raises IntegrityError: if the row violates any constraint of the table
+        except the unique digest of a photo which has already been saved
         """
-        Photo.objects.create(
-            photo_in_base64=photo_in_base64,
-            rgb_array=rgb_array,
-            transparent_pixels=transparent_pixels,
-            number_of_detected_faces=number_of_detected_faces,
-            face_landmarks=face_landmarks,
+        try:
+            with transaction.atomic():
+                photo = Photo.objects.create(
+                    photo_in_base64=photo_in_base64,
+                    photo_digest=photo_digest,
+                    rgb_array=rgb_array,
+                    transparent_pixels=transparent_pixels,
+                    number_of_detected_faces=number_of_detected_faces,
+                    face_landmarks=face_landmarks,
+                    landmarks=landmarks,
+                    perceptual_hash=None
+                    if perceptual_hash is None
+                    else convert_perceptual_hash_to_a_signed_integer(
+                        perceptual_hash=perceptual_hash
+                    ),
+                    thumbnail=thumbnail,
+                )
+                if perceptual_hash is not None:
+                    PerceptualHashBand.objects.bulk_create(
+                        [
+                            PerceptualHashBand(
+                                photo=photo,
+                                index_of_the_band=index_of_the_band,
+                                value_of_the_band=value_of_the_band,
+                            )
+                            for index_of_the_band, value_of_the_band in enumerate(
+                                get_bands_of_a_perceptual_hash(
+                                    perceptual_hash=perceptual_hash
+                                )
+                            )
+                        ]
+                    )
+        except IntegrityError:
+            # The unique digest of the photo has been saved by another request,
+            # any other violated constraint is an error.
+            if not Photo.objects.filter(photo_digest=photo_digest).exists():
+                raise
+
+    @staticmethod
+    def get_near_duplicates_of_a_user_photo(
+        perceptual_hash, maximum_hamming_distance, maximum_number_of_near_duplicates
+    ):
+        """
+        This function looks for the user photos with exactly one face, whose perceptual hashes differ
+        from 'perceptual_hash' by at most 'maximum_hamming_distance' bits.
+        The candidates are found in the database via the bands of the hash,
+        so 'maximum_hamming_distance' must be less than the number of bands.
+        At first only the hashes of the candidates are loaded, then the columns needed to reuse
+        the landmarks are loaded only for the nearest near duplicates.
+        :param perceptual_hash: the result of calling the function 'get_difference_hash'
+        (from 'apps.face_element_swapping.perceptual_hash')
+        :type perceptual_hash: integer - int
+        :param maximum_hamming_distance: the maximum number of different bits
+        :type maximum_hamming_distance: integer - int
+        :param maximum_number_of_near_duplicates: the maximum number of returned near duplicates
+        :type maximum_number_of_near_duplicates: integer - int
+        :return: list of tuples: (Hamming distance, an instance of the 'Photo' class (from the file '.models'))
+        sorted by the distance
+        :rtype: list - []
+        """
+        bands_of_the_hash = reduce(
+            or_,
+            (
+                Q(index_of_the_band=index_of_the_band, value_of_the_band=value_of_the_band)
+                for index_of_the_band, value_of_the_band in enumerate(
+                    get_bands_of_a_perceptual_hash(perceptual_hash=perceptual_hash)
+                )
+            ),
         )
+        candidates = Photo.objects.filter(
+            id__in=PerceptualHashBand.objects.filter(bands_of_the_hash).values(
+                "photo_id"
+            ),
+            number_of_detected_faces=1,
+            landmarks__isnull=False,
+            thumbnail__isnull=False,
+        ).values_list("id", "perceptual_hash")
+
+        hamming_distances = {}
+        for row_id, signed_integer in candidates:
+            hamming_distance = get_hamming_distance(
+                first_perceptual_hash=perceptual_hash,
+                second_perceptual_hash=convert_signed_integer_to_a_perceptual_hash(
+                    signed_integer=signed_integer
+                ),
+            )
+            if hamming_distance <= maximum_hamming_distance:
+                hamming_distances[row_id] = hamming_distance
+        ids_of_the_near_duplicates = sorted(
+            hamming_distances, key=lambda row_id: (hamming_distances[row_id], row_id)
+        )[:maximum_number_of_near_duplicates]
+        if not ids_of_the_near_duplicates:
+            return []
+
+        near_duplicates = Photo.objects.only("id", "landmarks", "thumbnail").in_bulk(
+            ids_of_the_near_duplicates
+        )
+        return [
+            (hamming_distances[row_id], near_duplicates[row_id])
+            for row_id in ids_of_the_near_duplicates
+            if row_id in near_duplicates
+        ]
 
     @staticmethod
-    def get_user_photo_data(photo_in_base64):
+    def get_user_photo_data(photo_digest):
         """
-        :param photo_in_base64: a photo converted to base64
-        :type photo_in_base64: string - str
+        :param photo_digest: the result of calling the function 'get_digest_of_a_photo'
+        (from the file '.helpers') for a photo
+        :type photo_digest: string - str
+        The row is read by a single query, which loads only the columns needed to swap the parts of the face
+        (the photo converted to base64 isn't loaded).
         :return: an instance of the 'Photo' class (from the file '.models')
         representing the row containing the photo or
         None if the photo doesn't exist in the database.
         :rtype: an instance of the 'Photo' class (from the file '.models') or None
         """
-        if DBFunc.user_photo_exists(photo_in_base64=photo_in_base64):
-            return Photo.objects.get(photo_in_base64=photo_in_base64)
-        return None
+        return (
+            Photo.objects.filter(photo_digest=photo_digest)
+            .only(
+                "id",
+                "rgb_array",
+                "transparent_pixels",
+                "number_of_detected_faces",
+                "face_landmarks",
+                "landmarks",
+            )
+            .first()
+        )
+
+    @staticmethod
+    def delete_user_photo(photo_digest):
+        """
+        This function deletes the row containing the photo (and the bands of its perceptual hash)
+        from the database table represented by the 'Photo' object (from the file '.models').
+        :param photo_digest: the result of calling the function 'get_digest_of_a_photo'
+        (from the file '.helpers') for the photo
+        :type photo_digest: string - str
+        """
+        # Only the ids of the deleted rows are loaded to find the bands of their perceptual hashes.
+        Photo.objects.filter(photo_digest=photo_digest).only("id").delete()
 
     @staticmethod
-    def user_photo_exists(photo_in_base64):
+    def user_photo_exists(photo_digest):
         """
-        This function checks if a photo(converted to base64) exists
+        This function checks if a photo exists
         in the database table represented by the 'Photo' object (from the file '.models').
-        :param photo_in_base64: a photo converted to base64
-        :type photo_in_base64: string - str
+        :param photo_digest: the result of calling the function 'get_digest_of_a_photo'
+        (from the file '.helpers') for the photo
+        :type photo_digest: string - str
         :return: True if the photo exists, False if not
         :rtype: bool (True or False)
         """
-        return Photo.objects.filter(photo_in_base64=photo_in_base64).exists()
+        return Photo.objects.filter(photo_digest=photo_digest).exists()
 
     @staticmethod
     def example_photo_exists(part_of_face, photo_name, photo_in_base64):
@@ -109,7 +270,13 @@ class DBFunc:
 
     @staticmethod
     def save_example_photo(
-        part_of_face, photo_name, photo_in_base64, rgb_array, face_landmarks
+        part_of_face,
+        photo_name,
+        photo_in_base64,
+        rgb_array,
+        face_landmarks=None,
+        landmarks=None,
+        asset_key=None,
     ):
         """
         This function saves the photo, which concern a specific part of the face, into the appropriate database table.
@@ -122,14 +289,20 @@ class DBFunc:
         :param photo_in_base64: a photo converted to base64
         :type photo_in_base64: string - str
         :param rgb_array: the same photo converted to an array with the shape (height x width x 3).
-        This array must be converted to a string.
-        :type rgb_array: string - str
+        This array must be serialized by the function 'convert_rgb_array_to_bytes' (from the file '.helpers').
+        :type rgb_array: bytes
         :param face_landmarks: characteristic points for the specific parts of a face.
         A dictionary representing these points should come from calling
         the function 'get_landmarks_of_parts_of_face'
         (class 'ProcessUserPhoto' from the file './process_user_data/swap_elements_of_face.py').
         After all this dictionary must be converted to a string.
         :type face_landmarks: string - str
+        :param landmarks: all landmarks of the face serialized by the function 'to_bytes'
+        of the class 'FaceLandmarks' (from 'apps.face_element_swapping.endpoints').
+        :type landmarks: bytes
+        :param asset_key: key of the asset built from the same photo, returned by the function 'save'
+        of the class 'ExampleAssetStore' (from the file '.example_assets')
+        :type asset_key: string - str or None
         """
         if part_of_face not in DB_OBJECTS:
             available_parts_of_face = ", ".join(
@@ -151,6 +324,8 @@ class DBFunc:
             photo_in_base64=photo_in_base64,
             rgb_array=rgb_array,
             face_landmarks=face_landmarks,
+            landmarks=landmarks,
+            asset_key=asset_key,
         )
 
     @staticmethod
@@ -163,7 +338,10 @@ class DBFunc:
         :param row_id: id of a row in the database table.
         :type row_id: integer - int
         :return: object representing the row with the passed (as a parameter) id ('row_id') or None if
-        a row with this id doesn't exist.
+        a row with this id doesn't exist. The row is read by a single query, which loads only the columns
+        needed to swap the part of the face (the photo converted to base64 isn't loaded).
+        If 'EXAMPLE_ASSET_STORE_ENABLED' (from the file '.settings') is True, the array of the photo
+        isn't loaded either, it is read by another query only if the asset of the row has to be built.
         :rtype: object representing a class which inherit from the class 'PartOfFace'(from the file '.models') or None
         :raises ValueError: if the passed parameter 'part_of_face' is not a key of DB_OBJECTS dictionary
         """
@@ -182,10 +360,101 @@ class DBFunc:
             )
             raise ValueError(error_info)
 
-        db_row = DB_OBJECTS[part_of_face].objects.filter(id=row_id)
-        if db_row.exists():
-            return db_row.first()
-        return None
+        return (
+            DB_OBJECTS[part_of_face]
+            .objects.filter(id=row_id)
+            .only(*DBFunc.get_columns_of_example_faces())
+            .first()
+        )
+
+    @staticmethod
+    def get_all_example_photo_data(part_of_face):
+        """
+        The rows are read by a single query, which loads only the columns needed to swap the part of the face
+        (the same columns as the function 'get_example_photo_data' included in this class).
+        :param part_of_face: a specific part of the face
+        This param must be a key of DB_OBJECTS dictionary (from the file '.models')
+        whose values represent database tables.
+        :type part_of_face: string - str
+        :return: all rows of the database table indicated by the passed parameter 'part_of_face'
+        :rtype: django.db.models.query.QuerySet of objects representing a class which inherit from the class
+        'PartOfFace'(from the file '.models')
+        :raises ValueError: if the passed parameter 'part_of_face' is not a key of DB_OBJECTS dictionary
+        """
+        if part_of_face not in DB_OBJECTS:
+            available_parts_of_face = ", ".join(
+                map(lambda key: "'" + str(key) + "'", DB_OBJECTS.keys())
+            )
+            error_info = (
+                "The provided part of the face ('{part_of_face}') "
+                "is not available. "
+                "Available parts of the face: "
+                "{available_parts_of_face}.".format(
+                    part_of_face=part_of_face,
+                    available_parts_of_face=available_parts_of_face,
+                )
+            )
+            raise ValueError(error_info)
+
+        return DB_OBJECTS[part_of_face].objects.only(
+            *DBFunc.get_columns_of_example_faces()
+        )
+
+    @staticmethod
+    def get_columns_of_example_faces():
+        """
+        :return: names of the columns of the example faces needed to swap a part of the face.
+        If 'EXAMPLE_ASSET_STORE_ENABLED' (from the file '.settings') is True, the examples are swapped
+        from their assets, so the array of the photo isn't included.
+        :rtype: tuple - () of strings
+        """
+        if EXAMPLE_ASSET_STORE_ENABLED:
+            return "id", "face_landmarks", "landmarks", "asset_key"
+        return "id", "rgb_array", "face_landmarks", "landmarks", "asset_key"
+
+    @staticmethod
+    def save_asset_key_of_an_example(part_of_face, row_id, asset_key):
+        """
+        This function saves the key of the asset built from the row (see the class 'ExampleAssetStore'
+        from the file '.example_assets'). The row is updated without sending any signals,
+        so the version of the example faces isn't changed.
+        :param part_of_face: a specific part of the face
+        This param must be a key of DB_OBJECTS dictionary (from the file '.models')
+        whose values represent database tables.
+        :type part_of_face: string - str
+        :param row_id: id of a row in the database table.
+        :type row_id: integer - int
+        :param asset_key: the result of calling the function 'save' of the class 'ExampleAssetStore'
+        :type asset_key: string - str
+        """
+        DB_OBJECTS[part_of_face].objects.filter(id=row_id).update(asset_key=asset_key)
+
+    @staticmethod
+    def get_version_of_the_example_faces():
+        """
+        :return: the version of the example faces saved in the database table represented
+        by the 'VersionOfTheExampleFaces' object (from the file '.models')
+        or None if the example faces haven't been changed since the table was created
+        :rtype: string - str or None
+        """
+        return (
+            VersionOfTheExampleFaces.objects.filter(
+                id=ID_OF_THE_VERSION_OF_THE_EXAMPLE_FACES
+            )
+            .values_list("version", flat=True)
+            .first()
+        )
+
+    @staticmethod
+    def change_version_of_the_example_faces():
+        """
+        This function saves a new version of the example faces in the database,
+        so the example faces kept in memory by all processes are loaded again.
+        """
+        VersionOfTheExampleFaces.objects.update_or_create(
+            id=ID_OF_THE_VERSION_OF_THE_EXAMPLE_FACES,
+            defaults={"version": uuid4().hex},
+        )
 
     @staticmethod
     def get_all_photos_of_a_part_of_the_face(part_of_face):
@@ -216,8 +485,10 @@ class DBFunc:
             raise ValueError(error_info)
 
         data = [
-            {"id": row.id, "name": row.photo_name, "source": row.photo_in_base64}
-            for row in DB_OBJECTS[part_of_face].objects.all()
+            {"id": row_id, "name": photo_name, "source": photo_in_base64}
+            for row_id, photo_name, photo_in_base64 in DB_OBJECTS[
+                part_of_face
+            ].objects.values_list("id", "photo_name", "photo_in_base64")
         ]
 
         return data
@@ -1,7 +1,6 @@
 """
     This file should be executed at the level of the main directory of this repository.
 """
-import json
 import logging
 import os
 import sys
@@ -15,17 +14,19 @@ os.environ["DJANGO_SETTINGS_MODULE"] = "myproject.settings"
 django.setup()
 
 from apps.face_element_swapping import get_faces_landmarks
+from apps.face_element_swapping.endpoints import FaceLandmarks
 from blog.db_func import DBFunc
 from blog.helpers import (
     convert_img_to_base64,
     convert_pil_to_np_array,
-    convert_rgb_array_to_text,
+    convert_rgb_array_to_bytes,
     replace_special_signs,
 )
+from blog.process_user_data import ProcessUserPhoto
 from blog.settings import (
     ACCEPTABLE_FILE_EXTENSIONS,
     DIRECTORIES_WITH_FACES,
-    LANDMARKS_FUNCTIONS,
+    EXAMPLE_ASSET_STORE_ENABLED,
 )
 
 # Choosing the right part of the face for which we look for photos
@@ -66,8 +67,10 @@ class SaveFacesIntoDB:
     ):
         """
         If the number of detected faces(number_of_detected_faces) in the image is equal to 1
-        this function detect the landmarks of the specified part of face (self._part_of_face)
-        and save all information about the image into the database, otherwise only a specific message is displayed.
+        this function saves all landmarks of the face (serialized by the class 'FaceLandmarks')
+        and all information about the image into the database, otherwise only a specific message is displayed.
+        If 'EXAMPLE_ASSET_STORE_ENABLED' (from the file 'blog/settings.py') is True, the asset of the image
+        is also saved in the store of the assets of examples.
 
         :param number_of_detected_faces: number of detected faces in an image
         :type number_of_detected_faces: integer - int
@@ -79,15 +82,22 @@ class SaveFacesIntoDB:
         :type rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
         """
         if number_of_detected_faces == 1:
-            face_landmarks = LANDMARKS_FUNCTIONS[self._part_of_face](face_landmarks)
-            face_landmarks = json.dumps({self._part_of_face: face_landmarks})
-
+            landmarks = FaceLandmarks.from_face_recognition(
+                face_landmarks=face_landmarks
+            ).to_bytes()
             DBFunc.save_example_photo(
                 part_of_face=self._part_of_face,
                 photo_in_base64=self._image_in_base64,
                 photo_name=self._image_name,
-                rgb_array=convert_rgb_array_to_text(rgb_array=rgb_array),
-                face_landmarks=face_landmarks,
+                rgb_array=convert_rgb_array_to_bytes(rgb_array=rgb_array),
+                landmarks=landmarks,
+                asset_key=ProcessUserPhoto.save_example_asset(
+                    rgb_array=rgb_array,
+                    landmarks=landmarks,
+                    part_of_face=self._part_of_face,
+                )
+                if EXAMPLE_ASSET_STORE_ENABLED
+                else None,
             )
 
             info_msg = (
@@ -0,0 +1,203 @@
+"""
+    This file should be executed at the level of the main directory of this repository, e.g.:
+        python blog/dev/multi_part_benchmark.py
+        python blog/dev/multi_part_benchmark.py --number-of-repeats 10 --output report.json
+    It compares the request which swaps lips and a nose in one pass (the key 'KEY_OF_THE_PARTS_OF_THE_FACE')
+    with two single-part requests sent one after another, where the second request is sent with the photo
+    returned by the first one (the only way to get both parts with single-part requests).
+    The requests are handled by the view 'change_part_of_face' with a test database
+    which contains the photos from the directories 'blog/dev/lips' and 'blog/dev/noses'.
+    Every configuration is measured with a new photo (the photos of users are removed from the database
+    and the cache of the color indexes is cleared) and with photos saved before.
+"""
+import argparse
+import json
+import os
+import sys
+from statistics import median
+from time import perf_counter
+
+import django
+
+# loading all necessary dependencies
+sys.path.append("./")
+os.environ["DJANGO_SETTINGS_MODULE"] = "myproject.settings"
+django.setup()
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import setup_test_environment
+from django.urls import reverse
+from PIL import Image
+
+from blog.dev.add_images_to_db import SaveFacesIntoDB
+from blog.helpers import convert_img_to_base64, correct_size, resize_img
+from blog.models import DB_OBJECTS, Photo
+from blog.process_user_data import ProcessUserPhoto
+from blog.settings import (
+    DIRECTORIES_WITH_FACES,
+    KEY_OF_AN_INPUT_PHOTO,
+    KEY_OF_THE_ACTIVE_PART_OF_THE_FACE,
+    KEY_OF_THE_FACE_ID,
+    KEY_OF_THE_PARTS_OF_THE_FACE,
+)
+
+PATH_OF_THE_USER_PHOTO = "./blog/dev/lips/Ariana_space_Grande.jpg"
+SWAPPED_PARTS_OF_THE_FACE = ["lips", "nose"]
+NUMBER_OF_REPEATS = 5
+
+
+def get_user_photo():
+    """
+    :return: the photo of a user (resized like the photos sent by users) converted to base64 with a prefix
+    :rtype: string - str
+    """
+    with Image.open(PATH_OF_THE_USER_PHOTO) as pil:
+        pil = pil.convert("RGB")
+        if not correct_size(img=pil):
+            pil = resize_img(img=pil)
+        return convert_img_to_base64(img=pil)
+
+
+def get_ids_of_examples():
+    """
+    :return: list of pairs: (part of the face, id of the first example face of this part)
+    :rtype: list - [] of tuples
+    """
+    return [
+        (part_of_face, DB_OBJECTS[part_of_face].objects.order_by("id").first().id)
+        for part_of_face in SWAPPED_PARTS_OF_THE_FACE
+    ]
+
+
+def swap_parts_in_one_request(client, input_photo, parts_of_face):
+    """
+    :param client: the client which sends the requests
+    :type client: django.test.Client
+    :param input_photo: base64-encoded image which has a special prefix
+    :type input_photo: string - str
+    :param parts_of_face: list of pairs: (part of the face, id of an example face)
+    :type parts_of_face: list - [] of tuples
+    :return: the returned photo (base64-encoded image which has a special prefix)
+    :rtype: string - str
+    """
+    response = client.post(
+        reverse("change_part_of_face"),
+        {
+            KEY_OF_AN_INPUT_PHOTO: input_photo,
+            KEY_OF_THE_PARTS_OF_THE_FACE: json.dumps(parts_of_face),
+        },
+    )
+    return response.json()["img_src"]
+
+
+def swap_parts_in_sequential_requests(client, input_photo, parts_of_face):
+    """
+    Every request is sent with the photo returned by the previous request.
+    :param client: the client which sends the requests
+    :type client: django.test.Client
+    :param input_photo: base64-encoded image which has a special prefix
+    :type input_photo: string - str
+    :param parts_of_face: list of pairs: (part of the face, id of an example face)
+    :type parts_of_face: list - [] of tuples
+    :return: the photo returned by the last request (base64-encoded image which has a special prefix)
+    :rtype: string - str
+    """
+    for part_of_face, face_id in parts_of_face:
+        response = client.post(
+            reverse("change_part_of_face"),
+            {
+                KEY_OF_AN_INPUT_PHOTO: input_photo,
+                KEY_OF_THE_ACTIVE_PART_OF_THE_FACE: part_of_face,
+                KEY_OF_THE_FACE_ID: face_id,
+            },
+        )
+        input_photo = response.json()["img_src"]
+    return input_photo
+
+
+def measure(function, input_photo, parts_of_face, number_of_repeats, new_photo):
+    """
+    :param function: 'swap_parts_in_one_request' or 'swap_parts_in_sequential_requests' (included in this file)
+    :type function: function
+    :param input_photo: base64-encoded image which has a special prefix
+    :type input_photo: string - str
+    :param parts_of_face: list of pairs: (part of the face, id of an example face)
+    :type parts_of_face: list - [] of tuples
+    :param number_of_repeats: number of measured calls of 'function'
+    :type number_of_repeats: integer - int
+    :param new_photo: param indicates if the photos of users are removed from the database
+    and the cache of the color indexes is cleared before every call
+    :type new_photo: bool (True or False)
+    :return: the median duration of a call in seconds
+    :rtype: float
+    """
+    client = Client()
+    # The first call starts the workers of the landmark detection and saves the photos.
+    function(client=client, input_photo=input_photo, parts_of_face=parts_of_face)
+
+    seconds = []
+    for _ in range(number_of_repeats):
+        if new_photo:
+            Photo.objects.all().delete()
+            ProcessUserPhoto.color_index_cache.clear()
+        start = perf_counter()
+        function(client=client, input_photo=input_photo, parts_of_face=parts_of_face)
+        seconds.append(perf_counter() - start)
+    return median(seconds)
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="Compares the request which swaps several parts of the face with sequential single-part requests."
+    )
+    parser.add_argument("--number-of-repeats", type=int, default=NUMBER_OF_REPEATS)
+    parser.add_argument("--output", help="path of the JSON file with the results")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments = parse_arguments()
+    setup_test_environment()
+    name_of_the_database = connection.creation.create_test_db(verbosity=0)
+    try:
+        for part_of_face in SWAPPED_PARTS_OF_THE_FACE:
+            SaveFacesIntoDB.save_faces_into_db(
+                part_of_face=part_of_face,
+                directory_containing_imgs=DIRECTORIES_WITH_FACES[part_of_face],
+            )
+        input_photo = get_user_photo()
+        parts_of_face = get_ids_of_examples()
+
+        results = []
+        for new_photo in (True, False):
+            seconds = {
+                name: measure(
+                    function=function,
+                    input_photo=input_photo,
+                    parts_of_face=parts_of_face,
+                    number_of_repeats=arguments.number_of_repeats,
+                    new_photo=new_photo,
+                )
+                for name, function in (
+                    ("one_request", swap_parts_in_one_request),
+                    ("sequential_requests", swap_parts_in_sequential_requests),
+                )
+            }
+            results.append(
+                {
+                    "new_photo": new_photo,
+                    "seconds_of_one_request": seconds["one_request"],
+                    "seconds_of_sequential_requests": seconds["sequential_requests"],
+                    "speedup": seconds["sequential_requests"] / seconds["one_request"],
+                }
+            )
+    finally:
+        connection.creation.destroy_test_db(name_of_the_database, verbosity=0)
+
+    report = {"parts_of_face": parts_of_face, "results": results}
+    if arguments.output:
+        with open(arguments.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
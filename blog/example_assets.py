@@ -0,0 +1,198 @@
+"""
+    This file contains the store of the example faces saved as '.npy' files.
+    Every example is saved in its own directory (an asset) named by the SHA-256 of the files of the asset:
+        rgb_array.npy - the whole example (the array has following shape(y, x, 3))
+        patch.npy - the bounding rectangle of the polygon of the swapped part of the face
+        origin.npy - coordinates (x, y) of the top left corner of the patch in the example
+        polygon.npy, cut_field.npy, control_points.npy - the endpoints of the part of the face
+        in the coordinates of the patch (the files of endpoints which are None aren't saved)
+    The arrays are opened as memory-mapped files, so all processes share the pages of the files.
+"""
+
+import os
+import shutil
+import tempfile
+from hashlib import sha256
+from io import BytesIO
+from types import MappingProxyType
+
+import numpy as np
+
+from apps.face_element_swapping.change_faces import ChangeFaceElement
+from apps.face_element_swapping.helpers import get_rectangle_in_an_image
+
+from .settings import DIRECTORY_OF_THE_EXAMPLE_ASSETS, VERSION_OF_THE_EXAMPLE_ASSETS
+
+NAMES_OF_THE_ENDPOINTS_OF_AN_ASSET = ("polygon", "cut_field", "control_points")
+EXTENSION_OF_THE_FILES_OF_AN_ASSET = ".npy"
+
+
+class ExampleAssetStore:
+    def __init__(self, directory=DIRECTORY_OF_THE_EXAMPLE_ASSETS):
+        """
+        :param directory: path to the directory which contains the assets
+        :type directory: string - str
+        """
+        self._directory = directory
+
+    @property
+    def directory(self):
+        return self._directory
+
+    def get_path_of_an_asset(self, asset_key):
+        """
+        :param asset_key: the result of calling the function 'save' (contained in this class)
+        :type asset_key: string - str
+        :return: path to the directory of the asset
+        :rtype: string - str
+        """
+        return os.path.join(self._directory, asset_key[:2], asset_key)
+
+    @staticmethod
+    def get_origin_of_the_patch(rgb_array, polygon):
+        """
+        :param rgb_array: an RGB image converted into a numpy array (the array has following shape(y, x, 3))
+        :type rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :param polygon: list or tuple of coordinates in 2D Space ([(x, y),(x, y),(x, y)...] or ((x, y),(x, y),(x, y)...))
+        :type polygon: list - [] or tuple - ()
+        :return: the bounding rectangle of the polygon - (x, y, width, height) or None if the rectangle
+        isn't contained in the image (then the whole image is used as the patch)
+        :rtype: tuple - () or None
+        """
+        x, y, width, height = ChangeFaceElement.get_bounding_rectangle_of_polygon(
+            polygon=polygon
+        )
+        if (
+            x < 0
+            or y < 0
+            or x + width > rgb_array.shape[1]
+            or y + height > rgb_array.shape[0]
+        ):
+            return None
+        return x, y, width, height
+
+    @staticmethod
+    def prepare_files_of_an_asset(rgb_array, endpoints):
+        """
+        The patch is cropped from the example like in the class 'ChangeFaceElement'
+        (from 'apps.face_element_swapping.change_faces'), so swapping the patch with the moved endpoints
+        gives exactly the same result as swapping the whole example.
+        :param rgb_array: an RGB image converted into a numpy array (the array has following shape(y, x, 3))
+        :type rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :param endpoints: dictionary with the keys: 'polygon', 'cut_field' and 'control_points'
+        (see the function 'prepare_params_to_face_swapping' of the class 'ProcessUserPhoto'
+        from the file 'process_user_data/swap_elements_of_face.py')
+        :type endpoints: dictionary - {} or types.MappingProxyType
+        :return: dictionary whose keys are the names of the files (without the extension) and values are arrays
+        :rtype: dictionary - {}
+        """
+        rgb_array = np.ascontiguousarray(rgb_array)
+        rectangle = ExampleAssetStore.get_origin_of_the_patch(
+            rgb_array=rgb_array, polygon=endpoints["polygon"]
+        )
+        if rectangle is None:
+            origin = (0, 0)
+            patch = rgb_array
+        else:
+            origin = rectangle[:2]
+            patch = get_rectangle_in_an_image(
+                np_array=rgb_array, bounding_rectangle_of_polygon=rectangle
+            )
+
+        files = {
+            "rgb_array": rgb_array,
+            "patch": np.ascontiguousarray(patch),
+            "origin": np.array(origin, dtype=np.int64),
+        }
+        for name in NAMES_OF_THE_ENDPOINTS_OF_AN_ASSET:
+            if endpoints[name]:
+                files[name] = np.array(endpoints[name]) - files["origin"]
+        return files
+
+    def save(self, rgb_array, endpoints):
+        """
+        This function saves the example into the store. An example saved before isn't saved again.
+        :param rgb_array: see the function 'prepare_files_of_an_asset' (contained in this class)
+        :param endpoints: see the function 'prepare_files_of_an_asset'
+        :return: key of the asset (64 hexadecimal digits)
+        :rtype: string - str
+        """
+        serialized_files = {}
+        for name, np_array in ExampleAssetStore.prepare_files_of_an_asset(
+            rgb_array=rgb_array, endpoints=endpoints
+        ).items():
+            buffer = BytesIO()
+            np.save(buffer, np_array, allow_pickle=False)
+            serialized_files[name] = buffer.getvalue()
+
+        digest = sha256(bytes((VERSION_OF_THE_EXAMPLE_ASSETS,)))
+        for name in sorted(serialized_files):
+            digest.update(name.encode() + b"\0")
+            digest.update(sha256(serialized_files[name]).digest())
+        asset_key = digest.hexdigest()
+
+        path_of_the_asset = self.get_path_of_an_asset(asset_key=asset_key)
+        if os.path.isdir(path_of_the_asset):
+            return asset_key
+
+        # The files are written into a temporary directory which is renamed at the end,
+        # so the processes never see an incomplete asset.
+        os.makedirs(os.path.dirname(path_of_the_asset), exist_ok=True)
+        temporary_directory = tempfile.mkdtemp(dir=os.path.dirname(path_of_the_asset))
+        try:
+            for name, serialized_file in serialized_files.items():
+                with open(
+                    os.path.join(
+                        temporary_directory, name + EXTENSION_OF_THE_FILES_OF_AN_ASSET
+                    ),
+                    "wb",
+                ) as file:
+                    file.write(serialized_file)
+            # The directories made by 'mkdtemp' can be read only by their owner.
+            os.chmod(temporary_directory, 0o755)
+            os.rename(temporary_directory, path_of_the_asset)
+        except OSError:
+            shutil.rmtree(temporary_directory, ignore_errors=True)
+            # The same asset may have been saved by another process in the meantime.
+            if not os.path.isdir(path_of_the_asset):
+                raise
+        return asset_key
+
+    def load(self, asset_key):
+        """
+        :param asset_key: the result of calling the function 'save' (contained in this class)
+        :type asset_key: string - str
+        :return: read-only dictionary with the keys: 'rgb_array' and 'patch' (read-only arrays mapped into memory),
+        'origin' - (x, y) and 'endpoints' (read-only dictionary with the keys: 'polygon', 'cut_field'
+        and 'control_points' in the coordinates of the patch)
+        :rtype: types.MappingProxyType
+        :raises FileNotFoundError: if the store doesn't contain the asset
+        """
+        path_of_the_asset = self.get_path_of_an_asset(asset_key=asset_key)
+
+        def load_file(name, mmap_mode=None):
+            path = os.path.join(
+                path_of_the_asset, name + EXTENSION_OF_THE_FILES_OF_AN_ASSET
+            )
+            if mmap_mode is None and not os.path.exists(path):
+                return None
+            return np.load(path, mmap_mode=mmap_mode, allow_pickle=False)
+
+        # 'numpy.asarray' returns a plain array which shares the memory of the memory-mapped file.
+        rgb_array = np.asarray(load_file(name="rgb_array", mmap_mode="r"))
+        patch = np.asarray(load_file(name="patch", mmap_mode="r"))
+        endpoints = {}
+        for name in NAMES_OF_THE_ENDPOINTS_OF_AN_ASSET:
+            points = load_file(name=name)
+            endpoints[name] = (
+                None if points is None else list(map(tuple, points.tolist()))
+            )
+
+        return MappingProxyType(
+            {
+                "rgb_array": rgb_array,
+                "patch": patch,
+                "origin": tuple(load_file(name="origin").tolist()),
+                "endpoints": MappingProxyType(endpoints),
+            }
+        )
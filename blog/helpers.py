@@ -1,21 +1,38 @@
-import json
+import struct
+import zlib
 from base64 import b64decode, b64encode
+from hashlib import sha256
 from io import BytesIO
 
+import cv2
 import numpy as np
 from PIL import Image
 
+from apps.face_element_swapping.perceptual_hash import (
+    NUMBER_OF_BITS_OF_THE_PERCEPTUAL_HASH,
+)
+
 from .settings import (
     BASE64_PREFIXES_ACCORDING_TO_FILE_EXTENSIONS,
+    COMPRESSION_OF_THE_SERIALIZED_RGB_ARRAYS,
+    COMPRESSIONS_OF_THE_SERIALIZED_RGB_ARRAYS,
     DEFAULT_PIL_MODE,
     DEFAULT_RESIZING_FILTER,
     FILE_EXTENSIONS_ACCORDING_TO_PIL_MODES,
+    LEVEL_OF_THE_PNG_COMPRESSION_OF_RGB_ARRAYS,
+    LEVEL_OF_THE_ZLIB_COMPRESSION_OF_RGB_ARRAYS,
     MAXIMUM_NUMBER_OF_PIXELS,
     MAXIMUM_SIDE_LENGTH,
     PIL_MODE_OF_TRANSPARENT_PHOTOS,
     SPECIAL_SIGNS_IN_FILE_NAMES,
+    VERSION_OF_THE_SERIALIZED_RGB_ARRAYS,
 )
 
+# version, compression, length of the dtype, number of dimensions
+# (followed by the dtype and the dimensions saved as 32-bit integers)
+FORMAT_OF_THE_HEADER_OF_SERIALIZED_RGB_ARRAYS = "<BBBB"
+FORMAT_OF_A_DIMENSION_OF_SERIALIZED_RGB_ARRAYS = "<I"
+
 
 def convert_img_to_base64(img):
     """
@@ -61,6 +78,19 @@ def remove_prefix_from_base64(base64_with_prefix):
     return base64_with_prefix.split(',')[1]
 
 
+def get_digest_of_a_photo(photo_in_base64):
+    """
+    The digest identifies the photos saved in the database, so they are found via an index of fixed-size values
+    instead of comparing base64-encoded photos.
+    :param photo_in_base64: an image converted to base64.
+    The string doesn't have any prefix.
+    :type photo_in_base64: string - str
+    :return: SHA-256 of the decoded image (64 hexadecimal digits)
+    :rtype: string - str
+    """
+    return sha256(b64decode(photo_in_base64)).hexdigest()
+
+
 def replace_special_signs(file_name):
     """
     This function replaces special signs (keys of the SPECIAL_SIGNS_IN_FILE_NAMES dictionary)
@@ -104,31 +134,131 @@ def convert_base64_to_pil(photo_in_base64):
     return pil
 
 
-def convert_rgb_array_to_text(rgb_array):
+def convert_rgb_array_to_bytes(
+    rgb_array, compression=COMPRESSION_OF_THE_SERIALIZED_RGB_ARRAYS
+):
     """
-    This function converts a numpy array to a (nested) Python list
-    and then converts the list to a string by using the function named 'dumps' from the 'json' module.
-    (https://docs.python.org/3/library/json.html#json.dumps).
+    This function serializes a numpy array into a header (the version of the format, the compression,
+    the dtype and the shape of the array) followed by the payload compressed by the passed method.
     :param rgb_array: an RGB image converted into a numpy array (the array has following shape(y, x, 3))
     :type rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
-    :return: a (nested) Python list, which previously was a numpy array, converted to a string
-    :rtype: string - str
+    :param compression: one of the keys of the COMPRESSIONS_OF_THE_SERIALIZED_RGB_ARRAYS dictionary
+    (from the file '.settings'). The compression 'png' supports only arrays of 8-bit or 16-bit unsigned integers
+    with 1, 3 or 4 channels.
+    :type compression: string - str
+    :return: the serialized array
+    :rtype: bytes
+    :raises ValueError: if the compression isn't available or it doesn't support the passed array
     """
-    return json.dumps(rgb_array.tolist())
+    if compression not in COMPRESSIONS_OF_THE_SERIALIZED_RGB_ARRAYS:
+        available_compressions = ", ".join(
+            map(
+                lambda key: "'" + str(key) + "'",
+                COMPRESSIONS_OF_THE_SERIALIZED_RGB_ARRAYS.keys(),
+            )
+        )
+        raise ValueError(
+            "The provided compression ('{compression}') is not available. "
+            "Available compressions: {available_compressions}.".format(
+                compression=compression, available_compressions=available_compressions
+            )
+        )
+
+    rgb_array = np.ascontiguousarray(rgb_array)
+    if compression == "png":
+        if (
+            rgb_array.dtype not in (np.uint8, np.uint16)
+            or rgb_array.ndim not in (2, 3)
+            or (rgb_array.ndim == 3 and rgb_array.shape[2] not in (1, 3, 4))
+        ):
+            raise ValueError(
+                "The compression 'png' supports only arrays of 8-bit or 16-bit unsigned integers "
+                "with 1, 3 or 4 channels. The passed array has the dtype '{dtype}' "
+                "and the shape {shape}.".format(dtype=rgb_array.dtype, shape=rgb_array.shape)
+            )
+        # The channels are saved in the order of the array (PNG is used only as a lossless container),
+        # so the decoded array doesn't have to be converted.
+        _, payload = cv2.imencode(
+            ".png",
+            rgb_array,
+            [cv2.IMWRITE_PNG_COMPRESSION, LEVEL_OF_THE_PNG_COMPRESSION_OF_RGB_ARRAYS],
+        )
+        payload = payload.tobytes()
+    elif compression == "zlib":
+        payload = zlib.compress(
+            rgb_array.data, LEVEL_OF_THE_ZLIB_COMPRESSION_OF_RGB_ARRAYS
+        )
+    else:
+        payload = rgb_array.tobytes()
+
+    dtype = rgb_array.dtype.str.encode()
+    header = struct.pack(
+        FORMAT_OF_THE_HEADER_OF_SERIALIZED_RGB_ARRAYS,
+        VERSION_OF_THE_SERIALIZED_RGB_ARRAYS,
+        COMPRESSIONS_OF_THE_SERIALIZED_RGB_ARRAYS[compression],
+        len(dtype),
+        rgb_array.ndim,
+    )
+    dimensions = b"".join(
+        struct.pack(FORMAT_OF_A_DIMENSION_OF_SERIALIZED_RGB_ARRAYS, dimension)
+        for dimension in rgb_array.shape
+    )
+    return header + dtype + dimensions + payload
 
 
-def convert_text_to_rgb_array(text, np_dtype=np.uint8):
+def convert_bytes_to_rgb_array(data):
     """
-    This function has the opposite effect to the 'convert_rgb_array_to_text' function (also included in this file).
-    It converts a string, which was made by the function named 'dumps' from the 'json' module, to
-    a (nested) Python list. Then this Python list is converted to a numpy array which has a specific dtype('np_dtype').
-    :param text: a (nested) Python list, which previously was a numpy array, converted to a string
-    :type text: string - str
-    :param np_dtype: numpy type (https://www.numpy.org/devdocs/user/basics.types.html)
-    :return: a numpy array which has a specific dtype ('np_dtype')
+    This function has the opposite effect to the 'convert_rgb_array_to_bytes' function (also included in this file).
+    The array is made directly from the buffer of the payload, so the payload of the compression 'raw'
+    isn't copied at all. The returned array is read-only.
+    :param data: the result of calling the function 'convert_rgb_array_to_bytes'
+    :type data: bytes or memoryview
+    :return: the deserialized array
     :rtype: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    :raises ValueError: if 'data' isn't an array serialized in the current version of the format
     """
-    return np.asanyarray(json.loads(text), dtype=np_dtype)
+    data = memoryview(data)
+    size_of_the_header = struct.calcsize(FORMAT_OF_THE_HEADER_OF_SERIALIZED_RGB_ARRAYS)
+    size_of_a_dimension = struct.calcsize(FORMAT_OF_A_DIMENSION_OF_SERIALIZED_RGB_ARRAYS)
+    compressions = {
+        value: key for key, value in COMPRESSIONS_OF_THE_SERIALIZED_RGB_ARRAYS.items()
+    }
+    if (
+        data.nbytes < size_of_the_header
+        or data[0] != VERSION_OF_THE_SERIALIZED_RGB_ARRAYS
+        or data[1] not in compressions
+    ):
+        raise ValueError(
+            "The passed data are not an array serialized in the version {version}.".format(
+                version=VERSION_OF_THE_SERIALIZED_RGB_ARRAYS
+            )
+        )
+
+    _, compression, length_of_the_dtype, number_of_dimensions = struct.unpack_from(
+        FORMAT_OF_THE_HEADER_OF_SERIALIZED_RGB_ARRAYS, data
+    )
+    offset = size_of_the_header + length_of_the_dtype
+    dtype = np.dtype(data[size_of_the_header:offset].tobytes().decode())
+    shape = tuple(
+        struct.unpack_from(
+            FORMAT_OF_A_DIMENSION_OF_SERIALIZED_RGB_ARRAYS,
+            data,
+            offset + idx * size_of_a_dimension,
+        )[0]
+        for idx in range(number_of_dimensions)
+    )
+    payload = data[offset + number_of_dimensions * size_of_a_dimension :]
+
+    if compressions[compression] == "png":
+        rgb_array = cv2.imdecode(
+            np.frombuffer(payload, dtype=np.uint8), cv2.IMREAD_UNCHANGED
+        ).reshape(shape)
+    elif compressions[compression] == "zlib":
+        rgb_array = np.frombuffer(zlib.decompress(payload), dtype=dtype).reshape(shape)
+    else:
+        rgb_array = np.frombuffer(payload, dtype=dtype).reshape(shape)
+    rgb_array.flags.writeable = False
+    return rgb_array
 
 
 def convert_pil_to_np_array(pil, np_dtype=np.uint8):
@@ -190,3 +320,29 @@ def resize_img(
         new_width = maximum_side_length
     img = img.resize((new_height, new_width), resizing_filter)
     return img
+
+
+def convert_perceptual_hash_to_a_signed_integer(perceptual_hash):
+    """
+    The database stores 64-bit signed integers, so the most significant bit of the hash becomes the sign bit.
+    :param perceptual_hash: the result of calling the function 'get_difference_hash'
+    (from 'apps.face_element_swapping.perceptual_hash')
+    :type perceptual_hash: integer - int
+    :return: the hash interpreted as a signed integer
+    :rtype: integer - int
+    """
+    if perceptual_hash >> (NUMBER_OF_BITS_OF_THE_PERCEPTUAL_HASH - 1):
+        return perceptual_hash - (1 << NUMBER_OF_BITS_OF_THE_PERCEPTUAL_HASH)
+    return perceptual_hash
+
+
+def convert_signed_integer_to_a_perceptual_hash(signed_integer):
+    """
+    This function has the opposite effect to the 'convert_perceptual_hash_to_a_signed_integer' function
+    (also included in this file).
+    :param signed_integer: a perceptual hash interpreted as a signed integer
+    :type signed_integer: integer - int
+    :return: the perceptual hash
+    :rtype: integer - int
+    """
+    return signed_integer & ((1 << NUMBER_OF_BITS_OF_THE_PERCEPTUAL_HASH) - 1)
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('blog', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='partofface',
+            name='landmarks',
+            field=models.BinaryField(blank=True, default=None, null=True),
+        ),
+        migrations.AddField(
+            model_name='photo',
+            name='landmarks',
+            field=models.BinaryField(blank=True, default=None, null=True),
+        ),
+        migrations.AlterField(
+            model_name='partofface',
+            name='face_landmarks',
+            field=models.TextField(blank=True, default=None, null=True),
+        ),
+    ]
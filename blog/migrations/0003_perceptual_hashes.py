@@ -0,0 +1,50 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('blog', '0002_binary_landmarks'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='photo',
+            name='perceptual_hash',
+            field=models.BigIntegerField(blank=True, default=None, null=True),
+        ),
+        migrations.AddField(
+            model_name='photo',
+            name='thumbnail',
+            field=models.BinaryField(blank=True, default=None, null=True),
+        ),
+        migrations.CreateModel(
+            name='PerceptualHashBand',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(primary_key=True, serialize=False, unique=True),
+                ),
+                ('index_of_the_band', models.SmallIntegerField()),
+                ('value_of_the_band', models.IntegerField()),
+                (
+                    'photo',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='perceptual_hash_bands',
+                        to='blog.photo',
+                    ),
+                ),
+            ],
+            options={
+                'indexes': [
+                    models.Index(
+                        fields=['index_of_the_band', 'value_of_the_band'],
+                        name='blog_percep_index_o_51e2f1_idx',
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,170 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:05
+
+import json
+import struct
+import zlib
+
+import cv2
+import numpy as np
+from django.db import migrations, models
+
+NAMES_OF_THE_MODELS_WITH_RGB_ARRAYS = ['Photo', 'PartOfFace']
+# The rows are read in chunks, because every decoded array of an old row takes a few megabytes.
+NUMBER_OF_ROWS_IN_A_CHUNK = 16
+
+# The format of the serialized arrays is frozen here (the version 1 of the format from the file 'blog/helpers.py'),
+# so this migration doesn't depend on the current code and settings of the application.
+VERSION_OF_THE_SERIALIZED_RGB_ARRAYS = 1
+COMPRESSIONS_OF_THE_SERIALIZED_RGB_ARRAYS = {'raw': 0, 'zlib': 1, 'png': 2}
+LEVEL_OF_THE_ZLIB_COMPRESSION_OF_RGB_ARRAYS = 1
+FORMAT_OF_THE_HEADER_OF_SERIALIZED_RGB_ARRAYS = '<BBBB'
+FORMAT_OF_A_DIMENSION_OF_SERIALIZED_RGB_ARRAYS = '<I'
+
+
+def convert_text_to_bytes(text):
+    """
+    :param text: an array saved as a (nested) Python list converted to a string by the function 'dumps'
+    from the 'json' module
+    :type text: string - str
+    :return: the array of 8-bit unsigned integers serialized in the version 1 of the format
+    with the compression 'zlib'
+    :rtype: bytes
+    """
+    rgb_array = np.ascontiguousarray(np.asanyarray(json.loads(text), dtype=np.uint8))
+    dtype = rgb_array.dtype.str.encode()
+    header = struct.pack(
+        FORMAT_OF_THE_HEADER_OF_SERIALIZED_RGB_ARRAYS,
+        VERSION_OF_THE_SERIALIZED_RGB_ARRAYS,
+        COMPRESSIONS_OF_THE_SERIALIZED_RGB_ARRAYS['zlib'],
+        len(dtype),
+        rgb_array.ndim,
+    )
+    dimensions = b''.join(
+        struct.pack(FORMAT_OF_A_DIMENSION_OF_SERIALIZED_RGB_ARRAYS, dimension)
+        for dimension in rgb_array.shape
+    )
+    payload = zlib.compress(rgb_array.data, LEVEL_OF_THE_ZLIB_COMPRESSION_OF_RGB_ARRAYS)
+    return header + dtype + dimensions + payload
+
+
+def convert_bytes_to_text(data):
+    """
+    This function has the opposite effect to the 'convert_text_to_bytes' function (also included in this file).
+    It reads the arrays serialized in the version 1 of the format with any of its compressions.
+    :param data: a serialized array
+    :type data: bytes or memoryview
+    :return: the array converted to a (nested) Python list and then to a string
+    :rtype: string - str
+    """
+    data = memoryview(data)
+    size_of_the_header = struct.calcsize(FORMAT_OF_THE_HEADER_OF_SERIALIZED_RGB_ARRAYS)
+    size_of_a_dimension = struct.calcsize(FORMAT_OF_A_DIMENSION_OF_SERIALIZED_RGB_ARRAYS)
+    _, compression, length_of_the_dtype, number_of_dimensions = struct.unpack_from(
+        FORMAT_OF_THE_HEADER_OF_SERIALIZED_RGB_ARRAYS, data
+    )
+    offset = size_of_the_header + length_of_the_dtype
+    dtype = np.dtype(data[size_of_the_header:offset].tobytes().decode())
+    shape = tuple(
+        struct.unpack_from(
+            FORMAT_OF_A_DIMENSION_OF_SERIALIZED_RGB_ARRAYS,
+            data,
+            offset + idx * size_of_a_dimension,
+        )[0]
+        for idx in range(number_of_dimensions)
+    )
+    payload = data[offset + number_of_dimensions * size_of_a_dimension:]
+    if compression == COMPRESSIONS_OF_THE_SERIALIZED_RGB_ARRAYS['png']:
+        rgb_array = cv2.imdecode(
+            np.frombuffer(payload, dtype=np.uint8), cv2.IMREAD_UNCHANGED
+        ).reshape(shape)
+    elif compression == COMPRESSIONS_OF_THE_SERIALIZED_RGB_ARRAYS['zlib']:
+        rgb_array = np.frombuffer(zlib.decompress(payload), dtype=dtype).reshape(shape)
+    else:
+        rgb_array = np.frombuffer(payload, dtype=dtype).reshape(shape)
+    return json.dumps(rgb_array.tolist())
+
+
+def convert_text_of_rgb_arrays_to_bytes(apps, schema_editor):
+    """
+    This function serializes the arrays saved as text (a nested Python list converted to a string)
+    (see the function 'convert_text_to_bytes' included in this file).
+    """
+    for name_of_the_model in NAMES_OF_THE_MODELS_WITH_RGB_ARRAYS:
+        model = apps.get_model('blog', name_of_the_model)
+        rows = (
+            model.objects.exclude(rgb_array=None)
+            .values_list('id', 'rgb_array')
+            .iterator(chunk_size=NUMBER_OF_ROWS_IN_A_CHUNK)
+        )
+        for row_id, text in rows:
+            model.objects.filter(id=row_id).update(
+                serialized_rgb_array=convert_text_to_bytes(text=text)
+            )
+
+
+def convert_bytes_of_rgb_arrays_to_text(apps, schema_editor):
+    """
+    This function has the opposite effect to the 'convert_text_of_rgb_arrays_to_bytes' function
+    (also included in this file).
+    """
+    for name_of_the_model in NAMES_OF_THE_MODELS_WITH_RGB_ARRAYS:
+        model = apps.get_model('blog', name_of_the_model)
+        rows = (
+            model.objects.exclude(serialized_rgb_array=None)
+            .values_list('id', 'serialized_rgb_array')
+            .iterator(chunk_size=NUMBER_OF_ROWS_IN_A_CHUNK)
+        )
+        for row_id, data in rows:
+            model.objects.filter(id=row_id).update(
+                rgb_array=convert_bytes_to_text(data=data)
+            )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('blog', '0003_perceptual_hashes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='partofface',
+            name='serialized_rgb_array',
+            field=models.BinaryField(blank=True, default=None, null=True),
+        ),
+        migrations.AddField(
+            model_name='photo',
+            name='serialized_rgb_array',
+            field=models.BinaryField(blank=True, default=None, null=True),
+        ),
+        migrations.AlterField(
+            model_name='partofface',
+            name='rgb_array',
+            field=models.TextField(blank=True, default=None, null=True),
+        ),
+        migrations.RunPython(
+            convert_text_of_rgb_arrays_to_bytes, convert_bytes_of_rgb_arrays_to_text
+        ),
+        migrations.RemoveField(
+            model_name='partofface',
+            name='rgb_array',
+        ),
+        migrations.RemoveField(
+            model_name='photo',
+            name='rgb_array',
+        ),
+        migrations.RenameField(
+            model_name='partofface',
+            old_name='serialized_rgb_array',
+            new_name='rgb_array',
+        ),
+        migrations.RenameField(
+            model_name='photo',
+            old_name='serialized_rgb_array',
+            new_name='rgb_array',
+        ),
+        migrations.AlterField(
+            model_name='partofface',
+            name='rgb_array',
+            field=models.BinaryField(),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:40
+
+from base64 import b64decode
+from hashlib import sha256
+
+from django.db import migrations, models
+
+# The rows are read in chunks, because every photo converted to base64 takes up to a few megabytes.
+NUMBER_OF_ROWS_IN_A_CHUNK = 64
+
+
+def get_digest_of_a_photo(photo_in_base64):
+    """
+    The digest is frozen here, so this migration doesn't depend on the current code of the application.
+    :param photo_in_base64: an image converted to base64 (without any prefix)
+    :type photo_in_base64: string - str
+    :return: SHA-256 of the decoded image (64 hexadecimal digits)
+    :rtype: string - str
+    """
+    return sha256(b64decode(photo_in_base64)).hexdigest()
+
+
+def save_digests_of_photos(apps, schema_editor):
+    """
+    This function saves the digests of the saved photos (see the function 'get_digest_of_a_photo'
+    included in this file). The photos were saved without a unique column,
+    so only the first of the rows containing the same photo is kept.
+    """
+    Photo = apps.get_model('blog', 'Photo')
+    saved_digests = set()
+    ids_of_duplicates = []
+    rows = (
+        Photo.objects.order_by('id')
+        .values_list('id', 'photo_in_base64')
+        .iterator(chunk_size=NUMBER_OF_ROWS_IN_A_CHUNK)
+    )
+    for row_id, photo_in_base64 in rows:
+        photo_digest = get_digest_of_a_photo(photo_in_base64=photo_in_base64)
+        if photo_digest in saved_digests:
+            ids_of_duplicates.append(row_id)
+        else:
+            saved_digests.add(photo_digest)
+            Photo.objects.filter(id=row_id).update(photo_digest=photo_digest)
+    Photo.objects.filter(id__in=ids_of_duplicates).delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('blog', '0004_binary_rgb_arrays'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='photo',
+            name='photo_digest',
+            field=models.CharField(blank=True, default=None, max_length=64, null=True),
+        ),
+        migrations.RunPython(save_digests_of_photos, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='photo',
+            name='photo_digest',
+            field=models.CharField(max_length=64, unique=True),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-18 21:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('blog', '0005_photo_digests'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersionOfTheExampleFaces',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(primary_key=True, serialize=False, unique=True),
+                ),
+                ('version', models.CharField(max_length=32)),
+            ],
+        ),
+    ]
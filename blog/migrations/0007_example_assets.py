@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('blog', '0006_version_of_the_example_faces'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='partofface',
+            name='asset_key',
+            field=models.CharField(blank=True, default=None, max_length=64, null=True),
+        ),
+    ]
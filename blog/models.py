@@ -3,6 +3,7 @@ from django.utils import timezone
 
 from .settings import (
     DESC_OF_PART_OF_FACE_IN_DB,
+    DESC_OF_PERCEPTUAL_HASH_BAND_IN_DB,
     DESC_OF_PHOTO_IN_DB,
     FORMAT_OF_DATE_IN_DB,
 )
@@ -19,9 +20,13 @@ class Photo(models.Model):
        photo_in_base64 - user photo which was converted to base64
        :type photo_in_base64: string
 
-       rgb_array - user photo converted into an nested Python list with the shape (height x width x 3).
-       This array should contain RGB values and must be converted to a string.
-       :type rgb_array: string
+       photo_digest - SHA-256 of the decoded photo generated by the function 'get_digest_of_a_photo'
+                      (from the file '.helpers'). The photos are looked up via this column.
+       :type photo_digest: string with 64 hexadecimal digits
+
+       rgb_array - user photo converted into a numpy array with the shape (height x width x 3)
+                   and serialized by the function 'convert_rgb_array_to_bytes' (from the file '.helpers').
+       :type rgb_array: bytes
 
        transparent_pixels: list of dictionaries.
        Each of these dictionaries has the following keys: 'row_idx', 'column_idx', 'value'.
@@ -33,18 +38,35 @@ class Photo(models.Model):
 
        face_landmarks - dictionary of characteristic points of the specific parts of the face.
                         The dictionary must be converted to a string.
+                        It is saved only in the rows which don't have the column 'landmarks'.
        :type face_landmarks: string
 
+       landmarks - all 68 landmarks of the face serialized by the function 'to_bytes'
+                   of the class 'FaceLandmarks' (from 'apps.face_element_swapping.endpoints').
+       :type landmarks: bytes
+
+       perceptual_hash - the difference hash of the photo generated by the function 'get_difference_hash'
+                         (from 'apps.face_element_swapping.perceptual_hash') and converted to a signed integer.
+       :type perceptual_hash: integer - int
+
+       thumbnail - the thumbnail of the photo generated by the function 'get_thumbnail'
+                   (from 'apps.face_element_swapping.perceptual_hash').
+       :type thumbnail: bytes
+
        timestamp - date of entry of the photo into the database.
        :type timestamp: class named 'datetime' from the library named 'datetime'.
     """
 
     id = models.AutoField(primary_key=True, unique=True)
     photo_in_base64 = models.TextField()
-    rgb_array = models.TextField(default=None, blank=True, null=True)
+    photo_digest = models.CharField(max_length=64, unique=True)
+    rgb_array = models.BinaryField(default=None, blank=True, null=True)
     transparent_pixels = models.TextField(default=None, blank=True, null=True)
     number_of_detected_faces = models.IntegerField()
     face_landmarks = models.TextField(default=None, blank=True, null=True)
+    landmarks = models.BinaryField(default=None, blank=True, null=True)
+    perceptual_hash = models.BigIntegerField(default=None, blank=True, null=True)
+    thumbnail = models.BinaryField(default=None, blank=True, null=True)
     timestamp = models.DateTimeField(default=timezone.now)
 
     def __str__(self):
@@ -53,6 +75,44 @@ class Photo(models.Model):
         )
 
 
+class PerceptualHashBand(models.Model):
+    """
+    Database table responsible for finding user photos with similar perceptual hashes.
+    Every photo has one row for every band of its perceptual hash, so photos whose hashes differ
+    by less bits than the number of bands share at least one row with the same band.
+    This table has the following columns:
+
+       id - unique row key (generated automatically)
+       :type id: int
+
+       photo - the photo which has the perceptual hash
+       :type photo: an instance of the 'Photo' class
+
+       index_of_the_band - index of the band in the hash (the first band contains the most significant bits)
+       :type index_of_the_band: integer - int
+
+       value_of_the_band - the bits of the band
+       :type value_of_the_band: integer - int
+    """
+
+    id = models.AutoField(primary_key=True, unique=True)
+    photo = models.ForeignKey(
+        Photo, on_delete=models.CASCADE, related_name="perceptual_hash_bands"
+    )
+    index_of_the_band = models.SmallIntegerField()
+    value_of_the_band = models.IntegerField()
+
+    class Meta:
+        indexes = [models.Index(fields=["index_of_the_band", "value_of_the_band"])]
+
+    def __str__(self):
+        return DESC_OF_PERCEPTUAL_HASH_BAND_IN_DB.format(
+            photo_id=self.photo_id,
+            index=self.index_of_the_band,
+            value=self.value_of_the_band,
+        )
+
+
 class PartOfFace(models.Model):
     """
     Database table responsible for storing photos concerning the specific part of the face.
@@ -67,14 +127,25 @@ class PartOfFace(models.Model):
        photo_in_base64 - the photo converted to base64
        :type photo_in_base64: string
 
-       rgb_array - the photo converted into an nested Python list with the shape (height x width x 3).
-       This array contains RGB values and was converted to a string.
-       :type rgb_array: string
+       rgb_array - the photo converted into a numpy array with the shape (height x width x 3)
+                   and serialized by the function 'convert_rgb_array_to_bytes' (from the file '.helpers').
+       :type rgb_array: bytes
+
+       asset_key - key of the asset containing the photo and the endpoints of the part of the face
+                   in the store represented by the class 'ExampleAssetStore' (from the file '.example_assets').
+                   The asset is only a copy of the row, so it is built again from the row if it is missing
+                   and the key is cleared whenever the row is edited (see the file '.signals').
+       :type asset_key: string with 64 hexadecimal digits
 
        face_landmarks - dictionary of characteristic points of the specific parts of the face
                         The dictionary was converted to a string.
+                        It is saved only in the rows which don't have the column 'landmarks'.
        :type face_landmarks: string
 
+       landmarks - all 68 landmarks of the face serialized by the function 'to_bytes'
+                   of the class 'FaceLandmarks' (from 'apps.face_element_swapping.endpoints').
+       :type landmarks: bytes
+
        timestamp - date of entry of the photo into the database.
        :type timestamp: class named 'datetime' from the library named 'datetime'.
     """
@@ -82,8 +153,10 @@ class PartOfFace(models.Model):
     id = models.AutoField(primary_key=True, unique=True)
     photo_name = models.CharField(max_length=100)
     photo_in_base64 = models.TextField()
-    rgb_array = models.TextField()
-    face_landmarks = models.TextField()
+    rgb_array = models.BinaryField()
+    asset_key = models.CharField(max_length=64, default=None, blank=True, null=True)
+    face_landmarks = models.TextField(default=None, blank=True, null=True)
+    landmarks = models.BinaryField(default=None, blank=True, null=True)
     timestamp = models.DateTimeField(default=timezone.now)
 
     def __str__(self):
@@ -108,4 +181,25 @@ class ExampleNose(PartOfFace):
     pass
 
 
+class VersionOfTheExampleFaces(models.Model):
+    """
+    Database table with a single row containing the version of the example faces.
+    The version is changed after an example face has been saved or deleted (see the file '.signals'),
+    so all processes which keep the example faces in memory can find out that they have been changed.
+    This table has the following columns:
+
+       id - unique row key (the row has the id 'ID_OF_THE_VERSION_OF_THE_EXAMPLE_FACES' from the file '.settings')
+       :type id: int
+
+       version - random hexadecimal digits generated after every change of the example faces
+       :type version: string with 32 hexadecimal digits
+    """
+
+    id = models.AutoField(primary_key=True, unique=True)
+    version = models.CharField(max_length=32)
+
+    def __str__(self):
+        return self.version
+
+
 DB_OBJECTS = {"lips": ExampleLip, "nose": ExampleNose}
@@ -0,0 +1,118 @@
+"""
+    This file contains the cache of the example faces kept in memory by every process.
+    The examples are saved in the cache decoded (read-only arrays and endpoints),
+    so a swap of an example doesn't read the database at all.
+"""
+
+from threading import Lock
+
+from ..db_func import DBFunc
+
+
+class ExampleFaceCache:
+    def __init__(self):
+        """
+        The keys of the cache are pairs: (part of the face, id of an example face).
+        All examples are removed from the cache when the version of the example faces
+        (see the function 'get_version_of_the_example_faces' of the class 'DBFunc' from the file '../db_func.py')
+        is changed, i.e. after an example has been saved or deleted by any process.
+        """
+        self._example_faces = {}
+        self._version = None
+        self._hits = 0
+        self._misses = 0
+        self._lock = Lock()
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def misses(self):
+        return self._misses
+
+    def __len__(self):
+        return len(self._example_faces)
+
+    def _update_version(self, version):
+        """
+        This function removes all examples from the cache if the version of the example faces has been changed.
+        It must be called with the lock acquired.
+        :param version: the current version of the example faces
+        (see the function 'get_version_of_the_example_faces' of the class 'DBFunc' from the file '../db_func.py')
+        :type version: string - str or None
+        """
+        if version != self._version:
+            self._example_faces.clear()
+            self._version = version
+
+    def get(self, part_of_face, row_id, load_example_face):
+        """
+        The version of the example faces is read from the database once per call.
+        :param part_of_face: a specific part of the face
+        :type part_of_face: string - str
+        :param row_id: id of an example face stored in our database
+        :type row_id: integer - int or string - str
+        :param load_example_face: function called with the parameters 'part_of_face' and 'row_id'
+        if the example isn't in the cache. It returns the example or None if the example doesn't exist.
+        :type load_example_face: function
+        :return: the result of calling 'load_example_face' (possibly cached before)
+        """
+        key = (part_of_face, int(row_id))
+        version = DBFunc.get_version_of_the_example_faces()
+        with self._lock:
+            self._update_version(version=version)
+            example_face = self._example_faces.get(key)
+            if example_face is not None:
+                self._hits += 1
+                return example_face
+            self._misses += 1
+
+        example_face = load_example_face(part_of_face=part_of_face, row_id=row_id)
+        if example_face is not None:
+            with self._lock:
+                # An example changed while it was loaded is saved with the old version,
+                # so it is removed by the next call, which reads the new version.
+                if self._version == version:
+                    self._example_faces[key] = example_face
+        return example_face
+
+    def preload(self, load_example_faces):
+        """
+        :param load_example_faces: function which returns a dictionary of all examples
+        (the keys are pairs: (part of the face, id of an example face))
+        :type load_example_faces: function
+        """
+        version = DBFunc.get_version_of_the_example_faces()
+        with self._lock:
+            self._update_version(version=version)
+
+        example_faces = load_example_faces()
+        with self._lock:
+            if self._version == version:
+                self._example_faces.update(example_faces)
+
+    def get_statistics(self):
+        """
+        :return: dictionary with the following keys: 'hits', 'misses', 'hit_rate', 'number_of_example_faces'
+        :rtype: dictionary - {}
+        """
+        with self._lock:
+            number_of_requests = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / number_of_requests
+                if number_of_requests
+                else 0.0,
+                "number_of_example_faces": len(self._example_faces),
+            }
+
+    def clear(self):
+        """
+        This function removes all examples from the cache and resets its counters.
+        """
+        with self._lock:
+            self._example_faces.clear()
+            self._hits = 0
+            self._misses = 0
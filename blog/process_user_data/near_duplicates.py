@@ -0,0 +1,118 @@
+"""
+    This file contains the reuse of the landmarks of saved user photos in their near duplicates,
+    e.g. in the same photo encoded again by a browser or slightly cropped.
+"""
+
+from threading import Lock
+
+from apps.face_element_swapping.endpoints import FaceLandmarks
+from apps.face_element_swapping.perceptual_hash import (
+    align_landmarks,
+    get_alignment_of_near_duplicates,
+)
+from apps.face_element_swapping.settings import (
+    MAXIMUM_HAMMING_DISTANCE_OF_NEAR_DUPLICATES,
+)
+
+from ..db_func import DBFunc
+from ..settings import MAXIMUM_NUMBER_OF_ALIGNED_NEAR_DUPLICATES
+
+
+class NearDuplicateStatistics:
+    def __init__(self):
+        """
+        Every lookup of a near duplicate is counted as exactly one of:
+        a hit (the landmarks have been reused), a rejection (near duplicates have been found,
+        but none of them has been aligned reliably) or a miss (no near duplicate has been found).
+        """
+        self._hits = 0
+        self._rejections = 0
+        self._misses = 0
+        self._lock = Lock()
+
+    def add_hit(self):
+        with self._lock:
+            self._hits += 1
+
+    def add_rejection(self):
+        with self._lock:
+            self._rejections += 1
+
+    def add_miss(self):
+        with self._lock:
+            self._misses += 1
+
+    def get_statistics(self):
+        """
+        :return: dictionary with the following keys: 'lookups', 'hits', 'rejections', 'misses', 'hit_rate'
+        :rtype: dictionary - {}
+        """
+        with self._lock:
+            number_of_lookups = self._hits + self._rejections + self._misses
+            return {
+                "lookups": number_of_lookups,
+                "hits": self._hits,
+                "rejections": self._rejections,
+                "misses": self._misses,
+                "hit_rate": self._hits / number_of_lookups
+                if number_of_lookups
+                else 0.0,
+            }
+
+    def clear(self):
+        """
+        This function resets the counters.
+        """
+        with self._lock:
+            self._hits = 0
+            self._rejections = 0
+            self._misses = 0
+
+
+def get_landmarks_of_a_near_duplicate(
+    rgb_array, perceptual_hash, thumbnail, near_duplicate_statistics
+):
+    """
+    This function looks for saved user photos whose perceptual hashes are close to 'perceptual_hash',
+    aligns them with the photo and moves the landmarks of the nearest aligned photo to the photo.
+    The alignment verifies the near duplicates, e.g. a different photo with a similar hash can't be aligned.
+    :param rgb_array: an RGB image converted into a numpy array (the array has following shape(y, x, 3))
+    :type rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    :param perceptual_hash: the result of calling the function 'get_difference_hash' for 'rgb_array'
+    (from 'apps.face_element_swapping.perceptual_hash')
+    :type perceptual_hash: integer - int
+    :param thumbnail: the result of calling the function 'get_thumbnail' for 'rgb_array'
+    (from 'apps.face_element_swapping.perceptual_hash')
+    :type thumbnail: bytes
+    :param near_duplicate_statistics: the statistics which count the result of the lookup
+    :type near_duplicate_statistics: NearDuplicateStatistics
+    :return: the landmarks of the face in the photo or None if no near duplicate has been aligned reliably
+    :rtype: FaceLandmarks (from 'apps.face_element_swapping.endpoints') or None
+    """
+    near_duplicates = DBFunc.get_near_duplicates_of_a_user_photo(
+        perceptual_hash=perceptual_hash,
+        maximum_hamming_distance=MAXIMUM_HAMMING_DISTANCE_OF_NEAR_DUPLICATES,
+        maximum_number_of_near_duplicates=MAXIMUM_NUMBER_OF_ALIGNED_NEAR_DUPLICATES,
+    )
+    if not near_duplicates:
+        near_duplicate_statistics.add_miss()
+        return None
+
+    for _, near_duplicate in near_duplicates:
+        transformation = get_alignment_of_near_duplicates(
+            first_thumbnail=bytes(near_duplicate.thumbnail), second_thumbnail=thumbnail
+        )
+        if transformation is None:
+            continue
+
+        landmarks = align_landmarks(
+            landmarks=FaceLandmarks.from_bytes(data=near_duplicate.landmarks).array,
+            transformation=transformation,
+            shape_of_an_image=rgb_array.shape,
+        )
+        if landmarks is not None:
+            near_duplicate_statistics.add_hit()
+            return FaceLandmarks(landmarks=landmarks)
+
+    near_duplicate_statistics.add_rejection()
+    return None
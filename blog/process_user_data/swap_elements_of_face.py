@@ -1,4 +1,6 @@
 import json
+from functools import lru_cache
+from types import MappingProxyType
 
 import numpy as np
 from django.http import JsonResponse
@@ -6,48 +8,113 @@ from PIL import Image
 
 from apps.face_element_swapping import get_faces_landmarks
 from apps.face_element_swapping.change_faces import ChangeFaceElement
+from apps.face_element_swapping.color_index_cache import ColorIndexCache
+from apps.face_element_swapping.endpoints import (
+    FaceLandmarks,
+    LandmarkDetectionService,
+)
+from apps.face_element_swapping.helpers import get_read_only_view
+from apps.face_element_swapping.piecewise_affine_warp import WarpMapCache
+from apps.face_element_swapping.perceptual_hash import (
+    get_difference_hash,
+    get_thumbnail,
+)
+from apps.face_element_swapping.timing import collect_stage_timings, timing_span
 
 from ..db_func import DBFunc
+from ..example_assets import ExampleAssetStore
 from ..helpers import (
     convert_base64_to_pil,
+    convert_bytes_to_rgb_array,
     convert_img_to_base64,
-    convert_rgb_array_to_text,
-    convert_text_to_rgb_array,
+    convert_rgb_array_to_bytes,
     correct_size,
+    get_digest_of_a_photo,
     remove_prefix_from_base64,
     resize_img,
     set_mode_of_pil,
 )
+from ..models import DB_OBJECTS
 from ..settings import (
     CORRECT_NUMBER_OF_CHANNELS_PER_PIXEL,
     DEFAULT_PIL_MODE,
+    EXAMPLE_ASSET_STORE_ENABLED,
+    EXAMPLE_FACE_CACHE_ENABLED,
+    FUSED_COLOR_ADJUSTMENT_OF_MANY_PARTS_OF_THE_FACE,
     INDEX_OF_THE_NUMBER_OF_CHANNELS_PER_PIXEL,
     INDEX_OF_THE_VALUE_OF_ALPHA_CHANNEL,
+    LANDMARK_DETECTION_IN_WORKER_PROCESSES,
     LANDMARKS_FUNCTIONS,
+    MAXIMUM_NUMBER_OF_CACHED_ENDPOINTS,
     MESSAGES_REGARDING_EXACTLY_ONE_FACE,
+    MESSAGES_REGARDING_INVALID_FACE_INDICES,
     MESSAGES_REGARDING_MORE_OR_LESS_THAN_ONE_FACE,
     MINIMUM_VALUE_OF_THE_ALPHA_CHANNEL,
+    MULTI_FACE_SWAPPING_ENABLED,
+    NAMES_OF_THE_LANDMARKS_OF_THE_PIECEWISE_AFFINE_WARP,
+    NAME_OF_THE_HEADER_WITH_STAGE_TIMINGS,
+    NEAR_DUPLICATE_REUSE_ENABLED,
     PARTS_OF_THE_FACE_WITH_THE_CUT_FIELD,
     PIL_MODE_OF_TRANSPARENT_PHOTOS,
+    STAGE_TIMINGS_ENABLED,
+    TIMEOUT_OF_THE_LANDMARK_DETECTION_IN_SECONDS,
+    WARP_MODE_OF_THE_FACE_SWAPPING,
 )
+from .example_faces import ExampleFaceCache
+from .near_duplicates import NearDuplicateStatistics, get_landmarks_of_a_near_duplicate
 
 
 class ProcessUserPhoto:
-    def __init__(self, input_photo, part_of_face, face_id):
+    # Color indexes fitted to user photos are shared by all requests handled by this process,
+    # so swapping another example into the same photo doesn't fit the classifier again.
+    color_index_cache = ColorIndexCache()
+    # Maps of the piecewise affine warp, so swapping the same example into the same face doesn't build them again.
+    warp_map_cache = WarpMapCache()
+    # The workers are started by the WSGI application (see the file 'myproject/wsgi.py')
+    # or by the first detection.
+    landmark_detection_service = LandmarkDetectionService()
+    # Results of the lookups of near duplicates of new photos handled by this process.
+    near_duplicate_statistics = NearDuplicateStatistics()
+    # Decoded example faces, loaded by the WSGI application (see the file 'myproject/wsgi.py').
+    example_face_cache = ExampleFaceCache()
+    # Example faces saved as memory-mapped files shared by all processes.
+    example_asset_store = ExampleAssetStore()
+
+    def __init__(
+        self,
+        input_photo,
+        part_of_face=None,
+        face_id=None,
+        face_location=None,
+        face_indices=None,
+        parts_of_face=None,
+    ):
         self._input_photo = input_photo
-        self._part_of_face = part_of_face
-        self._face_id = face_id
+        # List of pairs: (part of the face, id of an example face). A single part is swapped by default.
+        self._parts_of_face = (
+            parts_of_face if parts_of_face is not None else [(part_of_face, face_id)]
+        )
+        self._face_location = face_location
+        # True if the landmarks of the new photo have been predicted inside the box passed by the client.
+        self._landmarks_predicted_in_the_face_location = False
+        self._face_indices = face_indices
         self._photo_in_base64 = None
-        self._src_rgb_array = None
+        self._photo_digest = None
         self._dst_rgb_array = None
-        self._src_endpoints = None
-        self._dst_endpoints = None
+        # The following lists have one element for every part of the face from 'self._parts_of_face'.
+        self._src_rgb_arrays = None
+        self._src_endpoints_of_parts = None
+        self._dst_endpoints_of_parts = None
         self._transparent_pixels = []
+        self._perceptual_hash = None
+        self._thumbnail = None
         self._number_of_detected_faces = None
         self._more_or_less_than_one_photo = None
+        # The indices of the chosen faces (see the function 'prepare_face_indices' contained in this class).
+        self._indices_of_the_chosen_faces = None
 
     @staticmethod
-    def prepare_params_to_face_swapping(part_of_face, landmarks):
+    def prepare_params_to_face_swapping(part_of_face, landmarks, face_landmarks=None):
         """
         :param part_of_face: a specific part of the face
         :type part_of_face: string - str
@@ -55,10 +122,21 @@ class ProcessUserPhoto:
         The landmarks should comes from calling one of the functions
         included in the 'LANDMARKS_FUNCTIONS' dictionary (from the file '..settings').
         :type landmarks: dictionary - {}
-        :return: dictionary with the keys: 'polygon' and 'cut_field'
+        :param face_landmarks: None or all landmarks of the face generated by the function 'face_landmarks'
+        from the module named 'face_recognition' or an object of the class 'FaceLandmarks'.
+        The landmarks of the part of the face are used as the control points of the piecewise affine warp.
+        :type face_landmarks: None, dictionary - {} or FaceLandmarks
+        :return: dictionary with the keys: 'polygon', 'cut_field' and 'control_points'
+        (None if 'face_landmarks' isn't passed)
         :rtype: dictionary - {}
         """
-        endpoints = {}
+        endpoints = {
+            "control_points": ProcessUserPhoto.get_control_points(
+                face_landmarks=face_landmarks, part_of_face=part_of_face
+            )
+            if face_landmarks is not None
+            else None
+        }
         if part_of_face.lower() in map(str.lower, PARTS_OF_THE_FACE_WITH_THE_CUT_FIELD):
             endpoints["polygon"] = landmarks["four_endpoints"]
             endpoints["cut_field"] = landmarks["six_endpoints"]
@@ -67,6 +145,150 @@ class ProcessUserPhoto:
             endpoints["cut_field"] = None
         return endpoints
 
+    @staticmethod
+    def get_control_points(face_landmarks, part_of_face):
+        """
+        :param face_landmarks: all landmarks of a face generated by the function 'face_landmarks'
+        from the module named 'face_recognition' or an object of the class 'FaceLandmarks'
+        :type face_landmarks: dictionary - {} or FaceLandmarks
+        :param part_of_face: one of the keys of the 'NAMES_OF_THE_LANDMARKS_OF_THE_PIECEWISE_AFFINE_WARP' dictionary
+        (from the file '..settings')
+        :type part_of_face: string - str
+        :return: the landmarks of the part of the face (see the function 'get_landmarks_of_parts'
+        of the class 'FaceLandmarks' from 'apps.face_element_swapping.endpoints')
+        :rtype: list - [] of tuples - (x, y)
+        """
+        if not isinstance(face_landmarks, FaceLandmarks):
+            face_landmarks = FaceLandmarks.from_face_recognition(
+                face_landmarks=face_landmarks
+            )
+        return face_landmarks.get_landmarks_of_parts(
+            names_of_parts=NAMES_OF_THE_LANDMARKS_OF_THE_PIECEWISE_AFFINE_WARP[part_of_face]
+        )
+
+    @staticmethod
+    def prepare_face_location(face_location, size_of_the_input_photo, size_of_the_photo):
+        """
+        :param face_location: JSON list: [top, right, bottom, left] with the box of a face
+        in the coordinates of the input photo
+        :type face_location: string - str or None
+        :param size_of_the_input_photo: size of the input photo - (width, height)
+        :type size_of_the_input_photo: tuple - ()
+        :param size_of_the_photo: size of the processed (e.g. resized) photo - (width, height)
+        :type size_of_the_photo: tuple - ()
+        :return: the box in the coordinates of the processed photo
+        or None if 'face_location' isn't a JSON list of four numbers.
+        The box is checked by the function 'get_faces_landmarks' ('apps.face_element_swapping').
+        :rtype: tuple - () or None
+        """
+        if face_location is None:
+            return None
+        try:
+            top, right, bottom, left = json.loads(face_location)
+            horizontal_scale = size_of_the_photo[0] / size_of_the_input_photo[0]
+            vertical_scale = size_of_the_photo[1] / size_of_the_input_photo[1]
+            return (
+                round(top * vertical_scale),
+                round(right * horizontal_scale),
+                round(bottom * vertical_scale),
+                round(left * horizontal_scale),
+            )
+        except (TypeError, ValueError, OverflowError):
+            return None
+
+    @staticmethod
+    def prepare_parts_of_face(parts_of_face):
+        """
+        :param parts_of_face: JSON list of pairs: [part of the face, id of an example face],
+        e.g. '[["lips", 3], ["nose", 7]]'
+        :type parts_of_face: string - str
+        :return: list of pairs: (part of the face, id of an example face) in the order of 'parts_of_face'
+        :rtype: list - [] of tuples
+        :raises ValueError: if 'parts_of_face' isn't a non-empty JSON list of such pairs,
+        a part of the face isn't one of the keys of the 'LANDMARKS_FUNCTIONS' dictionary (from the file '..settings')
+        or a part of the face is repeated.
+        """
+        try:
+            pairs = [
+                (part_of_face, face_id) for part_of_face, face_id in json.loads(parts_of_face)
+            ]
+        except (TypeError, ValueError):
+            raise ValueError(
+                "The parts of the face must be a JSON list of pairs: [part of the face, id of an example face]."
+            )
+        if not pairs:
+            raise ValueError("The list of the parts of the face is empty.")
+
+        for part_of_face, _ in pairs:
+            if part_of_face not in LANDMARKS_FUNCTIONS:
+                supported_parts = ", ".join(
+                    map(lambda part: "'" + part + "'", LANDMARKS_FUNCTIONS)
+                )
+                raise ValueError(
+                    "The passed part of the face: '{part_of_face}' is not supported. "
+                    "The supported parts are: {supported_parts}.".format(
+                        part_of_face=part_of_face, supported_parts=supported_parts
+                    )
+                )
+        if len({part_of_face for part_of_face, _ in pairs}) != len(pairs):
+            raise ValueError("Every part of the face can be swapped only once.")
+        return pairs
+
+    @staticmethod
+    def prepare_face_indices(face_indices, number_of_faces):
+        """
+        :param face_indices: JSON list of the indices of the chosen faces (ordered from left to right)
+        :type face_indices: string - str or None
+        :param number_of_faces: number of faces in the photo
+        :type number_of_faces: integer - int
+        :return: sorted unique indices of the chosen faces or the indices of all faces if 'face_indices' is None.
+        None if 'face_indices' isn't a non-empty JSON list of integers or any of its indices is out of the range.
+        :rtype: list - [] of integers or None
+        """
+        if face_indices is None:
+            return list(range(number_of_faces))
+        try:
+            chosen_indices = json.loads(face_indices)
+        except (TypeError, ValueError):
+            return None
+        if not isinstance(chosen_indices, list) or not chosen_indices:
+            return None
+        for idx in chosen_indices:
+            if (
+                not isinstance(idx, int)
+                or isinstance(idx, bool)
+                or not 0 <= idx < number_of_faces
+            ):
+                return None
+        return sorted(set(chosen_indices))
+
+    @staticmethod
+    def faces_can_be_swapped(number_of_detected_faces):
+        """
+        :param number_of_detected_faces: number of detected faces in an image
+        :type number_of_detected_faces: integer - int
+        :return: True if the image contains exactly one face
+        or more faces and 'MULTI_FACE_SWAPPING_ENABLED' (from the file '..settings') is True, False if not
+        :rtype: bool (True or False)
+        """
+        if number_of_detected_faces > 1:
+            return MULTI_FACE_SWAPPING_ENABLED
+        return number_of_detected_faces == 1
+
+    @staticmethod
+    def sort_faces_landmarks(faces_landmarks):
+        """
+        :param faces_landmarks: landmarks of faces generated by the function 'face_landmarks'
+        from the module named 'face_recognition' or objects of the class 'FaceLandmarks'
+        :type faces_landmarks: list - []
+        :return: the landmarks of the faces ordered from left to right (by the leftmost point of the chin)
+        :rtype: list - []
+        """
+        return sorted(
+            faces_landmarks,
+            key=lambda face_landmarks: min(x for x, _ in face_landmarks["chin"]),
+        )
+
     @staticmethod
     def more_or_less_than_one_face_info(number_of_detected_faces, json_format=True):
         """
@@ -86,7 +308,27 @@ class ProcessUserPhoto:
         return data
 
     @staticmethod
-    def processed_img_info(swapped_part_of_face, json_format=True):
+    def invalid_face_indices_info(number_of_detected_faces, json_format=True):
+        """
+        :param number_of_detected_faces: number of detected faces in an image
+        :type number_of_detected_faces: integer - int
+        :param json_format: param indicates if returned dictionary should be converted into a JSON object
+        :type json_format: bool (True or False)
+        :return dictionary 'MESSAGES_REGARDING_INVALID_FACE_INDICES' (from the file '..settings')
+                where the number of detected faces is assigned to the key named 'number_of_detected_faces'.
+        :rtype dictionary - {} or dictionary converted into a JSON object (type - django.http.response.JsonResponse)
+        It depends on the parameter 'json_format'.
+        """
+        data = dict(MESSAGES_REGARDING_INVALID_FACE_INDICES)
+        data["number_of_detected_faces"] = number_of_detected_faces
+        if json_format:
+            return JsonResponse(data)
+        return data
+
+    @staticmethod
+    def processed_img_info(
+        swapped_part_of_face, json_format=True, number_of_detected_faces=1
+    ):
         """
         This function converts 'swapped_part_of_face' to Base64 and returns a dictionary with data.
         The dictionary may be converted into a JSON object.
@@ -95,16 +337,20 @@ class ProcessUserPhoto:
         :type swapped_part_of_face: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
         :param json_format: param indicates if returned dictionary should be converted into a JSON object
         :type json_format: bool (True or False)
+        :param number_of_detected_faces: number of detected faces in the image
+        :type number_of_detected_faces: integer - int
         :return dictionary: {
                                 "face_detected_successfully": True,
-                                "number_of_detected_faces": 1,
+                                "number_of_detected_faces": 'number_of_detected_faces',
                                 "img_src": 'swapped_part_of_face' converted to Base64
                                         }
         :rtype dictionary - {} or dictionary converted into a JSON object (type  - django.http.response.JsonResponse)
         It depends on the parameter 'json_format'.
         """
-        data = MESSAGES_REGARDING_EXACTLY_ONE_FACE
-        data["img_src"] = convert_img_to_base64(img=swapped_part_of_face)
+        data = dict(MESSAGES_REGARDING_EXACTLY_ONE_FACE)
+        data["number_of_detected_faces"] = number_of_detected_faces
+        with timing_span(name="convert_img_to_base64"):
+            data["img_src"] = convert_img_to_base64(img=swapped_part_of_face)
         if json_format:
             return JsonResponse(data)
         return data
@@ -130,6 +376,229 @@ class ProcessUserPhoto:
             part_of_face=part_of_face, landmarks=face_landmarks
         )
 
+    @staticmethod
+    @lru_cache(maxsize=MAXIMUM_NUMBER_OF_CACHED_ENDPOINTS)
+    def prepare_endpoints_from_landmarks(landmarks, part_of_face):
+        """
+        The endpoints are cached, so the endpoints of the same landmarks are calculated only once.
+        :param landmarks: all landmarks of a face serialized by the function 'to_bytes'
+        of the class 'FaceLandmarks' (from 'apps.face_element_swapping.endpoints')
+        :type landmarks: bytes
+        :param part_of_face: a specific part of the face
+        :type part_of_face: string - str
+        :return result of calling the function 'prepare_params_to_face_swapping' from this class.
+                (read-only dictionary with the keys: 'polygon', 'cut_field' and 'control_points')
+        :rtype types.MappingProxyType
+        """
+        face_landmarks = FaceLandmarks.from_bytes(data=landmarks)
+        return MappingProxyType(
+            ProcessUserPhoto.prepare_params_to_face_swapping(
+                part_of_face=part_of_face,
+                landmarks=LANDMARKS_FUNCTIONS[part_of_face](face_landmarks),
+                face_landmarks=face_landmarks,
+            )
+        )
+
+    @staticmethod
+    def get_endpoints_of_a_row(row, part_of_face):
+        """
+        :param row: a row of the table 'Photo' or of the tables of examples (from the file '..models')
+        :type row: an instance of the 'Photo' class or of a class which inherit from the class 'PartOfFace'
+        :param part_of_face: a specific part of the face
+        :type part_of_face: string - str
+        :return endpoints of the part of the face calculated from the column 'landmarks' or
+        (in the rows saved before this column was added) read from the column 'face_landmarks'.
+        (dictionary with the keys: 'polygon' and 'cut_field')
+        :rtype dictionary - {} or types.MappingProxyType
+        """
+        if row.landmarks is not None:
+            return ProcessUserPhoto.prepare_endpoints_from_landmarks(
+                landmarks=bytes(row.landmarks), part_of_face=part_of_face
+            )
+        return ProcessUserPhoto.prepare_endpoints_from_db(
+            face_landmarks=row.face_landmarks, part_of_face=part_of_face
+        )
+
+    @staticmethod
+    def prepare_example_face(row, part_of_face):
+        """
+        :param row: a row of the tables of examples (from the file '..models')
+        :type row: an instance of a class which inherit from the class 'PartOfFace'
+        :param part_of_face: a specific part of the face
+        :type part_of_face: string - str
+        :return: read-only dictionary with the keys: 'rgb_array' (read-only array of the example)
+        and 'endpoints' (see the function 'get_endpoints_of_a_row' contained in this class).
+        If 'EXAMPLE_ASSET_STORE_ENABLED' (from the file '..settings') is True, the array is the memory-mapped patch
+        of the asset of the row (see the function 'get_example_asset' contained in this class)
+        and the endpoints are in the coordinates of the patch. If the asset can't be saved
+        (e.g. the directory of the store is read-only), the row is used instead.
+        :rtype: types.MappingProxyType
+        """
+        if EXAMPLE_ASSET_STORE_ENABLED:
+            try:
+                asset = ProcessUserPhoto.get_example_asset(
+                    row=row, part_of_face=part_of_face
+                )
+                return MappingProxyType(
+                    {"rgb_array": asset["patch"], "endpoints": asset["endpoints"]}
+                )
+            except OSError:
+                pass
+        return MappingProxyType(
+            {
+                "rgb_array": convert_bytes_to_rgb_array(data=row.rgb_array),
+                "endpoints": ProcessUserPhoto.get_endpoints_of_a_row(
+                    row=row, part_of_face=part_of_face
+                ),
+            }
+        )
+
+    @staticmethod
+    def get_example_asset(row, part_of_face):
+        """
+        The database is the source of truth: if the row doesn't have an asset or its asset is missing
+        (e.g. the directory of the store hasn't been kept after a restart), the asset is built again
+        from the row and its key is saved in the row.
+        :param row: a row of the tables of examples (from the file '..models')
+        :type row: an instance of a class which inherit from the class 'PartOfFace'
+        :param part_of_face: a specific part of the face
+        :type part_of_face: string - str
+        :return: the result of calling the function 'load' of the class 'ExampleAssetStore'
+        (from the file '../example_assets.py')
+        :rtype: types.MappingProxyType
+        :raises OSError: if the asset can't be saved
+        """
+        if row.asset_key is not None:
+            try:
+                return ProcessUserPhoto.example_asset_store.load(
+                    asset_key=row.asset_key
+                )
+            except FileNotFoundError:
+                pass
+
+        asset_key = ProcessUserPhoto.example_asset_store.save(
+            rgb_array=convert_bytes_to_rgb_array(data=row.rgb_array),
+            endpoints=ProcessUserPhoto.get_endpoints_of_a_row(
+                row=row, part_of_face=part_of_face
+            ),
+        )
+        if asset_key != row.asset_key:
+            DBFunc.save_asset_key_of_an_example(
+                part_of_face=part_of_face, row_id=row.id, asset_key=asset_key
+            )
+        return ProcessUserPhoto.example_asset_store.load(asset_key=asset_key)
+
+    @staticmethod
+    def save_example_asset(rgb_array, landmarks, part_of_face):
+        """
+        :param rgb_array: an RGB example face converted into a numpy array (the array has following shape(y, x, 3))
+        :type rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :param landmarks: all landmarks of the face serialized by the function 'to_bytes'
+        of the class 'FaceLandmarks' (from 'apps.face_element_swapping.endpoints')
+        :type landmarks: bytes
+        :param part_of_face: a specific part of the face
+        :type part_of_face: string - str
+        :return: key of the asset saved by the function 'save' of the class 'ExampleAssetStore'
+        (from the file '../example_assets.py')
+        :rtype: string - str
+        """
+        return ProcessUserPhoto.example_asset_store.save(
+            rgb_array=rgb_array,
+            endpoints=ProcessUserPhoto.prepare_endpoints_from_landmarks(
+                landmarks=landmarks, part_of_face=part_of_face
+            ),
+        )
+
+    @staticmethod
+    def load_example_face(part_of_face, row_id):
+        """
+        :param part_of_face: a specific part of the face
+        :type part_of_face: string - str
+        :param row_id: id of an example face stored in our database
+        :type row_id: integer - int or string - str
+        :return: the result of calling the function 'prepare_example_face' (contained in this class)
+        for the row with the passed id or None if the row doesn't exist
+        :rtype: types.MappingProxyType or None
+        """
+        row = DBFunc.get_example_photo_data(part_of_face=part_of_face, row_id=row_id)
+        if row is None:
+            return None
+        return ProcessUserPhoto.prepare_example_face(row=row, part_of_face=part_of_face)
+
+    @staticmethod
+    def load_all_example_faces():
+        """
+        :return: dictionary of all examples. The keys are pairs: (part of the face, id of an example face),
+        the values are the results of calling the function 'prepare_example_face' (contained in this class).
+        :rtype: dictionary - {}
+        """
+        return {
+            (part_of_face, row.id): ProcessUserPhoto.prepare_example_face(
+                row=row, part_of_face=part_of_face
+            )
+            for part_of_face in DB_OBJECTS
+            for row in DBFunc.get_all_example_photo_data(part_of_face=part_of_face)
+        }
+
+    @staticmethod
+    def preload_example_faces():
+        """
+        This function loads all example faces into the cache of this process
+        (if 'EXAMPLE_FACE_CACHE_ENABLED' from the file '..settings' is True).
+        """
+        if EXAMPLE_FACE_CACHE_ENABLED:
+            ProcessUserPhoto.example_face_cache.preload(
+                load_example_faces=ProcessUserPhoto.load_all_example_faces
+            )
+
+    @staticmethod
+    def get_example_face(part_of_face, row_id):
+        """
+        :param part_of_face: a specific part of the face
+        :type part_of_face: string - str
+        :param row_id: id of an example face stored in our database
+        :type row_id: integer - int or string - str
+        :return: the result of calling the function 'load_example_face' (contained in this class),
+        taken from the cache of the example faces if 'EXAMPLE_FACE_CACHE_ENABLED' from the file '..settings' is True
+        :rtype: types.MappingProxyType or None
+        """
+        if EXAMPLE_FACE_CACHE_ENABLED:
+            return ProcessUserPhoto.example_face_cache.get(
+                part_of_face=part_of_face,
+                row_id=row_id,
+                load_example_face=ProcessUserPhoto.load_example_face,
+            )
+        return ProcessUserPhoto.load_example_face(
+            part_of_face=part_of_face, row_id=row_id
+        )
+
+    @staticmethod
+    def get_endpoints_of_all_faces_of_a_row(row, part_of_face):
+        """
+        :param row: a row of the table 'Photo' (from the file '..models')
+        :type row: an instance of the 'Photo' class
+        :param part_of_face: a specific part of the face
+        :type part_of_face: string - str
+        :return endpoints of the part of every face of the photo, ordered from left to right
+        (see the function 'get_endpoints_of_a_row' contained in this class).
+        The rows saved before the column 'landmarks' was added contain a single face.
+        :rtype list - [] of dictionaries or of types.MappingProxyType
+        """
+        if row.landmarks is None:
+            return [
+                ProcessUserPhoto.get_endpoints_of_a_row(
+                    row=row, part_of_face=part_of_face
+                )
+            ]
+        return [
+            ProcessUserPhoto.prepare_endpoints_from_landmarks(
+                landmarks=face_landmarks.to_bytes(), part_of_face=part_of_face
+            )
+            for face_landmarks in FaceLandmarks.from_bytes_of_many_faces(
+                data=row.landmarks
+            )
+        ]
+
     @staticmethod
     def get_landmarks_of_parts_of_face(face_landmarks):
         """
@@ -224,125 +693,308 @@ class ProcessUserPhoto:
 
         return rgba_array
 
-    def _process_existing_image(self):
+    def _process_existing_image(self, photo_from_db):
         """
-        This function looks for the necessary parameters to swap the same part of the face.
+        This function looks for the necessary parameters to swap the parts of the face.
         In this case the user image has been saved previously in our database.
-        If the number of detected faces in the image is not equal to 1 the variable
-        'self._more_or_less_than_one_photo' will be set to 'True' otherwise
-        the following variables: 'self._src_rgb_array', 'self._src_endpoints',
-        'self._dst_rgb_array', 'self._dst_endpoints'.
+        If the faces of the image can't be swapped (see the function 'faces_can_be_swapped' contained in this class)
+        the variable 'self._more_or_less_than_one_photo' will be set to 'True' otherwise
+        the following variables: 'self._src_rgb_arrays', 'self._src_endpoints_of_parts',
+        'self._dst_rgb_array', 'self._dst_endpoints_of_parts'.
         will have appropriate values and the variable 'self._more_or_less_than_one_photo' will be set to 'False'.
+        If the indices of the chosen faces are invalid, the variable 'self._indices_of_the_chosen_faces'
+        is left None and the photo isn't read.
+        :param photo_from_db: the row containing the photo returned by the function 'get_user_photo_data'
+        (class 'DBFunc' from the file '../db_func.py')
+        :type photo_from_db: an instance of the 'Photo' class (from the file '../models.py')
         """
-        photo_from_db = DBFunc.get_user_photo_data(
-            photo_in_base64=self._photo_in_base64
-        )
         self._number_of_detected_faces = photo_from_db.number_of_detected_faces
-        if self._number_of_detected_faces != 1:
+        if (
+            self._number_of_detected_faces > 1
+            and photo_from_db.landmarks is None
+            and ProcessUserPhoto.faces_can_be_swapped(
+                number_of_detected_faces=self._number_of_detected_faces
+            )
+        ):
+            # Only the number of faces has been saved for the group photos rejected before, so the photo is processed again.
+            DBFunc.delete_user_photo(photo_digest=self._photo_digest)
+            self._process_new_image()
+            return
+
+        if not ProcessUserPhoto.faces_can_be_swapped(
+            number_of_detected_faces=self._number_of_detected_faces
+        ):
             self._more_or_less_than_one_photo = True
         else:
             self._more_or_less_than_one_photo = False
-
-            self._dst_rgb_array = convert_text_to_rgb_array(
-                text=photo_from_db.rgb_array
-            )
-            src_face = DBFunc.get_example_photo_data(
-                part_of_face=self._part_of_face, row_id=self._face_id
-            )
-            self._src_endpoints = ProcessUserPhoto.prepare_endpoints_from_db(
-                face_landmarks=src_face.face_landmarks, part_of_face=self._part_of_face
+            self._indices_of_the_chosen_faces = ProcessUserPhoto.prepare_face_indices(
+                face_indices=self._face_indices,
+                number_of_faces=self._number_of_detected_faces,
             )
-            self._src_rgb_array = convert_text_to_rgb_array(text=src_face.rgb_array)
-            self._dst_endpoints = ProcessUserPhoto.prepare_endpoints_from_db(
-                face_landmarks=photo_from_db.face_landmarks,
-                part_of_face=self._part_of_face,
-            )
-            self._transparent_pixels = json.loads(photo_from_db.transparent_pixels)
+            if self._indices_of_the_chosen_faces is None:
+                return
+
+            with timing_span(name="convert_bytes_to_rgb_array"):
+                self._dst_rgb_array = convert_bytes_to_rgb_array(
+                    data=photo_from_db.rgb_array
+                )
+            self._prepare_examples()
+            with timing_span(name="get_endpoints_of_a_row"):
+                self._dst_endpoints_of_parts = []
+                for part_of_face, _ in self._parts_of_face:
+                    dst_endpoints_of_faces = (
+                        ProcessUserPhoto.get_endpoints_of_all_faces_of_a_row(
+                            row=photo_from_db, part_of_face=part_of_face
+                        )
+                    )
+                    self._dst_endpoints_of_parts.append(
+                        [
+                            dst_endpoints_of_faces[idx]
+                            for idx in self._indices_of_the_chosen_faces
+                        ]
+                    )
+            with timing_span(name="load_transparent_pixels"):
+                self._transparent_pixels = json.loads(photo_from_db.transparent_pixels)
+
+    def _prepare_examples(self):
+        """
+        This function reads the example faces of all swapped parts of the face
+        (see the function 'get_example_face' contained in this class)
+        and sets the variables: 'self._src_rgb_arrays' and 'self._src_endpoints_of_parts'.
+        """
+        self._src_rgb_arrays = []
+        self._src_endpoints_of_parts = []
+        for part_of_face, face_id in self._parts_of_face:
+            with timing_span(name="get_example_face"):
+                example_face = ProcessUserPhoto.get_example_face(
+                    part_of_face=part_of_face, row_id=face_id
+                )
+            self._src_endpoints_of_parts.append(example_face["endpoints"])
+            self._src_rgb_arrays.append(example_face["rgb_array"])
 
     def _save_info_on_a_new_image(self, faces_landmarks):
         """
         This function saves informations about a new image into our database.
-        :param faces_landmarks: landmarks of a single face generated
+        :param faces_landmarks: landmarks of all faces (ordered from left to right) generated
         by the function 'face_landmarks' from the module named 'face_recognition'.
         (link to the module named 'face_recognition' - https://pypi.org/project/face_recognition/)
-        :type face_landmarks: dictionary - {}
+        :type faces_landmarks: list - [] of dictionaries
         """
-        landmarks = ProcessUserPhoto.get_landmarks_of_parts_of_face(
-            face_landmarks=faces_landmarks
-        )
         DBFunc.save_user_photo(
             photo_in_base64=self._photo_in_base64,
+            photo_digest=self._photo_digest,
             number_of_detected_faces=self._number_of_detected_faces,
-            rgb_array=convert_rgb_array_to_text(rgb_array=self._dst_rgb_array),
+            rgb_array=convert_rgb_array_to_bytes(rgb_array=self._dst_rgb_array),
             transparent_pixels=json.dumps(self._transparent_pixels),
-            face_landmarks=json.dumps(landmarks),
+            landmarks=FaceLandmarks.to_bytes_of_many_faces(
+                faces_landmarks=[
+                    FaceLandmarks.from_face_recognition(face_landmarks=face_landmarks)
+                    for face_landmarks in faces_landmarks
+                ]
+            ),
+            perceptual_hash=self._perceptual_hash,
+            thumbnail=self._thumbnail,
         )
 
+    def _get_faces_landmarks(self, size_of_the_input_photo):
+        """
+        If the request contains a valid box of the face, only the landmarks are predicted inside the box,
+        so the photo is assumed to contain exactly one face. Such landmarks depend on the box passed by the client,
+        so they aren't saved in the database (see the function '_process_new_image' contained in this class).
+        Otherwise the landmarks are moved
+        from a saved near duplicate of the photo (if 'NEAR_DUPLICATE_REUSE_ENABLED' from the file '..settings' is True)
+        or, if there is no such photo, faces are detected in the whole photo.
+        :param size_of_the_input_photo: size of the input photo - (width, height)
+        :type size_of_the_input_photo: tuple - ()
+        :return: a list of dictionaries of face feature locations (eyes, nose, etc)
+        :rtype list - []
+        """
+        height, width = self._dst_rgb_array.shape[:2]
+        face_location = ProcessUserPhoto.prepare_face_location(
+            face_location=self._face_location,
+            size_of_the_input_photo=size_of_the_input_photo,
+            size_of_the_photo=(width, height),
+        )
+        if face_location is not None:
+            try:
+                with timing_span(name="get_faces_landmarks_in_the_face_location"):
+                    faces_landmarks = get_faces_landmarks(
+                        rgb_array=self._dst_rgb_array, faces_locations=[face_location]
+                    )
+                self._landmarks_predicted_in_the_face_location = True
+                return faces_landmarks
+            except ValueError:
+                pass
+
+        if NEAR_DUPLICATE_REUSE_ENABLED:
+            with timing_span(name="get_landmarks_of_a_near_duplicate"):
+                face_landmarks = get_landmarks_of_a_near_duplicate(
+                    rgb_array=self._dst_rgb_array,
+                    perceptual_hash=self._perceptual_hash,
+                    thumbnail=self._thumbnail,
+                    near_duplicate_statistics=ProcessUserPhoto.near_duplicate_statistics,
+                )
+            if face_landmarks is not None:
+                return [face_landmarks]
+
+        with timing_span(name="get_faces_landmarks"):
+            if LANDMARK_DETECTION_IN_WORKER_PROCESSES:
+                return ProcessUserPhoto.landmark_detection_service.get_faces_landmarks(
+                    rgb_array=self._dst_rgb_array,
+                    timeout=TIMEOUT_OF_THE_LANDMARK_DETECTION_IN_SECONDS,
+                )
+            return get_faces_landmarks(rgb_array=self._dst_rgb_array)
+
     def _process_new_image(self):
         """
-        This function looks for the necessary parameters to swap the same part of the face.
+        This function looks for the necessary parameters to swap the parts of the face.
         In this case the user image is a completely new one.
-        If the number of detected faces in the image is not equal to 1 the variable
-        'self._more_or_less_than_one_photo' will be set to 'True' and
+        If the faces of the image can't be swapped (see the function 'faces_can_be_swapped' contained in this class)
+        the variable 'self._more_or_less_than_one_photo' will be set to 'True' and
         informations about this image will be saved into our database.
-        In another case, the following variables: 'self._src_rgb_array', 'self._src_endpoints',
-        'self._dst_rgb_array', 'self._dst_endpoints'.
+        In another case, the following variables: 'self._src_rgb_arrays', 'self._src_endpoints_of_parts',
+        'self._dst_rgb_array', 'self._dst_endpoints_of_parts'.
         will have appropriate values, the variable 'self._more_or_less_than_one_photo' will be set to 'False'
         and informations about this image will be saved in our database.
+        If the indices of the chosen faces are invalid, only the informations about this image are saved
+        and the variable 'self._indices_of_the_chosen_faces' is left None.
+        Nothing is saved if the landmarks have been predicted inside the box of the face passed by the client,
+        so a wrong box doesn't affect the next requests with the same photo.
         """
-        dst_img_pil = convert_base64_to_pil(photo_in_base64=self._photo_in_base64)
+        with timing_span(name="convert_base64_to_pil"):
+            dst_img_pil = convert_base64_to_pil(photo_in_base64=self._photo_in_base64)
+        size_of_the_input_photo = dst_img_pil.size
 
         if not correct_size(img=dst_img_pil):
-            dst_img_pil = resize_img(img=dst_img_pil)
+            with timing_span(name="resize_img"):
+                dst_img_pil = resize_img(img=dst_img_pil)
 
         if dst_img_pil.mode != DEFAULT_PIL_MODE:
-            dst_rgba_array = np.array(
-                set_mode_of_pil(pil=dst_img_pil, mode=PIL_MODE_OF_TRANSPARENT_PHOTOS),
-                dtype=np.uint8,
-            )
-            self._transparent_pixels = ProcessUserPhoto.prepare_transparent_pixels(
-                rgba_array=dst_rgba_array
-            )
+            with timing_span(name="prepare_transparent_pixels"):
+                dst_rgba_array = np.array(
+                    set_mode_of_pil(
+                        pil=dst_img_pil, mode=PIL_MODE_OF_TRANSPARENT_PHOTOS
+                    ),
+                    dtype=np.uint8,
+                )
+                self._transparent_pixels = ProcessUserPhoto.prepare_transparent_pixels(
+                    rgba_array=dst_rgba_array
+                )
 
         dst_img_pil = set_mode_of_pil(pil=dst_img_pil, mode=DEFAULT_PIL_MODE)
         self._dst_rgb_array = np.array(dst_img_pil, dtype=np.uint8)
-        faces_landmarks = get_faces_landmarks(rgb_array=self._dst_rgb_array)
+        with timing_span(name="get_perceptual_hash"):
+            self._perceptual_hash = get_difference_hash(rgb_array=self._dst_rgb_array)
+            self._thumbnail = get_thumbnail(rgb_array=self._dst_rgb_array)
+        faces_landmarks = self._get_faces_landmarks(
+            size_of_the_input_photo=size_of_the_input_photo
+        )
+        faces_landmarks = ProcessUserPhoto.sort_faces_landmarks(
+            faces_landmarks=faces_landmarks
+        )
         self._number_of_detected_faces = len(faces_landmarks)
-        if self._number_of_detected_faces != 1:
-            DBFunc.save_user_photo(
-                photo_in_base64=self._photo_in_base64,
-                number_of_detected_faces=self._number_of_detected_faces,
-            )
+        if not ProcessUserPhoto.faces_can_be_swapped(
+            number_of_detected_faces=self._number_of_detected_faces
+        ):
+            if not self._landmarks_predicted_in_the_face_location:
+                with timing_span(name="save_user_photo"):
+                    DBFunc.save_user_photo(
+                        photo_in_base64=self._photo_in_base64,
+                        photo_digest=self._photo_digest,
+                        number_of_detected_faces=self._number_of_detected_faces,
+                        perceptual_hash=self._perceptual_hash,
+                    )
             self._more_or_less_than_one_photo = True
         else:
-            landmarks_of_the_part_of_face = LANDMARKS_FUNCTIONS[self._part_of_face](
-                faces_landmarks[0]
-            )
-            src_face = DBFunc.get_example_photo_data(
-                part_of_face=self._part_of_face, row_id=self._face_id
-            )
-            self._src_endpoints = ProcessUserPhoto.prepare_endpoints_from_db(
-                face_landmarks=src_face.face_landmarks, part_of_face=self._part_of_face
-            )
-            self._dst_endpoints = ProcessUserPhoto.prepare_params_to_face_swapping(
-                part_of_face=self._part_of_face, landmarks=landmarks_of_the_part_of_face
-            )
-            self._src_rgb_array = convert_text_to_rgb_array(text=src_face.rgb_array)
             self._more_or_less_than_one_photo = False
-            self._save_info_on_a_new_image(faces_landmarks=faces_landmarks[0])
+            self._indices_of_the_chosen_faces = ProcessUserPhoto.prepare_face_indices(
+                face_indices=self._face_indices,
+                number_of_faces=self._number_of_detected_faces,
+            )
+            if self._indices_of_the_chosen_faces is None:
+                if not self._landmarks_predicted_in_the_face_location:
+                    with timing_span(name="save_user_photo"):
+                        self._save_info_on_a_new_image(faces_landmarks=faces_landmarks)
+                return
+
+            self._prepare_examples()
+            self._dst_endpoints_of_parts = [
+                [
+                    ProcessUserPhoto.prepare_params_to_face_swapping(
+                        part_of_face=part_of_face,
+                        landmarks=LANDMARKS_FUNCTIONS[part_of_face](faces_landmarks[idx]),
+                        face_landmarks=faces_landmarks[idx],
+                    )
+                    for idx in self._indices_of_the_chosen_faces
+                ]
+                for part_of_face, _ in self._parts_of_face
+            ]
+            if not self._landmarks_predicted_in_the_face_location:
+                with timing_span(name="save_user_photo"):
+                    self._save_info_on_a_new_image(faces_landmarks=faces_landmarks)
 
     def _swap_part_of_face(self):
         """
-        :return result of calling the function 'change_face_element' from the class 'ChangeFaceElement'
-        (The class is located in 'apps.face_element_swapping.change_faces').
+        :return result of calling the function 'change_face_element', 'change_face_elements'
+        or (if several parts of the face are swapped) 'change_face_elements_from_many_sources'
+        from the class 'ChangeFaceElement' (The class is located in 'apps.face_element_swapping.change_faces').
         :rtype: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
         """
-        return ChangeFaceElement.change_face_element(
-            src_rgb_array=self._src_rgb_array,
-            dst_rgb_array=self._dst_rgb_array,
-            src_polygon=self._src_endpoints["polygon"],
-            dst_polygon=self._dst_endpoints["polygon"],
-            dst_cut_field=self._dst_endpoints["cut_field"],
+        # 'ChangeFaceElement' never modifies its input arrays,
+        # read-only views turn any accidental modification into an error.
+        sources = [
+            {
+                "src_rgb_array": get_read_only_view(np_array=src_rgb_array),
+                "src_polygon": src_endpoints["polygon"],
+                "dst_polygons": [
+                    dst_endpoints["polygon"] for dst_endpoints in dst_endpoints_of_faces
+                ],
+                "dst_cut_fields": [
+                    dst_endpoints["cut_field"] for dst_endpoints in dst_endpoints_of_faces
+                ],
+                "src_control_points": src_endpoints["control_points"],
+                "dst_control_points_of_faces": [
+                    dst_endpoints["control_points"]
+                    for dst_endpoints in dst_endpoints_of_faces
+                ],
+            }
+            for src_rgb_array, src_endpoints, dst_endpoints_of_faces in zip(
+                self._src_rgb_arrays,
+                self._src_endpoints_of_parts,
+                self._dst_endpoints_of_parts,
+            )
+        ]
+        dst_rgb_array = get_read_only_view(np_array=self._dst_rgb_array)
+        if len(sources) > 1:
+            return ChangeFaceElement.change_face_elements_from_many_sources(
+                dst_rgb_array=dst_rgb_array,
+                sources=sources,
+                color_index_cache=ProcessUserPhoto.color_index_cache,
+                fused_color_adjustment=FUSED_COLOR_ADJUSTMENT_OF_MANY_PARTS_OF_THE_FACE,
+                warp_mode=WARP_MODE_OF_THE_FACE_SWAPPING,
+                warp_map_cache=ProcessUserPhoto.warp_map_cache,
+            )
+
+        source = sources[0]
+        if len(source["dst_polygons"]) == 1:
+            return ChangeFaceElement.change_face_element(
+                src_rgb_array=source["src_rgb_array"],
+                dst_rgb_array=dst_rgb_array,
+                src_polygon=source["src_polygon"],
+                dst_polygon=source["dst_polygons"][0],
+                dst_cut_field=source["dst_cut_fields"][0],
+                color_index_cache=ProcessUserPhoto.color_index_cache,
+                src_control_points=source["src_control_points"],
+                dst_control_points=source["dst_control_points_of_faces"][0],
+                warp_mode=WARP_MODE_OF_THE_FACE_SWAPPING,
+                warp_map_cache=ProcessUserPhoto.warp_map_cache,
+            )
+        return ChangeFaceElement.change_face_elements(
+            dst_rgb_array=dst_rgb_array,
+            color_index_cache=ProcessUserPhoto.color_index_cache,
+            warp_mode=WARP_MODE_OF_THE_FACE_SWAPPING,
+            warp_map_cache=ProcessUserPhoto.warp_map_cache,
+            **source
         )
 
     def _process_user_photo(self):
@@ -356,8 +1008,17 @@ class ProcessUserPhoto:
             base64_with_prefix=self._input_photo
         )
 
-        if DBFunc.user_photo_exists(photo_in_base64=self._photo_in_base64):
-            self._process_existing_image()
+        with timing_span(name="get_digest_of_a_photo"):
+            self._photo_digest = get_digest_of_a_photo(
+                photo_in_base64=self._photo_in_base64
+            )
+        with timing_span(name="get_user_photo_data"):
+            photo_from_db = DBFunc.get_user_photo_data(
+                photo_digest=self._photo_digest
+            )
+
+        if photo_from_db is not None:
+            self._process_existing_image(photo_from_db=photo_from_db)
         else:
             self._process_new_image()
 
@@ -365,29 +1026,46 @@ class ProcessUserPhoto:
             return ProcessUserPhoto.more_or_less_than_one_face_info(
                 number_of_detected_faces=self._number_of_detected_faces
             )
+        if self._indices_of_the_chosen_faces is None:
+            return ProcessUserPhoto.invalid_face_indices_info(
+                number_of_detected_faces=self._number_of_detected_faces
+            )
 
-        swapped_part_of_face = self._swap_part_of_face()
+        with timing_span(name="swap_part_of_face"):
+            swapped_part_of_face = self._swap_part_of_face()
         if self._transparent_pixels:
-            swapped_part_of_face = (
-                ProcessUserPhoto.add_transparent_pixels_to_an_rgb_image(
-                    rgb_array=swapped_part_of_face,
-                    transparent_pixels=self._transparent_pixels,
+            with timing_span(name="add_transparent_pixels_to_an_rgb_image"):
+                swapped_part_of_face = (
+                    ProcessUserPhoto.add_transparent_pixels_to_an_rgb_image(
+                        rgb_array=swapped_part_of_face,
+                        transparent_pixels=self._transparent_pixels,
+                    )
                 )
-            )
         return ProcessUserPhoto.processed_img_info(
-            swapped_part_of_face=swapped_part_of_face
+            swapped_part_of_face=swapped_part_of_face,
+            number_of_detected_faces=self._number_of_detected_faces,
         )
 
     @classmethod
-    def process_user_photo(cls, input_photo, part_of_face, face_id):
+    def process_user_photo(
+        cls,
+        input_photo,
+        part_of_face=None,
+        face_id=None,
+        face_location=None,
+        face_indices=None,
+        parts_of_face=None,
+    ):
         """
         The function processes the input user photo('input_photo').
-        If the photo contains more or less than one face,
+        If the faces of the photo can't be swapped (see the function 'faces_can_be_swapped' contained in this class),
         this function will return the result of calling
         the function 'more_or_less_than_one_face_info'(contained in this class).
         If the input user photo is correct,
         this function will find the photo (with the passed id - 'face_id') in the database
-        and then swap the part of the face indicated by the 'part_of_face' parameter.
+        and then swap the part of the face indicated by the 'part_of_face' parameter on all chosen faces.
+        If 'parts_of_face' is passed, all its parts of the face are swapped in one pass instead
+        (the photo is read, decoded and encoded only once).
         :param input_photo: base64-encoded image which has a special prefix.
         Here are some examples of the prefixes: 'data:image/png;base64,' ,
                                                 'data:image/gif;base64,' ,
@@ -397,13 +1075,43 @@ class ProcessUserPhoto:
         :type part_of_face string - str
         :param face_id: id of an example face stored in our database
         :type face_id: string - str
-        :return: If the photo contains more or less than one face,
+        :param face_location: JSON list: [top, right, bottom, left] with the box of the face
+        in the coordinates of the input photo (see the function 'prepare_face_location' contained in this class).
+        If the box is invalid, it is ignored.
+        :type face_location: string - str or None
+        :param face_indices: JSON list of the indices of the faces (ordered from left to right) whose part is swapped
+        (see the function 'prepare_face_indices' contained in this class). By default all faces are swapped.
+        If the indices are invalid, nothing is swapped and the result of calling
+        the function 'invalid_face_indices_info' (contained in this class) is returned.
+        :type face_indices: string - str or None
+        :param parts_of_face: JSON list of pairs: [part of the face, id of an example face]
+        (see the function 'prepare_parts_of_face' contained in this class).
+        If it is passed, the parameters 'part_of_face' and 'face_id' are ignored.
+        :type parts_of_face: string - str or None
+        :return: If the faces of the photo can't be swapped,
         this function will return the result of calling the function 'more_or_less_than_one_face_info'
         (contained in this class). If the photo is correct, this function will return
         the result of calling the function 'processed_img_info'(also contained in this class).
+        If 'STAGE_TIMINGS_ENABLED' (from the file '..settings') is True, the durations of the stages
+        of processing are added to the header named 'NAME_OF_THE_HEADER_WITH_STAGE_TIMINGS'.
         :rtype: dictionary converted into a JSON object (type - django.http.response.JsonResponse)
+        :raises ValueError: if 'parts_of_face' is invalid (see the function 'prepare_parts_of_face').
         """
         photo_processing = cls(
-            input_photo=input_photo, part_of_face=part_of_face, face_id=face_id
+            input_photo=input_photo,
+            part_of_face=part_of_face,
+            face_id=face_id,
+            face_location=face_location,
+            face_indices=face_indices,
+            parts_of_face=ProcessUserPhoto.prepare_parts_of_face(parts_of_face=parts_of_face)
+            if parts_of_face is not None
+            else None,
         )
-        return photo_processing._process_user_photo()
+        with collect_stage_timings(enabled=STAGE_TIMINGS_ENABLED) as stage_timings:
+            response = photo_processing._process_user_photo()
+
+        if stage_timings is not None:
+            response[
+                NAME_OF_THE_HEADER_WITH_STAGE_TIMINGS
+            ] = stage_timings.to_server_timing_header()
+        return response
@@ -1,9 +1,13 @@
+import os
+
 from PIL import Image
 
 from apps.face_element_swapping.endpoints import GetEndpointsOfANose, GetEndpointsOfLips
+from apps.face_element_swapping.settings import DEFAULT_WARP_MODE
 
 DESC_OF_PHOTO_IN_DB = "{id} | {date}"
 DESC_OF_PART_OF_FACE_IN_DB = "{name} | {date}"
+DESC_OF_PERCEPTUAL_HASH_BAND_IN_DB = "{photo_id} | {index} | {value}"
 FORMAT_OF_DATE_IN_DB = "%d-%m-%Y %H:%M:%S"
 
 DIRECTORIES_WITH_FACES = {"lips": "./blog/dev/lips", "nose": "./blog/dev/noses"}
@@ -17,11 +21,27 @@ LANDMARKS_FUNCTIONS = {
     "nose": GetEndpointsOfANose.get_endpoints_of_a_nose,
 }
 
+# One of the values of the WARP_MODES list (from the file 'apps/face_element_swapping/settings.py').
+# The piecewise affine warp moves the landmarks of the following parts of the face of an example
+# exactly to the landmarks of the swapped face.
+WARP_MODE_OF_THE_FACE_SWAPPING = DEFAULT_WARP_MODE
+NAMES_OF_THE_LANDMARKS_OF_THE_PIECEWISE_AFFINE_WARP = {
+    "lips": ["top_lip", "bottom_lip"],
+    "nose": ["nose_bridge", "nose_tip"],
+}
+
 MESSAGES_REGARDING_MORE_OR_LESS_THAN_ONE_FACE = {
     "face_detected_successfully": False,
     "number_of_detected_faces": None,
 }
 
+# The response to a request whose indices of the faces are invalid or out of the range of the detected faces.
+MESSAGES_REGARDING_INVALID_FACE_INDICES = {
+    "face_detected_successfully": False,
+    "number_of_detected_faces": None,
+    "invalid_face_indices": True,
+}
+
 MESSAGES_REGARDING_EXACTLY_ONE_FACE = {
     "face_detected_successfully": True,
     "number_of_detected_faces": 1,
@@ -63,9 +83,100 @@ REQUIRED_KEYS_OF_THE_FACE_SWAPPING_REQUEST = [
     KEY_OF_THE_ACTIVE_PART_OF_THE_FACE,
     KEY_OF_THE_FACE_ID,
 ]
+# Optional key of the face swapping request. Its value is a JSON list: [top, right, bottom, left]
+# with the box of the face in the coordinates of the input photo. If the box is valid,
+# the face detection is skipped and only the landmarks are predicted inside the box.
+# Such landmarks aren't saved in the database, only the landmarks of detected faces are reused.
+KEY_OF_THE_FACE_LOCATION = 'faceLocation'
+# Optional key of the face swapping request. Its value is a JSON list of the indices of the faces
+# (ordered from left to right) whose part is swapped. If it is missing, all faces are swapped.
+# If it isn't a non-empty list of the indices of the detected faces, nothing is swapped
+# and 'MESSAGES_REGARDING_INVALID_FACE_INDICES' is returned.
+KEY_OF_THE_FACE_INDICES = 'faceIndices'
+# Key of the request which swaps several parts of the face in one pass. Its value is a JSON list
+# of pairs: [part of the face, id of an example face], e.g. [["lips", 3], ["nose", 7]].
+# The parts are swapped in the order of the list. If the key is contained in the request,
+# the keys 'KEY_OF_THE_ACTIVE_PART_OF_THE_FACE' and 'KEY_OF_THE_FACE_ID' are not required.
+KEY_OF_THE_PARTS_OF_THE_FACE = 'partsOfFace'
+REQUIRED_KEYS_OF_THE_MULTI_PART_FACE_SWAPPING_REQUEST = [
+    KEY_OF_AN_INPUT_PHOTO,
+    KEY_OF_THE_PARTS_OF_THE_FACE,
+]
 
 HTML_OF_THE_MAIN_PAGE = 'blog/post_list.html'
 
+# If it is True, the durations of the stages of face part swapping
+# are added to the responses in the 'Server-Timing' header.
+STAGE_TIMINGS_ENABLED = False
+NAME_OF_THE_HEADER_WITH_STAGE_TIMINGS = 'Server-Timing'
+
+# If it is True, the part of the face is swapped on all faces (or on the chosen faces) of group photos
+# and their responses contain the swapped photo with 'face_detected_successfully' set to True.
+# This changes the public API: clients which expect group photos to be rejected
+# (with 'face_detected_successfully' set to False) have to be updated before it is turned on.
+# Otherwise only photos with exactly one face are processed.
+MULTI_FACE_SWAPPING_ENABLED = False
+
+# If it is True, the colors of several parts of the face swapped in one request are adjusted
+# after all parts have been cloned, with the colors of the photo itself, so the fitted classifiers
+# are shared with the requests which swap these parts one by one. Otherwise the output is the same
+# as the output of swapping the parts one after another. The fused colors of overlapping parts
+# (e.g. the lips and the nose) differ from that output by at most a few levels of the channels.
+FUSED_COLOR_ADJUSTMENT_OF_MANY_PARTS_OF_THE_FACE = True
+
+# If it is True, landmarks of faces in new photos are detected by a pool of worker processes
+# (see the class 'LandmarkDetectionService' from the module 'apps.face_element_swapping.endpoints')
+# which is started together with the WSGI application. Every worker loads its own copy of the models,
+# so every process of the server (e.g. a worker of gunicorn) adds the memory of all workers of its pool.
+LANDMARK_DETECTION_IN_WORKER_PROCESSES = False
+TIMEOUT_OF_THE_LANDMARK_DETECTION_IN_SECONDS = 30
+
+# If it is True, the landmarks of a new photo are moved from a saved near duplicate of the photo
+# (e.g. the same photo encoded again or slightly cropped) instead of being detected.
+# The near duplicates are found via perceptual hashes and aligned via thumbnails
+# (see the file 'apps/face_element_swapping/perceptual_hash.py').
+NEAR_DUPLICATE_REUSE_ENABLED = False
+# The nearest near duplicates are aligned one by one until one of them is aligned reliably.
+# Only the landmarks and the thumbnails of these photos are read from the database.
+MAXIMUM_NUMBER_OF_ALIGNED_NEAR_DUPLICATES = 3
+# If it is True, the statistics of the reuse of near duplicates (counted by every process separately)
+# are returned by the view 'near_duplicate_statistics'.
+NEAR_DUPLICATE_STATISTICS_ENABLED = False
+
+# If it is True, every process keeps the decoded example faces and their endpoints in memory.
+# All examples are loaded when the WSGI application is started (see the file 'myproject/wsgi.py'),
+# the examples added later are loaded by the first request which swaps them.
+# Saving or deleting an example (e.g. by the class 'SaveFacesIntoDB' or by the admin) changes the version
+# of the examples saved in the database in the row with the following id (see the class 'VersionOfTheExampleFaces'
+# from the file 'models.py'), which clears the examples kept by all processes. The version is read once per swap.
+EXAMPLE_FACE_CACHE_ENABLED = True
+ID_OF_THE_VERSION_OF_THE_EXAMPLE_FACES = 1
+
+# If it is True, the processes swap the example faces from the memory-mapped files of the following directory
+# (see the class 'ExampleAssetStore' from the file 'example_assets.py'), so all processes of a server
+# share a single copy of every example. The database always keeps the arrays of the examples:
+# the assets are built from the rows when they are missing (e.g. after a restart of a server whose disk isn't kept)
+# and their keys are saved in the rows.
+EXAMPLE_ASSET_STORE_ENABLED = False
+DIRECTORY_OF_THE_EXAMPLE_ASSETS = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "example_assets"
+)
+# The keys of the assets depend on this version, so a change of the files of the assets makes new keys.
+VERSION_OF_THE_EXAMPLE_ASSETS = 1
+
+# The maximum number of serialized landmarks whose endpoints are kept in memory.
+MAXIMUM_NUMBER_OF_CACHED_ENDPOINTS = 1024
+
+# The arrays of the photos are saved in the databases as bytes: a header (the version of the format,
+# the compression of the payload, the dtype and the shape of the array) followed by the payload.
+# The payload of the compression 'raw' is the buffer of the array, so it is decoded without any copy;
+# 'zlib' and 'png' (lossless) make the rows smaller and are decoded in a few dozen milliseconds.
+VERSION_OF_THE_SERIALIZED_RGB_ARRAYS = 1
+COMPRESSIONS_OF_THE_SERIALIZED_RGB_ARRAYS = {"raw": 0, "zlib": 1, "png": 2}
+COMPRESSION_OF_THE_SERIALIZED_RGB_ARRAYS = "zlib"
+LEVEL_OF_THE_ZLIB_COMPRESSION_OF_RGB_ARRAYS = 1
+LEVEL_OF_THE_PNG_COMPRESSION_OF_RGB_ARRAYS = 1
+
 MAXIMUM_SIDE_LENGTH = 710
 MAXIMUM_NUMBER_OF_PIXELS = MAXIMUM_SIDE_LENGTH * MAXIMUM_SIDE_LENGTH
 DEFAULT_RESIZING_FILTER = Image.LANCZOS
@@ -0,0 +1,31 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from .db_func import DBFunc
+from .models import DB_OBJECTS
+
+
+def change_version_of_the_example_faces(sender, **kwargs):
+    """
+    This function is called after an example face has been saved or deleted
+    (e.g. by the class 'SaveFacesIntoDB' from the file './dev/add_images_to_db.py' or by the admin).
+    Examples changed by the function 'update' of a query set don't send any signals.
+    """
+    DBFunc.change_version_of_the_example_faces()
+
+
+def clear_asset_key_of_an_edited_example(sender, instance, raw=False, **kwargs):
+    """
+    This function is called before an example face is saved. The asset of an edited example
+    may contain its old photo or its old landmarks, so the key of the asset is cleared
+    and the asset is built again from the row (see the function 'get_example_asset'
+    of the class 'ProcessUserPhoto' from the file './process_user_data/swap_elements_of_face.py').
+    """
+    if not raw and not instance._state.adding:
+        instance.asset_key = None
+
+
+def connect_signals_of_the_example_faces():
+    for model in DB_OBJECTS.values():
+        pre_save.connect(clear_asset_key_of_an_edited_example, sender=model)
+        post_save.connect(change_version_of_the_example_faces, sender=model)
+        post_delete.connect(change_version_of_the_example_faces, sender=model)
@@ -1,3 +1,1770 @@
-from django.test import TestCase
+import json
+import os
+import shutil
+import tempfile
+from io import BytesIO
+from math import ceil
+from unittest import mock
 
-# Create your tests here.
+import cv2
+import numpy as np
+from django.db import IntegrityError, connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+
+from apps.face_element_swapping import get_faces_landmarks
+from apps.face_element_swapping.buffer_pool import SCRATCH_BUFFERS, BufferPool
+from apps.face_element_swapping.change_faces import ChangeFaceElement
+from apps.face_element_swapping.color_adjustment import ColorIndex
+from apps.face_element_swapping.color_index_cache import ColorIndexCache
+from apps.face_element_swapping.endpoints import (
+    FaceLandmarks,
+    GetEndpointsOfANose,
+    GetEndpointsOfLips,
+    LandmarkTracker,
+)
+from apps.face_element_swapping.endpoints.helpers import get_faces_locations
+from apps.face_element_swapping.endpoints.settings import (
+    INDICES_OF_THE_LANDMARKS_OF_PARTS_OF_A_FACE,
+    NUMBER_OF_LANDMARKS_OF_A_FACE,
+)
+from apps.face_element_swapping.frames import swap_part_of_face_in_frames
+from apps.face_element_swapping.helpers import (
+    fill_pixel_if_belongs_to_polygon,
+    get_palette,
+    get_polygon_mask,
+    get_read_only_view,
+)
+from apps.face_element_swapping.piecewise_affine_warp import (
+    WarpMapCache,
+    get_delaunay_triangles,
+    get_warp_maps,
+)
+from apps.face_element_swapping.settings import (
+    COLOR_ADJUSTMENT_MODE_OF_THE_LOOKUP_TABLE,
+    DEFAULT_CLASSIFIER,
+    NUMBER_OF_CELLS_PER_CHANNEL_OF_THE_COLOR_LOOKUP_TABLE,
+    PERCENT_OF_NEAREST_NEIGHBOURS,
+    WARP_MODE_OF_THE_PIECEWISE_AFFINE_TRANSFORM,
+)
+
+from .db_func import DBFunc
+from .example_assets import ExampleAssetStore
+from .helpers import (
+    convert_base64_to_pil,
+    convert_bytes_to_rgb_array,
+    convert_img_to_base64,
+    convert_rgb_array_to_bytes,
+    correct_size,
+    get_digest_of_a_photo,
+    remove_prefix_from_base64,
+    resize_img,
+)
+from .models import DB_OBJECTS, Photo, VersionOfTheExampleFaces
+from .process_user_data import ProcessUserPhoto
+from .settings import (
+    COMPRESSIONS_OF_THE_SERIALIZED_RGB_ARRAYS,
+    DIRECTORIES_WITH_FACES,
+    ID_OF_THE_VERSION_OF_THE_EXAMPLE_FACES,
+    NAME_OF_THE_HEADER_WITH_STAGE_TIMINGS,
+    VERSION_OF_THE_SERIALIZED_RGB_ARRAYS,
+)
+
+PATH_OF_THE_USER_PHOTO = "./blog/dev/lips/Ariana_space_Grande.jpg"
+# The group photo is made of the user photo and this photo placed side by side.
+PATH_OF_THE_SECOND_FACE_OF_THE_GROUP_PHOTO = "./blog/dev/lips/Bebe_space_Rexha.jpg"
+PATHS_OF_THE_EXAMPLE_FACES = {
+    "lips": "./blog/dev/lips/Angelina_space_Jolie.jpg",
+    "nose": "./blog/dev/noses/Dua_space_Lipa.jpg",
+}
+# Bytes fetched besides the values of the columns needed to swap the parts of the face
+# (ids, counters, the transparent pixels and the landmarks).
+MAXIMUM_NUMBER_OF_ADDITIONAL_FETCHED_BYTES = 4096
+# The mean absolute differences of the channels between a swapped photo and the original photo
+# inside the lips which are swapped and inside the lips which aren't (the photos are saved as JPEG).
+MINIMUM_MEAN_DIFFERENCE_OF_A_SWAPPED_PART = 10.0
+MAXIMUM_MEAN_DIFFERENCE_OF_AN_UNCHANGED_PART = 3.0
+# The inputs of the tests of the fast paths are generated by a random generator with a fixed seed.
+SEED_OF_THE_RANDOM_INPUTS = 0
+# The longer side of the downscaled copies on which faces are detected
+# and the maximum displacement of the sides of the boxes found on them
+# (a fraction of the height or the width of the box found on the photo itself).
+MAXIMUM_SIDE_LENGTH_OF_THE_DOWNSCALED_PHOTOS = 320
+MAXIMUM_DISPLACEMENT_OF_THE_SIDES_OF_THE_FACE_BOXES = 0.15
+# Bounds of the differences between the channels of the colors looked up in the color lookup table
+# (with NUMBER_OF_CELLS_PER_CHANNEL_OF_THE_COLOR_LOOKUP_TABLE cells) and the colors calculated via the classifier.
+MAXIMUM_ABSOLUTE_ERROR_OF_THE_COLOR_LOOKUP_TABLE = 8
+MAXIMUM_MEAN_ABSOLUTE_ERROR_OF_THE_COLOR_LOOKUP_TABLE = 1.0
+# The maps of the warps are stored in the fixed-point representation
+# with 1 / 32 of a pixel precision.
+MAXIMUM_ERROR_OF_THE_WARP_MAPS = 1 / 32
+# The differences of the channels between the parts of the face adjusted in a single pass
+# and the parts swapped one after another (the nose is fitted to the photo without the swapped lips).
+# The observed differences are up to 2 and 0.02 on average inside the swapped parts.
+MAXIMUM_ABSOLUTE_DIFFERENCE_OF_THE_FUSED_COLOR_ADJUSTMENT = 4
+MAXIMUM_MEAN_DIFFERENCE_OF_THE_FUSED_COLOR_ADJUSTMENT = 0.1
+# The frames of the tested videos are made of the user photo moved by this number of pixels
+# between consecutive frames.
+SHIFT_OF_THE_FACE_BETWEEN_FRAMES = 2
+
+
+def open_rgb_photo(path):
+    """
+    :param path: path of a photo
+    :type path: string - str
+    :return: the photo resized like the photos sent by users
+    :rtype: PIL.Image.Image (https://pillow.readthedocs.io/en/3.1.x/reference/Image.html)
+    """
+    with Image.open(path) as pil:
+        pil = pil.convert("RGB")
+    if not correct_size(img=pil):
+        pil = resize_img(img=pil)
+    return pil
+
+
+def get_group_photo():
+    """
+    :return: the group photo with two faces (resized like the photos sent by users)
+    :rtype: PIL.Image.Image (https://pillow.readthedocs.io/en/3.1.x/reference/Image.html)
+    """
+    return resize_img(
+        img=Image.fromarray(
+            np.hstack(
+                [
+                    np.array(open_rgb_photo(path=path), dtype=np.uint8)
+                    for path in (
+                        PATH_OF_THE_USER_PHOTO,
+                        PATH_OF_THE_SECOND_FACE_OF_THE_GROUP_PHOTO,
+                    )
+                ]
+            )
+        )
+    )
+
+
+def get_rgb_array_of_the_response(response):
+    """
+    :param response: the response of the view with the swapped photo
+    :type response: django.http.response.JsonResponse
+    :return: the swapped photo
+    :rtype: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    """
+    return np.array(
+        convert_base64_to_pil(
+            photo_in_base64=remove_prefix_from_base64(
+                base64_with_prefix=json.loads(response.content)["img_src"]
+            )
+        ).convert("RGB"),
+        dtype=np.uint8,
+    )
+
+
+def get_number_of_fetched_bytes(queries):
+    """
+    The SELECT queries are executed again to measure the size of the values which they fetch.
+    :param queries: the queries captured by the class 'CaptureQueriesContext' (from 'django.test.utils')
+    :type queries: list - [] of dictionaries
+    :return: the total size of the fetched values (strings and bytes are counted by their length,
+    other values by 8 bytes)
+    :rtype: integer - int
+    """
+    number_of_bytes = 0
+    with connection.cursor() as cursor:
+        for query in get_select_queries(queries=queries):
+            cursor.execute(query)
+            for row in cursor.fetchall():
+                for value in row:
+                    if isinstance(value, str):
+                        number_of_bytes += len(value.encode())
+                    elif isinstance(value, (bytes, memoryview)):
+                        number_of_bytes += len(value)
+                    elif value is not None:
+                        number_of_bytes += 8
+    return number_of_bytes
+
+
+def get_select_queries(queries):
+    """
+    :param queries: the queries captured by the class 'CaptureQueriesContext' (from 'django.test.utils')
+    :type queries: list - [] of dictionaries
+    :return: SQL of the SELECT queries
+    :rtype: list - [] of strings
+    """
+    return [
+        query["sql"] for query in queries if query["sql"].lstrip().startswith("SELECT")
+    ]
+
+
+class FaceSwappingTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ids_of_the_example_faces = {}
+        cls.sizes_of_the_example_arrays = {}
+        for part_of_face, path in PATHS_OF_THE_EXAMPLE_FACES.items():
+            pil = open_rgb_photo(path=path)
+            rgb_array = np.array(pil, dtype=np.uint8)
+            serialized_rgb_array = convert_rgb_array_to_bytes(rgb_array=rgb_array)
+            DBFunc.save_example_photo(
+                part_of_face=part_of_face,
+                photo_name=part_of_face,
+                photo_in_base64=convert_img_to_base64(img=pil),
+                rgb_array=serialized_rgb_array,
+                landmarks=FaceLandmarks.from_face_recognition(
+                    face_landmarks=get_faces_landmarks(rgb_array=rgb_array)[0]
+                ).to_bytes(),
+            )
+            cls.ids_of_the_example_faces[part_of_face] = (
+                DB_OBJECTS[part_of_face].objects.get(photo_name=part_of_face).id
+            )
+            cls.sizes_of_the_example_arrays[part_of_face] = len(serialized_rgb_array)
+        cls.input_photo = convert_img_to_base64(
+            img=open_rgb_photo(path=PATH_OF_THE_USER_PHOTO)
+        )
+
+    def setUp(self):
+        ProcessUserPhoto.example_face_cache.clear()
+
+    def swap(self, parts_of_face):
+        """
+        :param parts_of_face: the swapped parts of the face (keys of the PATHS_OF_THE_EXAMPLE_FACES dictionary)
+        :type parts_of_face: list - [] of strings
+        :return: the response of the view
+        :rtype: django.http.response.JsonResponse
+        """
+        if len(parts_of_face) == 1:
+            return ProcessUserPhoto.process_user_photo(
+                input_photo=self.input_photo,
+                part_of_face=parts_of_face[0],
+                face_id=self.ids_of_the_example_faces[parts_of_face[0]],
+            )
+        return ProcessUserPhoto.process_user_photo(
+            input_photo=self.input_photo,
+            parts_of_face=json.dumps(
+                [
+                    [part_of_face, self.ids_of_the_example_faces[part_of_face]]
+                    for part_of_face in parts_of_face
+                ]
+            ),
+        )
+
+    def assert_swapped(self, response):
+        self.assertTrue(json.loads(response.content)["face_detected_successfully"])
+
+
+@mock.patch(
+    "blog.process_user_data.swap_elements_of_face.LANDMARK_DETECTION_IN_WORKER_PROCESSES",
+    False,
+)
+class DBAccessOfFaceSwappingTests(FaceSwappingTestCase):
+    def assert_photo_in_base64_not_fetched(self, queries):
+        for sql in get_select_queries(queries=queries):
+            self.assertNotIn("photo_in_base64", sql)
+
+    def get_size_of_the_saved_user_photo(self):
+        """
+        :return: size of the serialized array of the saved user photo
+        :rtype: integer - int
+        """
+        return len(
+            Photo.objects.get(
+                photo_digest=get_digest_of_a_photo(
+                    photo_in_base64=remove_prefix_from_base64(
+                        base64_with_prefix=self.input_photo
+                    )
+                )
+            ).rgb_array
+        )
+
+    def test_new_photo(self):
+        with CaptureQueriesContext(connection) as context:
+            self.assert_swapped(response=self.swap(parts_of_face=["lips"]))
+
+        # the lookup of the photo, the version of the examples and the lookup of the example
+        self.assertEqual(len(get_select_queries(queries=context.captured_queries)), 3)
+        self.assert_photo_in_base64_not_fetched(queries=context.captured_queries)
+        self.assertEqual(Photo.objects.count(), 1)
+
+    def test_landmarks_predicted_in_a_face_location_are_not_saved(self):
+        rgb_array = np.array(open_rgb_photo(path=PATH_OF_THE_USER_PHOTO), dtype=np.uint8)
+        top, right, bottom, left = get_faces_locations(rgb_array=rgb_array)[0]
+        # a box passed by a client may contain only a part of the face
+        response = ProcessUserPhoto.process_user_photo(
+            input_photo=self.input_photo,
+            part_of_face="lips",
+            face_id=self.ids_of_the_example_faces["lips"],
+            face_location=json.dumps([top, (left + right) // 2, bottom, left]),
+        )
+
+        self.assert_swapped(response=response)
+        self.assertFalse(Photo.objects.exists())
+        self.assert_swapped(response=self.swap(parts_of_face=["lips"]))
+        self.assertEqual(Photo.objects.get().number_of_detected_faces, 1)
+
+    def test_invalid_face_indices(self):
+        for face_indices in ["[1]", "[-1]", "[]", "[true]", "0", "[0"]:
+            response = ProcessUserPhoto.process_user_photo(
+                input_photo=self.input_photo,
+                part_of_face="lips",
+                face_id=self.ids_of_the_example_faces["lips"],
+                face_indices=face_indices,
+            )
+            data = json.loads(response.content)
+            self.assertFalse(data["face_detected_successfully"])
+            self.assertTrue(data["invalid_face_indices"])
+            self.assertEqual(data["number_of_detected_faces"], 1)
+
+        # the photo is saved by the first request, so the indices are also checked for a saved photo
+        self.assertEqual(Photo.objects.count(), 1)
+        self.assert_swapped(
+            response=ProcessUserPhoto.process_user_photo(
+                input_photo=self.input_photo,
+                part_of_face="lips",
+                face_id=self.ids_of_the_example_faces["lips"],
+                face_indices="[0]",
+            )
+        )
+
+    def test_saved_photo(self):
+        self.swap(parts_of_face=["lips"])
+
+        # the lookup of the photo and the version of the examples
+        # (the example has been cached by the first swap)
+        with self.assertNumQueries(2):
+            response = self.swap(parts_of_face=["lips"])
+        self.assert_swapped(response=response)
+
+    def test_stage_timings_of_a_saved_photo(self):
+        self.swap(parts_of_face=["lips"])
+
+        with mock.patch(
+            "blog.process_user_data.swap_elements_of_face.STAGE_TIMINGS_ENABLED", True
+        ):
+            response = self.swap(parts_of_face=["lips"])
+        names_of_the_stages = [
+            stage.split(";")[0].strip()
+            for stage in response[NAME_OF_THE_HEADER_WITH_STAGE_TIMINGS].split(",")
+        ]
+
+        self.assertIn("get_endpoints_of_a_row", names_of_the_stages)
+        self.assertIn("load_transparent_pixels", names_of_the_stages)
+
+    def test_saved_photo_with_many_parts_of_the_face(self):
+        self.swap(parts_of_face=["lips"])
+
+        # the lookup of the photo, the version of the examples (once per part of the face)
+        # and the lookup of the nose
+        with self.assertNumQueries(4):
+            response = self.swap(parts_of_face=["lips", "nose"])
+        self.assert_swapped(response=response)
+
+    def test_preloaded_example_faces(self):
+        self.swap(parts_of_face=["lips"])
+        ProcessUserPhoto.example_face_cache.clear()
+        with self.assertNumQueries(len(DB_OBJECTS) + 1):
+            ProcessUserPhoto.preload_example_faces()
+
+        with self.assertNumQueries(3):
+            response = self.swap(parts_of_face=["lips", "nose"])
+        self.assert_swapped(response=response)
+        self.assertFalse(
+            ProcessUserPhoto.example_face_cache.get_statistics()["misses"]
+        )
+
+    def test_example_faces_are_read_only(self):
+        example_face = ProcessUserPhoto.get_example_face(
+            part_of_face="lips", row_id=self.ids_of_the_example_faces["lips"]
+        )
+
+        self.assertFalse(example_face["rgb_array"].flags.writeable)
+        with self.assertRaises(TypeError):
+            example_face["endpoints"]["polygon"] = None
+
+    def test_example_faces_after_saving_an_example(self):
+        ProcessUserPhoto.preload_example_faces()
+        example = DB_OBJECTS["lips"].objects.get(
+            id=self.ids_of_the_example_faces["lips"]
+        )
+        example.landmarks = DB_OBJECTS["nose"].objects.get(
+            id=self.ids_of_the_example_faces["nose"]
+        ).landmarks
+        example.save()
+
+        with self.assertNumQueries(2):
+            example_face = ProcessUserPhoto.get_example_face(
+                part_of_face="lips", row_id=example.id
+            )
+        self.assertEqual(
+            example_face["endpoints"]["control_points"],
+            ProcessUserPhoto.prepare_endpoints_from_landmarks(
+                landmarks=bytes(example.landmarks), part_of_face="lips"
+            )["control_points"],
+        )
+
+    def test_example_faces_after_a_change_by_another_process(self):
+        ProcessUserPhoto.preload_example_faces()
+        landmarks_of_the_nose = bytes(
+            DB_OBJECTS["nose"]
+            .objects.get(id=self.ids_of_the_example_faces["nose"])
+            .landmarks
+        )
+        # Another process doesn't send any signals to this process,
+        # it only changes the example and the version saved in the database.
+        DB_OBJECTS["lips"].objects.filter(
+            id=self.ids_of_the_example_faces["lips"]
+        ).update(landmarks=landmarks_of_the_nose)
+        VersionOfTheExampleFaces.objects.update_or_create(
+            id=ID_OF_THE_VERSION_OF_THE_EXAMPLE_FACES,
+            defaults={"version": "changed by another process"},
+        )
+
+        example_face = ProcessUserPhoto.get_example_face(
+            part_of_face="lips", row_id=self.ids_of_the_example_faces["lips"]
+        )
+        self.assertEqual(
+            example_face["endpoints"]["control_points"],
+            ProcessUserPhoto.prepare_endpoints_from_landmarks(
+                landmarks=landmarks_of_the_nose, part_of_face="lips"
+            )["control_points"],
+        )
+
+    def test_example_faces_after_deleting_an_example(self):
+        ProcessUserPhoto.preload_example_faces()
+        DB_OBJECTS["nose"].objects.filter(
+            id=self.ids_of_the_example_faces["nose"]
+        ).delete()
+
+        self.assertIsNone(
+            ProcessUserPhoto.get_example_face(
+                part_of_face="nose", row_id=self.ids_of_the_example_faces["nose"]
+            )
+        )
+
+    def test_bytes_fetched_for_a_saved_photo(self):
+        self.swap(parts_of_face=["lips"])
+
+        with CaptureQueriesContext(connection) as context:
+            self.swap(parts_of_face=["lips", "nose"])
+
+        self.assert_photo_in_base64_not_fetched(queries=context.captured_queries)
+        self.assertLessEqual(
+            get_number_of_fetched_bytes(queries=context.captured_queries),
+            self.get_size_of_the_saved_user_photo()
+            + sum(self.sizes_of_the_example_arrays.values())
+            + MAXIMUM_NUMBER_OF_ADDITIONAL_FETCHED_BYTES,
+        )
+
+    def test_piecewise_affine_warp(self):
+        perspective_response = self.swap(parts_of_face=["lips"])
+        ProcessUserPhoto.warp_map_cache.clear()
+
+        with mock.patch(
+            "blog.process_user_data.swap_elements_of_face.WARP_MODE_OF_THE_FACE_SWAPPING",
+            WARP_MODE_OF_THE_PIECEWISE_AFFINE_TRANSFORM,
+        ):
+            responses = [self.swap(parts_of_face=["lips"]) for _ in range(2)]
+
+        for response in responses:
+            self.assert_swapped(response=response)
+        self.assertEqual(responses[0].content, responses[1].content)
+        self.assertNotEqual(responses[0].content, perspective_response.content)
+        # the maps of the second swap are taken from the cache
+        self.assertEqual(ProcessUserPhoto.warp_map_cache.misses, 1)
+        self.assertEqual(ProcessUserPhoto.warp_map_cache.hits, 1)
+
+    def test_color_index_of_a_saved_photo_is_cached(self):
+        self.swap(parts_of_face=["lips"])
+        ProcessUserPhoto.color_index_cache.clear()
+
+        responses = [self.swap(parts_of_face=["lips"]) for _ in range(2)]
+
+        self.assertEqual(responses[0].content, responses[1].content)
+        self.assertEqual(ProcessUserPhoto.color_index_cache.misses, 1)
+        self.assertEqual(ProcessUserPhoto.color_index_cache.hits, 1)
+
+    def test_saving_the_same_photo_twice(self):
+        photo_digest = "0" * 64
+        for number_of_detected_faces in (1, 2):
+            DBFunc.save_user_photo(
+                photo_in_base64="",
+                photo_digest=photo_digest,
+                number_of_detected_faces=number_of_detected_faces,
+            )
+
+        self.assertEqual(Photo.objects.get().number_of_detected_faces, 1)
+        with self.assertRaises(IntegrityError):
+            DBFunc.save_user_photo(
+                photo_in_base64="",
+                photo_digest="1" * 64,
+                number_of_detected_faces=None,
+            )
+
+    def test_lookup_of_a_missing_photo(self):
+        with self.assertNumQueries(1):
+            self.assertIsNone(DBFunc.get_user_photo_data(photo_digest="0" * 64))
+
+    def test_lookup_of_a_missing_example(self):
+        with self.assertNumQueries(1):
+            self.assertIsNone(
+                DBFunc.get_example_photo_data(part_of_face="lips", row_id=0)
+            )
+
+    def test_list_of_examples(self):
+        with CaptureQueriesContext(connection) as context:
+            examples = DBFunc.get_all_photos_of_a_part_of_the_face(part_of_face="lips")
+
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertNotIn("rgb_array", context.captured_queries[0]["sql"])
+        self.assertEqual(
+            [example["id"] for example in examples],
+            [self.ids_of_the_example_faces["lips"]],
+        )
+
+
+@mock.patch(
+    "blog.process_user_data.swap_elements_of_face.LANDMARK_DETECTION_IN_WORKER_PROCESSES",
+    False,
+)
+@mock.patch(
+    "blog.process_user_data.swap_elements_of_face.MULTI_FACE_SWAPPING_ENABLED", True
+)
+class GroupPhotosTests(FaceSwappingTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        group_photo = get_group_photo()
+        cls.input_photo = convert_img_to_base64(img=group_photo)
+        # the photo is compared with the photo decoded from the input (like by the view)
+        cls.rgb_array = np.array(
+            convert_base64_to_pil(
+                photo_in_base64=remove_prefix_from_base64(
+                    base64_with_prefix=cls.input_photo
+                )
+            ).convert("RGB"),
+            dtype=np.uint8,
+        )
+        cls.faces_landmarks = ProcessUserPhoto.sort_faces_landmarks(
+            faces_landmarks=get_faces_landmarks(rgb_array=cls.rgb_array)
+        )
+
+    def get_mean_differences_of_the_lips(self, rgb_array):
+        """
+        :param rgb_array: the swapped group photo
+        :type rgb_array: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        :return: the mean absolute differences between the swapped photo and the group photo
+        inside the lips of every face (ordered from left to right)
+        :rtype: list - [] of floats
+        """
+        differences = []
+        for face_landmarks in self.faces_landmarks:
+            polygon = GetEndpointsOfLips.get_endpoints_of_lips(face_landmarks)
+            (
+                rectangle_of_the_group_photo,
+                polygon_mask,
+            ) = ChangeFaceElement.get_pixels_inside_polygon(
+                rgb_array=self.rgb_array, polygon=polygon
+            )
+            rectangle_of_the_swapped_photo = ChangeFaceElement.get_pixels_inside_polygon(
+                rgb_array=rgb_array, polygon=polygon
+            )[0]
+            differences.append(
+                float(
+                    np.abs(
+                        rectangle_of_the_swapped_photo[polygon_mask].astype(np.int16)
+                        - rectangle_of_the_group_photo[polygon_mask]
+                    ).mean()
+                )
+            )
+        return differences
+
+    def swap_faces(self, face_indices=None):
+        """
+        :param face_indices: see the parameter 'face_indices' of the function 'process_user_photo'
+        (class 'ProcessUserPhoto')
+        :type face_indices: string - str or None
+        :return: the mean differences of the lips of the swapped photo
+        (see the function 'get_mean_differences_of_the_lips' contained in this class)
+        :rtype: list - [] of floats
+        """
+        response = ProcessUserPhoto.process_user_photo(
+            input_photo=self.input_photo,
+            part_of_face="lips",
+            face_id=self.ids_of_the_example_faces["lips"],
+            face_indices=face_indices,
+        )
+        self.assert_swapped(response=response)
+        self.assertEqual(json.loads(response.content)["number_of_detected_faces"], 2)
+        return self.get_mean_differences_of_the_lips(
+            rgb_array=get_rgb_array_of_the_response(response=response)
+        )
+
+    def test_all_faces_are_swapped(self):
+        self.assertEqual(len(self.faces_landmarks), 2)
+        for difference in self.swap_faces():
+            self.assertGreater(difference, MINIMUM_MEAN_DIFFERENCE_OF_A_SWAPPED_PART)
+
+    def test_chosen_faces_are_swapped(self):
+        difference_of_the_first_face, difference_of_the_second_face = self.swap_faces(
+            face_indices="[1]"
+        )
+
+        self.assertLess(
+            difference_of_the_first_face, MAXIMUM_MEAN_DIFFERENCE_OF_AN_UNCHANGED_PART
+        )
+        self.assertGreater(
+            difference_of_the_second_face, MINIMUM_MEAN_DIFFERENCE_OF_A_SWAPPED_PART
+        )
+
+    def test_faces_swapped_in_parallel_are_the_same_as_faces_swapped_one_by_one(self):
+        src_rgb_array = np.array(
+            open_rgb_photo(path=PATHS_OF_THE_EXAMPLE_FACES["lips"]), dtype=np.uint8
+        )
+        src_polygon = GetEndpointsOfLips.get_endpoints_of_lips(
+            get_faces_landmarks(rgb_array=src_rgb_array)[0]
+        )
+        dst_polygons = [
+            GetEndpointsOfLips.get_endpoints_of_lips(face_landmarks)
+            for face_landmarks in self.faces_landmarks
+        ]
+
+        swapped_rgb_arrays = [
+            ChangeFaceElement.change_face_elements(
+                src_rgb_array=src_rgb_array,
+                dst_rgb_array=self.rgb_array,
+                src_polygon=src_polygon,
+                dst_polygons=dst_polygons,
+                in_parallel=in_parallel,
+            )
+            for in_parallel in (True, False)
+        ]
+
+        np.testing.assert_array_equal(swapped_rgb_arrays[0], swapped_rgb_arrays[1])
+        expected_rgb_array = self.rgb_array
+        for dst_polygon in dst_polygons:
+            expected_rgb_array = ChangeFaceElement.change_face_element(
+                src_rgb_array=src_rgb_array,
+                dst_rgb_array=expected_rgb_array,
+                src_polygon=src_polygon,
+                dst_polygon=dst_polygon,
+            )
+        np.testing.assert_array_equal(swapped_rgb_arrays[0], expected_rgb_array)
+
+
+@mock.patch(
+    "blog.process_user_data.swap_elements_of_face.NEAR_DUPLICATE_REUSE_ENABLED", True
+)
+class NearDuplicatesOfUserPhotosTests(FaceSwappingTestCase):
+    def setUp(self):
+        super().setUp()
+        ProcessUserPhoto.near_duplicate_statistics.clear()
+
+    @staticmethod
+    def save_user_photo(perceptual_hash):
+        """
+        This function saves a user photo with one face, which differs from other photos only by its hash.
+        :param perceptual_hash: the perceptual hash of the photo
+        :type perceptual_hash: integer - int
+        """
+        DBFunc.save_user_photo(
+            photo_in_base64="",
+            photo_digest="{:064x}".format(perceptual_hash),
+            number_of_detected_faces=1,
+            landmarks=b"landmarks",
+            perceptual_hash=perceptual_hash,
+            thumbnail=b"thumbnail",
+        )
+
+    def test_landmarks_of_a_near_duplicate_are_reused(self):
+        self.assert_swapped(response=self.swap(parts_of_face=["lips"]))
+        buffer = BytesIO()
+        open_rgb_photo(path=PATH_OF_THE_USER_PHOTO).save(buffer, "JPEG", quality=75)
+        with Image.open(buffer) as pil:
+            self.input_photo = convert_img_to_base64(img=pil.convert("RGB"))
+
+        self.assert_swapped(response=self.swap(parts_of_face=["lips"]))
+        self.assertEqual(Photo.objects.count(), 2)
+        self.assertEqual(
+            ProcessUserPhoto.near_duplicate_statistics.get_statistics()["hits"], 1
+        )
+
+    def test_columns_of_the_candidates(self):
+        perceptual_hash = 0x0123456789ABCDEF
+        # a near duplicate, a photo which shares three bands but differs by 16 bits
+        # and another near duplicate
+        for changed_bits in (0b1, 0xFFFF, 0b111):
+            self.save_user_photo(perceptual_hash=perceptual_hash ^ changed_bits)
+
+        with CaptureQueriesContext(connection) as context:
+            near_duplicates = DBFunc.get_near_duplicates_of_a_user_photo(
+                perceptual_hash=perceptual_hash,
+                maximum_hamming_distance=3,
+                maximum_number_of_near_duplicates=1,
+            )
+
+        self.assertEqual(
+            [hamming_distance for hamming_distance, _ in near_duplicates], [1]
+        )
+        self.assertEqual(bytes(near_duplicates[0][1].landmarks), b"landmarks")
+        lookup_of_the_candidates, lookup_of_the_near_duplicates = get_select_queries(
+            queries=context.captured_queries
+        )
+        self.assertNotIn("thumbnail", lookup_of_the_candidates.split("WHERE")[0])
+        self.assertNotIn("landmarks", lookup_of_the_candidates.split("WHERE")[0])
+        self.assertIn("thumbnail", lookup_of_the_near_duplicates)
+
+
+@mock.patch(
+    "blog.process_user_data.swap_elements_of_face.LANDMARK_DETECTION_IN_WORKER_PROCESSES",
+    False,
+)
+class ExampleAssetStoreTests(FaceSwappingTestCase):
+    def setUp(self):
+        super().setUp()
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        self.example_asset_store = ExampleAssetStore(directory=temporary_directory.name)
+        for patcher in (
+            mock.patch.object(
+                ProcessUserPhoto, "example_asset_store", self.example_asset_store
+            ),
+            mock.patch(
+                "blog.process_user_data.swap_elements_of_face.EXAMPLE_ASSET_STORE_ENABLED",
+                True,
+            ),
+            mock.patch("blog.db_func.EXAMPLE_ASSET_STORE_ENABLED", True),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def get_example(self, part_of_face):
+        """
+        :param part_of_face: a key of the PATHS_OF_THE_EXAMPLE_FACES dictionary
+        :type part_of_face: string - str
+        :return: the row of the example face
+        :rtype: an instance of a class which inherit from the class 'PartOfFace' (from the file '.models')
+        """
+        return DB_OBJECTS[part_of_face].objects.get(
+            id=self.ids_of_the_example_faces[part_of_face]
+        )
+
+    def test_same_key_of_the_same_example(self):
+        example = self.get_example(part_of_face="lips")
+        rgb_array = np.array(
+            open_rgb_photo(path=PATHS_OF_THE_EXAMPLE_FACES["lips"]), dtype=np.uint8
+        )
+
+        self.assertEqual(
+            *[
+                ProcessUserPhoto.save_example_asset(
+                    rgb_array=rgb_array,
+                    landmarks=bytes(example.landmarks),
+                    part_of_face="lips",
+                )
+                for _ in range(2)
+            ]
+        )
+
+    def test_assets_are_memory_mapped_and_read_only(self):
+        example_face = ProcessUserPhoto.get_example_face(
+            part_of_face="nose", row_id=self.ids_of_the_example_faces["nose"]
+        )
+
+        self.assertIsInstance(example_face["rgb_array"].base, np.memmap)
+        self.assertFalse(example_face["rgb_array"].flags.writeable)
+        # only the bounding rectangle of the nose is read
+        self.assertLess(
+            example_face["rgb_array"].nbytes,
+            np.array(open_rgb_photo(path=PATHS_OF_THE_EXAMPLE_FACES["nose"])).nbytes,
+        )
+
+    def test_rows_keep_the_arrays_of_the_examples(self):
+        ProcessUserPhoto.get_example_face(
+            part_of_face="nose", row_id=self.ids_of_the_example_faces["nose"]
+        )
+
+        example = self.get_example(part_of_face="nose")
+        self.assertIsNotNone(example.asset_key)
+        self.assertEqual(
+            len(example.rgb_array), self.sizes_of_the_example_arrays["nose"]
+        )
+
+    def test_array_of_an_example_with_an_asset_is_not_loaded(self):
+        ProcessUserPhoto.get_example_face(
+            part_of_face="lips", row_id=self.ids_of_the_example_faces["lips"]
+        )
+        ProcessUserPhoto.example_face_cache.clear()
+
+        with CaptureQueriesContext(connection) as context:
+            ProcessUserPhoto.get_example_face(
+                part_of_face="lips", row_id=self.ids_of_the_example_faces["lips"]
+            )
+        # the version of the examples and the lookup of the example
+        self.assertEqual(len(context.captured_queries), 2)
+        for query in context.captured_queries:
+            self.assertNotIn("rgb_array", query["sql"])
+
+    def test_missing_assets_are_built_again(self):
+        expected_example_face = ProcessUserPhoto.get_example_face(
+            part_of_face="nose", row_id=self.ids_of_the_example_faces["nose"]
+        )
+        asset_key = self.get_example(part_of_face="nose").asset_key
+        shutil.rmtree(
+            os.path.dirname(
+                self.example_asset_store.get_path_of_an_asset(asset_key=asset_key)
+            )
+        )
+        ProcessUserPhoto.example_face_cache.clear()
+
+        example_face = ProcessUserPhoto.get_example_face(
+            part_of_face="nose", row_id=self.ids_of_the_example_faces["nose"]
+        )
+        np.testing.assert_array_equal(
+            example_face["rgb_array"], expected_example_face["rgb_array"]
+        )
+        self.assertEqual(self.get_example(part_of_face="nose").asset_key, asset_key)
+
+    def test_asset_key_of_an_edited_example_is_cleared(self):
+        ProcessUserPhoto.get_example_face(
+            part_of_face="lips", row_id=self.ids_of_the_example_faces["lips"]
+        )
+        example = self.get_example(part_of_face="lips")
+        example.photo_name = "edited"
+        example.save()
+
+        self.assertIsNone(self.get_example(part_of_face="lips").asset_key)
+
+    def test_swapping_assets(self):
+        with mock.patch(
+            "blog.process_user_data.swap_elements_of_face.EXAMPLE_ASSET_STORE_ENABLED",
+            False,
+        ):
+            expected_responses = [
+                self.swap(parts_of_face=parts_of_face).content
+                for parts_of_face in (["lips"], ["lips", "nose"])
+            ]
+        ProcessUserPhoto.example_face_cache.clear()
+
+        self.assertEqual(
+            [
+                self.swap(parts_of_face=parts_of_face).content
+                for parts_of_face in (["lips"], ["lips", "nose"])
+            ],
+            expected_responses,
+        )
+
+
+def get_dictionary_of_landmarks(landmarks):
+    """
+    :param landmarks: all landmarks of a face (the array has following shape(68, 2))
+    :type landmarks: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+    :return: the landmarks in the same format as the landmarks generated
+    by the function 'face_landmarks' from the module named 'face_recognition'
+    :rtype: dictionary - {}
+    """
+    return {
+        name_of_a_part: list(map(tuple, landmarks[indices].tolist()))
+        for name_of_a_part, indices in INDICES_OF_THE_LANDMARKS_OF_PARTS_OF_A_FACE.items()
+    }
+
+
+class FastPathsOfTheFaceSwappingTests(SimpleTestCase):
+    def setUp(self):
+        self.random_state = np.random.RandomState(SEED_OF_THE_RANDOM_INPUTS)
+
+    def test_polygon_mask_is_the_same_as_the_mask_of_shapely(self):
+        for _ in range(8):
+            # Integer vertices put many pixels exactly on the edges of the polygon.
+            polygon = list(map(tuple, self.random_state.randint(0, 40, (6, 2)).tolist()))
+            bounding_rectangle_of_polygon = (
+                ChangeFaceElement.get_bounding_rectangle_of_polygon(polygon=polygon)
+            )
+            x, y, width, height = bounding_rectangle_of_polygon
+            expected_mask = np.zeros((y + height, x + width, 1), dtype=np.uint8)
+            for row_idx in range(y, y + height):
+                for column_idx in range(x, x + width):
+                    fill_pixel_if_belongs_to_polygon(
+                        rgb_array=expected_mask,
+                        polygon=polygon,
+                        row_idx=row_idx,
+                        column_idx=column_idx,
+                        pixel_value=np.ones(1, dtype=np.uint8),
+                    )
+
+            np.testing.assert_array_equal(
+                get_polygon_mask(
+                    polygon=polygon,
+                    bounding_rectangle_of_polygon=bounding_rectangle_of_polygon,
+                ),
+                expected_mask[y:, x:, 0].astype(bool),
+            )
+
+    def adjust_image_colors_pixel_by_pixel(
+        self, training_image, image_to_adjust, polygon_of_images
+    ):
+        """
+        The colors are adjusted like before the vectorization of the function 'adjust_image_colors_via_classifier'
+        (from the class 'ChangeFaceElement'), i.e. every pixel of the bounding rectangle of the polygon
+        is checked by the module 'shapely' and filled separately.
+        :return: the adjusted copy of 'image_to_adjust'
+        :rtype: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        """
+        image_to_adjust = image_to_adjust.copy()
+        x, y, width, height = ChangeFaceElement.get_bounding_rectangle_of_polygon(
+            polygon=polygon_of_images
+        )
+        training_data = np.unique(
+            training_image[y : y + height, x : x + width].reshape(-1, 3), axis=0
+        )
+        training_data_avg = np.average(training_data, axis=0)
+        training_data_std = np.std(training_data, axis=0)
+        classifier = DEFAULT_CLASSIFIER(
+            n_neighbors=ceil(PERCENT_OF_NEAREST_NEIGHBOURS * training_data.shape[0])
+        )
+        classifier.fit(
+            (training_data - training_data_avg) / training_data_std,
+            range(training_data.shape[0]),
+        )
+        data_to_adjust = image_to_adjust[y : y + height, x : x + width].reshape(-1, 3)
+        labels = classifier.kneighbors(
+            (data_to_adjust - training_data_avg) / training_data_std,
+            return_distance=False,
+        )
+
+        label_idx = 0
+        for row_idx in range(y, y + height):
+            for column_idx in range(x, x + width):
+                fill_pixel_if_belongs_to_polygon(
+                    rgb_array=image_to_adjust,
+                    polygon=polygon_of_images,
+                    row_idx=row_idx,
+                    column_idx=column_idx,
+                    pixel_value=np.round(
+                        np.average(training_data[labels[label_idx]], axis=0)
+                    ).astype(np.uint8),
+                )
+                label_idx += 1
+        return image_to_adjust
+
+    def test_colors_adjusted_inside_the_polygon_mask_are_the_same_as_pixel_by_pixel(self):
+        for _ in range(4):
+            training_image = self.random_state.randint(0, 256, (48, 52, 3)).astype(
+                np.uint8
+            )
+            image_to_adjust = self.random_state.randint(0, 256, (48, 52, 3)).astype(
+                np.uint8
+            )
+            polygon_of_images = list(
+                map(tuple, self.random_state.randint(2, 46, (5, 2)).tolist())
+            )
+            bounding_rectangle_of_polygon = (
+                ChangeFaceElement.get_bounding_rectangle_of_polygon(
+                    polygon=polygon_of_images
+                )
+            )
+            x, y, width, height = bounding_rectangle_of_polygon
+            polygon_mask = np.zeros(image_to_adjust.shape[:2], dtype=bool)
+            polygon_mask[y : y + height, x : x + width] = get_polygon_mask(
+                polygon=polygon_of_images,
+                bounding_rectangle_of_polygon=bounding_rectangle_of_polygon,
+            )
+            self.assertTrue(polygon_mask.any())
+
+            adjusted_image = ChangeFaceElement.adjust_image_colors_via_classifier(
+                classifier=DEFAULT_CLASSIFIER,
+                training_image=training_image,
+                image_to_adjust=image_to_adjust.copy(),
+                polygon_of_images=polygon_of_images,
+            )
+
+            np.testing.assert_array_equal(
+                adjusted_image[~polygon_mask], image_to_adjust[~polygon_mask]
+            )
+            np.testing.assert_array_equal(
+                adjusted_image,
+                self.adjust_image_colors_pixel_by_pixel(
+                    training_image=training_image,
+                    image_to_adjust=image_to_adjust,
+                    polygon_of_images=polygon_of_images,
+                ),
+            )
+
+    def test_palette_is_the_same_as_the_unique_rows(self):
+        # Few values per channel make many repeated colors, the extreme values check the packing.
+        for rgb_values in (
+            self.random_state.choice([0, 1, 127, 128, 254, 255], (500, 3)),
+            self.random_state.randint(0, 256, (500, 3)),
+            np.zeros((1, 3)),
+        ):
+            rgb_values = rgb_values.astype(np.uint8)
+            colors, counts = get_palette(rgb_values=rgb_values)
+
+            expected_colors, expected_counts = np.unique(
+                rgb_values, axis=0, return_counts=True
+            )
+            self.assertEqual(colors.dtype, np.uint8)
+            np.testing.assert_array_equal(colors, expected_colors)
+            np.testing.assert_array_equal(counts, expected_counts)
+
+    def test_cloning_in_the_region_of_interest_is_the_same_as_in_the_whole_image(self):
+        dst_rgb_array = (
+            self.random_state.rand(200, 220, 3) * 40
+            + np.linspace(0, 200, 220)[np.newaxis, :, np.newaxis]
+        ).astype(np.uint8)
+        dst_polygon = [(80, 90), (110, 70), (140, 92), (112, 120)]
+        _, _, width, height = ChangeFaceElement.get_bounding_rectangle_of_polygon(
+            polygon=dst_polygon
+        )
+        cropped_dst_rgb_array = self.random_state.randint(
+            0, 256, (height, width, 3)
+        ).astype(np.uint8)
+
+        swapped_rgb_arrays = [
+            ChangeFaceElement.fill_polygon_in_a_rectangle(
+                dst_rgb_array=dst_rgb_array,
+                dst_polygon=dst_polygon,
+                cropped_dst_rgb_array=cropped_dst_rgb_array,
+                region_of_interest_cloning=region_of_interest_cloning,
+            )
+            for region_of_interest_cloning in (True, False)
+        ]
+
+        self.assertTrue((swapped_rgb_arrays[0] != dst_rgb_array).any())
+        np.testing.assert_array_equal(swapped_rgb_arrays[0], swapped_rgb_arrays[1])
+
+    def test_colors_of_the_lookup_table_are_close_to_the_colors_of_the_classifier(self):
+        training_image = np.array(
+            open_rgb_photo(path=PATH_OF_THE_USER_PHOTO), dtype=np.uint8
+        )
+        # the lips of another face have colors which don't belong to the training palette
+        image_to_adjust = np.array(
+            open_rgb_photo(path=PATHS_OF_THE_EXAMPLE_FACES["lips"]), dtype=np.uint8
+        )
+        polygon_of_images = GetEndpointsOfLips.get_endpoints_of_lips(
+            get_faces_landmarks(rgb_array=training_image)[0]
+        )
+
+        report = ChangeFaceElement.get_error_report_of_the_lookup_table(
+            classifier=DEFAULT_CLASSIFIER,
+            training_image=training_image,
+            image_to_adjust=image_to_adjust,
+            polygon_of_images=polygon_of_images,
+            numbers_of_cells_per_channel=[
+                NUMBER_OF_CELLS_PER_CHANNEL_OF_THE_COLOR_LOOKUP_TABLE
+            ],
+        )
+        (lookup_table,) = report["lookup_tables"]
+
+        self.assertGreater(report["number_of_pixels"], 0)
+        self.assertLessEqual(
+            lookup_table["maximum_absolute_error"],
+            MAXIMUM_ABSOLUTE_ERROR_OF_THE_COLOR_LOOKUP_TABLE,
+        )
+        self.assertLessEqual(
+            lookup_table["mean_absolute_error"],
+            MAXIMUM_MEAN_ABSOLUTE_ERROR_OF_THE_COLOR_LOOKUP_TABLE,
+        )
+        self.assertLessEqual(lookup_table["fraction_of_different_pixels"], 1.0)
+
+    def test_number_of_cells_of_the_color_adjuster(self):
+        training_image = self.random_state.randint(0, 256, (40, 40, 3)).astype(np.uint8)
+
+        color_adjuster = ChangeFaceElement.get_color_adjuster(
+            classifier=DEFAULT_CLASSIFIER,
+            training_image=training_image,
+            polygon_of_images=[(5, 5), (30, 8), (25, 35)],
+            color_adjustment_mode=COLOR_ADJUSTMENT_MODE_OF_THE_LOOKUP_TABLE,
+            number_of_cells_per_channel=8,
+        )
+
+        self.assertEqual(color_adjuster.number_of_cells_per_channel, 8)
+
+    def test_landmark_operators_are_the_same_as_the_endpoint_functions(self):
+        landmarks = self.random_state.randint(
+            100, 600, (32, NUMBER_OF_LANDMARKS_OF_A_FACE, 2)
+        )
+        endpoints_of_lips = GetEndpointsOfLips.get_endpoints_of_lips_of_many_faces(
+            landmarks=landmarks
+        )
+        endpoints_of_noses = GetEndpointsOfANose.get_endpoints_of_noses_of_many_faces(
+            landmarks=landmarks
+        )
+
+        for idx, landmarks_of_a_face in enumerate(landmarks):
+            face_landmarks = get_dictionary_of_landmarks(landmarks=landmarks_of_a_face)
+            endpoints_of_a_nose = GetEndpointsOfANose.get_endpoints_of_a_nose(
+                face_landmarks
+            )
+            np.testing.assert_array_equal(
+                endpoints_of_lips[idx],
+                GetEndpointsOfLips.get_endpoints_of_lips(face_landmarks),
+            )
+            for key in ("four_endpoints", "six_endpoints"):
+                np.testing.assert_array_equal(
+                    endpoints_of_noses[key][idx], endpoints_of_a_nose[key]
+                )
+
+    def test_bytes_of_face_landmarks(self):
+        landmarks = self.random_state.randint(
+            0, 710, (3, NUMBER_OF_LANDMARKS_OF_A_FACE, 2)
+        )
+        faces_landmarks = [
+            FaceLandmarks.from_face_recognition(
+                face_landmarks=get_dictionary_of_landmarks(landmarks=landmarks_of_a_face)
+            )
+            for landmarks_of_a_face in landmarks
+        ]
+
+        deserialized_faces_landmarks = FaceLandmarks.from_bytes_of_many_faces(
+            data=FaceLandmarks.to_bytes_of_many_faces(faces_landmarks=faces_landmarks)
+        )
+
+        self.assertEqual(len(deserialized_faces_landmarks), len(faces_landmarks))
+        for landmarks_of_a_face, face_landmarks in zip(
+            landmarks, deserialized_faces_landmarks
+        ):
+            np.testing.assert_array_equal(face_landmarks.array, landmarks_of_a_face)
+            self.assertEqual(
+                dict(face_landmarks),
+                get_dictionary_of_landmarks(landmarks=landmarks_of_a_face),
+            )
+            self.assertEqual(
+                FaceLandmarks.from_bytes(data=face_landmarks.to_bytes()).to_bytes(),
+                face_landmarks.to_bytes(),
+            )
+
+
+class ReadOnlyInputsOfTheFaceSwappingTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.dst_rgb_array = np.array(
+            open_rgb_photo(path=PATH_OF_THE_USER_PHOTO), dtype=np.uint8
+        )
+        cls.dst_face_landmarks = get_faces_landmarks(rgb_array=cls.dst_rgb_array)[0]
+        cls.src_rgb_arrays = {}
+        cls.src_faces_landmarks = {}
+        for part_of_face, path in PATHS_OF_THE_EXAMPLE_FACES.items():
+            cls.src_rgb_arrays[part_of_face] = np.array(
+                open_rgb_photo(path=path), dtype=np.uint8
+            )
+            cls.src_faces_landmarks[part_of_face] = get_faces_landmarks(
+                rgb_array=cls.src_rgb_arrays[part_of_face]
+            )[0]
+
+    def change_face_element(self, part_of_face, src_rgb_array, dst_rgb_array):
+        """
+        :param part_of_face: a key of the PATHS_OF_THE_EXAMPLE_FACES dictionary
+        :type part_of_face: string - str
+        :return: the user photo with the part of the face from the example face
+        :rtype: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        """
+        if part_of_face == "lips":
+            src_polygon = GetEndpointsOfLips.get_endpoints_of_lips(
+                self.src_faces_landmarks[part_of_face]
+            )
+            dst_polygon = GetEndpointsOfLips.get_endpoints_of_lips(
+                self.dst_face_landmarks
+            )
+            dst_cut_field = None
+        else:
+            src_polygon = GetEndpointsOfANose.get_endpoints_of_a_nose(
+                self.src_faces_landmarks[part_of_face]
+            )["four_endpoints"]
+            dst_endpoints = GetEndpointsOfANose.get_endpoints_of_a_nose(
+                self.dst_face_landmarks
+            )
+            dst_polygon = dst_endpoints["four_endpoints"]
+            dst_cut_field = dst_endpoints["six_endpoints"]
+        return ChangeFaceElement.change_face_element(
+            src_rgb_array=src_rgb_array,
+            dst_rgb_array=dst_rgb_array,
+            src_polygon=src_polygon,
+            dst_polygon=dst_polygon,
+            dst_cut_field=dst_cut_field,
+        )
+
+    def test_read_only_inputs_are_not_changed(self):
+        for part_of_face, src_rgb_array in self.src_rgb_arrays.items():
+            with self.subTest(part_of_face=part_of_face):
+                dst_rgb_array = self.dst_rgb_array.copy()
+                src_rgb_array = src_rgb_array.copy()
+
+                # writing to the read-only views would raise ValueError
+                swapped_rgb_array = self.change_face_element(
+                    part_of_face=part_of_face,
+                    src_rgb_array=get_read_only_view(np_array=src_rgb_array),
+                    dst_rgb_array=get_read_only_view(np_array=dst_rgb_array),
+                )
+
+                np.testing.assert_array_equal(dst_rgb_array, self.dst_rgb_array)
+                np.testing.assert_array_equal(
+                    src_rgb_array, self.src_rgb_arrays[part_of_face]
+                )
+                self.assertFalse(np.shares_memory(swapped_rgb_array, dst_rgb_array))
+                self.assertTrue((swapped_rgb_array != dst_rgb_array).any())
+
+    def test_scratch_buffers_are_reused_by_the_next_swaps(self):
+        SCRATCH_BUFFERS.clear()
+        swapped_rgb_array = self.change_face_element(
+            part_of_face="lips",
+            src_rgb_array=self.src_rgb_arrays["lips"],
+            dst_rgb_array=self.dst_rgb_array,
+        )
+        number_of_bytes = SCRATCH_BUFFERS.get_number_of_bytes()
+        mask = SCRATCH_BUFFERS.get_buffer(name="mask", shape=(1,), dtype=np.uint8)
+
+        for _ in range(2):
+            np.testing.assert_array_equal(
+                self.change_face_element(
+                    part_of_face="lips",
+                    src_rgb_array=self.src_rgb_arrays["lips"],
+                    dst_rgb_array=self.dst_rgb_array,
+                ),
+                swapped_rgb_array,
+            )
+
+        self.assertGreater(number_of_bytes, 0)
+        self.assertEqual(SCRATCH_BUFFERS.get_number_of_bytes(), number_of_bytes)
+        self.assertTrue(
+            np.shares_memory(
+                SCRATCH_BUFFERS.get_buffer(name="mask", shape=(1,), dtype=np.uint8),
+                mask,
+            )
+        )
+
+    def test_buffers_are_enlarged_only_if_they_are_too_small(self):
+        buffer_pool = BufferPool()
+        buffer = buffer_pool.get_buffer(name="buffer", shape=(4, 5, 3), dtype=np.uint8)
+
+        smaller_buffer = buffer_pool.get_buffer(
+            name="buffer", shape=(2, 3), dtype=np.uint16
+        )
+        self.assertEqual(smaller_buffer.shape, (2, 3))
+        self.assertEqual(smaller_buffer.dtype, np.uint16)
+        self.assertTrue(np.shares_memory(smaller_buffer, buffer))
+
+        bigger_buffer = buffer_pool.get_buffer(
+            name="buffer", shape=(8, 5, 3), dtype=np.uint8
+        )
+        self.assertFalse(np.shares_memory(bigger_buffer, buffer))
+        self.assertEqual(buffer_pool.get_number_of_bytes(), bigger_buffer.nbytes)
+
+
+class ManyPartsOfTheFaceTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.dst_rgb_array = np.array(
+            open_rgb_photo(path=PATH_OF_THE_USER_PHOTO), dtype=np.uint8
+        )
+        dst_face_landmarks = get_faces_landmarks(rgb_array=cls.dst_rgb_array)[0]
+        src_rgb_arrays = {
+            part_of_face: np.array(open_rgb_photo(path=path), dtype=np.uint8)
+            for part_of_face, path in PATHS_OF_THE_EXAMPLE_FACES.items()
+        }
+        src_faces_landmarks = {
+            part_of_face: get_faces_landmarks(rgb_array=src_rgb_array)[0]
+            for part_of_face, src_rgb_array in src_rgb_arrays.items()
+        }
+        dst_endpoints_of_a_nose = GetEndpointsOfANose.get_endpoints_of_a_nose(
+            dst_face_landmarks
+        )
+        # the lips and the nose have overlapping regions of interest
+        cls.sources = [
+            {
+                "src_rgb_array": src_rgb_arrays["lips"],
+                "src_polygon": GetEndpointsOfLips.get_endpoints_of_lips(
+                    src_faces_landmarks["lips"]
+                ),
+                "dst_polygons": [
+                    GetEndpointsOfLips.get_endpoints_of_lips(dst_face_landmarks)
+                ],
+                "dst_cut_fields": [None],
+            },
+            {
+                "src_rgb_array": src_rgb_arrays["nose"],
+                "src_polygon": GetEndpointsOfANose.get_endpoints_of_a_nose(
+                    src_faces_landmarks["nose"]
+                )["four_endpoints"],
+                "dst_polygons": [dst_endpoints_of_a_nose["four_endpoints"]],
+                "dst_cut_fields": [dst_endpoints_of_a_nose["six_endpoints"]],
+            },
+        ]
+
+    def swap_parts_one_after_another(self):
+        """
+        :return: the user photo with the lips swapped first and the nose swapped in the result
+        :rtype: numpy.ndarray (https://docs.scipy.org/doc/numpy/reference/generated/numpy.ndarray.html)
+        """
+        swapped_rgb_array = self.dst_rgb_array
+        for source in self.sources:
+            swapped_rgb_array = ChangeFaceElement.change_face_element(
+                src_rgb_array=source["src_rgb_array"],
+                dst_rgb_array=swapped_rgb_array,
+                src_polygon=source["src_polygon"],
+                dst_polygon=source["dst_polygons"][0],
+                dst_cut_field=source["dst_cut_fields"][0],
+            )
+        return swapped_rgb_array
+
+    def test_fused_color_adjustment_is_close_to_parts_swapped_one_after_another(self):
+        expected_rgb_array = self.swap_parts_one_after_another()
+
+        swapped_rgb_arrays = {}
+        for fused_color_adjustment in (True, False):
+            swapped_rgb_arrays[
+                fused_color_adjustment
+            ] = ChangeFaceElement.change_face_elements_from_many_sources(
+                dst_rgb_array=self.dst_rgb_array,
+                sources=self.sources,
+                fused_color_adjustment=fused_color_adjustment,
+            )
+
+        np.testing.assert_array_equal(swapped_rgb_arrays[False], expected_rgb_array)
+        differences = np.abs(
+            swapped_rgb_arrays[True].astype(np.int16) - expected_rgb_array
+        )
+        self.assertLessEqual(
+            differences.max(), MAXIMUM_ABSOLUTE_DIFFERENCE_OF_THE_FUSED_COLOR_ADJUSTMENT
+        )
+        swapped_pixels = (expected_rgb_array != self.dst_rgb_array).any(axis=2) | (
+            swapped_rgb_arrays[True] != self.dst_rgb_array
+        ).any(axis=2)
+        self.assertLessEqual(
+            differences[swapped_pixels].mean(),
+            MAXIMUM_MEAN_DIFFERENCE_OF_THE_FUSED_COLOR_ADJUSTMENT,
+        )
+
+
+class FaceDetectionOnDownscaledPhotosTests(SimpleTestCase):
+    def test_same_faces_are_found_on_the_downscaled_photos(self):
+        for directory in DIRECTORIES_WITH_FACES.values():
+            for name in sorted(os.listdir(directory)):
+                rgb_array = np.array(
+                    open_rgb_photo(path=os.path.join(directory, name)), dtype=np.uint8
+                )
+                faces_locations = get_faces_locations(
+                    rgb_array=rgb_array, maximum_side_length=None
+                )
+                faces_locations_of_the_downscaled_photo = get_faces_locations(
+                    rgb_array=rgb_array,
+                    maximum_side_length=MAXIMUM_SIDE_LENGTH_OF_THE_DOWNSCALED_PHOTOS,
+                )
+
+                self.assertEqual(
+                    len(faces_locations_of_the_downscaled_photo),
+                    len(faces_locations),
+                    msg=name,
+                )
+                for face_location, face_location_of_the_downscaled_photo in zip(
+                    faces_locations, faces_locations_of_the_downscaled_photo
+                ):
+                    top, right, bottom, left = face_location
+                    sides_of_the_box = np.array(
+                        [bottom - top, right - left, bottom - top, right - left]
+                    )
+                    self.assertLessEqual(
+                        (
+                            np.abs(
+                                np.subtract(
+                                    face_location_of_the_downscaled_photo, face_location
+                                )
+                            )
+                            / sides_of_the_box
+                        ).max(),
+                        MAXIMUM_DISPLACEMENT_OF_THE_SIDES_OF_THE_FACE_BOXES,
+                        msg=name,
+                    )
+
+
+class SerializedRgbArraysTests(SimpleTestCase):
+    def setUp(self):
+        self.random_state = np.random.RandomState(SEED_OF_THE_RANDOM_INPUTS)
+        self.rgb_array = self.random_state.randint(0, 256, (30, 40, 3)).astype(np.uint8)
+
+    def assert_round_trip(self, rgb_array, compression):
+        deserialized_rgb_array = convert_bytes_to_rgb_array(
+            data=convert_rgb_array_to_bytes(rgb_array=rgb_array, compression=compression)
+        )
+
+        self.assertEqual(deserialized_rgb_array.dtype, rgb_array.dtype)
+        np.testing.assert_array_equal(deserialized_rgb_array, rgb_array)
+        self.assertFalse(deserialized_rgb_array.flags.writeable)
+
+    def test_round_trip_of_all_compressions(self):
+        for compression in COMPRESSIONS_OF_THE_SERIALIZED_RGB_ARRAYS:
+            with self.subTest(compression=compression):
+                self.assert_round_trip(rgb_array=self.rgb_array, compression=compression)
+                # a view which isn't contiguous
+                self.assert_round_trip(
+                    rgb_array=self.rgb_array[::2, 1:], compression=compression
+                )
+
+    def test_round_trip_of_other_types(self):
+        for rgb_array, compressions in (
+            (self.random_state.rand(7, 5, 3).astype(np.float32), ("raw", "zlib")),
+            (self.random_state.randint(-300, 300, (7, 5)).astype(">i2"), ("raw", "zlib")),
+            (
+                self.random_state.randint(0, 2**16, (7, 5, 4)).astype(np.uint16),
+                ("raw", "zlib", "png"),
+            ),
+        ):
+            for compression in compressions:
+                with self.subTest(dtype=rgb_array.dtype.str, compression=compression):
+                    self.assert_round_trip(rgb_array=rgb_array, compression=compression)
+
+    def test_png_compression_of_unsupported_arrays(self):
+        for rgb_array in (
+            self.rgb_array.astype(np.float32),
+            self.rgb_array[:, :, :2],
+        ):
+            with self.assertRaises(ValueError):
+                convert_rgb_array_to_bytes(rgb_array=rgb_array, compression="png")
+
+    def test_unknown_compression(self):
+        with self.assertRaises(ValueError):
+            convert_rgb_array_to_bytes(rgb_array=self.rgb_array, compression="lzma")
+
+    def test_data_of_another_version(self):
+        data = bytearray(convert_rgb_array_to_bytes(rgb_array=self.rgb_array))
+        data[0] = VERSION_OF_THE_SERIALIZED_RGB_ARRAYS + 1
+
+        with self.assertRaises(ValueError):
+            convert_bytes_to_rgb_array(data=bytes(data))
+        with self.assertRaises(ValueError):
+            convert_bytes_to_rgb_array(data=b"")
+
+
+class ColorIndexCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.random_state = np.random.RandomState(SEED_OF_THE_RANDOM_INPUTS)
+        self.training_image = self.random_state.randint(0, 256, (40, 40, 3)).astype(
+            np.uint8
+        )
+        self.polygon_of_images = [(5, 5), (30, 8), (25, 30)]
+        self.color_index_cache = ColorIndexCache()
+
+    def get_color_index(self, training_image, polygon_of_images):
+        """
+        :return: the color index fitted to the bounding rectangle of 'polygon_of_images' in 'training_image'
+        (see the function 'get_color_index' of the class 'ChangeFaceElement')
+        :rtype: ColorIndex (from 'apps.face_element_swapping.color_adjustment')
+        """
+        return ChangeFaceElement.get_color_index(
+            classifier=DEFAULT_CLASSIFIER,
+            training_image=training_image,
+            polygon_of_images=polygon_of_images,
+            color_index_cache=self.color_index_cache,
+        )
+
+    def test_color_index_of_the_same_rectangle_is_taken_from_the_cache(self):
+        color_index = self.get_color_index(
+            training_image=self.training_image, polygon_of_images=self.polygon_of_images
+        )
+        # other pixels of the training image aren't a part of the key
+        training_image = self.training_image.copy()
+        training_image[35:, 35:] = 0
+
+        self.assertIs(
+            self.get_color_index(
+                training_image=training_image, polygon_of_images=self.polygon_of_images
+            ),
+            color_index,
+        )
+        self.assertEqual(self.color_index_cache.misses, 1)
+        self.assertEqual(self.color_index_cache.hits, 1)
+        self.assertEqual(self.color_index_cache.get_statistics()["hit_rate"], 0.5)
+
+    def test_color_index_of_another_rectangle_is_fitted_again(self):
+        color_index = self.get_color_index(
+            training_image=self.training_image, polygon_of_images=self.polygon_of_images
+        )
+        training_image = self.training_image.copy()
+        training_image[10, 10] += 1
+
+        # the same photo with another polygon and the same polygon in another photo
+        for training_image, polygon_of_images in (
+            (self.training_image, [(5, 5), (30, 8), (25, 31)]),
+            (training_image, self.polygon_of_images),
+        ):
+            self.assertIsNot(
+                self.get_color_index(
+                    training_image=training_image, polygon_of_images=polygon_of_images
+                ),
+                color_index,
+            )
+        self.assertEqual(self.color_index_cache.misses, 3)
+        self.assertEqual(self.color_index_cache.hits, 0)
+        self.assertEqual(len(self.color_index_cache), 3)
+
+    def test_least_recently_used_color_indexes_are_evicted(self):
+        color_indexes = [
+            ColorIndex(
+                classifier=DEFAULT_CLASSIFIER,
+                training_data=self.random_state.randint(0, 256, (200, 3)).astype(
+                    np.uint8
+                ),
+            )
+            for _ in range(4)
+        ]
+        keys = [("color index", idx) for idx in range(4)]
+        number_of_bytes_of_an_index = color_indexes[0].nbytes
+        color_index_cache = ColorIndexCache(
+            maximum_number_of_bytes=2 * number_of_bytes_of_an_index
+        )
+
+        color_index_cache.add(key=keys[0], color_index=color_indexes[0])
+        color_index_cache.add(key=keys[1], color_index=color_indexes[1])
+        self.assertIs(color_index_cache.get(key=keys[0]), color_indexes[0])
+        color_index_cache.add(key=keys[2], color_index=color_indexes[2])
+
+        self.assertIsNone(color_index_cache.get(key=keys[1]))
+        self.assertIs(color_index_cache.get(key=keys[0]), color_indexes[0])
+        self.assertIs(color_index_cache.get(key=keys[2]), color_indexes[2])
+        self.assertEqual(
+            color_index_cache.number_of_bytes, 2 * number_of_bytes_of_an_index
+        )
+
+        # indexes bigger than the whole cache aren't stored
+        color_index_cache = ColorIndexCache(
+            maximum_number_of_bytes=number_of_bytes_of_an_index - 1
+        )
+        color_index_cache.add(key=keys[3], color_index=color_indexes[3])
+        self.assertEqual(len(color_index_cache), 0)
+
+
+def get_float_warp_maps(warp_maps):
+    """
+    :param warp_maps: the result of calling the function 'get_warp_maps'
+    (from 'apps.face_element_swapping.piecewise_affine_warp')
+    :type warp_maps: tuple - (numpy.ndarray, numpy.ndarray)
+    :return: the source 'x' and 'y' coordinates of every pixel of the output image
+    :rtype: tuple - (numpy.ndarray, numpy.ndarray)
+    """
+    return cv2.convertMaps(warp_maps[0], warp_maps[1], cv2.CV_32FC1)
+
+
+class PiecewiseAffineWarpTests(SimpleTestCase):
+    def setUp(self):
+        self.src_points = np.array(
+            [(0, 0), (60, 2), (58, 40), (3, 38), (30, 20), (20, 12)], dtype=np.float64
+        )
+        self.dst_points = np.array(
+            [(0, 0), (50, 0), (50, 30), (0, 30), (28, 14), (15, 10)], dtype=np.float64
+        )
+        self.size_of_the_output = (51, 31)
+        self.perspective_transform = cv2.getPerspectiveTransform(
+            self.src_points[:4].astype(np.float32), self.dst_points[:4].astype(np.float32)
+        )
+
+    def test_destination_points_are_mapped_to_the_source_points(self):
+        map_x, map_y = get_float_warp_maps(
+            warp_maps=get_warp_maps(
+                src_points=self.src_points,
+                dst_points=self.dst_points,
+                size_of_the_output=self.size_of_the_output,
+                perspective_transform=self.perspective_transform,
+            )
+        )
+
+        for (src_x, src_y), (dst_x, dst_y) in zip(self.src_points, self.dst_points):
+            self.assertAlmostEqual(
+                map_x[int(dst_y), int(dst_x)], src_x, delta=MAXIMUM_ERROR_OF_THE_WARP_MAPS
+            )
+            self.assertAlmostEqual(
+                map_y[int(dst_y), int(dst_x)], src_y, delta=MAXIMUM_ERROR_OF_THE_WARP_MAPS
+            )
+
+    def test_repeated_points_are_triangulated_once(self):
+        triangles = get_delaunay_triangles(points=self.dst_points)
+
+        np.testing.assert_array_equal(
+            get_delaunay_triangles(
+                points=np.concatenate([self.dst_points, self.dst_points[:3]])
+            ),
+            triangles,
+        )
+
+    def test_degenerate_points_are_warped_by_the_perspective_transform(self):
+        collinear_points = np.array([(0, 0), (10, 10), (20, 20), (30, 30)], dtype=np.float64)
+        self.assertEqual(len(get_delaunay_triangles(points=collinear_points)), 0)
+        self.assertEqual(len(get_delaunay_triangles(points=np.zeros((4, 2)))), 0)
+
+        map_x, map_y = get_float_warp_maps(
+            warp_maps=get_warp_maps(
+                src_points=self.src_points[:4],
+                dst_points=collinear_points,
+                size_of_the_output=self.size_of_the_output,
+                perspective_transform=self.perspective_transform,
+            )
+        )
+        xs, ys = np.meshgrid(
+            np.arange(self.size_of_the_output[0], dtype=np.float32),
+            np.arange(self.size_of_the_output[1], dtype=np.float32),
+        )
+        expected_points = cv2.perspectiveTransform(
+            np.dstack([xs, ys]).reshape(-1, 1, 2),
+            np.linalg.inv(self.perspective_transform),
+        ).reshape(ys.shape + (2,))
+        np.testing.assert_allclose(
+            map_x, expected_points[:, :, 0], atol=MAXIMUM_ERROR_OF_THE_WARP_MAPS
+        )
+        np.testing.assert_allclose(
+            map_y, expected_points[:, :, 1], atol=MAXIMUM_ERROR_OF_THE_WARP_MAPS
+        )
+
+    def test_least_recently_used_maps_are_evicted(self):
+        warp_maps = [
+            get_warp_maps(
+                src_points=self.src_points + shift,
+                dst_points=self.dst_points,
+                size_of_the_output=self.size_of_the_output,
+                perspective_transform=self.perspective_transform,
+            )
+            for shift in range(4)
+        ]
+        keys = [
+            WarpMapCache.get_key(
+                src_points=self.src_points + shift,
+                dst_points=self.dst_points,
+                size_of_the_output=self.size_of_the_output,
+            )
+            for shift in range(4)
+        ]
+        number_of_bytes_of_the_maps = sum(warp_map.nbytes for warp_map in warp_maps[0])
+        warp_map_cache = WarpMapCache(
+            maximum_number_of_bytes=2 * number_of_bytes_of_the_maps
+        )
+
+        warp_map_cache.add(key=keys[0], warp_maps=warp_maps[0])
+        warp_map_cache.add(key=keys[1], warp_maps=warp_maps[1])
+        self.assertIs(warp_map_cache.get(key=keys[0]), warp_maps[0])
+        warp_map_cache.add(key=keys[2], warp_maps=warp_maps[2])
+
+        self.assertIsNone(warp_map_cache.get(key=keys[1]))
+        self.assertIs(warp_map_cache.get(key=keys[0]), warp_maps[0])
+        self.assertIs(warp_map_cache.get(key=keys[2]), warp_maps[2])
+        self.assertFalse(warp_maps[0][0].flags.writeable)
+        self.assertEqual(
+            warp_map_cache.get_statistics()["number_of_bytes"],
+            2 * number_of_bytes_of_the_maps,
+        )
+
+        # maps bigger than the whole cache aren't stored
+        WarpMapCache(maximum_number_of_bytes=number_of_bytes_of_the_maps - 1).add(
+            key=keys[3], warp_maps=warp_maps[3]
+        )
+        self.assertTrue(warp_maps[3][0].flags.writeable)
+
+
+class FramePipelineTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.src_rgb_array = np.array(
+            open_rgb_photo(path=PATHS_OF_THE_EXAMPLE_FACES["lips"]), dtype=np.uint8
+        )
+        cls.src_face_landmarks = get_faces_landmarks(rgb_array=cls.src_rgb_array)[0]
+        rgb_array = np.array(open_rgb_photo(path=PATH_OF_THE_USER_PHOTO), dtype=np.uint8)
+        cls.frames_with_a_face = [
+            np.roll(rgb_array, idx * SHIFT_OF_THE_FACE_BETWEEN_FRAMES, axis=1)
+            for idx in range(4)
+        ]
+        cls.frame_without_faces = np.zeros_like(rgb_array)
+        cls.frame_with_two_faces = np.array(get_group_photo(), dtype=np.uint8)
+
+    def swap(self, frames, number_of_workers):
+        """
+        :param frames: the frames of a video
+        :type frames: list - [] of numpy.ndarray
+        :param number_of_workers: see the function 'swap_part_of_face_in_frames'
+        (from 'apps.face_element_swapping.frames')
+        :type number_of_workers: integer - int
+        :return: the processed frames
+        :rtype: list - [] of numpy.ndarray
+        """
+        return list(
+            swap_part_of_face_in_frames(
+                frames=iter(frames),
+                src_rgb_array=self.src_rgb_array,
+                src_face_landmarks=self.src_face_landmarks,
+                part_of_face="lips",
+                number_of_workers=number_of_workers,
+            )
+        )
+
+    def test_frames_of_the_workers_are_the_same_as_the_frames_of_the_calling_process(self):
+        frames = self.frames_with_a_face + [self.frame_without_faces]
+
+        swapped_frames = self.swap(frames=frames, number_of_workers=0)
+
+        self.assertEqual(len(swapped_frames), len(frames))
+        for frame, swapped_frame in zip(self.frames_with_a_face, swapped_frames):
+            self.assertTrue((swapped_frame != frame).any())
+        for swapped_frame, frame_of_the_workers in zip(
+            swapped_frames, self.swap(frames=frames, number_of_workers=2)
+        ):
+            np.testing.assert_array_equal(frame_of_the_workers, swapped_frame)
+
+    def test_frames_without_exactly_one_face_are_not_changed(self):
+        # Every frame is detected, so the frames without faces and with two faces are recognized.
+        frames = [
+            self.frames_with_a_face[0],
+            self.frame_without_faces,
+            self.frame_with_two_faces,
+            self.frames_with_a_face[1],
+        ]
+
+        swapped_frames = list(
+            swap_part_of_face_in_frames(
+                frames=iter(frames),
+                src_rgb_array=self.src_rgb_array,
+                src_face_landmarks=self.src_face_landmarks,
+                part_of_face="lips",
+                number_of_workers=0,
+                landmark_tracker=LandmarkTracker(detection_interval=1),
+            )
+        )
+
+        self.assertIs(swapped_frames[1], self.frame_without_faces)
+        self.assertIs(swapped_frames[2], self.frame_with_two_faces)
+        self.assertTrue((swapped_frames[3] != self.frames_with_a_face[1]).any())
+
+    def test_black_frame_after_a_tracked_face_is_swapped(self):
+        # The tracked frames aren't searched for faces, so the black frame gets the tracked landmarks.
+        frames = self.frames_with_a_face[:2] + [self.frame_without_faces]
+
+        swapped_frames = self.swap(frames=frames, number_of_workers=0)
+
+        self.assertEqual(swapped_frames[2].shape, self.frame_without_faces.shape)
+        self.assertTrue(swapped_frames[2].any())
+
+    def test_faces_are_detected_again_after_the_detection_interval(self):
+        landmark_tracker = LandmarkTracker(detection_interval=3)
+
+        for idx in range(7):
+            self.assertIsNotNone(
+                landmark_tracker.track(
+                    rgb_array=self.frames_with_a_face[idx % len(self.frames_with_a_face)]
+                )
+            )
+        # the frames 0, 3 and 6
+        self.assertEqual(landmark_tracker.number_of_detections, 3)
+
+    def test_faces_are_detected_again_after_a_low_confidence_of_the_tracking(self):
+        landmark_tracker = LandmarkTracker(detection_interval=100, minimum_confidence=0.7)
+
+        # the tracking of the third frame isn't confident
+        with mock.patch(
+            "apps.face_element_swapping.endpoints.landmark_tracker.get_intersection_over_union",
+            side_effect=[0.9, 0.5, 0.9],
+        ):
+            for frame in self.frames_with_a_face:
+                self.assertIsNotNone(landmark_tracker.track(rgb_array=frame))
+
+        self.assertEqual(landmark_tracker.number_of_detections, 2)
+        # a detected frame without faces resets the tracking
+        landmark_tracker.reset()
+        self.assertIsNone(landmark_tracker.track(rgb_array=self.frame_without_faces))
+        self.assertIsNotNone(landmark_tracker.track(rgb_array=self.frames_with_a_face[0]))
+        self.assertEqual(landmark_tracker.number_of_detections, 4)
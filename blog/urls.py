@@ -8,4 +8,9 @@ urlpatterns = [
         r'^change_part_of_face/$', views.change_part_of_face, name='change_part_of_face'
     ),
     re_path(r'^load_faces/$', views.load_faces, name='load_faces'),
+    re_path(
+        r'^near_duplicate_statistics/$',
+        views.near_duplicate_statistics,
+        name='near_duplicate_statistics',
+    ),
 ]
@@ -1,4 +1,4 @@
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
 from django.shortcuts import render
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
@@ -12,10 +12,15 @@ from .settings import (
     KEY_OF_AN_INPUT_PHOTO,
     KEY_OF_THE_ACTIVE_PART_OF_THE_FACE,
     KEY_OF_THE_FACE_ID,
+    KEY_OF_THE_FACE_INDICES,
+    KEY_OF_THE_FACE_LOCATION,
+    KEY_OF_THE_PARTS_OF_THE_FACE,
+    NEAR_DUPLICATE_STATISTICS_ENABLED,
     REQUEST_METHOD_OF_THE_FACE_LOADING,
     REQUEST_METHOD_OF_THE_FACE_SWAPPING,
     REQUIRED_KEYS_OF_THE_FACE_LOADING_REQUEST,
     REQUIRED_KEYS_OF_THE_FACE_SWAPPING_REQUEST,
+    REQUIRED_KEYS_OF_THE_MULTI_PART_FACE_SWAPPING_REQUEST,
 )
 
 
@@ -72,16 +77,22 @@ def change_part_of_face(request):
     """
     :param request: a http requests from the FrontEnd.
     The correct request should contain all the keys from
-    the 'REQUIRED_KEYS_OF_THE_FACE_SWAPPING_REQUEST' list.
+    the 'REQUIRED_KEYS_OF_THE_FACE_SWAPPING_REQUEST' list or, if several parts of the face are swapped at once,
+    all the keys from the 'REQUIRED_KEYS_OF_THE_MULTI_PART_FACE_SWAPPING_REQUEST' list.
+    It may also contain the box of the face (the key 'KEY_OF_THE_FACE_LOCATION')
+    and the indices of the swapped faces (the key 'KEY_OF_THE_FACE_INDICES').
     :type request: django.core.handlers.wsgi.WSGIRequest
     :return: result of calling the function 'process_user_photo'
     (class 'ProcessUserPhoto' from the file './process_user_data/swap_elements_of_face.py').
     :rtype: dictionary converted into a JSON object (type - django.http.response.JsonResponse)
-    :raises ValueError: if the request doesn't contain a key
-    from the 'REQUIRED_KEYS_OF_THE_FACE_SWAPPING_REQUEST' list.
+    :raises ValueError: if the request doesn't contain a key from the list of the required keys.
     """
 
-    for required_key in REQUIRED_KEYS_OF_THE_FACE_SWAPPING_REQUEST:
+    if KEY_OF_THE_PARTS_OF_THE_FACE in request.POST:
+        required_keys = REQUIRED_KEYS_OF_THE_MULTI_PART_FACE_SWAPPING_REQUEST
+    else:
+        required_keys = REQUIRED_KEYS_OF_THE_FACE_SWAPPING_REQUEST
+    for required_key in required_keys:
         if required_key not in request.POST:
             raise ValueError(
                 "The required key '{required_key}' "
@@ -91,7 +102,30 @@ def change_part_of_face(request):
     input_photo = request.POST.get(KEY_OF_AN_INPUT_PHOTO)
     part_of_face = request.POST.get(KEY_OF_THE_ACTIVE_PART_OF_THE_FACE)
     face_id = request.POST.get(KEY_OF_THE_FACE_ID)
+    face_location = request.POST.get(KEY_OF_THE_FACE_LOCATION)
+    face_indices = request.POST.get(KEY_OF_THE_FACE_INDICES)
+    parts_of_face = request.POST.get(KEY_OF_THE_PARTS_OF_THE_FACE)
 
     return ProcessUserPhoto.process_user_photo(
-        input_photo=input_photo, part_of_face=part_of_face, face_id=face_id
+        input_photo=input_photo,
+        part_of_face=part_of_face,
+        face_id=face_id,
+        face_location=face_location,
+        face_indices=face_indices,
+        parts_of_face=parts_of_face,
     )
+
+
+def near_duplicate_statistics(request):
+    """
+    :param request: a http requests from the FrontEnd.
+    :type request: django.core.handlers.wsgi.WSGIRequest
+    :return: the statistics of the reuse of the landmarks of near duplicates of new photos
+    (see the class 'NearDuplicateStatistics' from the file './process_user_data/near_duplicates.py')
+    counted by the process which handles the request.
+    :rtype: dictionary converted into a JSON object (type - django.http.response.JsonResponse)
+    :raises Http404: if 'NEAR_DUPLICATE_STATISTICS_ENABLED' (from the file '.settings') is False.
+    """
+    if not NEAR_DUPLICATE_STATISTICS_ENABLED:
+        raise Http404
+    return JsonResponse(ProcessUserPhoto.near_duplicate_statistics.get_statistics())
@@ -10,7 +10,22 @@ https://docs.djangoproject.com/en/2.0/howto/deployment/wsgi/
 import os
 
 from django.core.wsgi import get_wsgi_application
+from django.db import DatabaseError
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "myproject.settings")
 
 application = get_wsgi_application()
+
+# The models of the landmark detection are loaded once, before the first request.
+from blog.process_user_data import ProcessUserPhoto  # noqa: E402
+from blog.settings import LANDMARK_DETECTION_IN_WORKER_PROCESSES  # noqa: E402
+
+if LANDMARK_DETECTION_IN_WORKER_PROCESSES:
+    ProcessUserPhoto.landmark_detection_service.start()
+
+# The example faces are decoded once, before the first request. If the database can't be read
+# (e.g. it hasn't been migrated yet), the examples are loaded by the first requests which swap them.
+try:
+    ProcessUserPhoto.preload_example_faces()
+except DatabaseError:
+    pass